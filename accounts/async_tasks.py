@@ -85,7 +85,10 @@ def enhance_session_async(session_id: str, request_meta: dict):
         Enhanced session data
     """
     try:
-        from core.session_manager import session_manager
+        from core.session_manager import (
+            session_manager,
+            SESSION_DURATION_SECONDS
+        )
         from core.utils import get_location_from_ip, get_device_info
         import json
 
@@ -152,11 +155,8 @@ def enhance_session_async(session_id: str, request_meta: dict):
 
         # Update session in Redis and Database
         if session_manager.use_redis:
-            redis_key = f"session:{session_id}"
-            session_manager.redis_client.setex(
-                redis_key,
-                session_manager.SESSION_DURATION_SECONDS,
-                json.dumps(session_data, default=str)
+            session_manager.store_session(
+                session_id, session_data, SESSION_DURATION_SECONDS
             )
 
         # Update database session record
@@ -189,7 +189,10 @@ def enhance_device_fingerprint_async(self, session_id: str, client_fingerprint_d
         client_fingerprint_data: Client-side fingerprint data
     """
     try:
-        from core.session_manager import session_manager
+        from core.session_manager import (
+            session_manager,
+            SESSION_DURATION_SECONDS
+        )
         from core.device_fingerprint import OptimizedDeviceFingerprint
 
         # Get current session data
@@ -231,12 +234,8 @@ def enhance_device_fingerprint_async(self, session_id: str, client_fingerprint_d
 
         # Update Redis cache
         if session_manager.use_redis:
-            import json
-            redis_key = f"session:{session_id}"
-            session_manager.redis_client.setex(
-                redis_key,
-                SESSION_DURATION_SECONDS,
-                json.dumps(session_data, default=str)
+            session_manager.store_session(
+                session_id, session_data, SESSION_DURATION_SECONDS
             )
 
         # Update database
@@ -0,0 +1,149 @@
+"""
+Set-based reconciliation of the denormalized UserProfile counters.
+
+Each counter is recomputed for a chunk of profiles with one grouped
+``COUNT`` per counter (keyed by follower, followed, author, ...), and only
+the profiles whose stored values drifted are written, with
+``bulk_update``. Follow and post signals record touched profiles in
+``dirty_profiles`` so the periodic task only recounts those.
+"""
+
+from collections import defaultdict
+from typing import Iterable, Sequence
+
+from django.db.models import Count
+
+from core.dirty_sets import DirtyIdSet
+
+from .models import UserProfile
+
+# Counters kept in sync by accounts.tasks.update_user_counters
+USER_COUNTER_FIELDS = ('follower_count', 'following_count', 'posts_count')
+
+# Every counter rebuilt by the sync_counters management command
+ALL_COUNTER_FIELDS = USER_COUNTER_FIELDS + (
+    'likes_given_count', 'comments_made_count', 'reposts_count',
+    'shares_sent_count', 'shares_received_count', 'polls_created_count',
+    'poll_votes_count', 'communities_joined_count',
+)
+
+REPOST_TYPES = ['repost', 'repost_with_media', 'repost_quote', 'repost_remix']
+
+
+def _counter_sources():
+    """
+    Counter field -> (queryset of counted rows, lookup to the profile).
+
+    Definitions match the ``UserProfile.sync_*`` methods.
+    """
+    from accounts.models import Follow
+    from content.models import (
+        Comment, DirectShare, DirectShareRecipient, Post, PostReaction
+    )
+    from polls.models import Poll, PollVote
+
+    approved_follows = Follow.objects.filter(status='approved', is_deleted=False)
+    sources = {
+        'follower_count': (approved_follows, 'followed'),
+        'following_count': (approved_follows, 'follower'),
+        'posts_count': (Post.objects.filter(is_deleted=False), 'author'),
+        'likes_given_count': (PostReaction.objects.filter(
+            reaction_type__in=PostReaction.POSITIVE_REACTIONS, is_deleted=False
+        ), 'user'),
+        'comments_made_count': (
+            Comment.objects.filter(is_deleted=False), 'author'
+        ),
+        'reposts_count': (Post.objects.filter(
+            post_type__in=REPOST_TYPES, is_deleted=False
+        ), 'author'),
+        'shares_sent_count': (
+            DirectShare.objects.filter(is_deleted=False), 'sender'
+        ),
+        'shares_received_count': (
+            DirectShareRecipient.objects.filter(is_deleted=False), 'recipient'
+        ),
+        'polls_created_count': (
+            Poll.objects.filter(is_deleted=False), 'post__author'
+        ),
+        'poll_votes_count': (
+            PollVote.objects.filter(is_deleted=False), 'voter__profile'
+        ),
+    }
+    try:
+        from communities.models import CommunityMembership
+        sources['communities_joined_count'] = (
+            CommunityMembership.objects.filter(is_deleted=False), 'user'
+        )
+    except ImportError:
+        # communities app might not be available
+        pass
+    return sources
+
+
+def recount_profile_counters(profile_ids: Iterable,
+                             fields: Sequence[str] = USER_COUNTER_FIELDS) -> int:
+    """
+    Recompute ``fields`` for ``profile_ids`` and persist those that changed.
+
+    Returns:
+        Number of profiles whose counters were corrected
+    """
+    profile_ids = list(profile_ids)
+    sources = _counter_sources()
+    fields = [field for field in fields if field in sources]
+
+    actual = {}
+    for field in fields:
+        queryset, lookup = sources[field]
+        actual[field] = defaultdict(int, {
+            row[lookup]: row['total']
+            for row in queryset.filter(
+                **{f'{lookup}__in': profile_ids}
+            ).order_by().values(lookup).annotate(total=Count('pk'))
+        })
+
+    changed = []
+    for row in UserProfile.objects.filter(pk__in=profile_ids).values('pk', *fields):
+        if any(row[field] != actual[field][row['pk']] for field in fields):
+            profile = UserProfile(pk=row['pk'])
+            for field in fields:
+                setattr(profile, field, actual[field][row['pk']])
+            changed.append(profile)
+
+    if changed:
+        UserProfile.objects.bulk_update(changed, fields, batch_size=1000)
+    return len(changed)
+
+
+def rebuild_all_profile_counters(fields: Sequence[str] = ALL_COUNTER_FIELDS,
+                                 batch_size: int = 5000,
+                                 progress=None) -> tuple:
+    """
+    Recount every profile, walking the table in primary-key order.
+
+    Args:
+        progress: Optional callable receiving ``(processed, corrected)``
+            after each chunk
+
+    Returns:
+        ``(processed, corrected)``
+    """
+    processed = corrected = 0
+    last_pk = None
+    while True:
+        profiles = UserProfile.objects.order_by('pk')
+        if last_pk is not None:
+            profiles = profiles.filter(pk__gt=last_pk)
+        chunk = list(profiles.values_list('pk', flat=True)[:batch_size])
+        if not chunk:
+            break
+        corrected += recount_profile_counters(chunk, fields)
+        processed += len(chunk)
+        last_pk = chunk[-1]
+        if progress:
+            progress(processed, corrected)
+    return processed, corrected
+
+
+# Profiles touched by follow and post signals
+dirty_profiles = DirtyIdSet('accounts:dirty_profiles')
@@ -0,0 +1,151 @@
+"""
+Benchmark for the user counter recount (update_user_counters / sync_counters).
+
+Seeds synthetic profiles with follows and posts inside a transaction that is
+rolled back at the end, leaving every stored counter at zero so each seeded
+profile drifted. Times a full set-based recount of the counters kept by
+update_user_counters, then the per-chunk recount the task runs for a dirty
+share of the profiles.
+"""
+
+import time
+import uuid
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.counters import (
+    USER_COUNTER_FIELDS, rebuild_all_profile_counters, recount_profile_counters
+)
+from accounts.models import Follow, UserProfile
+from content.models import Post
+
+# Target for recounting every profile of a large deployment
+TARGET_SECONDS = 60
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic profiles with follows and posts (rolled back '
+        'afterwards) and time the user counter recount'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--profiles', type=int, default=1000000,
+            help='Profiles to seed (default: 1000000)'
+        )
+        parser.add_argument(
+            '--follows-per-profile', type=int, default=3,
+            help='Approved follows seeded per profile (default: 3)'
+        )
+        parser.add_argument(
+            '--posts-per-profile', type=int, default=1,
+            help='Posts seeded per profile (default: 1)'
+        )
+        parser.add_argument(
+            '--dirty-percent', type=float, default=1.0,
+            help='Share of profiles recounted as dirty by the incremental '
+                 'run (default: 1.0)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Profiles recounted per grouped query (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            full_seconds = self._run(options)
+            # Leave no benchmark data behind
+            transaction.set_rollback(True)
+
+        if full_seconds <= TARGET_SECONDS:
+            self.stdout.write(self.style.SUCCESS(
+                f'✓ Full recount of {options["profiles"]} profiles within '
+                f'{TARGET_SECONDS}s (seed data rolled back)'
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f'Full recount of {options["profiles"]} profiles took '
+                f'{full_seconds:.1f}s, over the {TARGET_SECONDS}s target '
+                f'(seed data rolled back)'
+            ))
+
+    def _run(self, options):
+        self.stdout.write(f"Seeding {options['profiles']} profiles...")
+        profile_ids = self._seed_profiles(options['profiles'])
+        self.stdout.write('Seeding follows and posts...')
+        self._seed_activity(profile_ids, options)
+
+        batch_size = options['batch_size']
+        start = time.perf_counter()
+        processed, corrected = rebuild_all_profile_counters(
+            USER_COUNTER_FIELDS, batch_size=batch_size
+        )
+        full_seconds = time.perf_counter() - start
+        self._report('Full recount', full_seconds, processed, corrected)
+
+        # Drift the dirty share again, as the task finds it
+        dirty = profile_ids[:max(1, int(
+            len(profile_ids) * options['dirty_percent'] / 100.0
+        ))]
+        UserProfile.objects.filter(pk__in=dirty).update(
+            follower_count=0, following_count=0, posts_count=0
+        )
+        start = time.perf_counter()
+        corrected = 0
+        for offset in range(0, len(dirty), batch_size):
+            corrected += recount_profile_counters(
+                dirty[offset:offset + batch_size]
+            )
+        self._report(
+            f'Incremental ({len(dirty)} dirty)',
+            time.perf_counter() - start, len(dirty), corrected
+        )
+        return full_seconds
+
+    def _seed_profiles(self, count):
+        run_id = uuid.uuid4().hex[:8]
+        profile_ids = []
+        for offset in range(0, count, 5000):
+            users = User.objects.bulk_create([
+                User(username=f'bench-{run_id}-{n}')
+                for n in range(offset, min(offset + 5000, count))
+            ])
+            profiles = UserProfile.objects.bulk_create([
+                UserProfile(
+                    user=user, phone_number='+15550000000',
+                    date_of_birth='1990-01-01'
+                )
+                for user in users
+            ])
+            profile_ids.extend(profile.pk for profile in profiles)
+        return profile_ids
+
+    def _seed_activity(self, profile_ids, options):
+        total = len(profile_ids)
+        follows = min(options['follows_per_profile'], total - 1)
+        for offset in range(0, total, 5000):
+            chunk = range(offset, min(offset + 5000, total))
+            # Each profile follows the next ``follows`` profiles in the ring
+            Follow.objects.bulk_create([
+                Follow(
+                    follower_id=profile_ids[n],
+                    followed_id=profile_ids[(n + step) % total],
+                    status='approved'
+                )
+                for n in chunk
+                for step in range(1, follows + 1)
+            ], batch_size=5000)
+            Post.objects.bulk_create([
+                Post(author_id=profile_ids[n], content='Counter benchmark')
+                for n in chunk
+                for _ in range(options['posts_per_profile'])
+            ], batch_size=5000)
+
+    def _report(self, label, elapsed, processed, corrected):
+        self.stdout.write(
+            f'  {label:<40} {elapsed:8.2f}s  '
+            f'{processed} processed, {corrected} corrected'
+        )
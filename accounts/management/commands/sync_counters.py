@@ -1,7 +1,9 @@
 """Management command to synchronize UserProfile counters with model counts."""
 
 from django.core.management.base import BaseCommand
-from django.db import transaction
+from accounts.counters import (
+    ALL_COUNTER_FIELDS, rebuild_all_profile_counters, recount_profile_counters
+)
 from accounts.models import UserProfile
 
 
@@ -17,79 +19,50 @@ class Command(BaseCommand):
         parser.add_argument(
             '--batch-size',
             type=int,
-            default=100,
-            help='Process profiles in batches (default: 100)',
+            default=5000,
+            help='Profiles recounted per grouped query (default: 5000)',
         )
 
     def handle(self, *args, **options):
         profile_id = options.get('profile_id')
-        batch_size = options.get('batch_size', 100)
+        batch_size = options.get('batch_size', 5000)
 
         if profile_id:
             # Sync specific profile
-            try:
-                profile = UserProfile.objects.get(id=profile_id)
-                self.sync_profile_counters(profile)
-                self.stdout.write(
-                    self.style.SUCCESS(
-                        f'Successfully synced counters for profile '
-                        f'{profile_id}'
-                    )
-                )
-            except UserProfile.DoesNotExist:
+            if not UserProfile.objects.filter(id=profile_id).exists():
                 self.stdout.write(
                     self.style.ERROR(
                         f'UserProfile with ID {profile_id} not found'
                     )
                 )
                 return
+            recount_profile_counters([profile_id], ALL_COUNTER_FIELDS)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Successfully synced counters for profile '
+                    f'{profile_id}'
+                )
+            )
         else:
-            # Sync all profiles in batches
+            # Full rebuild: every profile, chunk by chunk
             total_profiles = UserProfile.objects.count()
             self.stdout.write(
                 f'Syncing counters for {total_profiles} profiles...'
             )
 
-            processed = 0
-            while processed < total_profiles:
-                batch_end = processed + batch_size
-                batch = UserProfile.objects.all()[processed:batch_end]
-
-                for profile in batch:
-                    self.sync_profile_counters(profile)
-                    processed += 1
+            def report(processed, corrected):
+                self.stdout.write(
+                    f'Processed {processed}/{total_profiles} profiles '
+                    f'({corrected} corrected)'
+                )
 
-                    if processed % 50 == 0:
-                        self.stdout.write(
-                            f'Processed {processed}/{total_profiles} profiles'
-                        )
+            processed, corrected = rebuild_all_profile_counters(
+                ALL_COUNTER_FIELDS, batch_size=batch_size, progress=report
+            )
 
             self.stdout.write(
                 self.style.SUCCESS(
-                    f'Successfully synced counters for {total_profiles} '
-                    f'profiles'
+                    f'Successfully synced counters for {processed} '
+                    f'profiles ({corrected} corrected)'
                 )
             )
-
-    def sync_profile_counters(self, profile):
-        """Sync counters for a specific profile."""
-        with transaction.atomic():
-            # Sync all counter types
-            profile.sync_posts_count()
-            profile.sync_followers_following_count()
-            profile.sync_likes_given_count()
-            profile.sync_comments_made_count()
-            profile.sync_reposts_count()
-            profile.sync_shares_count()
-            profile.sync_equipments_added_count()
-            profile.sync_polls_and_votes_count()
-            profile.sync_communities_joined_count()
-
-            # Save all updated counter fields
-            profile.save(update_fields=[
-                'posts_count', 'follower_count', 'following_count',
-                'likes_given_count', 'comments_made_count', 'reposts_count',
-                'shares_sent_count', 'shares_received_count',
-                'equipments_added_count', 'polls_created_count',
-                'poll_votes_count', 'communities_joined_count'
-            ])
@@ -1835,9 +1835,13 @@ class UserSession(models.Model):
                         redis_key, 3600, json.dumps(data, default=str)
                     )
 
-                # Remove from user's active sessions
-                user_sessions_key = f"user_sessions:{self.user.id}"
-                redis_client.srem(user_sessions_key, self.session_id)
+                # Remove from the user and fingerprint session indexes
+                from core.session_manager import session_manager
+                index_data = json.loads(session_data) if session_data else {}
+                index_data.setdefault('user_id', str(self.user.id))
+                index_data.setdefault('device_fingerprint', self.device_fingerprint)
+                index_data.setdefault('fast_fingerprint', self.fast_fingerprint)
+                session_manager.unindex_session(self.session_id, index_data)
 
             except Exception as e:
                 # Log but don't fail if Redis update fails
@@ -1902,9 +1906,11 @@ class UserSession(models.Model):
                         json.dumps(data, default=str)
                     )
 
-                    # Also update user sessions set expiration
-                    user_sessions_key = f"user_sessions:{self.user.id}"
-                    redis_client.expire(user_sessions_key, ttl_seconds)
+                    # Keep the user and fingerprint indexes alive as long
+                    from core.session_manager import session_manager
+                    session_manager.index_session(
+                        self.session_id, data, ttl_seconds
+                    )
 
                     import logging
                     logger = logging.getLogger('accounts.models')
@@ -1934,10 +1940,11 @@ class UserSession(models.Model):
                         json.dumps(redis_data, default=str)
                     )
 
-                    # Re-add to user sessions
-                    user_sessions_key = f"user_sessions:{self.user.id}"
-                    redis_client.sadd(user_sessions_key, self.session_id)
-                    redis_client.expire(user_sessions_key, ttl_seconds)
+                    # Re-add to the user and fingerprint indexes
+                    from core.session_manager import session_manager
+                    session_manager.index_session(
+                        self.session_id, redis_data, ttl_seconds
+                    )
 
             except Exception as e:
                 import logging
@@ -8,6 +8,7 @@ from django.db.utils import IntegrityError
 from django.contrib.auth.models import User
 from django.utils import timezone
 from accounts.models import UserProfile, UserEvent
+from accounts.counters import dirty_profiles
 
 logger = logging.getLogger(__name__)
 
@@ -151,6 +152,17 @@ def follow_relationship_deleted(sender, instance, **kwargs):
         _inc(instance.follower, 'following_count', -1)
         _inc(instance.followed, 'follower_count', -1)
 
+# Profiles whose follow/post counters update_user_counters should recount
+@receiver(post_save, sender='accounts.Follow')
+@receiver(post_delete, sender='accounts.Follow')
+def mark_follow_profiles_dirty(sender, instance, **kwargs):  # noqa: ARG001
+    dirty_profiles.mark_on_commit(instance.follower_id, instance.followed_id)
+
+@receiver(post_save, sender='content.Post')
+@receiver(post_delete, sender='content.Post')
+def mark_post_author_dirty(sender, instance, **kwargs):  # noqa: ARG001
+    dirty_profiles.mark_on_commit(instance.author_id)
+
 # Polls
 @receiver(post_save, sender='polls.Poll')
 def poll_created(sender, instance, created, **kwargs):  # noqa: ARG001
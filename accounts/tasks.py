@@ -104,43 +104,52 @@ def cleanup_ended_sessions():
 
 
 @shared_task
-def update_user_counters():
-    """Update user counter fields like follower_count, following_count, posts_count"""
-    from accounts.models import Follow
-    from content.models import Post
-
-    users = UserProfile.objects.all()
+def update_user_counters(batch_size=5000, max_batches=200):
+    """
+    Update user counter fields like follower_count, following_count,
+    posts_count for profiles touched by follow/post signals since the
+    last run. If Redis is unavailable, every profile is recounted.
+    """
+    from accounts.counters import (
+        USER_COUNTER_FIELDS, dirty_profiles, rebuild_all_profile_counters,
+        recount_profile_counters
+    )
 
-    for user in users:
+    processed = corrected = 0
+    for _ in range(max_batches):
         try:
-            # Update follower count
-            follower_count = Follow.objects.filter(followed=user).count()
-
-            # Update following count
-            following_count = Follow.objects.filter(follower=user).count()
-
-            # Update posts count
-            posts_count = Post.objects.filter(author=user).count()
-
-            # Update the user profile
-            user.follower_count = follower_count
-            user.following_count = following_count
-            user.posts_count = posts_count
-            user.save(update_fields=[
-                'follower_count', 'following_count', 'posts_count'
-            ])
+            profile_ids = dirty_profiles.pop_batch(batch_size)
+        except Exception:
+            rebuilt, rebuilt_corrected = rebuild_all_profile_counters(
+                USER_COUNTER_FIELDS, batch_size=batch_size
+            )
+            # Keep the totals of batches already recounted in this run
+            processed += rebuilt
+            corrected += rebuilt_corrected
+            break
 
+        if not profile_ids:
+            break
+        try:
+            corrected += recount_profile_counters(profile_ids)
+            processed += len(profile_ids)
         except Exception as e:
+            # Put the chunk back so the next run retries it
+            dirty_profiles.mark(*profile_ids)
             ErrorLog.objects.create(
                 level='error',
-                message=f'Error updating counters for user {user.id}: {str(e)}',
+                message=(
+                    f'Error updating counters for {len(profile_ids)} users: '
+                    f'{str(e)}'
+                ),
                 extra_data={
-                    'user_id': str(user.id),
+                    'user_ids': profile_ids[:100],
                     'task': 'update_user_counters'
                 }
             )
+            break
 
-    return f"Updated counters for {users.count()} users"
+    return f"Updated counters for {processed} users ({corrected} corrected)"
 
 
 @shared_task
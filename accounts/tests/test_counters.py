@@ -0,0 +1,79 @@
+"""Tests for the set-based UserProfile counter reconciliation."""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from accounts.counters import (
+    ALL_COUNTER_FIELDS, rebuild_all_profile_counters, recount_profile_counters
+)
+from accounts.models import Follow, UserProfile
+from content.models import Post
+
+
+class ProfileCounterRecountTest(TestCase):
+    def setUp(self):
+        self.profiles = []
+        for i in range(3):
+            user = User.objects.create_user(
+                username=f'counteruser{i}', password='TestPass123!'
+            )
+            profile, _ = UserProfile.objects.get_or_create(user=user)
+            self.profiles.append(profile)
+
+        first, second, third = self.profiles
+        Follow.objects.create(follower=second, followed=first, status='approved')
+        Follow.objects.create(follower=third, followed=first, status='approved')
+        Follow.objects.create(follower=first, followed=second, status='pending')
+        Post.objects.create(author=first, content='Counted')
+        Post.objects.create(author=first, content='Removed', is_deleted=True)
+
+        UserProfile.objects.update(
+            follower_count=7, following_count=7, posts_count=7
+        )
+
+    def _counts(self, profile):
+        profile.refresh_from_db()
+        return (profile.follower_count, profile.following_count,
+                profile.posts_count)
+
+    def test_recount_corrects_drifted_profiles(self):
+        first, second, third = self.profiles
+
+        corrected = recount_profile_counters([first.pk, second.pk])
+
+        self.assertEqual(corrected, 2)
+        self.assertEqual(self._counts(first), (2, 0, 1))
+        self.assertEqual(self._counts(second), (0, 1, 0))
+        # Not in the chunk: left alone
+        self.assertEqual(self._counts(third), (7, 7, 7))
+
+    def test_full_rebuild_walks_every_profile(self):
+        processed, corrected = rebuild_all_profile_counters(
+            ALL_COUNTER_FIELDS, batch_size=2
+        )
+
+        self.assertEqual(processed, UserProfile.objects.count())
+        self.assertEqual(self._counts(self.profiles[2]), (0, 1, 0))
+        self.assertEqual(
+            rebuild_all_profile_counters(ALL_COUNTER_FIELDS, batch_size=2),
+            (processed, 0)
+        )
+
+    def test_fallback_rebuild_adds_to_the_run_totals(self):
+        from accounts.tasks import update_user_counters
+
+        first = self.profiles[0]
+        with mock.patch(
+            'accounts.counters.dirty_profiles.pop_batch',
+            side_effect=[[first.pk], RuntimeError('Redis down')]
+        ), mock.patch(
+            'accounts.counters.recount_profile_counters', return_value=1
+        ), mock.patch(
+            'accounts.counters.rebuild_all_profile_counters',
+            return_value=(2, 0)
+        ):
+            result = update_user_counters()
+
+        self.assertEqual(result, 'Updated counters for 3 users (1 corrected)')
@@ -9,10 +9,10 @@ import json
 from django.utils.deprecation import MiddlewareMixin
 from django.urls import resolve
 from django.contrib.auth.models import AnonymousUser
+from analytics.services import event_buffer
 from analytics.tasks import (
     track_content_analytics,
     track_search_analytics,
-    update_comprehensive_user_analytics,
     track_post_view
 )
 import logging
@@ -90,7 +90,7 @@ class AnalyticsTrackingMiddleware(MiddlewareMixin):
             if user_profile and hasattr(request, 'session'):
                 session_key = request.session.session_key
                 if session_key and session_key.endswith('0'):  # Sample 10% of requests
-                    update_comprehensive_user_analytics.delay(str(user_profile.id))
+                    event_buffer.push('user_analytics', str(user_profile.id))
 
             # Track page views for authenticated users
             self._track_page_view(request, response, user_profile)
@@ -236,14 +236,13 @@ class AnalyticsTrackingMiddleware(MiddlewareMixin):
     def _track_page_view(self, request, response, user_profile):
         """Track page view for authenticated and anonymous users"""
         try:
-            from analytics.tasks import track_page_view
-
             # Track authenticated user page views
             if user_profile and request.method == 'GET':
                 # Only track GET requests for actual page views
                 if response.status_code == 200:
-                    # Pass UserProfile.id (UUID) not User.id (integer)
-                    track_page_view.delay(str(user_profile.id))
+                    # Pass UserProfile.id (UUID) not User.id (integer);
+                    # buffered and counted in bulk by flush_analytics_events
+                    event_buffer.push('page_view', str(user_profile.id))
 
                     # Check if this is a community page visit
                     community_data = self._extract_community_context(
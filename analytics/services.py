@@ -2,8 +2,10 @@
 
 import json
 import logging
+import time
+import uuid
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Set
+from typing import Dict, List, Optional, Set, Tuple
 from django.core.cache import cache
 from django.utils import timezone
 from django.conf import settings
@@ -331,5 +333,182 @@ class CommunityOnlineTracker:
             return {}
 
 
-# Global instance
+# KEYS: buffer, batch, pending batches; ARGV: batch size, claim time
+CLAIM_SCRIPT = """
+local events = redis.call('LRANGE', KEYS[1], 0, tonumber(ARGV[1]) - 1)
+if #events == 0 then
+    return events
+end
+redis.call('LTRIM', KEYS[1], #events, -1)
+for start = 1, #events, 1000 do
+    redis.call('RPUSH', KEYS[2], unpack(events, start, math.min(start + 999, #events)))
+end
+redis.call('ZADD', KEYS[3], ARGV[2], KEYS[2])
+return events
+"""
+
+# KEYS: buffer, batch, pending batches
+RECOVER_SCRIPT = """
+local events = redis.call('LRANGE', KEYS[2], 0, -1)
+for start = 1, #events, 1000 do
+    redis.call('RPUSH', KEYS[1], unpack(events, start, math.min(start + 999, #events)))
+end
+redis.call('DEL', KEYS[2])
+redis.call('ZREM', KEYS[3], KEYS[2])
+return #events
+"""
+
+
+class AnalyticsEventBuffer:
+    """
+    Redis list buffering per-request analytics events.
+
+    Middleware appends with a single RPUSH instead of enqueueing a Celery
+    task per event; ``analytics.tasks.flush_analytics_events`` drains the
+    list in batches. When Redis is unreachable the event falls back to
+    its original per-event task so nothing is lost.
+
+    A drained batch is moved atomically to its own processing list and
+    only removed once acknowledged; failed events are requeued (up to
+    ``MAX_ATTEMPTS``) and batches of a crashed flush are returned to the
+    buffer after ``CLAIM_TIMEOUT``.
+    """
+
+    BUFFER_KEY = 'analytics:event_buffer'
+    BATCH_KEY = 'analytics:event_buffer:batch:{}'
+    PENDING_KEY = 'analytics:event_buffer:pending'
+
+    # Seconds after which an unacknowledged batch is considered abandoned
+    CLAIM_TIMEOUT = 600
+    # Flush attempts before a failing event is dropped
+    MAX_ATTEMPTS = 3
+
+    # Event kind -> per-event task used as fallback
+    FALLBACK_TASKS = {
+        'auth': 'analytics.tasks.track_authentication_performance',
+        'session': 'analytics.tasks.track_session_comprehensive',
+        'page_view': 'analytics.tasks.track_page_view',
+        'user_analytics': 'analytics.tasks.update_comprehensive_user_analytics',
+    }
+
+    def __init__(self):
+        self.redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1
+        )
+        self.max_length = getattr(
+            settings, 'ANALYTICS_EVENT_BUFFER_MAX_LENGTH', 1_000_000
+        )
+        self.claim_script = self.redis_client.register_script(CLAIM_SCRIPT)
+        self.recover_script = self.redis_client.register_script(RECOVER_SCRIPT)
+
+    def push(self, kind: str, payload) -> None:
+        """Append one event; never raises."""
+        try:
+            length = self.redis_client.rpush(
+                self.BUFFER_KEY,
+                json.dumps({'kind': kind, 'data': payload}, default=str)
+            )
+            if length > self.max_length:
+                # Consumer is down or far behind: shed the oldest events
+                self.redis_client.ltrim(self.BUFFER_KEY, -self.max_length, -1)
+            return
+        except Exception as e:
+            logger.debug(f"Analytics buffer unavailable, dispatching task: {e}")
+
+        try:
+            from celery import current_app
+            current_app.send_task(
+                self.FALLBACK_TASKS[kind],
+                args=[payload]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to dispatch analytics event {kind}: {e}")
+
+    def claim(self, size: int) -> Tuple[Optional[str], List[Dict]]:
+        """
+        Atomically move up to ``size`` events to a new processing batch.
+
+        Returns:
+            ``(batch_key, events)``; ``(None, [])`` when the buffer is
+            empty. The batch must be passed to ``ack`` or ``requeue``.
+        """
+        batch_key = self.BATCH_KEY.format(uuid.uuid4().hex)
+        raw_events = self.claim_script(
+            keys=[self.BUFFER_KEY, batch_key, self.PENDING_KEY],
+            args=[size, time.time()]
+        )
+        if not raw_events:
+            return None, []
+
+        events = []
+        for raw in raw_events:
+            try:
+                events.append(json.loads(raw))
+            except (TypeError, ValueError):
+                logger.warning("Dropping malformed analytics event")
+        return batch_key, events
+
+    def ack(self, batch_key: str) -> None:
+        """Forget a batch whose events were all handled."""
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.delete(batch_key)
+        pipe.zrem(self.PENDING_KEY, batch_key)
+        pipe.execute()
+
+    def requeue(self, batch_key: str, events: List[Dict]) -> int:
+        """
+        Return ``events`` of a batch to the buffer and forget the batch.
+
+        Events already flushed ``MAX_ATTEMPTS`` times are dropped.
+
+        Returns:
+            Number of events requeued
+        """
+        retried = []
+        for event in events:
+            attempts = event.get('attempts', 0) + 1
+            if attempts >= self.MAX_ATTEMPTS:
+                logger.error(
+                    f"Dropping {event.get('kind')} analytics event after "
+                    f"{attempts} failed flushes"
+                )
+                continue
+            retried.append(
+                json.dumps({**event, 'attempts': attempts}, default=str)
+            )
+
+        pipe = self.redis_client.pipeline(transaction=True)
+        if retried:
+            pipe.rpush(self.BUFFER_KEY, *retried)
+        pipe.delete(batch_key)
+        pipe.zrem(self.PENDING_KEY, batch_key)
+        pipe.execute()
+        return len(retried)
+
+    def recover_stale(self) -> int:
+        """
+        Return batches claimed more than ``CLAIM_TIMEOUT`` ago (their flush
+        crashed) to the buffer.
+
+        Returns:
+            Number of events recovered
+        """
+        stale = self.redis_client.zrangebyscore(
+            self.PENDING_KEY, '-inf', time.time() - self.CLAIM_TIMEOUT
+        )
+        return sum(
+            self.recover_script(
+                keys=[self.BUFFER_KEY, batch_key, self.PENDING_KEY]
+            )
+            for batch_key in stale
+        )
+
+    def __len__(self) -> int:
+        return self.redis_client.llen(self.BUFFER_KEY)
+
+
+# Global instances
 online_tracker = CommunityOnlineTracker()
+event_buffer = AnalyticsEventBuffer()
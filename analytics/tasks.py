@@ -18,11 +18,16 @@ from content.models import PostSee, Post, Comment, PostReaction
 from accounts.models import UserProfile
 from communities.models import Community, CommunityMembership
 from analytics.services import online_tracker
+from collections import defaultdict
 import logging
 import hashlib
 
 logger = logging.getLogger(__name__)
 
+# Session events from the auth middleware folded into one bulk update per
+# flush; other event types go through track_session_comprehensive
+BATCHED_SESSION_EVENTS = {'page_visit', 'smart_renewal', 'renewal_skipped'}
+
 
 def calculate_percentile(values, percentile):
     """
@@ -1077,6 +1082,258 @@ def track_session_comprehensive(session_data):
         return False
 
 
+@shared_task
+def flush_analytics_events(batch_size=5000, max_batches=20):
+    """
+    Drain the analytics event buffer filled by the request middleware.
+
+    Events are grouped by kind and written with one bulk statement per
+    model instead of one Celery task and query per request. A batch is
+    acknowledged once handled; events a handler could not apply (all of
+    its kind if it raised) are requeued for the next run.
+
+    Returns:
+        int: Number of events processed
+    """
+    from analytics.services import event_buffer
+
+    handlers = {
+        'auth': _flush_auth_events,
+        'session': _flush_session_events,
+        'page_view': _flush_page_view_events,
+        'user_analytics': _flush_user_analytics_events,
+    }
+
+    # Batches of a flush that died before acknowledging them
+    event_buffer.recover_stale()
+
+    processed = 0
+    for _ in range(max_batches):
+        batch_key, events = event_buffer.claim(batch_size)
+        if batch_key is None:
+            break
+
+        by_kind = defaultdict(list)
+        for event in events:
+            by_kind[event.get('kind')].append(event)
+
+        failed = []
+        for kind, kind_events in by_kind.items():
+            handler = handlers.get(kind)
+            if handler is None:
+                logger.warning(f"Unknown analytics event kind: {kind}")
+                continue
+            # Handlers apply nothing when they raise, so the whole kind can
+            # be retried; partial failures are returned instead
+            try:
+                unapplied = handler([event.get('data') for event in kind_events])
+            except Exception as e:
+                logger.error(
+                    f"Failed to flush {len(kind_events)} {kind} events: {e}"
+                )
+                failed.extend(kind_events)
+                continue
+            if unapplied:
+                # Requeue only these, so applied events are not repeated
+                unapplied_ids = {id(data) for data in unapplied}
+                failed.extend(
+                    event for event in kind_events
+                    if id(event.get('data')) in unapplied_ids
+                )
+
+        if failed:
+            event_buffer.requeue(batch_key, failed)
+        else:
+            event_buffer.ack(batch_key)
+
+        processed += len(events) - len(failed)
+        # A failing handler is retried by the next run, not in a loop here
+        if failed or len(events) < batch_size:
+            break
+
+    return processed
+
+
+@transaction.atomic
+def _flush_auth_events(events):
+    """Bulk insert AuthenticationMetric rows."""
+    from django.contrib.auth import get_user_model
+
+    user_ids = {str(e['user_id']) for e in events if e.get('user_id')}
+    existing_user_ids = {
+        str(pk) for pk in get_user_model().objects.filter(
+            id__in=user_ids
+        ).values_list('id', flat=True)
+    } if user_ids else set()
+
+    metrics = []
+    for auth_data in events:
+        user_id = auth_data.get('user_id')
+        metrics.append(AuthenticationMetric(
+            auth_method=auth_data.get('auth_method', 'unknown'),
+            user_id=user_id if str(user_id) in existing_user_ids else None,
+            session_id=auth_data.get('session_id', '') or '',
+            jwt_validation_time=auth_data.get('jwt_validation_time'),
+            session_lookup_time=auth_data.get('session_lookup_time'),
+            total_auth_time=auth_data.get('total_auth_time', 0.0),
+            endpoint=(auth_data.get('endpoint', '') or '')[:200],
+            http_method=auth_data.get('http_method', ''),
+            ip_address=auth_data.get('ip_address'),
+            user_agent=auth_data.get('user_agent', ''),
+            success=auth_data.get('success', False),
+            error_message=auth_data.get('error_message', ''),
+            jwt_renewed=auth_data.get('jwt_renewed', False),
+            token_age_seconds=auth_data.get('token_age_seconds'),
+            token_remaining_seconds=auth_data.get('token_remaining_seconds'),
+            additional_data=auth_data.get('additional_data', {}),
+        ))
+    AuthenticationMetric.objects.bulk_create(metrics, batch_size=1000)
+
+
+def _flush_session_events(events):
+    """
+    Fold page visit / renewal events into their SessionAnalytic rows.
+
+    Lifecycle events are applied one by one as they are read. If the folded
+    update fails, its events are returned so that only they are retried.
+    """
+    from django.conf import settings
+
+    hash_algo = getattr(settings, 'SESSION_TOKEN_HASH_ALGO', 'sha256')
+    grouped = defaultdict(list)
+    for session_data in events:
+        session_id = session_data.get('session_id')
+        if (session_id and
+                session_data.get('event_type') in BATCHED_SESSION_EVENTS):
+            hashed = hashlib.new(hash_algo, session_id.encode()).hexdigest()
+            grouped[hashed].append(session_data)
+        else:
+            track_session_comprehensive(session_data)
+
+    if not grouped:
+        return None
+
+    try:
+        _fold_session_events(grouped)
+    except Exception as e:
+        folded = [event for batch in grouped.values() for event in batch]
+        logger.error(f"Failed to fold {len(folded)} session events: {e}")
+        return folded
+    return None
+
+
+def _fold_session_events(grouped):
+    """Apply page visit / renewal events grouped by hashed session id."""
+    analytics = SessionAnalytic.objects.in_bulk(
+        list(grouped), field_name='session_id'
+    )
+    now = timezone.now()
+    updated = []
+    for hashed_id, session_events in grouped.items():
+        session_analytic = analytics.get(hashed_id)
+        if session_analytic is None:
+            continue
+
+        processing_time = sum(
+            e.get('processing_time_ms') or 0.0 for e in session_events
+        )
+        event_types = [e.get('event_type') for e in session_events]
+        smart_renewals = event_types.count('smart_renewal')
+        skipped = event_types.count('renewal_skipped')
+
+        session_analytic.last_activity = now
+        session_analytic.lookup_count = F('lookup_count') + len(session_events)
+        session_analytic.total_processing_time_ms = (
+            F('total_processing_time_ms') + processing_time
+        )
+        session_analytic.smart_renewals = F('smart_renewals') + smart_renewals
+        if smart_renewals:
+            session_analytic.last_smart_renewal_at = now
+        session_analytic.unnecessary_renewals_prevented = (
+            F('unnecessary_renewals_prevented') + skipped
+        )
+
+        metadata = session_analytic.additional_metadata or {}
+        page_visits = metadata.get('page_visits', {})
+        endpoints = metadata.get('endpoints', [])
+        for session_data in session_events:
+            if session_data.get('event_type') != 'page_visit':
+                continue
+            path = session_data.get('path', '')
+            if not path:
+                continue
+            http_method = session_data.get('http_method', 'GET')
+            page_key = f"{http_method}:{path}"
+            page_visits[page_key] = page_visits.get(page_key, 0) + 1
+            endpoints.append({
+                'path': path,
+                'method': http_method,
+                'timestamp': now.isoformat()
+            })
+        metadata['page_visits'] = page_visits
+        # Keep only last 50 endpoints to avoid bloating
+        metadata['endpoints'] = endpoints[-50:]
+        session_analytic.additional_metadata = metadata
+
+        expires_at = [e['expires_at'] for e in session_events
+                      if e.get('expires_at')]
+        if expires_at:
+            session_analytic.expires_at = expires_at[-1]
+
+        updated.append(session_analytic)
+
+    with transaction.atomic():
+        SessionAnalytic.objects.bulk_update(updated, [
+            'last_activity', 'lookup_count', 'total_processing_time_ms',
+            'smart_renewals', 'last_smart_renewal_at',
+            'unnecessary_renewals_prevented', 'additional_metadata',
+            'expires_at',
+        ], batch_size=500)
+
+
+@transaction.atomic
+def _flush_page_view_events(user_ids):
+    """Add buffered page views to UserAnalytics.total_page_views."""
+    from analytics.models import UserAnalytics
+
+    counts = defaultdict(int)
+    for user_id in user_ids:
+        if user_id:
+            counts[str(user_id)] += 1
+    if not counts:
+        return
+
+    existing = {
+        str(pk) for pk in UserAnalytics.objects.filter(
+            user_id__in=counts
+        ).values_list('user_id', flat=True)
+    }
+    missing = set(counts) - existing
+    if missing:
+        profiles = UserProfile.objects.filter(
+            id__in=missing
+        ).values_list('id', flat=True)
+        UserAnalytics.objects.bulk_create([
+            UserAnalytics(user_id=pk, total_page_views=counts[str(pk)])
+            for pk in profiles
+        ], ignore_conflicts=True)
+
+    # One UPDATE per distinct increment rather than per user
+    users_by_count = defaultdict(list)
+    for user_id in existing:
+        users_by_count[counts[user_id]].append(user_id)
+    for count, ids in users_by_count.items():
+        UserAnalytics.objects.filter(user_id__in=ids).update(
+            total_page_views=F('total_page_views') + count
+        )
+
+
+def _flush_user_analytics_events(user_ids):
+    """Recompute analytics once per distinct sampled user."""
+    for user_id in {str(user_id) for user_id in user_ids if user_id}:
+        update_comprehensive_user_analytics(user_id)
+
+
 # Enhanced Analytics Tasks for New Models
 
 @shared_task
@@ -0,0 +1,155 @@
+"""Tests for the buffered analytics event pipeline."""
+
+import hashlib
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from analytics.models import AuthenticationMetric, SessionAnalytic, UserAnalytics
+from analytics.tasks import flush_analytics_events
+
+
+class FlushAnalyticsEventsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='bufferuser', password='testpass'
+        )
+        self.profile, _ = UserProfile.objects.get_or_create(user=self.user)
+
+    def _flush(self, events):
+        batches = [('batch', events), (None, [])]
+        with mock.patch.multiple(
+            'analytics.services.event_buffer',
+            claim=mock.Mock(side_effect=lambda size: batches.pop(0)),
+            ack=mock.DEFAULT,
+            requeue=mock.DEFAULT,
+            recover_stale=mock.DEFAULT,
+        ) as buffer:
+            self.buffer = buffer
+            return flush_analytics_events(batch_size=len(events) + 1)
+
+    def test_auth_events_bulk_created(self):
+        events = [
+            {'kind': 'auth', 'data': {
+                'auth_method': 'jwt', 'user_id': self.user.id,
+                'total_auth_time': 1.5, 'success': True,
+            }},
+            {'kind': 'auth', 'data': {
+                'auth_method': 'jwt', 'user_id': 999999,
+                'total_auth_time': 2.0, 'success': False,
+            }},
+        ]
+
+        self.assertEqual(self._flush(events), 2)
+
+        self.assertEqual(AuthenticationMetric.objects.count(), 2)
+        self.assertEqual(
+            AuthenticationMetric.objects.filter(user=self.user).count(), 1
+        )
+        # Unknown users are kept as anonymous metrics
+        self.assertEqual(
+            AuthenticationMetric.objects.filter(user__isnull=True).count(), 1
+        )
+
+    def test_failed_handler_requeues_its_events(self):
+        page_view = {'kind': 'page_view', 'data': str(self.profile.id)}
+        auth = {'kind': 'auth', 'data': {
+            'auth_method': 'jwt', 'user_id': self.user.id,
+            'total_auth_time': 1.0, 'success': True,
+        }}
+
+        with mock.patch(
+            'analytics.tasks._flush_page_view_events',
+            side_effect=RuntimeError('database unavailable')
+        ):
+            self.assertEqual(self._flush([page_view, auth]), 1)
+
+        self.buffer['requeue'].assert_called_once_with('batch', [page_view])
+        self.buffer['ack'].assert_not_called()
+        self.assertEqual(AuthenticationMetric.objects.count(), 1)
+
+    def test_page_views_aggregated_per_user(self):
+        events = [
+            {'kind': 'page_view', 'data': str(self.profile.id)}
+            for _ in range(3)
+        ]
+        self._flush(events)
+        analytics = UserAnalytics.objects.get(user=self.profile)
+        self.assertEqual(analytics.total_page_views, 3)
+
+        self._flush(events[:2])
+        analytics.refresh_from_db()
+        self.assertEqual(analytics.total_page_views, 5)
+
+    def test_session_page_visits_folded_into_one_row(self):
+        now = timezone.now()
+        session_analytic = SessionAnalytic.objects.create(
+            session_id=hashlib.sha256(b'raw-session').hexdigest(),
+            user=self.user,
+            created_at=now,
+            last_activity=now,
+            expires_at=now + timedelta(hours=4),
+        )
+        events = [
+            {'kind': 'session', 'data': {
+                'session_id': 'raw-session', 'user_id': self.user.id,
+                'event_type': 'page_visit', 'path': '/api/feed/',
+                'http_method': 'GET',
+            }}
+            for _ in range(4)
+        ] + [{'kind': 'session', 'data': {
+            'session_id': 'raw-session', 'user_id': self.user.id,
+            'event_type': 'smart_renewal',
+        }}]
+
+        self._flush(events)
+
+        session_analytic.refresh_from_db()
+        self.assertEqual(session_analytic.lookup_count, 5)
+        self.assertEqual(session_analytic.smart_renewals, 1)
+        self.assertEqual(
+            session_analytic.additional_metadata['page_visits'],
+            {'GET:/api/feed/': 4}
+        )
+
+    def test_failed_session_fold_requeues_only_folded_events(self):
+        now = timezone.now()
+        session_analytic = SessionAnalytic.objects.create(
+            session_id=hashlib.sha256(b'mixed-session').hexdigest(),
+            user=self.user,
+            created_at=now,
+            last_activity=now,
+            expires_at=now + timedelta(hours=4),
+        )
+        renewed = {'kind': 'session', 'data': {
+            'session_id': 'mixed-session', 'user_id': self.user.id,
+            'event_type': 'renewed',
+        }}
+        visits = [
+            {'kind': 'session', 'data': {
+                'session_id': 'mixed-session', 'user_id': self.user.id,
+                'event_type': 'page_visit', 'path': '/api/feed/',
+                'http_method': 'GET',
+            }}
+            for _ in range(2)
+        ]
+
+        with mock.patch.object(
+            SessionAnalytic.objects, 'bulk_update',
+            side_effect=RuntimeError('database unavailable')
+        ):
+            self.assertEqual(self._flush([renewed, *visits]), 1)
+
+        # The applied renewal is not retried with the page visits
+        self.buffer['requeue'].assert_called_once_with('batch', visits)
+        session_analytic.refresh_from_db()
+        self.assertEqual(session_analytic.lookup_count, 1)
+
+        self._flush(visits)
+        session_analytic.refresh_from_db()
+        self.assertEqual(session_analytic.lookup_count, 3)
+        self.assertEqual(session_analytic.renewal_count, 1)
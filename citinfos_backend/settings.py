@@ -98,6 +98,7 @@ DJANGO_APPS = [
     'django.contrib.messages',
     'django.contrib.staticfiles',
     'django.contrib.gis',  # GeoDjango for spatial data support
+    'django.contrib.postgres',  # Full-text search and trigram lookups
 ]
 
 THIRD_PARTY_APPS = [
@@ -545,6 +546,19 @@ REDIS_PORT = env('REDIS_PORT')
 REDIS_DB = env('REDIS_DB')
 REDIS_URL = env('REDIS_URL')
 
+# Per-minute request budgets enforced by middleware.APIRateLimitMiddleware
+# (merged over its defaults). Turned off in test_settings.
+API_RATE_LIMIT_ENABLED = env.bool('API_RATE_LIMIT_ENABLED', default=True)
+API_RATE_LIMITS = {}
+
+# In-process tier of LocationCacheService (entries, seconds). Entries are
+# also dropped on geo data reloads through Redis pub/sub.
+LOCATION_LOCAL_CACHE_SIZE = env.int('LOCATION_LOCAL_CACHE_SIZE', default=5000)
+LOCATION_LOCAL_CACHE_TIMEOUT = env.int('LOCATION_LOCAL_CACHE_TIMEOUT', default=300)
+# Resolve coordinates to divisions from an in-memory polygon grid
+# (core.spatial_index) before querying PostGIS
+LOCATION_SPATIAL_INDEX = env.bool('LOCATION_SPATIAL_INDEX', default=True)
+
 # Email configuration
 EMAIL_BACKEND = env('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
 EMAIL_HOST = env('EMAIL_HOST')         # Your SMTP server
@@ -636,14 +650,20 @@ CELERY_BEAT_SCHEDULE = {
     },
 
     # --- Content/Recommendation Tasks ---
+    # Full posting-pattern analysis of users active since the last run
     'process-bot-detection-analysis': {
         'task': 'content.tasks.process_bot_detection_analysis',
-        'schedule': crontab(hour=0, minute=0),
+        'schedule': crontab(minute=0),  # Hourly
     },
     'cleanup-bot-detection-data': {
         'task': 'content.tasks.cleanup_bot_detection_data',
         'schedule': crontab(hour=1, minute=0),
     },
+    # Picks up ingest items whose scheduled drain was missed
+    'process-content-ingest': {
+        'task': 'content.tasks.process_content_ingest',
+        'schedule': 60.0,  # Every minute
+    },
     'process-moderation-queue': {
         'task': 'content.tasks.process_moderation_queue',
         'schedule': crontab(minute='*/15'),
@@ -656,9 +676,14 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'content.tasks.update_content_counters',
         'schedule': crontab(minute='*/30'),
     },
+    # Apply write-behind reaction counter deltas (no-op unless enabled)
+    'flush-reaction-counters': {
+        'task': 'content.tasks.flush_reaction_counters',
+        'schedule': 5.0,  # Every 5 seconds
+    },
     'update-trending-hashtags': {
         'task': 'content.tasks.update_trending_hashtags',
-        'schedule': crontab(minute=0),
+        'schedule': crontab(minute='*/5'),  # One mention bucket
     },
     'process-mentions': {
         'task': 'content.tasks.process_mentions',
@@ -749,6 +774,11 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'analytics.tasks.sync_community_analytics_from_redis',
         'schedule': 30.0,  # Every 30 seconds
     },
+    # Drain the per-request analytics event buffer
+    'flush-analytics-events': {
+        'task': 'analytics.tasks.flush_analytics_events',
+        'schedule': 10.0,  # Every 10 seconds
+    },
     'cleanup-old-anonymous-data': {
         'task': 'analytics.tasks.cleanup_old_anonymous_data',
         'schedule': crontab(hour=4, minute=15),  # Daily at 4:15 AM
@@ -781,6 +811,10 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'polls.tasks.update_poll_counters',
         'schedule': crontab(minute='*/5'),
     },
+    'update-message-counters': {
+        'task': 'messaging.tasks.update_message_counters',
+        'schedule': crontab(minute='*/5'),
+    },
     'analyze-poll-engagement': {
         'task': 'polls.tasks.analyze_poll_engagement',
         'schedule': crontab(hour=5, minute=30),
@@ -1026,8 +1060,37 @@ if env('AWS_ACCESS_KEY_ID'):
 # Custom settings for social network
 SOCIAL_NETWORK_SETTINGS = {
     'MAX_POST_LENGTH': 2000,
+    # Top-level comments embedded in post listings (?comments_preview=N)
+    'COMMENT_PREVIEW_COUNT': 3,
+    'COMMENT_PREVIEW_MAX': 20,
+    # Page size bounds for the lazy comment thread endpoint
+    'COMMENT_THREAD_PAGE_SIZE': 20,
+    'COMMENT_THREAD_MAX_PAGE_SIZE': 100,
+    # Page size bounds for a chat room's message history
+    'MESSAGE_PAGE_SIZE': 50,
+    'MESSAGE_MAX_PAGE_SIZE': 200,
 }
 
+# Global search backend: 'basic' (icontains) or 'fulltext' (PostgreSQL
+# tsvector + trigram indexes, see search/fulltext.py)
+SEARCH_BACKEND = env('SEARCH_BACKEND', default='basic')
+SEARCH_FULLTEXT_CONFIG = env('SEARCH_FULLTEXT_CONFIG', default='simple')
+# Run per-type searches in parallel, each bounded by a time budget; types
+# that miss it come back empty with partial=True
+SEARCH_CONCURRENT = env.bool('SEARCH_CONCURRENT', default=False)
+SEARCH_TYPE_TIME_BUDGET_MS = env.int('SEARCH_TYPE_TIME_BUDGET_MS', default=1500)
+SEARCH_MAX_WORKERS = env.int('SEARCH_MAX_WORKERS', default=12)
+
+# Buffer like/dislike/share counter changes in Redis and apply them to
+# Post/Comment in batches (content.tasks.flush_reaction_counters)
+REACTION_COUNTER_WRITE_BEHIND = env.bool(
+    'REACTION_COUNTER_WRITE_BEHIND', default=False
+)
+
+# New posts/comments are moderated, bot-checked and mention/hashtag-processed
+# in batches after commit (content.ingest); one drain is scheduled per delay
+CONTENT_INGEST_BATCH_DELAY = env.int('CONTENT_INGEST_BATCH_DELAY', default=2)
+
 # AI Conversation System Settings
 AI_SETTINGS: dict[str, object] = {
     'OPENAI_API_KEY': env('OPENAI_API_KEY'),
@@ -72,5 +72,8 @@ CACHES = {
 CELERY_TASK_ALWAYS_EAGER = True
 CELERY_TASK_EAGER_PROPAGATES = True
 
+# Don't throttle suites that log in repeatedly
+API_RATE_LIMIT_ENABLED = False
+
 # Media files for tests
 MEDIA_ROOT = '/tmp/citinfos_backend_test_media'
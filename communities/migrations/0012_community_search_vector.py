@@ -0,0 +1,29 @@
+# Generated by Django 4.2.25 on 2026-10-16 09:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('communities', '0011_update_rubrique_hierarchy'),
+        ('search', '0002_trigram_extension'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='community',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='community_search_gin'),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass('name', name='gin_trgm_ops'), name='community_name_trgm'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 """Community models for managing communities and memberships."""
 
 from django.db import models, IntegrityError
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from accounts.models import UserProfile
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
@@ -180,12 +182,21 @@ class Community(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search document (name/description), maintained by
+    # search.signals
+    search_vector = SearchVectorField(null=True, editable=False)
+
     class Meta:
         indexes = [
             models.Index(fields=['division', '-created_at']),
             models.Index(fields=['community_type', '-created_at']),
             models.Index(fields=['is_active', '-posts_count']),
             models.Index(fields=['is_featured', '-created_at']),
+            GinIndex(fields=['search_vector'], name='community_search_gin'),
+            GinIndex(
+                OpClass('name', name='gin_trgm_ops'),
+                name='community_name_trgm'
+            ),
         ]
 
     def _generate_unique_slug(self, base_text=None, max_length=100):
@@ -1,6 +1,7 @@
 """Admin interface for content moderation system."""
 
 from django.contrib import admin
+from django.db import transaction
 from django.utils.html import format_html
 from django.urls import reverse
 from django.utils.safestring import mark_safe
@@ -11,6 +12,7 @@ from .models import (
     BotDetectionProfile, BotDetectionEvent, UserActivityPattern,
     PostSee, DirectShare
 )
+from .bot_blocks import blocked_bots
 
 
 @admin.register(PostSee)
@@ -399,6 +401,7 @@ class BotDetectionProfileAdmin(admin.ModelAdmin):
             is_flagged_as_bot=False,
             auto_blocked=False
         )
+        transaction.on_commit(blocked_bots.invalidate)
         self.message_user(request, f'{updated} profiles marked as verified human.')
     mark_as_verified_human.short_description = "Mark as verified human"
 
@@ -411,6 +414,7 @@ class BotDetectionProfileAdmin(admin.ModelAdmin):
     def unblock_user(self, request, queryset):
         """Unblock selected users."""
         updated = queryset.update(auto_blocked=False)
+        transaction.on_commit(blocked_bots.invalidate)
         self.message_user(request, f'{updated} users unblocked.')
     unblock_user.short_description = "Unblock user"
 
@@ -0,0 +1,189 @@
+"""
+Cached set of users blocked as bots (``BotDetectionProfile.auto_blocked``).
+
+Block status is checked before every new post/comment and on every
+authenticated request, so it is served from a per-process snapshot instead
+of the database. The blocked profile ids live in a Redis set next to a
+version number; each process re-reads the version at most every
+``LOCAL_TTL`` seconds and reloads the set only when it changed. A block or
+unblock bumps the version once committed, so it reaches every worker within
+a second.
+
+A missing version (first use, expiry or ``invalidate``) makes the next
+reader rebuild the set from the database. The version expires after
+``REBUILD_INTERVAL`` so a lost update cannot stay stale for longer. Every
+block or unblock is also journaled with its Redis time, and a rebuild
+re-applies the changes made since it started reading, so one committed
+while the rebuild was in flight is not overwritten.
+"""
+
+import logging
+import time
+from typing import FrozenSet, List, Optional
+
+import redis
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# KEYS: members, version, journal
+# ARGV: profile id, '1' to block or '0' to unblock, journal ttl
+SET_BLOCKED_SCRIPT = """
+local now = redis.call('TIME')
+redis.call('HSET', KEYS[3], ARGV[1],
+    ARGV[2] .. ':' .. now[1] .. string.format('%06d', now[2]))
+redis.call('EXPIRE', KEYS[3], ARGV[3])
+if redis.call('EXISTS', KEYS[2]) == 0 then
+    return 0
+end
+local changed
+if ARGV[2] == '1' then
+    changed = redis.call('SADD', KEYS[1], ARGV[1])
+else
+    changed = redis.call('SREM', KEYS[1], ARGV[1])
+end
+if changed == 1 then
+    redis.call('INCR', KEYS[2])
+end
+return changed
+"""
+
+# KEYS: members, version, journal
+# ARGV: read start (Redis time, microseconds), version, version ttl,
+#       journal retention (microseconds), blocked profile ids...
+REBUILD_SCRIPT = """
+redis.call('DEL', KEYS[1])
+for start = 5, #ARGV, 1000 do
+    redis.call('SADD', KEYS[1], unpack(ARGV, start, math.min(start + 999, #ARGV)))
+end
+local read_start = tonumber(ARGV[1])
+local journal = redis.call('HGETALL', KEYS[3])
+for i = 1, #journal, 2 do
+    local flag, stamp = string.match(journal[i + 1], '(%d):(%d+)')
+    stamp = tonumber(stamp)
+    if stamp >= read_start then
+        -- Committed after the database read began: the read may miss it
+        if flag == '1' then
+            redis.call('SADD', KEYS[1], journal[i])
+        else
+            redis.call('SREM', KEYS[1], journal[i])
+        end
+    elseif stamp < read_start - tonumber(ARGV[4]) then
+        redis.call('HDEL', KEYS[3], journal[i])
+    end
+end
+redis.call('SET', KEYS[2], ARGV[2], 'EX', ARGV[3])
+return ARGV[2]
+"""
+
+
+class BlockedBotCache:
+    """Versioned Redis set of blocked profile ids with a local snapshot."""
+
+    # Seconds a process trusts its snapshot before re-reading the version
+    LOCAL_TTL = 0.5
+    # Seconds before the set is rebuilt from the database anyway
+    REBUILD_INTERVAL = 3600
+    # Seconds journaled changes are kept for rebuilds in flight
+    JOURNAL_RETENTION = 60
+
+    def __init__(self, prefix: str = 'bot:blocked'):
+        self.prefix = prefix
+        self.members_key = f'{prefix}:members'
+        self.version_key = f'{prefix}:version'
+        self.journal_key = f'{prefix}:journal'
+        self.redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1,
+            decode_responses=True
+        )
+        self.set_blocked_script = self.redis_client.register_script(
+            SET_BLOCKED_SCRIPT
+        )
+        self.rebuild_script = self.redis_client.register_script(
+            REBUILD_SCRIPT
+        )
+        # (checked at, version, blocked ids or None if Redis failed)
+        self._snapshot = (float('-inf'), None, None)
+
+    def is_blocked(self, profile_id) -> Optional[bool]:
+        """Whether the profile is blocked, or None if Redis is unavailable."""
+        blocked = self.blocked_ids()
+        return None if blocked is None else str(profile_id) in blocked
+
+    def blocked_ids(self) -> Optional[FrozenSet[str]]:
+        """Current blocked profile ids, or None if Redis is unavailable."""
+        checked_at, version, blocked = self._snapshot
+        now = time.monotonic()
+        if now - checked_at < self.LOCAL_TTL:
+            return blocked
+
+        try:
+            current = self.redis_client.get(self.version_key)
+            if current is None:
+                current = self.rebuild()
+            if current != version or blocked is None:
+                pipe = self.redis_client.pipeline()
+                pipe.get(self.version_key)
+                pipe.smembers(self.members_key)
+                current, members = pipe.execute()
+                blocked = frozenset(members)
+        except redis.RedisError as e:
+            logger.warning(f"Blocked bot cache unavailable: {e}")
+            current, blocked = None, None
+
+        self._snapshot = (now, current, blocked)
+        return blocked
+
+    def set_blocked(self, profile_id, blocked: bool) -> None:
+        """Record a block or unblock; never raises."""
+        try:
+            self.set_blocked_script(
+                keys=[self.members_key, self.version_key, self.journal_key],
+                args=[
+                    str(profile_id), '1' if blocked else '0',
+                    self.REBUILD_INTERVAL,
+                ]
+            )
+        except redis.RedisError as e:
+            logger.warning(f"Could not update blocked bot cache: {e}")
+        # This process sees its own change on the next check
+        self._snapshot = (float('-inf'), None, None)
+
+    def rebuild(self) -> str:
+        """Reload the blocked set from the database; returns the version."""
+        seconds, microseconds = self.redis_client.time()
+        read_start = seconds * 1_000_000 + microseconds
+        profile_ids = self._blocked_profile_ids()
+        # Nanoseconds never repeat a version an old snapshot may hold
+        version = str(time.time_ns())
+        return self.rebuild_script(
+            keys=[self.members_key, self.version_key, self.journal_key],
+            args=[
+                read_start, version, self.REBUILD_INTERVAL,
+                self.JOURNAL_RETENTION * 1_000_000, *profile_ids,
+            ]
+        )
+
+    def _blocked_profile_ids(self) -> List[str]:
+        from .models import BotDetectionProfile
+
+        return [
+            str(profile_id) for profile_id in
+            BotDetectionProfile.objects.filter(
+                auto_blocked=True
+            ).values_list('user_id', flat=True)
+        ]
+
+    def invalidate(self) -> None:
+        """Force a rebuild after bulk updates that bypass model signals."""
+        try:
+            self.redis_client.delete(self.version_key)
+        except redis.RedisError as e:
+            logger.warning(f"Could not invalidate blocked bot cache: {e}")
+        self._snapshot = (float('-inf'), None, None)
+
+
+# Global instance
+blocked_bots = BlockedBotCache()
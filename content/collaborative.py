@@ -0,0 +1,302 @@
+"""
+Batch user-user collaborative filtering over a sparse reaction matrix.
+
+All positive reactions are loaded once into a binary user x post CSR matrix.
+Co-like counts for a chunk of users are one sparse product
+(``X[chunk] @ X.T``), from which Jaccard similarities and each user's top-K
+neighbours are taken. Candidate scores are two more sparse products
+(neighbour similarities and neighbour counts times ``X``), so the whole user
+base is scored in a few vectorized passes instead of one query per
+neighbour and per candidate post. Results replace each user's
+``collaborative`` ContentRecommendation rows with ``bulk_create``.
+
+Scoring matches the previous per-user implementation: Jaccard > 0.1 with at
+least 2 common likes, candidates liked by at least 2 neighbours, score =
+0.7 * average similarity + 0.3 * crowd - 0.5 * dislike penalty.
+"""
+
+import logging
+from collections import defaultdict
+from datetime import timedelta
+
+import numpy as np
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.utils import timezone
+from scipy import sparse
+
+from .models import ContentRecommendation, Post, PostReaction
+
+logger = logging.getLogger(__name__)
+
+ALGORITHM_VERSION = 'cf-csr-1.0'
+
+
+class CollaborativeFilteringEngine:
+    """Computes collaborative recommendations for many users at once."""
+
+    def __init__(self, neighbors=20, min_common=2, min_similarity=0.1,
+                 min_likes=3, min_supporters=2, limit=15,
+                 candidate_days=90, chunk_size=2000):
+        self.neighbors = neighbors
+        self.min_common = min_common
+        self.min_similarity = min_similarity
+        self.min_likes = min_likes
+        self.min_supporters = min_supporters
+        self.limit = limit
+        self.candidate_days = candidate_days
+        self.chunk_size = chunk_size
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Build the like/dislike matrices and the candidate post vectors."""
+        user_index, post_index = {}, {}
+
+        def reaction_matrix(reaction_types):
+            rows, cols = [], []
+            reactions = PostReaction.objects.filter(
+                reaction_type__in=reaction_types, is_deleted=False
+            ).values_list('user_id', 'post_id')
+            for user_id, post_id in reactions.iterator(chunk_size=10000):
+                rows.append(user_index.setdefault(user_id, len(user_index)))
+                cols.append(post_index.setdefault(post_id, len(post_index)))
+            return rows, cols
+
+        like_rows, like_cols = reaction_matrix(PostReaction.POSITIVE_REACTIONS)
+        dislike_rows, dislike_cols = reaction_matrix(
+            PostReaction.NEGATIVE_REACTIONS
+        )
+        shape = (len(user_index), len(post_index))
+
+        self.user_ids = np.empty(shape[0], dtype=object)
+        for user_id, i in user_index.items():
+            self.user_ids[i] = user_id
+        self.post_ids = np.empty(shape[1], dtype=object)
+        for post_id, j in post_index.items():
+            self.post_ids[j] = post_id
+        self.user_index = user_index
+
+        self.likes = self._binary(like_rows, like_cols, shape)
+        self.dislikes = self._binary(dislike_rows, dislike_cols, shape)
+        self.like_counts = np.asarray(self.likes.sum(axis=1)).ravel()
+
+        # Only recent, visible posts are recommended; their dislike ratio
+        # penalises the score
+        self.eligible = np.zeros(shape[1], dtype=bool)
+        self.penalty = np.zeros(shape[1], dtype=np.float32)
+        candidates = Post.objects.filter(
+            is_deleted=False,
+            is_hidden=False,
+            created_at__gte=timezone.now() - timedelta(days=self.candidate_days)
+        ).values_list('id', 'likes_count', 'dislikes_count')
+        for post_id, likes, dislikes in candidates.iterator(chunk_size=10000):
+            j = post_index.get(post_id)
+            if j is not None:
+                self.eligible[j] = True
+                self.penalty[j] = min(dislikes / max(likes + 1, 1), 1.0)
+
+        logger.info(
+            f"Collaborative filtering matrix: {shape[0]} users x "
+            f"{shape[1]} posts, {self.likes.nnz} likes"
+        )
+        return self
+
+    @staticmethod
+    def _binary(rows, cols, shape):
+        matrix = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.float32), (rows, cols)), shape=shape
+        )
+        matrix.sum_duplicates()
+        matrix.data[:] = 1.0
+        return matrix
+
+    # ------------------------------------------------------------------
+    # Neighbours
+    # ------------------------------------------------------------------
+
+    def neighbor_table(self, rows):
+        """
+        Top-K neighbours of the users at matrix ``rows``.
+
+        Returns:
+            ``(indices, similarities)``, two ``len(rows) x K`` arrays; unused
+            slots hold index -1 and similarity 0
+        """
+        k = self.neighbors
+        indices = np.full((len(rows), k), -1, dtype=np.int32)
+        similarities = np.zeros((len(rows), k), dtype=np.float32)
+
+        common = (self.likes[rows] @ self.likes.T).tocsr()
+        common.sort_indices()
+        for i, row in enumerate(rows):
+            start, end = common.indptr[i], common.indptr[i + 1]
+            cols = common.indices[start:end]
+            counts = common.data[start:end]
+            union = self.like_counts[row] + self.like_counts[cols] - counts
+            jaccard = counts / np.maximum(union, 1)
+
+            keep = (
+                (cols != row) &
+                (counts >= self.min_common) &
+                (jaccard > self.min_similarity)
+            )
+            cols, jaccard = cols[keep], jaccard[keep]
+            if len(cols) > k:
+                top = np.argpartition(-jaccard, k - 1)[:k]
+                cols, jaccard = cols[top], jaccard[top]
+            order = np.argsort(-jaccard)
+            indices[i, :len(cols)] = cols[order]
+            similarities[i, :len(cols)] = jaccard[order]
+        return indices, similarities
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def recommend_rows(self, rows):
+        """
+        Score candidates for the users at matrix ``rows``.
+
+        Yields:
+            ``(row, [(post_id, score, supporters, avg_similarity), ...])``
+        """
+        indices, similarities = self.neighbor_table(rows)
+        valid = indices >= 0
+        chunk_rows = np.repeat(np.arange(len(rows)), valid.sum(axis=1))
+        shape = (len(rows), self.likes.shape[0])
+        weights = sparse.csr_matrix(
+            (similarities[valid], (chunk_rows, indices[valid])), shape=shape
+        )
+        members = sparse.csr_matrix(
+            (np.ones(valid.sum(), dtype=np.float32),
+             (chunk_rows, indices[valid])), shape=shape
+        )
+
+        similarity_sums = (weights @ self.likes).tocsr()
+        supporters = (members @ self.likes).tocsr()
+        similarity_sums.sort_indices()
+        supporters.sort_indices()
+        seen = (self.likes[rows] + self.dislikes[rows]).tocsr()
+
+        for i, row in enumerate(rows):
+            start, end = supporters.indptr[i], supporters.indptr[i + 1]
+            cols = supporters.indices[start:end]
+            counts = supporters.data[start:end]
+            sums = similarity_sums.data[start:end]
+
+            seen_cols = seen.indices[seen.indptr[i]:seen.indptr[i + 1]]
+            keep = (
+                (counts >= self.min_supporters) &
+                self.eligible[cols] &
+                ~np.isin(cols, seen_cols)
+            )
+            cols, counts, sums = cols[keep], counts[keep], sums[keep]
+            if not len(cols):
+                yield row, []
+                continue
+
+            average = sums / counts
+            crowd = np.minimum(counts / 5.0, 1.0)
+            scores = average * 0.7 + crowd * 0.3 - self.penalty[cols] * 0.5
+            top = np.argsort(-scores)[:self.limit]
+            yield row, [
+                (self.post_ids[cols[t]], float(scores[t]), int(counts[t]),
+                 float(average[t]))
+                for t in top
+            ]
+
+    def recommend(self, user_ids=None):
+        """
+        Yield ``(user_id, recommendations)`` for ``user_ids`` (default: every
+        user with enough likes), chunk by chunk.
+        """
+        if user_ids is None:
+            rows = np.flatnonzero(self.like_counts >= self.min_likes)
+        else:
+            rows = np.array([
+                self.user_index[user_id] for user_id in user_ids
+                if user_id in self.user_index and
+                self.like_counts[self.user_index[user_id]] >= self.min_likes
+            ], dtype=np.int64)
+
+        for start in range(0, len(rows), self.chunk_size):
+            for row, recommendations in self.recommend_rows(
+                rows[start:start + self.chunk_size]
+            ):
+                yield self.user_ids[row], recommendations
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def run(self, user_ids=None, expires_in=timedelta(days=1)):
+        """
+        Load, score and store recommendations. Each processed user's
+        previous ``collaborative`` rows are replaced; posts another
+        algorithm already recommended to the user are skipped and the
+        remaining ranks close up.
+
+        Returns:
+            Number of ContentRecommendation rows written
+        """
+        self.load()
+        post_type = ContentType.objects.get_for_model(Post)
+        expires_at = timezone.now() + expires_in
+
+        written = 0
+        batch_users, batch_rows = [], []
+        for user_id, recommendations in self.recommend(user_ids):
+            batch_users.append(user_id)
+            for rank, (post_id, score, supporters, average) in enumerate(
+                recommendations, start=1
+            ):
+                batch_rows.append(ContentRecommendation(
+                    user_id=user_id,
+                    content_type=post_type,
+                    object_id=post_id,
+                    score=max(0.0, min(score, 1.0)),
+                    reason='Users like what you also liked',
+                    recommendation_type='collaborative',
+                    rank=rank,
+                    algorithm_version=ALGORITHM_VERSION,
+                    metadata={
+                        'similar_users': supporters,
+                        'avg_similarity': round(average, 4),
+                    },
+                    expires_at=expires_at,
+                ))
+            if len(batch_users) >= self.chunk_size:
+                written += self._store(batch_users, batch_rows)
+                batch_users, batch_rows = [], []
+        if batch_users:
+            written += self._store(batch_users, batch_rows)
+        return written
+
+    @staticmethod
+    def _store(user_ids, rows):
+        """Replace the users' collaborative rows; returns rows inserted."""
+        with transaction.atomic():
+            ContentRecommendation.objects.filter(
+                user_id__in=user_ids, recommendation_type='collaborative'
+            ).delete()
+            # A post already recommended to the user by another algorithm
+            # keeps that row (unique per user and object)
+            taken = set(ContentRecommendation.objects.filter(
+                user_id__in=user_ids,
+                object_id__in={row.object_id for row in rows},
+            ).values_list('user_id', 'object_id'))
+
+            kept, ranks = [], defaultdict(int)
+            for row in rows:
+                if (row.user_id, row.object_id) in taken:
+                    continue
+                ranks[row.user_id] += 1
+                row.rank = ranks[row.user_id]
+                kept.append(row)
+            ContentRecommendation.objects.bulk_create(
+                kept, batch_size=1000, ignore_conflicts=True
+            )
+        return len(kept)
@@ -0,0 +1,99 @@
+"""
+Set-based reconciliation of the denormalized Post counters.
+
+Reaction, comment, share and repost signals add the affected post id to a
+Redis set (``dirty_posts``); ``content.tasks.update_content_counters``
+drains that set in chunks and recomputes every counter of a chunk with one
+query of grouped aggregate subqueries, then writes only the rows that
+drifted with a single ``bulk_update``.
+"""
+
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from core.dirty_sets import DirtyIdSet
+
+from .models import Comment, DirectShare, Post, PostReaction
+from .real_time_counters import counter_buffer
+
+# Post field -> annotation holding its recomputed value
+COUNTER_FIELDS = {
+    'likes_count': 'actual_likes',
+    'dislikes_count': 'actual_dislikes',
+    'comments_count': 'actual_comments',
+    'shares_count': 'actual_shares',
+    'repost_count': 'actual_reposts',
+}
+
+
+def _count_per_post(queryset):
+    """Correlated ``COUNT(*)`` of ``queryset`` rows for the outer post."""
+    counts = queryset.filter(post=OuterRef('pk')).order_by().values(
+        'post'
+    ).annotate(total=Count('pk')).values('total')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+@transaction.atomic
+def recount_post_counters(post_ids: Iterable) -> int:
+    """
+    Recompute likes/dislikes/comments/shares/reposts for ``post_ids`` and
+    persist those that changed.
+
+    Returns:
+        Number of posts whose counters were corrected
+    """
+    reactions = PostReaction.objects.filter(is_deleted=False)
+    # Row locks hold back a counter flush until the recount is written, so
+    # a batch cannot commit between reading the buffer and the update
+    rows = Post.objects.select_for_update().filter(
+        pk__in=list(post_ids)
+    ).order_by('pk').annotate(
+        actual_likes=_count_per_post(reactions.filter(
+            reaction_type__in=PostReaction.POSITIVE_REACTIONS
+        )),
+        actual_dislikes=_count_per_post(reactions.filter(
+            reaction_type__in=PostReaction.NEGATIVE_REACTIONS
+        )),
+        actual_comments=_count_per_post(
+            Comment.objects.filter(is_deleted=False)
+        ),
+        actual_shares=_count_per_post(DirectShare.objects.all()),
+        actual_reposts=Coalesce(Subquery(
+            Post.objects.filter(
+                parent_post=OuterRef('pk'), post_type='repost'
+            ).order_by().values('parent_post').annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField()
+        ), 0),
+    ).values('pk', *COUNTER_FIELDS, *COUNTER_FIELDS.values())
+
+    rows = list(rows)
+    # Deltas still buffered in write-behind mode will be added by the
+    # flusher, so the stored value must not include them yet
+    pending = counter_buffer.pending_deltas('post', [row['pk'] for row in rows])
+
+    changed = []
+    for row in rows:
+        deltas = pending.get(row['pk'], {})
+        targets = {
+            field: max(0, row[actual] - deltas.get(field, 0))
+            for field, actual in COUNTER_FIELDS.items()
+        }
+        if any(row[field] != target for field, target in targets.items()):
+            post = Post(pk=row['pk'])
+            for field, target in targets.items():
+                setattr(post, field, target)
+            changed.append(post)
+
+    if changed:
+        Post.objects.bulk_update(changed, list(COUNTER_FIELDS))
+    return len(changed)
+
+
+# Posts touched by reaction/comment/share/repost signals
+dirty_posts = DirtyIdSet('content:dirty_posts')
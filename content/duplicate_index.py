@@ -0,0 +1,175 @@
+"""
+Near-duplicate index of recent posts and comments for bot detection.
+
+Each post and comment stores a MinHash signature of its text's character
+shingles (``duplicate_signature``, set on save). Once committed, the item is
+added to LSH buckets in Redis: one sorted set per band hash, scored by
+creation time, both for its author and globally. "Near-duplicates of this
+text within W, for this user or from anyone" is then a fixed number of
+bucket range reads plus a signature comparison of the (capped) candidates,
+however much the user or the site has posted, which also exposes the same
+text pushed from many accounts at once (spam waves).
+
+Signatures and band hashes come from ``content.similarity_index``: 128
+MinHash values in 32 bands of 4, so texts with an estimated Jaccard
+similarity of 0.7 share a band with probability > 0.99.
+"""
+
+import logging
+import re
+import time
+from datetime import timedelta
+from typing import List, Optional
+
+import numpy as np
+import redis
+from django.conf import settings
+
+from .similarity_index import band_hashes, estimate_similarity, minhash
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 5
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+# Estimated similarity above which two texts are near-duplicates
+DUPLICATE_SIMILARITY = 0.7
+
+# Window for a user repeating their own text
+DUPLICATE_WINDOW = timedelta(hours=24)
+# Accounts posting the same text within this window make a spam wave
+SPAM_WAVE_WINDOW = timedelta(hours=1)
+SPAM_WAVE_ACCOUNTS = 3
+# Shorter texts ("congrats on the new job!") are legitimately posted by many
+# accounts at once, so only texts with this many shingles count as a wave
+SPAM_WAVE_MIN_SHINGLES = 10 * SHINGLE_SIZE
+
+
+def text_shingles(text: str) -> set:
+    """Character shingles of ``text`` with case and punctuation removed."""
+    normalized = ' '.join(TOKEN_RE.findall((text or '').lower()))
+    if len(normalized) <= SHINGLE_SIZE:
+        return {normalized} if normalized else set()
+    return {
+        normalized[start:start + SHINGLE_SIZE]
+        for start in range(len(normalized) - SHINGLE_SIZE + 1)
+    }
+
+
+def text_signature(text: str) -> Optional[bytes]:
+    """MinHash signature of ``text`` as stored on the row, or None."""
+    shingles = text_shingles(text)
+    return minhash(shingles).tobytes() if shingles else None
+
+
+def _as_signature(signature) -> np.ndarray:
+    return np.frombuffer(bytes(signature), dtype=np.uint32)
+
+
+class NearDuplicateIndex:
+    """LSH buckets of recent post/comment signatures in Redis."""
+
+    # Items older than this are dropped from the buckets
+    RETENTION = timedelta(hours=24)
+    # Most recent members kept per bucket, bounding every lookup
+    MAX_BUCKET_SIZE = 50
+
+    def __init__(self, prefix: str = 'dupes'):
+        self.prefix = prefix
+        self.redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5
+        )
+
+    def bucket_key(self, scope: str, band_hash: int) -> str:
+        return f'{self.prefix}:{scope}:{band_hash}'
+
+    def signature_key(self, member: str) -> str:
+        return f'{self.prefix}:sig:{member}'
+
+    @staticmethod
+    def member(kind: str, object_id, user_id) -> str:
+        return f'{kind}:{object_id}:{user_id}'
+
+    def add(self, kind: str, object_id, user_id, signature, at=None) -> bool:
+        """Index one item; False if Redis is unavailable."""
+        timestamp = at.timestamp() if at else time.time()
+        retention = int(self.RETENTION.total_seconds())
+        member = self.member(kind, object_id, user_id)
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.set(self.signature_key(member), bytes(signature), ex=retention)
+            for band_hash in band_hashes(_as_signature(signature)):
+                for scope in ('all', f'user:{user_id}'):
+                    key = self.bucket_key(scope, band_hash)
+                    pipe.zadd(key, {member: timestamp})
+                    pipe.zremrangebyscore(key, '-inf', timestamp - retention)
+                    pipe.zremrangebyrank(key, 0, -self.MAX_BUCKET_SIZE - 1)
+                    pipe.expire(key, retention)
+            pipe.execute()
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"Could not index {kind} {object_id} for duplicates: {e}")
+            return False
+
+    def find(self, signature, within: timedelta, user_id=None, at=None,
+             kind: str = None, exclude: str = None,
+             min_similarity: float = DUPLICATE_SIMILARITY) -> List[dict]:
+        """
+        Near-duplicates of ``signature`` created in the ``within`` before
+        ``at`` (now by default), by ``user_id`` or by anyone when None.
+
+        Returns:
+            ``{'kind', 'object_id', 'user_id', 'similarity'}`` per match,
+            most similar first
+        """
+        signature = _as_signature(signature)
+        end = at.timestamp() if at else time.time()
+        scope = f'user:{user_id}' if user_id else 'all'
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for band_hash in band_hashes(signature):
+            pipe.zrangebyscore(
+                self.bucket_key(scope, band_hash),
+                end - within.total_seconds(), end
+            )
+        candidates = sorted({
+            member.decode()
+            for members in pipe.execute()
+            for member in members
+        } - {exclude})
+        if kind:
+            candidates = [m for m in candidates if m.startswith(f'{kind}:')]
+        if not candidates:
+            return []
+
+        stored = self.redis_client.mget(
+            [self.signature_key(member) for member in candidates]
+        )
+        found = [
+            (member, value) for member, value in zip(candidates, stored)
+            if value is not None
+        ]
+        if not found:
+            return []
+        similarities = estimate_similarity(
+            signature, np.stack([_as_signature(value) for _, value in found])
+        )
+
+        matches = []
+        for (member, _), similarity in zip(found, similarities):
+            if similarity >= min_similarity:
+                member_kind, object_id, member_user = member.split(':')
+                matches.append({
+                    'kind': member_kind,
+                    'object_id': object_id,
+                    'user_id': member_user,
+                    'similarity': float(similarity),
+                })
+        matches.sort(key=lambda match: match['similarity'], reverse=True)
+        return matches
+
+
+# Global instance
+duplicate_index = NearDuplicateIndex()
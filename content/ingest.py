@@ -0,0 +1,237 @@
+"""
+Asynchronous post-ingest pipeline for new posts and comments.
+
+The post_save receivers only queue the new object's id once the creating
+transaction commits; ``content.tasks.process_content_ingest`` drains the
+queues in batches and runs every item through the stages below, so post and
+comment creation latency no longer depends on the number of moderation
+rules. Rules are evaluated through the cached compiled rule sets
+(``content.moderation_rules``).
+
+Stages are idempotent: each completed stage is recorded per item, so a
+retried item resumes at the stage that failed, and rules that already fired
+for an item are not evaluated again.
+"""
+
+import logging
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db import transaction
+
+from analytics.models import ErrorLog
+from core.dirty_sets import DirtyIdSet
+
+from .models import AutoModerationAction, Comment, Post
+from .utils import (
+    check_moderation_rules,
+    create_content_analysis,
+    process_content_for_bot_detection,
+    process_post_content,
+    queue_high_risk_actions,
+)
+
+logger = logging.getLogger(__name__)
+
+# Stages run in order; rule evaluation reads the analyses of the first one,
+# and similarity indexing the hashtags of the one before it
+STAGES = {
+    'post': (
+        'analysis', 'rules', 'bot_signals', 'mentions_hashtags', 'similarity'
+    ),
+    'comment': ('analysis', 'rules', 'bot_signals'),
+}
+
+
+class ContentIngestPipeline:
+    """Batched, staged processing of newly created posts and comments."""
+
+    MODELS = {'post': Post, 'comment': Comment}
+    QUEUE_KEY = 'content:ingest:{kind}s'
+    STAGE_KEY = 'content:ingest:{kind}:{object_id}:{stage}'
+    ATTEMPTS_KEY = 'content:ingest:{kind}:{object_id}:attempts'
+    SCHEDULE_KEY = 'content:ingest:scheduled'
+    # Stage markers only need to outlive retries
+    STATE_TIMEOUT = 24 * 3600
+    MAX_ATTEMPTS = 3
+
+    def __init__(self):
+        self.queues = {
+            kind: DirtyIdSet(self.QUEUE_KEY.format(kind=kind))
+            for kind in self.MODELS
+        }
+        self.batch_delay = getattr(settings, 'CONTENT_INGEST_BATCH_DELAY', 2)
+
+    def enqueue_on_commit(self, kind: str, object_id) -> None:
+        """Queue an item once the current transaction commits."""
+        transaction.on_commit(lambda: self.enqueue(kind, object_id))
+
+    def enqueue(self, kind: str, object_id) -> None:
+        """
+        Queue an item and schedule a drain of the queues.
+
+        One drain is scheduled per ``CONTENT_INGEST_BATCH_DELAY`` seconds and
+        picks up everything queued meanwhile. Without Redis or a broker the
+        item is processed inline, as before the pipeline existed.
+        """
+        from .tasks import process_content_ingest
+
+        try:
+            self.queues[kind].add(object_id)
+            if cache.add(self.SCHEDULE_KEY, 1, self.batch_delay):
+                process_content_ingest.apply_async(countdown=self.batch_delay)
+        except Exception as e:
+            logger.warning(
+                f"Ingest queue unavailable, processing {kind} {object_id} "
+                f"inline: {e}"
+            )
+            self.process(kind, [object_id])
+
+    def drain(self, batch_size: int = 100, max_batches: int = 50) -> tuple:
+        """
+        Process queued posts and comments, ``batch_size`` at a time.
+
+        Returns:
+            ``(processed, timings)`` where ``timings`` maps each stage to the
+            seconds spent in it
+        """
+        timings = {}
+        processed = 0
+        for kind, queue in self.queues.items():
+            for _ in range(max_batches):
+                object_ids = queue.pop_batch(batch_size)
+                if not object_ids:
+                    break
+                processed += self.process(kind, object_ids, timings)
+        return processed, timings
+
+    def process(self, kind: str, object_ids, timings=None) -> int:
+        """
+        Run items of ``kind`` through the stages they have not completed.
+
+        Returns:
+            Number of items that went through every stage
+        """
+        if timings is None:
+            timings = {}
+
+        items = [
+            item for item in self.MODELS[kind].objects.filter(
+                pk__in=list(object_ids)
+            ).select_related('author__user')
+            if item.content
+        ]
+        if not items:
+            return 0
+
+        completed = self._completed_stages(kind, items)
+        fired = self._fired_rules(items)
+        failed = set()
+
+        for stage in STAGES[kind]:
+            start = time.perf_counter()
+            done = []
+            for item in items:
+                key = self.STAGE_KEY.format(
+                    kind=kind, object_id=item.pk, stage=stage
+                )
+                if item.pk in failed or key in completed:
+                    continue
+                try:
+                    self._run_stage(stage, item, fired[item.pk])
+                    done.append(key)
+                except Exception as e:
+                    failed.add(item.pk)
+                    self._retry_later(kind, item, stage, e)
+            self._mark_completed(done)
+            timings[stage] = (
+                timings.get(stage, 0.0) + time.perf_counter() - start
+            )
+
+        return len(items) - len(failed)
+
+    def _run_stage(self, stage, item, fired_rule_ids):
+        if stage == 'analysis':
+            create_content_analysis(item)
+        elif stage == 'rules':
+            actions = check_moderation_rules(
+                item, exclude_rule_ids=fired_rule_ids
+            )
+            queue_high_risk_actions(actions)
+        elif stage == 'bot_signals':
+            result = process_content_for_bot_detection(item)
+            if result.get('blocked'):
+                logger.info(
+                    f"User {item.author.user.username} blocked as bot"
+                )
+            elif result['bot_detected']:
+                logger.info(
+                    f"Bot signals for {item.pk}: {result['events']}"
+                )
+        elif stage == 'mentions_hashtags':
+            process_post_content(item)
+        elif stage == 'similarity':
+            from .similarity_index import similarity_index
+
+            similarity_index.index_post(item)
+
+    def _fired_rules(self, items):
+        """Ids of the rules that already produced an action, per item."""
+        fired = defaultdict(set)
+        for object_id, rule_id in AutoModerationAction.objects.filter(
+            content_type=ContentType.objects.get_for_model(items[0]),
+            object_id__in=[item.pk for item in items],
+            triggered_by_rule__isnull=False
+        ).values_list('object_id', 'triggered_by_rule_id'):
+            fired[object_id].add(rule_id)
+        return fired
+
+    def _completed_stages(self, kind, items):
+        keys = [
+            self.STAGE_KEY.format(kind=kind, object_id=item.pk, stage=stage)
+            for item in items
+            for stage in STAGES[kind]
+        ]
+        try:
+            return set(cache.get_many(keys))
+        except Exception as e:
+            # Stages are safe to rerun, just slower
+            logger.debug(f"Ingest stage markers unavailable: {e}")
+            return set()
+
+    def _mark_completed(self, keys):
+        if not keys:
+            return
+        try:
+            cache.set_many(dict.fromkeys(keys, 1), self.STATE_TIMEOUT)
+        except Exception as e:
+            logger.debug(f"Ingest stage markers unavailable: {e}")
+
+    def _retry_later(self, kind, item, stage, error):
+        """Log a failed stage and queue the item again, up to MAX_ATTEMPTS."""
+        attempts_key = self.ATTEMPTS_KEY.format(kind=kind, object_id=item.pk)
+        try:
+            attempts = cache.get(attempts_key, 0) + 1
+            cache.set(attempts_key, attempts, self.STATE_TIMEOUT)
+        except Exception:
+            attempts = self.MAX_ATTEMPTS
+        if attempts < self.MAX_ATTEMPTS:
+            self.queues[kind].mark(item.pk)
+
+        ErrorLog.objects.create(
+            level='error',
+            message=f'Error in {stage} stage for {kind} {item.pk}: {str(error)}',
+            extra_data={
+                'object_id': str(item.pk),
+                'stage': stage,
+                'attempt': attempts,
+                'task': 'process_content_ingest'
+            }
+        )
+
+
+# Global instance
+ingest_pipeline = ContentIngestPipeline()
@@ -0,0 +1,164 @@
+"""
+Management command to benchmark near-duplicate detection on a spam wave.
+
+Indexes synthetic texts in Redis under a throwaway key prefix (no database
+writes): a day of ordinary posts from many users, then a wave of accounts
+posting light variations of one message. Reports the per-submission cost
+of the index lookup against the previous SequenceMatcher scan of the
+user's own last 24 hours, and how much of the wave is caught.
+"""
+
+import random
+import time
+import uuid
+from difflib import SequenceMatcher
+
+import redis
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from content.duplicate_index import (
+    DUPLICATE_WINDOW, SPAM_WAVE_ACCOUNTS, SPAM_WAVE_WINDOW,
+    NearDuplicateIndex, text_signature
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark near-duplicate lookups and spam-wave detection'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=500,
+            help='Users posting ordinary content (default: 500)',
+        )
+        parser.add_argument(
+            '--history',
+            type=int,
+            default=1000,
+            help='Largest 24-hour history of one user (default: 1000)',
+        )
+        parser.add_argument(
+            '--wave',
+            type=int,
+            default=200,
+            help='Accounts taking part in the spam wave (default: 200)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the synthetic text (default: 42)',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.vocabulary = [
+            ''.join(self.rng.choice('abcdefghijklmnopqrstuvwxyz')
+                    for _ in range(self.rng.randint(3, 9)))
+            for _ in range(20000)
+        ]
+        self.now = timezone.now()
+        self.index = NearDuplicateIndex(f'bench:dupes:{uuid.uuid4().hex[:8]}')
+        try:
+            self.index.redis_client.ping()
+        except redis.RedisError as e:
+            raise CommandError(f'Redis is not available: {e}')
+
+        try:
+            self.stdout.write(f"Indexing {options['users']} users' posts...")
+            for user in range(options['users']):
+                for _ in range(20):
+                    self.index_text(f'user{user}', self.sentence())
+
+            self.report_lookups(options['history'])
+            self.report_wave(options['wave'])
+        finally:
+            keys = list(self.index.redis_client.scan_iter(
+                f'{self.index.prefix}:*', count=1000
+            ))
+            for start in range(0, len(keys), 1000):
+                self.index.redis_client.delete(*keys[start:start + 1000])
+
+        self.stdout.write(self.style.SUCCESS(
+            '✓ Lookups read a fixed number of LSH buckets, whatever the '
+            'history size'
+        ))
+
+    def sentence(self, words=25):
+        return ' '.join(self.rng.choices(self.vocabulary, k=words))
+
+    def variant(self, text):
+        """Light edit of ``text``: one word swapped, casing, punctuation."""
+        words = text.split()
+        words[self.rng.randrange(len(words))] = self.rng.choice(self.vocabulary)
+        return ' '.join(words).capitalize() + self.rng.choice(['', '!', '...'])
+
+    def index_text(self, user_id, text, within=DUPLICATE_WINDOW):
+        object_id = uuid.uuid4()
+        at = self.now - within * self.rng.random()
+        self.index.add('post', object_id, user_id, text_signature(text), at)
+        return self.index.member('post', object_id, user_id)
+
+    def report_lookups(self, largest):
+        self.stdout.write(
+            f"\n{'history':>8} {'index ms/post':>14} {'scan ms/post':>13}"
+        )
+        for size in (largest // 100, largest // 10, largest):
+            user_id = f'heavy{size}'
+            history = [self.sentence() for _ in range(size)]
+            for text in history:
+                self.index_text(user_id, text)
+            submissions = [self.sentence() for _ in range(20)]
+
+            start = time.perf_counter()
+            for text in submissions:
+                self.index.find(
+                    text_signature(text), DUPLICATE_WINDOW, user_id=user_id,
+                    at=self.now
+                )
+            indexed = (time.perf_counter() - start) * 1000 / len(submissions)
+
+            start = time.perf_counter()
+            for text in submissions:
+                for existing in history:
+                    if SequenceMatcher(None, text, existing).ratio() > 0.9:
+                        break
+            scanned = (time.perf_counter() - start) * 1000 / len(submissions)
+
+            self.stdout.write(f'{size:>8} {indexed:>14.3f} {scanned:>13.3f}')
+
+    def report_wave(self, accounts):
+        message = self.sentence()
+        wave = []
+        for account in range(accounts):
+            user_id, text = f'spammer{account}', self.variant(message)
+            wave.append((
+                user_id, text,
+                self.index_text(user_id, text, SPAM_WAVE_WINDOW)
+            ))
+
+        flagged = 0
+        start = time.perf_counter()
+        for user_id, text, member in wave:
+            others = {
+                match['user_id'] for match in self.index.find(
+                    text_signature(text), SPAM_WAVE_WINDOW,
+                    at=self.now, exclude=member
+                )
+            } - {user_id}
+            flagged += len(others) >= SPAM_WAVE_ACCOUNTS
+        elapsed = (time.perf_counter() - start) * 1000 / len(wave)
+
+        false_positives = sum(
+            bool(self.index.find(
+                text_signature(self.sentence()), SPAM_WAVE_WINDOW, at=self.now
+            ))
+            for _ in range(accounts)
+        )
+        self.stdout.write(
+            f'\nSpam wave of {accounts} accounts: {flagged} flagged '
+            f'({elapsed:.3f} ms/post), {false_positives} of {accounts} '
+            f'ordinary posts matched anything'
+        )
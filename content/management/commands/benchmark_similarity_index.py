@@ -0,0 +1,113 @@
+"""
+Management command to benchmark the incremental post similarity index.
+
+Runs on synthetic posts held in memory (no database writes): an index of
+existing posts is built once, then batches of new posts are signed and
+matched through the LSH bands, as update_content_similarity_scores does.
+"""
+
+import random
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from content.similarity_index import (
+    MIN_SIMILARITY, band_hashes, estimate_similarity, minhash, post_features
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark nightly similarity cost against new and existing posts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--existing',
+            type=int,
+            default=20000,
+            help='Largest number of already indexed posts (default: 20000)',
+        )
+        parser.add_argument(
+            '--new',
+            type=int,
+            default=500,
+            help='Largest number of new posts per run (default: 500)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Random seed for the synthetic posts (default: 42)',
+        )
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.vocabulary = [f'word{i}' for i in range(5000)]
+        self.topics = [
+            self.rng.sample(self.vocabulary, 60) for _ in range(200)
+        ]
+        existing, new = options['existing'], options['new']
+
+        self.stdout.write(f'Signing {existing} existing posts...')
+        self.posts = [self.synthetic_post() for _ in range(existing)]
+        signatures = [minhash(features) for features in self.posts]
+
+        self.stdout.write('\nFixed new posts, growing index:')
+        for total in (existing // 4, existing // 2, existing):
+            self.report(signatures[:total], new)
+
+        self.stdout.write('\nFixed index, growing new posts:')
+        for count in (new // 4, new // 2, new):
+            self.report(signatures, count)
+
+        self.stdout.write(self.style.SUCCESS(
+            '✓ Incremental cost follows the number of new posts; a full '
+            f'pairwise pass over {existing + new} posts would compare '
+            f'{(existing + new) * (existing + new - 1) // 2} pairs'
+        ))
+
+    def synthetic_post(self):
+        """Features of a post mostly drawn from one topic."""
+        topic = self.rng.choice(self.topics)
+        words = self.rng.sample(topic, 20) + self.rng.sample(self.vocabulary, 5)
+        self.rng.shuffle(words)
+        hashtags = self.rng.sample(topic[:5], 2)
+        return post_features(' '.join(words), hashtags, self.rng.randint(1, 20))
+
+    def new_post(self, indexed):
+        """A new post; one in ten is a light edit of an indexed post."""
+        if self.rng.random() < 0.1:
+            features = set(self.posts[self.rng.randrange(indexed)])
+            features.discard(self.rng.choice(sorted(features)))
+            features.add(self.rng.choice(self.vocabulary))
+            return features
+        return self.synthetic_post()
+
+    def report(self, signatures, new_count):
+        buckets = defaultdict(list)
+        for i, signature in enumerate(signatures):
+            for band in band_hashes(signature):
+                buckets[band].append(i)
+        stacked = np.vstack(signatures)
+
+        start = time.perf_counter()
+        compared = pairs = 0
+        for _ in range(new_count):
+            signature = minhash(self.new_post(len(signatures)))
+            candidates = set()
+            for band in band_hashes(signature):
+                candidates.update(buckets.get(band, ()))
+            if candidates:
+                scores = estimate_similarity(
+                    signature, stacked[sorted(candidates)]
+                )
+                pairs += int((scores >= MIN_SIMILARITY).sum())
+            compared += len(candidates)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(
+            f'  {len(signatures):>7} indexed, {new_count:>5} new: '
+            f'{elapsed * 1000:8.1f} ms, {compared} candidates scored, '
+            f'{pairs} similar pairs'
+        )
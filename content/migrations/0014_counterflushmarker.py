@@ -0,0 +1,27 @@
+# Generated by Django 4.2.25 on 2026-10-16 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0013_post_search_vector'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CounterFlushMarker',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('batch_id', models.CharField(max_length=64, unique=True)),
+                ('model', models.CharField(max_length=20)),
+                ('rows_updated', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Counter Flush Marker',
+                'verbose_name_plural': 'Counter Flush Markers',
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2.25 on 2026-10-16 14:00
+
+import django.contrib.postgres.fields
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0014_counterflushmarker'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSimilaritySignature',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='similarity_signature', serialize=False, to='content.post')),
+                ('minhash', models.BinaryField(help_text='uint32 MinHash values')),
+                ('band_hashes', django.contrib.postgres.fields.ArrayField(base_field=models.BigIntegerField(), size=None)),
+                ('post_created_at', models.DateTimeField(db_index=True)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [django.contrib.postgres.indexes.GinIndex(fields=['band_hashes'], name='content_simsig_bands_gin')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.25 on 2026-10-16 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0015_postsimilaritysignature'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='hashtag',
+            name='trending_score',
+            field=models.FloatField(db_index=True, default=0.0, help_text='Time-decayed recent mentions (see content.trending)'),
+        ),
+    ]
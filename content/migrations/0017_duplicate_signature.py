@@ -0,0 +1,23 @@
+# Generated by Django 4.2.25 on 2026-10-16 21:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('content', '0016_hashtag_trending_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='duplicate_signature',
+            field=models.BinaryField(null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='duplicate_signature',
+            field=models.BinaryField(null=True),
+        ),
+    ]
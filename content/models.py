@@ -9,6 +9,9 @@ from django.db import models
 from django.utils import timezone
 from django.contrib.contenttypes.models import ContentType
 from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from accounts.models import UserProfile
 from core.models import PostManager, CommentManager, MentionManager
 from core.html_sanitizer import sanitize_article_content, sanitize_basic_html
@@ -511,6 +514,14 @@ class Post(models.Model):
         default='public'
     )
 
+    # Full-text search document (title/content/excerpt), maintained by
+    # search.signals and indexed with GIN
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # MinHash of the text's character shingles for near-duplicate
+    # detection, set on save (see content.duplicate_index)
+    duplicate_signature = models.BinaryField(null=True, editable=False)
+
     # Custom manager
     objects = PostManager()
 
@@ -933,6 +944,7 @@ class Post(models.Model):
             models.Index(fields=['visibility', '-created_at']),
             models.Index(fields=['post_type', '-created_at']),
             models.Index(fields=['community', '-created_at']),
+            GinIndex(fields=['search_vector'], name='content_post_search_gin'),
         ]
 
     def delete(self, *args, **kwargs):
@@ -1468,6 +1480,10 @@ class Comment(models.Model):
     )
     content = models.TextField(max_length=1000)
 
+    # MinHash of the text's character shingles for near-duplicate
+    # detection, set on save (see content.duplicate_index)
+    duplicate_signature = models.BinaryField(null=True, editable=False)
+
     # Custom manager
     objects = CommentManager()
 
@@ -2381,9 +2397,8 @@ class DirectShare(models.Model):
         is_create = self._state.adding
         super().save(*args, **kwargs)
         if is_create:
-            Post.objects.filter(id=self.post_id).update(
-                shares_count=models.F('shares_count') + 1
-            )
+            from .real_time_counters import RealTimeCounterManager
+            RealTimeCounterManager.increment_share_count(Post(pk=self.post_id))
 
     def __str__(self):
         return f"{self.sender.user.username} shared {self.post}"
@@ -2391,9 +2406,8 @@ class DirectShare(models.Model):
     def delete(self, *args, **kwargs):
         post_id = self.post_id
         super().delete(*args, **kwargs)
-        Post.objects.filter(id=post_id, shares_count__gt=0).update(
-            shares_count=models.F('shares_count') - 1
-        )
+        from .real_time_counters import RealTimeCounterManager
+        RealTimeCounterManager.decrement_share_count(Post(pk=post_id))
 
     def restore_instance(self, cascade=True):
         """Restore this soft-deleted instance and optionally cascade to related objects."""
@@ -2692,6 +2706,11 @@ class Hashtag(models.Model):
     name = models.CharField(max_length=100, unique=True)
     posts_count = models.PositiveIntegerField(default=0)
     is_trending = models.BooleanField(default=False)
+    trending_score = models.FloatField(
+        default=0.0,
+        db_index=True,
+        help_text="Time-decayed recent mentions (see content.trending)"
+    )
 
     # Soft delete field
 
@@ -5717,6 +5736,32 @@ class ContentSimilarity(models.Model):
         )
 
 
+class PostSimilaritySignature(models.Model):
+    """
+    MinHash signature of a post's text, hashtags and rubrique, with its LSH
+    band hashes for approximate nearest-neighbour lookups
+    (see content.similarity_index).
+    """
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='similarity_signature'
+    )
+    minhash = models.BinaryField(help_text="uint32 MinHash values")
+    band_hashes = ArrayField(models.BigIntegerField())
+    post_created_at = models.DateTimeField(db_index=True)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            GinIndex(fields=['band_hashes'], name='content_simsig_bands_gin'),
+        ]
+
+    def __str__(self):
+        return f"Similarity signature for post {self.post_id}"
+
+
 class UserContentPreferences(models.Model):
     """Store user content preferences derived from behavior analysis."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -6943,6 +6988,27 @@ class ContentExperimentResult(models.Model):
         return self.p_value is not None and self.p_value < 0.05
 
 
+class CounterFlushMarker(models.Model):
+    """
+    Records a write-behind counter batch applied to the database.
+
+    Written in the same transaction as the batch's counter updates, so a
+    flusher that crashed before clearing the batch from Redis can tell on
+    restart whether it was already applied (see content.real_time_counters).
+    """
+    batch_id = models.CharField(max_length=64, unique=True)
+    model = models.CharField(max_length=20)
+    rows_updated = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = 'Counter Flush Marker'
+        verbose_name_plural = 'Counter Flush Markers'
+
+    def __str__(self):
+        return f"{self.model} counters batch {self.batch_id}"
+
+
 # NOTE: Post.shares_count reflects ONLY DirectShare (private) interactions.
 #       Post.repost_count reflects ONLY Repost (public feed) interactions.
 #       These counters are independent and not summed automatically.
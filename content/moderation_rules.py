@@ -0,0 +1,305 @@
+"""
+Compiled moderation rule sets.
+
+The active ``ContentModerationRule`` rows that apply to a kind of content
+in a community are compiled once and cached in-process until a rule is
+saved or deleted (a shared version key in the cache invalidates every
+worker). All keyword rules of a set are folded into one Aho–Corasick
+automaton, so matching is a single pass over the text whatever the number
+of keywords, and the analyses read by the ML rules are fetched with one
+query per content item.
+
+Keyword rule ``configuration`` options:
+    keywords      Keywords to look for, case-insensitively
+    whole_words   Only match whole words, so "ass" does not match "class"
+                  (default False)
+    fold_accents  Ignore accents and Unicode compatibility forms, so "cafe"
+                  matches "Café" (default False)
+"""
+
+import logging
+import unicodedata
+import uuid
+from collections import deque
+from typing import Iterator, List, Tuple
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import Q
+
+from .models import ContentAnalysis, ContentModerationRule
+
+logger = logging.getLogger(__name__)
+
+# Rule type -> analysis_type its scores are stored under
+ANALYSIS_RULE_TYPES = {
+    'ml_toxicity': 'toxicity',
+    'ml_spam': 'toxicity',
+    'sentiment': 'sentiment',
+}
+
+# Content kind -> rule flag selecting the rules that apply to it
+KIND_FILTERS = {
+    'post': 'applies_to_posts',
+    'comment': 'applies_to_comments',
+}
+
+
+def normalize_text(text: str, fold_accents: bool = False) -> str:
+    """Lowercase ``text``; optionally strip accents and compatibility forms."""
+    if not fold_accents:
+        return text.lower()
+    decomposed = unicodedata.normalize('NFKD', text.casefold())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class KeywordAutomaton:
+    """Aho–Corasick automaton reporting every occurrence of its keywords."""
+
+    def __init__(self, keywords: List[str]):
+        self.keywords = keywords
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+
+        for index, keyword in enumerate(keywords):
+            state = 0
+            for char in keyword:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                state = next_state
+            self.output[state].append(index)
+
+        # Failure links, breadth first so shorter suffixes are linked first
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = (
+                    self.output[next_state] +
+                    self.output[self.fail[next_state]]
+                )
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield ``(start, keyword_index)`` for every occurrence in ``text``."""
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(char, 0)
+            for index in self.output[state]:
+                yield position - len(self.keywords[index]) + 1, index
+
+
+class CompiledRuleSet:
+    """Moderation rules compiled for fast evaluation against content."""
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.analysis_types = {
+            ANALYSIS_RULE_TYPES[rule.rule_type] for rule in self.rules
+            if rule.rule_type in ANALYSIS_RULE_TYPES
+        }
+
+        # fold_accents -> (automaton, [(rule index, keyword position,
+        # whole_words), ...] per automaton keyword)
+        entries = {False: {}, True: {}}
+        for rule_index, rule in enumerate(self.rules):
+            if rule.rule_type != 'keyword':
+                continue
+            configuration = rule.configuration or {}
+            fold_accents = bool(configuration.get('fold_accents', False))
+            whole_words = bool(configuration.get('whole_words', False))
+            for position, keyword in enumerate(
+                configuration.get('keywords', [])
+            ):
+                normalized = normalize_text(str(keyword), fold_accents)
+                if normalized:
+                    entries[fold_accents].setdefault(normalized, []).append(
+                        (rule_index, position, whole_words)
+                    )
+
+        self.matchers = {
+            fold_accents: (
+                KeywordAutomaton(list(keyword_entries)),
+                list(keyword_entries.values())
+            )
+            for fold_accents, keyword_entries in entries.items()
+            if keyword_entries
+        }
+
+    def keyword_hits(self, text: str) -> dict:
+        """Rule index -> position of its first configured keyword found."""
+        hits = {}
+        for fold_accents, (automaton, entries) in self.matchers.items():
+            normalized = normalize_text(text, fold_accents)
+            for start, index in automaton.iter_matches(normalized):
+                end = start + len(automaton.keywords[index])
+                on_boundary = (
+                    (start == 0 or not _is_word_char(normalized[start - 1])) and
+                    (end == len(normalized) or not _is_word_char(normalized[end]))
+                )
+                for rule_index, position, whole_words in entries[index]:
+                    if whole_words and not on_boundary:
+                        continue
+                    if position < hits.get(rule_index, position + 1):
+                        hits[rule_index] = position
+        return hits
+
+    def evaluate(self, content_object, exclude_rule_ids=()) -> list:
+        """
+        Evaluate every rule against ``content_object``.
+
+        Returns:
+            ``(rule, confidence_score, reason)`` for each triggered rule, in
+            rule order
+        """
+        content_text = getattr(content_object, 'content', '')
+        if not content_text:
+            return []
+
+        keyword_hits = self.keyword_hits(content_text) if self.matchers else {}
+        analyses = (
+            self._analyses_for(content_object) if self.analysis_types else {}
+        )
+
+        triggered = []
+        for rule_index, rule in enumerate(self.rules):
+            if rule.pk in exclude_rule_ids:
+                continue
+            if rule.rule_type == 'keyword':
+                if rule_index in keyword_hits:
+                    keyword = rule.configuration['keywords'][
+                        keyword_hits[rule_index]
+                    ]
+                    triggered.append(
+                        (rule, 1.0, f"Contains banned keyword: {keyword}")
+                    )
+            else:
+                result = self._evaluate_analysis_rule(rule, analyses)
+                if result:
+                    triggered.append((rule, *result))
+        return triggered
+
+    def _analyses_for(self, content_object):
+        return {
+            analysis.analysis_type: analysis
+            for analysis in ContentAnalysis.objects.filter(
+                content_type=ContentType.objects.get_for_model(content_object),
+                object_id=content_object.id,
+                analysis_type__in=self.analysis_types
+            )
+        }
+
+    def _evaluate_analysis_rule(self, rule, analyses):
+        configuration = rule.configuration or {}
+        analysis = analyses.get(ANALYSIS_RULE_TYPES.get(rule.rule_type))
+        if analysis is None:
+            return None
+
+        if rule.rule_type == 'ml_toxicity':
+            threshold = configuration.get('toxicity_threshold', 0.7)
+            score = analysis.toxicity_score
+            if score and score >= threshold:
+                return score, f"High toxicity score: {score:.2f}"
+
+        elif rule.rule_type == 'ml_spam':
+            threshold = configuration.get('spam_threshold', 0.8)
+            score = analysis.spam_score
+            if score and score >= threshold:
+                return score, f"High spam score: {score:.2f}"
+
+        elif rule.rule_type == 'sentiment':
+            blocked_sentiments = configuration.get('blocked_sentiments', [])
+            if analysis.sentiment in blocked_sentiments:
+                return (
+                    analysis.sentiment_confidence or 0.8,
+                    f"Blocked sentiment: {analysis.sentiment}"
+                )
+
+        return None
+
+
+class CompiledRuleCache:
+    """Per-process cache of compiled rule sets by content kind and community."""
+
+    VERSION_KEY = 'content:moderation_rules:version'
+
+    def __init__(self):
+        self._compiled = {}
+        self._version = None
+
+    def for_content(self, content_object) -> CompiledRuleSet:
+        """Rule set applying to ``content_object``'s kind and community."""
+        community_id = getattr(content_object, 'community_id', None)
+        if community_id is None and getattr(content_object, 'post_id', None):
+            # Comments belong to their post's community
+            community_id = content_object.post.community_id
+        return self.get(
+            content_object.__class__.__name__.lower(), community_id
+        )
+
+    def get(self, kind: str, community_id=None) -> CompiledRuleSet:
+        """Compiled active rules for ``kind`` in ``community_id``."""
+        version = self._current_version()
+        if version != self._version:
+            self._compiled = {}
+            self._version = version
+
+        key = (kind, community_id)
+        rule_set = self._compiled.get(key)
+        if rule_set is None:
+            rule_set = CompiledRuleSet(self._load_rules(kind, community_id))
+            # Without a shared version, changes elsewhere go unnoticed
+            if version is not None:
+                self._compiled[key] = rule_set
+        return rule_set
+
+    def invalidate(self) -> None:
+        """Drop compiled rule sets in every process."""
+        self._compiled = {}
+        try:
+            cache.set(self.VERSION_KEY, uuid.uuid4().hex, None)
+        except Exception as e:
+            logger.warning(f"Could not invalidate compiled moderation rules: {e}")
+
+    def _current_version(self):
+        try:
+            version = cache.get(self.VERSION_KEY)
+            if version is None:
+                cache.add(self.VERSION_KEY, uuid.uuid4().hex, None)
+                version = cache.get(self.VERSION_KEY)
+            return version
+        except Exception as e:
+            logger.debug(f"Moderation rule version unavailable: {e}")
+            return None
+
+    def _load_rules(self, kind, community_id):
+        rules = ContentModerationRule.objects.filter(is_active=True)
+        if kind in KIND_FILTERS:
+            rules = rules.filter(**{KIND_FILTERS[kind]: True})
+        if community_id:
+            rules = rules.filter(
+                Q(community_id=community_id) | Q(community=None)
+            )
+        else:
+            rules = rules.filter(community=None)
+        return list(rules)
+
+
+# Global instance
+compiled_rules = CompiledRuleCache()
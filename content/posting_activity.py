@@ -0,0 +1,159 @@
+"""
+Per-user posting activity kept incrementally in Redis for bot detection.
+
+Every new post or comment is recorded once committed, with one Lua script
+that updates, atomically:
+
+* a sorted set of the user's recent activity timestamps, so the number of
+  posts/comments in the rapid-posting window is one ``ZCOUNT``;
+* running inter-arrival statistics (count, mean and variance of the gaps
+  between activities, via Welford's algorithm, plus rapid gaps), so the
+  regularity check is one ``HGETALL`` instead of loading 30 days of posts;
+* a sorted set of active users, so the scheduled full analysis
+  (``content.tasks.process_bot_detection_analysis``) only visits users who
+  posted since its last run.
+"""
+
+import logging
+import math
+import time
+from datetime import timedelta
+from typing import List, Optional
+
+import redis
+from django.conf import settings
+
+from core.watermarks import ActivityWatermark
+
+logger = logging.getLogger(__name__)
+
+# KEYS: events, stats, active users
+# ARGV: timestamp, member, user id, window, stats ttl, rapid gap
+RECORD_SCRIPT = """
+local now = tonumber(ARGV[1])
+local last = tonumber(redis.call('HGET', KEYS[2], 'last_at'))
+if last == nil or now >= last then
+    redis.call('HSET', KEYS[2], 'last_at', ARGV[1])
+end
+if last ~= nil and now >= last then
+    local gap = now - last
+    local n = tonumber(redis.call('HGET', KEYS[2], 'n') or '0') + 1
+    local mean = tonumber(redis.call('HGET', KEYS[2], 'mean') or '0')
+    local m2 = tonumber(redis.call('HGET', KEYS[2], 'm2') or '0')
+    local delta = gap - mean
+    mean = mean + delta / n
+    m2 = m2 + delta * (gap - mean)
+    redis.call('HSET', KEYS[2], 'n', n, 'mean', mean, 'm2', m2)
+    if gap < tonumber(ARGV[6]) then
+        redis.call('HINCRBY', KEYS[2], 'rapid', 1)
+    end
+end
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+
+local window = tonumber(ARGV[4])
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+redis.call('EXPIRE', KEYS[1], window)
+redis.call('ZADD', KEYS[3], ARGV[1], ARGV[3])
+return redis.call('ZCOUNT', KEYS[1], now - window, now)
+"""
+
+
+class PostingActivityTracker:
+    """Sliding-window counts and gap statistics of users' posts/comments."""
+
+    EVENTS_KEY = 'bot:activity:{}:events'
+    STATS_KEY = 'bot:activity:{}:stats'
+    ACTIVE_KEY = 'bot:activity:active'
+
+    # Rapid-posting window, and gaps counted as rapid incidents
+    WINDOW = timedelta(minutes=5)
+    RAPID_GAP = timedelta(seconds=10)
+    # Statistics of users idle this long are dropped
+    STATS_RETENTION = timedelta(days=30)
+
+    def __init__(self):
+        self.redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1,
+            decode_responses=True
+        )
+        self.record_script = self.redis_client.register_script(RECORD_SCRIPT)
+
+    def record(self, user_id, member: str, at=None) -> Optional[int]:
+        """
+        Record one post/comment (``member`` identifies it) at ``at``.
+
+        Returns:
+            Activities of the user in the window ending at ``at``, or None
+            if Redis is unavailable
+        """
+        timestamp = at.timestamp() if at else time.time()
+        try:
+            return int(self.record_script(
+                keys=[
+                    self.EVENTS_KEY.format(user_id),
+                    self.STATS_KEY.format(user_id),
+                    self.ACTIVE_KEY,
+                ],
+                args=[
+                    timestamp, member, str(user_id),
+                    int(self.WINDOW.total_seconds()),
+                    int(self.STATS_RETENTION.total_seconds()),
+                    self.RAPID_GAP.total_seconds(),
+                ]
+            ))
+        except redis.RedisError as e:
+            logger.warning(f"Could not record posting activity: {e}")
+            return None
+
+    def recent_count(self, user_id, at=None) -> int:
+        """Activities of the user in the window ending at ``at`` (or now)."""
+        timestamp = at.timestamp() if at else time.time()
+        return self.redis_client.zcount(
+            self.EVENTS_KEY.format(user_id),
+            timestamp - self.WINDOW.total_seconds(), timestamp
+        )
+
+    def interval_stats(self, user_id) -> dict:
+        """
+        Running statistics of the gaps between the user's activities.
+
+        Returns:
+            ``{'interval_count', 'avg_interval', 'std_deviation',
+            'rapid_incidents'}``; ``std_deviation`` is the sample standard
+            deviation, as ``statistics.stdev`` would give
+        """
+        stats = self.redis_client.hgetall(self.STATS_KEY.format(user_id))
+        count = int(stats.get('n', 0))
+        m2 = float(stats.get('m2', 0.0))
+        return {
+            'interval_count': count,
+            'avg_interval': float(stats['mean']) if count else None,
+            'std_deviation': (
+                math.sqrt(max(m2, 0.0) / (count - 1)) if count > 1 else 0.0
+            ),
+            'rapid_incidents': int(stats.get('rapid', 0)),
+        }
+
+    def active_user_ids(self, since=None) -> List[str]:
+        """Users with activity since ``since`` (within retention if None)."""
+        cutoff = since.timestamp() if since else (
+            time.time() - self.STATS_RETENTION.total_seconds()
+        )
+        return self.redis_client.zrangebyscore(self.ACTIVE_KEY, cutoff, '+inf')
+
+    def prune_active_users(self) -> int:
+        """Drop users idle for longer than the statistics are kept."""
+        return self.redis_client.zremrangebyscore(
+            self.ACTIVE_KEY, '-inf',
+            time.time() - self.STATS_RETENTION.total_seconds()
+        )
+
+
+# Global instance
+posting_activity = PostingActivityTracker()
+
+# Start of the last successful process_bot_detection_analysis run
+bot_analysis_watermark = ActivityWatermark('content:bot_analysis:watermark')
@@ -1,11 +1,180 @@
 """
 Real-time counter management for likes, dislikes, and shares.
-Best practices implementation.
+
+Two modes:
+
+* Direct (default): each change is an atomic ``UPDATE ... F() + delta``.
+* Write-behind (``REACTION_COUNTER_WRITE_BEHIND``): changes are accumulated
+  in Redis hashes with ``HINCRBY`` and ``content.tasks.flush_reaction_counters``
+  applies them to ``Post``/``Comment`` in batches every few seconds, so a
+  viral post's row is written once per flush instead of once per reaction.
+  API reads add the pending delta (``counter_buffer.pending_deltas``).
+
+Flushes are exactly-once: the pending hash is atomically renamed to a
+``flushing`` hash tagged with a batch id, and the batch's updates commit
+together with a ``CounterFlushMarker`` row for that id. A flusher that dies
+after the commit but before deleting the ``flushing`` hash finds the marker
+on its next run and only cleans up; reads likewise skip a ``flushing`` hash
+whose marker exists, since its deltas are already in the database.
 """
+import logging
+import uuid
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable
+
+import redis
+from django.conf import settings
 from django.db import transaction
 from django.db.models import F
-from django.contrib.contenttypes.models import ContentType
-from .models import Post, Comment, Like, Dislike, DirectShare
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import Comment, CounterFlushMarker, Post
+
+logger = logging.getLogger(__name__)
+
+
+class CounterDeltaBuffer:
+    """Redis hashes of not-yet-persisted counter deltas, per model."""
+
+    PENDING_KEY = 'counters:pending:{}'
+    FLUSHING_KEY = 'counters:flushing:{}'
+    BATCH_ID_KEY = 'counters:flushing_id:{}'
+
+    MODELS = {'post': Post, 'comment': Comment}
+    FIELDS = {
+        'post': ('likes_count', 'dislikes_count', 'shares_count'),
+        'comment': ('likes_count', 'dislikes_count'),
+    }
+
+    # Applied batch markers are kept this long for crash recovery
+    MARKER_RETENTION = timedelta(days=1)
+
+    def __init__(self):
+        self.enabled = getattr(settings, 'REACTION_COUNTER_WRITE_BEHIND', False)
+        self.redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5
+        )
+
+    @classmethod
+    def label_for(cls, content_object):
+        for label, model in cls.MODELS.items():
+            if isinstance(content_object, model):
+                return label
+        return None
+
+    def add(self, label: str, pk, field: str, delta: int) -> bool:
+        """Accumulate ``delta``; returns False if Redis is unavailable."""
+        try:
+            self.redis_client.hincrby(
+                self.PENDING_KEY.format(label), f'{pk}:{field}', delta
+            )
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"Counter buffer unavailable, writing directly: {e}")
+            return False
+
+    def pending_deltas(self, label: str, pks: Iterable) -> Dict:
+        """
+        Return ``{pk: {field: delta}}`` for deltas not yet in the database
+        (pending plus any batch being flushed and not yet committed).
+        Never raises.
+        """
+        pks = list(pks)
+        fields = self.FIELDS[label]
+        if not self.enabled or not pks:
+            return {}
+
+        hash_fields = [f'{pk}:{field}' for pk in pks for field in fields]
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            pipe.hmget(self.PENDING_KEY.format(label), hash_fields)
+            pipe.hmget(self.FLUSHING_KEY.format(label), hash_fields)
+            pipe.get(self.BATCH_ID_KEY.format(label))
+            pending, flushing, batch_id = pipe.execute()
+        except redis.RedisError as e:
+            logger.debug(f"Counter buffer unavailable for reads: {e}")
+            return {}
+
+        if batch_id is not None and any(flushing):
+            if isinstance(batch_id, bytes):
+                batch_id = batch_id.decode()
+            # Committed but not yet cleared from Redis: already counted
+            if CounterFlushMarker.objects.filter(batch_id=batch_id).exists():
+                flushing = [None] * len(hash_fields)
+
+        deltas = {}
+        for i, hash_field in enumerate(hash_fields):
+            total = int(pending[i] or 0) + int(flushing[i] or 0)
+            if total:
+                pk = pks[i // len(fields)]
+                deltas.setdefault(pk, {})[fields[i % len(fields)]] = total
+        return deltas
+
+    def flush(self, label: str) -> int:
+        """
+        Apply the accumulated deltas of ``label`` to the database.
+
+        Returns:
+            Number of rows updated
+        """
+        pending_key = self.PENDING_KEY.format(label)
+        flushing_key = self.FLUSHING_KEY.format(label)
+        batch_id_key = self.BATCH_ID_KEY.format(label)
+
+        # Resume a batch left by a crashed flush before starting a new one
+        if not self.redis_client.exists(flushing_key):
+            if not self.redis_client.exists(pending_key):
+                return 0
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.rename(pending_key, flushing_key)
+            pipe.set(batch_id_key, uuid.uuid4().hex)
+            pipe.execute()
+
+        batch_id = self.redis_client.get(batch_id_key)
+        if batch_id is None:
+            batch_id = uuid.uuid4().hex
+            self.redis_client.set(batch_id_key, batch_id)
+        elif isinstance(batch_id, bytes):
+            batch_id = batch_id.decode()
+
+        deltas = defaultdict(dict)
+        for hash_field, value in self.redis_client.hgetall(flushing_key).items():
+            if isinstance(hash_field, bytes):
+                hash_field = hash_field.decode()
+            pk, field = hash_field.rsplit(':', 1)
+            if int(value) and field in self.FIELDS[label]:
+                deltas[pk][field] = int(value)
+
+        updated = self._apply(label, batch_id, deltas)
+        self.redis_client.delete(flushing_key, batch_id_key)
+        return updated
+
+    def _apply(self, label, batch_id, deltas) -> int:
+        model = self.MODELS[label]
+        with transaction.atomic():
+            if CounterFlushMarker.objects.filter(batch_id=batch_id).exists():
+                logger.info(f"Counter batch {batch_id} already applied")
+                return 0
+
+            updated = 0
+            # Lock rows in pk order, as recounts do, to avoid deadlocks
+            for pk, field_deltas in sorted(deltas.items()):
+                updated += model.objects.filter(pk=pk).update(**{
+                    field: Greatest(F(field) + delta, 0)
+                    for field, delta in field_deltas.items()
+                })
+            CounterFlushMarker.objects.create(
+                batch_id=batch_id, model=label, rows_updated=updated
+            )
+
+        CounterFlushMarker.objects.filter(
+            created_at__lt=timezone.now() - self.MARKER_RETENTION
+        ).delete()
+        return updated
 
 
 class RealTimeCounterManager:
@@ -20,156 +189,87 @@ class RealTimeCounterManager:
     """
 
     @staticmethod
-    def increment_like_count(content_object):
+    def adjust_count(content_object, field, delta):
         """
-        Atomically increment like count using F() expressions.
-        This prevents race conditions in high-traffic scenarios.
+        Add ``delta`` to ``field`` of a Post or Comment (never below zero).
+
+        In write-behind mode the delta is buffered in Redis once the current
+        transaction commits; otherwise (or if Redis is unavailable) it is
+        applied with an atomic F() update. The in-memory instance is updated
+        either way for immediate feedback.
         """
-        with transaction.atomic():
-            content_object.__class__.objects.filter(
-                pk=content_object.pk
-            ).update(
-                likes_count=F('likes_count') + 1
+        if not delta:
+            return
+        model = content_object.__class__
+        pk = content_object.pk
+
+        def write_directly():
+            model.objects.filter(pk=pk).update(
+                **{field: Greatest(F(field) + delta, 0)}
+            )
+
+        label = counter_buffer.label_for(content_object)
+        if counter_buffer.enabled and label:
+            transaction.on_commit(
+                lambda: counter_buffer.add(label, pk, field, delta) or
+                write_directly()
             )
-            # Refresh the object to get updated count
-            content_object.refresh_from_db(fields=['likes_count'])
+        else:
+            write_directly()
+        setattr(
+            content_object, field,
+            max(0, (getattr(content_object, field, 0) or 0) + delta)
+        )
+
+    @staticmethod
+    def increment_like_count(content_object):
+        """Increment like count."""
+        RealTimeCounterManager.adjust_count(content_object, 'likes_count', 1)
 
     @staticmethod
     def decrement_like_count(content_object):
-        """Atomically decrement like count."""
-        with transaction.atomic():
-            content_object.__class__.objects.filter(
-                pk=content_object.pk,
-                likes_count__gt=0  # Prevent negative counts
-            ).update(
-                likes_count=F('likes_count') - 1
-            )
-            content_object.refresh_from_db(fields=['likes_count'])
+        """Decrement like count."""
+        RealTimeCounterManager.adjust_count(content_object, 'likes_count', -1)
 
     @staticmethod
     def increment_dislike_count(content_object):
-        """Atomically increment dislike count."""
-        with transaction.atomic():
-            content_object.__class__.objects.filter(
-                pk=content_object.pk
-            ).update(
-                dislikes_count=F('dislikes_count') + 1
-            )
-            content_object.refresh_from_db(fields=['dislikes_count'])
+        """Increment dislike count."""
+        RealTimeCounterManager.adjust_count(content_object, 'dislikes_count', 1)
 
     @staticmethod
     def decrement_dislike_count(content_object):
-        """Atomically decrement dislike count."""
-        with transaction.atomic():
-            content_object.__class__.objects.filter(
-                pk=content_object.pk,
-                dislikes_count__gt=0
-            ).update(
-                dislikes_count=F('dislikes_count') - 1
-            )
-            content_object.refresh_from_db(fields=['dislikes_count'])
+        """Decrement dislike count."""
+        RealTimeCounterManager.adjust_count(content_object, 'dislikes_count', -1)
 
     @staticmethod
     def increment_share_count(post):
-        """Atomically increment share count."""
-        with transaction.atomic():
-            Post.objects.filter(
-                pk=post.pk
-            ).update(
-                shares_count=F('shares_count') + 1
-            )
-            post.refresh_from_db(fields=['shares_count'])
+        """Increment share count."""
+        RealTimeCounterManager.adjust_count(post, 'shares_count', 1)
 
     @staticmethod
-    def handle_like_action(user_profile, content_object):
-        """
-        Handle like/unlike action with real-time counter updates.
-        Returns (like_object, created, action_taken)
-        """
-        content_type = ContentType.objects.get_for_model(content_object)
+    def decrement_share_count(post):
+        """Decrement share count."""
+        RealTimeCounterManager.adjust_count(post, 'shares_count', -1)
 
-        with transaction.atomic():
-            like, created = Like.objects.get_or_create(
-                user=user_profile,
-                content_type=content_type,
-                object_id=content_object.id,
-                defaults={'is_deleted': False}
-            )
 
-            if created:
-                # New like
-                RealTimeCounterManager.increment_like_count(content_object)
-                return like, True, "liked"
-            else:
-                if like.is_deleted:
-                    # Reactivate deleted like
-                    like.is_deleted = False
-                    like.save()
-                    RealTimeCounterManager.increment_like_count(content_object)
-                    return like, False, "liked"
-                else:
-                    # Remove existing like (soft delete)
-                    like.is_deleted = True
-                    like.save()
-                    RealTimeCounterManager.decrement_like_count(content_object)
-                    return like, False, "unliked"
+def apply_pending_counts(data, deltas):
+    """Add a ``{field: delta}`` mapping to serialized counter fields."""
+    for field, delta in (deltas or {}).items():
+        if field in data and data[field] is not None:
+            data[field] = max(0, data[field] + delta)
+    return data
 
-    @staticmethod
-    def handle_dislike_action(user_profile, content_object):
-        """
-        Handle dislike/undislike action with real-time counter updates.
-        Returns (dislike_object, created, action_taken)
-        """
-        content_type = ContentType.objects.get_for_model(content_object)
 
-        with transaction.atomic():
-            dislike, created = Dislike.objects.get_or_create(
-                user=user_profile,
-                content_type=content_type,
-                object_id=content_object.id,
-                defaults={'is_deleted': False}
-            )
+def get_pending_counts(context, label, pk):
+    """
+    Write-behind counter deltas for one object, from the batch preloaded by
+    the list serializer when it covers ``pk``.
+    """
+    preloaded = context.get(f'pending_{label}_counts')
+    if preloaded is not None and pk in preloaded[0]:
+        return preloaded[1].get(pk)
+    return counter_buffer.pending_deltas(label, [pk]).get(pk)
+
 
-            if created:
-                # New dislike
-                RealTimeCounterManager.increment_dislike_count(content_object)
-                return dislike, True, "disliked"
-            else:
-                if dislike.is_deleted:
-                    # Reactivate deleted dislike
-                    dislike.is_deleted = False
-                    dislike.save()
-                    RealTimeCounterManager.increment_dislike_count(content_object)
-                    return dislike, False, "disliked"
-                else:
-                    # Remove existing dislike (soft delete)
-                    dislike.is_deleted = True
-                    dislike.save()
-                    RealTimeCounterManager.decrement_dislike_count(content_object)
-                    return dislike, False, "undisliked"
-
-
-# Signal-based approach (alternative/complementary)
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
-
-@receiver(post_save, sender=Like)
-def update_like_count_on_save(sender, instance, created, **kwargs):
-    """Update like count when Like object is saved."""
-    if created and not instance.is_deleted:
-        # New active like
-        RealTimeCounterManager.increment_like_count(instance.content_object)
-    elif not created:
-        # Existing like updated - check if status changed
-        if instance.is_deleted:
-            RealTimeCounterManager.decrement_like_count(instance.content_object)
-
-
-@receiver(post_save, sender=Dislike)
-def update_dislike_count_on_save(sender, instance, created, **kwargs):
-    """Update dislike count when Dislike object is saved."""
-    if created and not instance.is_deleted:
-        RealTimeCounterManager.increment_dislike_count(instance.content_object)
-    elif not created:
-        if instance.is_deleted:
-            RealTimeCounterManager.decrement_dislike_count(instance.content_object)
+# Global instance
+counter_buffer = CounterDeltaBuffer()
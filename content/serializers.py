@@ -1,3 +1,4 @@
+from django.db import models
 from rest_framework import serializers
 from accounts.models import UserProfile
 from .models import (
@@ -11,6 +12,9 @@ from .models import (
     ContentExperiment, UserContentExperimentAssignment,
     ContentExperimentMetric, ContentExperimentResult
 )
+from .real_time_counters import (
+    apply_pending_counts, counter_buffer, get_pending_counts
+)
 
 # =====================
 # CORE CONTENT SERIALIZERS
@@ -256,6 +260,137 @@ class CommentNestedSerializer(serializers.ModelSerializer):
         return mentions
 
 
+class CommentViewerState:
+    """
+    Requesting user's reactions for a batch of comments.
+
+    Loaded with a single ``IN`` query and shared through
+    ``context['comment_viewer_state']`` so comment previews and thread pages
+    do not query reactions per comment.
+    """
+
+    def __init__(self, comment_ids=()):
+        self.comment_ids = set(comment_ids)
+        self.liked_comment_ids = set()
+        self.disliked_comment_ids = set()
+
+    @classmethod
+    def load(cls, request, comment_ids):
+        """Fetch the viewer's reactions on ``comment_ids``."""
+        state = cls(comment_ids)
+        if not state.comment_ids:
+            return state
+        if not request or not request.user.is_authenticated:
+            return state
+
+        reactions = CommentReaction.objects.filter(
+            user__user=request.user,
+            comment_id__in=state.comment_ids
+        ).values_list('comment_id', 'reaction_type')
+        for comment_id, reaction_type in reactions:
+            if reaction_type in CommentReaction.POSITIVE_REACTIONS:
+                state.liked_comment_ids.add(comment_id)
+            elif reaction_type in CommentReaction.NEGATIVE_REACTIONS:
+                state.disliked_comment_ids.add(comment_id)
+        return state
+
+    def covers_comment(self, comment_id):
+        """Whether this state was loaded for ``comment_id``."""
+        return comment_id in self.comment_ids
+
+
+class CommentThreadListSerializer(serializers.ListSerializer):
+    """List serializer that preloads comment viewer state once per page."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        comments = list(iterable)
+        state = self.context.get('comment_viewer_state')
+        if state is None or not all(
+            state.covers_comment(comment.id) for comment in comments
+        ):
+            self.context['comment_viewer_state'] = CommentViewerState.load(
+                self.context.get('request'),
+                [comment.id for comment in comments]
+            )
+        pending = self.context.get('pending_comment_counts')
+        if pending is None or not all(
+            comment.id in pending[0] for comment in comments
+        ):
+            comment_ids = [comment.id for comment in comments]
+            self.context['pending_comment_counts'] = (
+                set(comment_ids),
+                counter_buffer.pending_deltas('comment', comment_ids)
+            )
+        return super().to_representation(comments)
+
+
+class CommentThreadSerializer(CommentNestedSerializer):
+    """
+    Single-depth comment serializer used for previews and thread pages.
+
+    Replies are not inlined; ``replies_count``/``has_replies`` tell the client
+    whether to load the next depth from the comment thread endpoint.
+    """
+    replies_count = serializers.SerializerMethodField()
+    has_replies = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Comment
+        fields = [
+            'id', 'author', 'author_username', 'author_name', 'parent',
+            'content', 'is_edited', 'likes_count', 'dislikes_count',
+            'replies_count', 'has_replies', 'user_has_liked',
+            'user_has_disliked', 'mentions', 'created_at', 'updated_at'
+        ]
+        list_serializer_class = CommentThreadListSerializer
+
+    def to_representation(self, instance):
+        """Add counter deltas buffered in write-behind mode."""
+        data = super().to_representation(instance)
+        return apply_pending_counts(data, get_pending_counts(
+            self.context, 'comment', instance.id
+        ))
+
+    def _get_viewer_state(self, obj):
+        state = self.context.get('comment_viewer_state')
+        if state is not None and state.covers_comment(obj.id):
+            return state
+        return None
+
+    def get_user_has_liked(self, obj):
+        """Check if user has positive reaction, using batched state."""
+        state = self._get_viewer_state(obj)
+        if state is not None:
+            return obj.id in state.liked_comment_ids
+        return super().get_user_has_liked(obj)
+
+    def get_user_has_disliked(self, obj):
+        """Check if user has negative reaction, using batched state."""
+        state = self._get_viewer_state(obj)
+        if state is not None:
+            return obj.id in state.disliked_comment_ids
+        return super().get_user_has_disliked(obj)
+
+    def get_replies_count(self, obj):
+        """Live reply count, annotated by ``Comment.objects.for_thread()``."""
+        count = getattr(obj, 'thread_replies_count', None)
+        if count is None:
+            count = obj.replies.filter(is_deleted=False).count()
+            obj.thread_replies_count = count
+        return count
+
+    def get_has_replies(self, obj):
+        return self.get_replies_count(obj) > 0
+
+    def get_mentions(self, obj):
+        """Get mention mappings, reusing prefetched mentions when present."""
+        mentions = {}
+        for mention in obj.content_mentions.all():
+            mentions[mention.mentioned_user.user.username] = str(mention.mentioned_user.id)
+        return mentions
+
+
 class PostCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer for creating/updating posts."""
     class Meta:
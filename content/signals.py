@@ -2,103 +2,105 @@
 Django signals for automatic content moderation and real-time notifications.
 """
 
+from django.db import transaction
 from django.db.models.signals import post_save, pre_save, post_delete
 from django.dispatch import receiver
 from django.utils import timezone
 from django.core.exceptions import ValidationError
-from .models import Post, Comment, PostReaction, CommentReaction, PostMedia
-from .utils import (
-    process_content_for_moderation,
-    process_content_for_bot_detection,
-    is_user_blocked_as_bot
+from .models import (
+    Post, Comment, PostReaction, CommentReaction, PostMedia, DirectShare,
+    PostHashtag, ContentModerationRule, BotDetectionProfile
 )
+from .counters import dirty_posts
+from .real_time_counters import RealTimeCounterManager, counter_buffer
+from .utils import is_user_id_blocked_as_bot
 
 
 @receiver(pre_save, sender=Post)
-def check_bot_before_post(sender, instance, **kwargs):
-    """Check for bot behavior before allowing post creation."""
-    if not instance.pk:  # Only for new posts
-        # Check if user is blocked as bot
-        if is_user_blocked_as_bot(instance.author):
-            raise ValidationError("Account has been flagged as automated and cannot post content.")
-
-
 @receiver(pre_save, sender=Comment)
-def check_bot_before_comment(sender, instance, **kwargs):
-    """Check for bot behavior before allowing comment creation."""
-    if not instance.pk:  # Only for new comments
-        # Check if user is blocked as bot
-        if is_user_blocked_as_bot(instance.author):
-            raise ValidationError("Account has been flagged as automated and cannot post content.")
+def check_bot_before_content(sender, instance, **kwargs):
+    """Refuse new posts and comments from users blocked as bots."""
+    # UUID primary keys are set before the first save, so ``pk`` can't tell
+    if instance._state.adding and is_user_id_blocked_as_bot(instance.author_id):
+        raise ValidationError("Account has been flagged as automated and cannot post content.")
 
 
 @receiver(post_save, sender=Post)
 def auto_moderate_post(sender, instance, created, **kwargs):
-    """Automatically moderate new posts."""
+    """Queue new posts for moderation, bot detection and mentions/hashtags."""
     if created and instance.content:
-        # Process the post for moderation in the background
-        # In a production environment, you'd want to use Celery or similar
-        try:
-            # Regular content moderation
-            moderation_result = process_content_for_moderation(instance)
-
-            # Bot detection
-            bot_result = process_content_for_bot_detection(instance)
-
-            # Process mentions and hashtags
-            from .utils import process_post_content
-            content_result = process_post_content(instance)
-
-            # Log the results (you could use proper logging here)
-            analyses_count = len(moderation_result['analyses'])
-            actions_count = len(moderation_result['actions'])
-            print(f"Post {instance.id} moderation: {analyses_count} analyses, "
-                  f"{actions_count} actions, "
-                  f"requires_review: {moderation_result['requires_review']}")
-
-            if content_result:
-                mentions_count = len(content_result.get('mentions', []))
-                hashtags_count = len(content_result.get('hashtags', []))
-                print(f"Post {instance.id} processed: {mentions_count} mentions, "
-                      f"{hashtags_count} hashtags")
-
-            if bot_result['bot_detected']:
-                print(f"Post {instance.id} bot detection: "
-                      f"{bot_result['events']}")
-                if bot_result.get('blocked'):
-                    print(f"User {instance.author.user.username} "
-                          f"blocked as bot")
-
-        except Exception as e:
-            # Log error but don't fail the post creation
-            print(f"Error moderating post {instance.id}: {str(e)}")
+        from .ingest import ingest_pipeline
+        ingest_pipeline.enqueue_on_commit('post', instance.id)
 
 
 @receiver(post_save, sender=Comment)
 def auto_moderate_comment(sender, instance, created, **kwargs):
-    """Automatically moderate new comments."""
+    """Queue new comments for moderation and bot detection."""
     if created and instance.content:
-        # Process the comment for moderation in the background
-        try:
-            # Regular content moderation
-            moderation_result = process_content_for_moderation(instance)
+        from .ingest import ingest_pipeline
+        ingest_pipeline.enqueue_on_commit('comment', instance.id)
 
-            # Bot detection
-            bot_result = process_content_for_bot_detection(instance)
 
-            # Log the results
-            print(f"Comment {instance.id} moderation: {len(moderation_result['analyses'])} analyses, "
-                  f"{len(moderation_result['actions'])} actions, "
-                  f"requires_review: {moderation_result['requires_review']}")
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def record_posting_activity(sender, instance, created, **kwargs):
+    """Feed new posts/comments to the per-user bot detection counters."""
+    if not created or not instance.author_id:
+        return
+    from .posting_activity import posting_activity
 
-            if bot_result['bot_detected']:
-                print(f"Comment {instance.id} bot detection: {bot_result['events']}")
-                if bot_result.get('blocked'):
-                    print(f"User {instance.author.user.username} blocked as bot")
+    user_id = instance.author_id
+    member = f'{sender.__name__.lower()}:{instance.id}'
+    created_at = instance.created_at
+    transaction.on_commit(
+        lambda: posting_activity.record(user_id, member, created_at)
+    )
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def set_duplicate_signature(sender, instance, update_fields=None, **kwargs):
+    """Fingerprint the text for near-duplicate detection on full saves."""
+    if update_fields is None:
+        from .duplicate_index import text_signature
+        instance.duplicate_signature = text_signature(instance.content)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Comment)
+def index_near_duplicates(sender, instance, created, **kwargs):
+    """Add new posts/comments to the near-duplicate index once committed."""
+    if not created or not instance.duplicate_signature:
+        return
+    # Reposts are expected to copy their parent post
+    if getattr(instance, 'parent_post_id', None):
+        return
+    from .duplicate_index import duplicate_index
+
+    args = (
+        sender.__name__.lower(), instance.id, instance.author_id,
+        instance.duplicate_signature, instance.created_at
+    )
+    transaction.on_commit(lambda: duplicate_index.add(*args))
+
+
+@receiver(post_save, sender=BotDetectionProfile)
+@receiver(post_delete, sender=BotDetectionProfile)
+def update_blocked_bots(sender, instance, signal, **kwargs):
+    """Update the cached blocked set once a block or unblock is committed."""
+    from .bot_blocks import blocked_bots
+
+    blocked = signal is post_save and instance.auto_blocked
+    user_id = instance.user_id
+    transaction.on_commit(lambda: blocked_bots.set_blocked(user_id, blocked))
 
-        except Exception as e:
-            # Log error but don't fail the comment creation
-            print(f"Error moderating comment {instance.id}: {str(e)}")
+
+@receiver(post_save, sender=ContentModerationRule)
+@receiver(post_delete, sender=ContentModerationRule)
+def invalidate_compiled_moderation_rules(sender, instance, **kwargs):
+    """Recompile moderation rules once the rule change is committed."""
+    from .moderation_rules import compiled_rules
+    transaction.on_commit(compiled_rules.invalidate)
 
 
 # =============================================================================
@@ -211,11 +213,58 @@ def send_repost_notification(sender, instance, created, **kwargs):
 # =============================================================================
 
 
+def _reaction_counter_field(reaction_model, reaction_type, is_deleted):
+    """Counter a reaction contributes to: likes_count, dislikes_count or None."""
+    if is_deleted:
+        return None
+    if reaction_type in reaction_model.POSITIVE_REACTIONS:
+        return 'likes_count'
+    if reaction_type in reaction_model.NEGATIVE_REACTIONS:
+        return 'dislikes_count'
+    return None
+
+
+def _apply_reaction_delta(target, previous_field, current_field):
+    """Move one unit between counters when a reaction changes sentiment."""
+    if previous_field == current_field:
+        return
+    if previous_field:
+        RealTimeCounterManager.adjust_count(target, previous_field, -1)
+    if current_field:
+        RealTimeCounterManager.adjust_count(target, current_field, 1)
+
+
+@receiver(pre_save, sender=PostReaction)
+@receiver(pre_save, sender=CommentReaction)
+def remember_previous_reaction(sender, instance, **kwargs):
+    """In write-behind mode, note what the reaction counted for before saving."""
+    if not counter_buffer.enabled:
+        return
+    previous = None
+    if not instance._state.adding:
+        previous = sender.objects.filter(pk=instance.pk).values_list(
+            'reaction_type', 'is_deleted'
+        ).first()
+    instance._previous_counter_field = (
+        _reaction_counter_field(sender, *previous) if previous else None
+    )
+
+
 @receiver(post_save, sender=PostReaction)
 def update_post_reaction_counts_on_save(sender, instance, created, **kwargs):
     """Update post likes_count and dislikes_count when reaction is created or updated."""
     post = instance.post
 
+    if counter_buffer.enabled:
+        _apply_reaction_delta(
+            post,
+            getattr(instance, '_previous_counter_field', None),
+            _reaction_counter_field(
+                PostReaction, instance.reaction_type, instance.is_deleted
+            )
+        )
+        return
+
     # Recalculate counts based on reaction sentiment
     positive_count = PostReaction.objects.filter(
         post=post,
@@ -240,6 +289,16 @@ def update_post_reaction_counts_on_delete(sender, instance, **kwargs):
     """Update post likes_count and dislikes_count when reaction is deleted."""
     post = instance.post
 
+    if counter_buffer.enabled:
+        _apply_reaction_delta(
+            post,
+            _reaction_counter_field(
+                PostReaction, instance.reaction_type, instance.is_deleted
+            ),
+            None
+        )
+        return
+
     # Recalculate counts
     positive_count = PostReaction.objects.filter(
         post=post,
@@ -264,6 +323,16 @@ def update_comment_reaction_counts_on_save(sender, instance, created, **kwargs):
     """Update comment likes_count and dislikes_count when reaction is created or updated."""
     comment = instance.comment
 
+    if counter_buffer.enabled:
+        _apply_reaction_delta(
+            comment,
+            getattr(instance, '_previous_counter_field', None),
+            _reaction_counter_field(
+                CommentReaction, instance.reaction_type, instance.is_deleted
+            )
+        )
+        return
+
     # Recalculate counts based on reaction sentiment
     positive_count = CommentReaction.objects.filter(
         comment=comment,
@@ -288,6 +357,16 @@ def update_comment_reaction_counts_on_delete(sender, instance, **kwargs):
     """Update comment likes_count and dislikes_count when reaction is deleted."""
     comment = instance.comment
 
+    if counter_buffer.enabled:
+        _apply_reaction_delta(
+            comment,
+            _reaction_counter_field(
+                CommentReaction, instance.reaction_type, instance.is_deleted
+            ),
+            None
+        )
+        return
+
     # Recalculate counts
     positive_count = CommentReaction.objects.filter(
         comment=comment,
@@ -307,6 +386,41 @@ def update_comment_reaction_counts_on_delete(sender, instance, **kwargs):
     comment.save(update_fields=['likes_count', 'dislikes_count'])
 
 
+# =============================================================================
+# DIRTY POST TRACKING (reconciled by update_content_counters)
+# =============================================================================
+
+
+@receiver(post_save, sender=PostReaction)
+@receiver(post_delete, sender=PostReaction)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(post_save, sender=DirectShare)
+@receiver(post_delete, sender=DirectShare)
+def mark_post_counters_dirty(sender, instance, **kwargs):
+    """Queue the post for counter reconciliation."""
+    dirty_posts.mark_on_commit(instance.post_id)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def mark_reposted_post_dirty(sender, instance, **kwargs):
+    """Queue the original post when a repost is created or removed."""
+    if instance.post_type == 'repost' and instance.parent_post_id:
+        dirty_posts.mark_on_commit(instance.parent_post_id)
+
+
+@receiver(post_save, sender=PostHashtag)
+def record_hashtag_mention(sender, instance, created, **kwargs):
+    """Count a new hashtag use towards trending once it is committed."""
+    if not created:
+        return
+    from .trending import trend_tracker
+
+    name = instance.hashtag.name
+    transaction.on_commit(lambda: trend_tracker.record([name]))
+
+
 @receiver(post_save, sender=PostMedia)
 def auto_generate_video_thumbnail(sender, instance, created, **kwargs):
     """
@@ -0,0 +1,253 @@
+"""
+Incremental MinHash/LSH index for post-to-post content similarity.
+
+Each post is reduced once to a set of features: words and word bigrams of
+its title and text, its hashtags, and its rubrique. Those features are
+summarised by a 128-value MinHash signature, stored with 32 LSH band hashes
+in ``PostSimilaritySignature``. Two posts share a band with high probability
+once their feature Jaccard similarity passes ~0.4, so a new post's
+neighbours are found by one GIN-indexed ``band_hashes && ...`` lookup and
+scored from their signatures. Only new posts are compared, so the nightly
+cost grows with the number of new posts, not with all recent posts.
+"""
+
+import hashlib
+import logging
+import re
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import (
+    ContentSimilarity, Post, PostHashtag, PostSimilaritySignature
+)
+from .utils import extract_hashtags_from_content
+
+logger = logging.getLogger(__name__)
+
+NUM_PERMUTATIONS = 128
+BANDS = 32
+ROWS_PER_BAND = NUM_PERMUTATIONS // BANDS
+
+# Minimum estimated similarity stored in ContentSimilarity
+MIN_SIMILARITY = 0.3
+
+# Posts are compared with posts created within this window
+NEIGHBOUR_WINDOW = timedelta(days=7)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Fixed seed: signatures must stay comparable across processes and runs
+_random = np.random.RandomState(20240607)
+_PERM_A = _random.randint(1, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _random.randint(0, 1 << 31, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+WORD_RE = re.compile(r'\w{3,}', re.UNICODE)
+
+
+def post_features(text: str, hashtags: Iterable[str] = (),
+                  rubrique=None) -> set:
+    """Feature set of a post: words, word bigrams, hashtags, rubrique."""
+    words = WORD_RE.findall((text or '').lower())
+    features = set(words)
+    features.update(f'{a} {b}' for a, b in zip(words, words[1:]))
+    features.update(f'#{tag.lower()}' for tag in hashtags)
+    if rubrique:
+        features.add(f'rubrique:{rubrique}')
+    return features
+
+
+def _feature_hashes(features) -> np.ndarray:
+    return np.array([
+        int.from_bytes(
+            hashlib.blake2b(feature.encode(), digest_size=4).digest(), 'little'
+        )
+        for feature in features
+    ], dtype=np.uint64)
+
+
+def minhash(features) -> np.ndarray:
+    """MinHash signature (``NUM_PERMUTATIONS`` uint32 values)."""
+    if not features:
+        return np.full(NUM_PERMUTATIONS, _MAX_HASH, dtype=np.uint32)
+    hashes = _feature_hashes(features)
+    permuted = (
+        np.outer(hashes, _PERM_A) + _PERM_B
+    ) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+def band_hashes(signature: np.ndarray) -> List[int]:
+    """One signed 64-bit hash per LSH band (band index included)."""
+    bands = []
+    for band in range(BANDS):
+        chunk = signature[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        digest = hashlib.blake2b(
+            bytes([band]) + chunk.tobytes(), digest_size=8
+        ).digest()
+        bands.append(int.from_bytes(digest, 'little', signed=True))
+    return bands
+
+
+def estimate_similarity(signature: np.ndarray, others: np.ndarray) -> np.ndarray:
+    """Estimated Jaccard similarity of ``signature`` to each row of ``others``."""
+    return (others == signature).mean(axis=1)
+
+
+class PostSimilarityIndex:
+    """Builds signatures and finds similar posts through the LSH bands."""
+
+    def signature_for(self, post, hashtags=()) -> PostSimilaritySignature:
+        """Unsaved signature for ``post``."""
+        rubrique = (
+            post.thread.rubrique_template_id
+            if post.thread_id and post.thread.rubrique_template_id
+            else post.rubrique_template_id
+        )
+        # Hashtags in the text count even before PostHashtag rows exist
+        hashtags = set(hashtags) | set(
+            extract_hashtags_from_content(post.content)
+        )
+        features = post_features(
+            f'{post.title or ""} {post.content or ""}', hashtags, rubrique
+        )
+        signature = minhash(features)
+        return PostSimilaritySignature(
+            post=post,
+            minhash=signature.tobytes(),
+            band_hashes=band_hashes(signature),
+            post_created_at=post.created_at,
+        )
+
+    def index_posts(self, posts) -> List[PostSimilaritySignature]:
+        """Compute and store signatures for ``posts``."""
+        hashtags = defaultdict(list)
+        for post_id, name in PostHashtag.objects.filter(
+            post__in=posts, is_deleted=False
+        ).values_list('post_id', 'hashtag__name'):
+            hashtags[post_id].append(name)
+
+        signatures = [
+            self.signature_for(post, hashtags[post.id]) for post in posts
+        ]
+        PostSimilaritySignature.objects.bulk_create(
+            signatures,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['post'],
+            update_fields=['minhash', 'band_hashes', 'post_created_at',
+                           'computed_at'],
+        )
+        return signatures
+
+    def index_post(self, post) -> int:
+        """
+        Index one post and link its neighbours; run by the ingest pipeline
+        (``content.ingest``) for new posts. Returns the number of similarity
+        rows written.
+        """
+        if post.is_deleted:
+            return 0
+        return self._index_and_link(
+            [post], ContentType.objects.get_for_model(Post)
+        )
+
+    def query(self, signature: PostSimilaritySignature,
+              min_similarity=MIN_SIMILARITY) -> List[Tuple]:
+        """
+        Recent posts sharing an LSH band with ``signature``, scored.
+
+        Returns:
+            ``[(post_id, similarity), ...]`` sorted by similarity
+        """
+        values = np.frombuffer(bytes(signature.minhash), dtype=np.uint32)
+        window_start = signature.post_created_at - NEIGHBOUR_WINDOW
+        candidates = list(PostSimilaritySignature.objects.filter(
+            band_hashes__overlap=signature.band_hashes,
+            post_created_at__gte=window_start,
+            post__is_deleted=False,
+            post__is_hidden=False,
+        ).exclude(post_id=signature.post_id).values_list('post_id', 'minhash'))
+        if not candidates:
+            return []
+
+        others = np.vstack([
+            np.frombuffer(bytes(raw), dtype=np.uint32)
+            for _, raw in candidates
+        ])
+        scores = estimate_similarity(values, others)
+        matches = [
+            (candidates[i][0], float(scores[i]))
+            for i in np.flatnonzero(scores >= min_similarity)
+        ]
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+    def update(self, since=None, batch_size=500) -> Dict[str, int]:
+        """
+        Index posts created or edited since their last signature and store
+        their new neighbour pairs in ContentSimilarity.
+
+        Returns:
+            ``{'indexed_posts': ..., 'similar_pairs': ...}`` (pairs counted
+            in both directions)
+        """
+        since = since or timezone.now() - NEIGHBOUR_WINDOW
+        posts = Post.objects.filter(
+            created_at__gte=since, is_deleted=False, is_hidden=False
+        ).filter(
+            Q(similarity_signature__isnull=True) |
+            Q(updated_at__gt=F('similarity_signature__computed_at'))
+        ).select_related('thread').order_by('created_at')
+
+        post_type = ContentType.objects.get_for_model(Post)
+        indexed = pairs = 0
+        batch = []
+        for post in posts.iterator(chunk_size=batch_size):
+            batch.append(post)
+            if len(batch) >= batch_size:
+                pairs += self._index_and_link(batch, post_type)
+                indexed += len(batch)
+                batch = []
+        if batch:
+            pairs += self._index_and_link(batch, post_type)
+            indexed += len(batch)
+
+        return {'indexed_posts': indexed, 'similar_pairs': pairs}
+
+    def _index_and_link(self, posts, post_type) -> int:
+        # Posts of the same batch find each other, so pairs are keyed
+        pairs = {}
+        for signature in self.index_posts(posts):
+            for other_id, score in self.query(signature):
+                pairs[(signature.post_id, other_id)] = score
+                pairs[(other_id, signature.post_id)] = score
+
+        # Re-indexed (edited) posts may have lost neighbours: replace their
+        # pairs instead of adding to them
+        post_ids = [post.id for post in posts]
+        ContentSimilarity.objects.filter(
+            Q(object_id_1__in=post_ids) | Q(object_id_2__in=post_ids),
+            content_type_1=post_type,
+            content_type_2=post_type,
+            similarity_type='content',
+        ).delete()
+        ContentSimilarity.objects.bulk_create([
+            ContentSimilarity(
+                content_type_1=post_type, object_id_1=first,
+                content_type_2=post_type, object_id_2=second,
+                similarity_score=score,
+                similarity_type='content',
+            )
+            for (first, second), score in pairs.items()
+        ], batch_size=1000)
+        return len(pairs)
+
+
+# Global instance
+similarity_index = PostSimilarityIndex()
@@ -18,15 +18,32 @@ from analytics.models import ErrorLog
 
 @shared_task
 def process_bot_detection_analysis():
-    """Analyze user behavior patterns for bot detection"""
+    """
+    Analyze user behavior patterns for bot detection.
+
+    Only users who posted or commented since the last successful run are
+    analyzed (see content.posting_activity); users active in the last 24
+    hours if Redis is unavailable.
+    """
     try:
         from content.utils import update_bot_detection_profile
+        from content.posting_activity import (
+            bot_analysis_watermark, posting_activity
+        )
         from accounts.models import UserProfile
 
-        # Get users who have been active in the last 24 hours
-        recent_users = UserProfile.objects.filter(
-            last_active__gte=timezone.now() - timedelta(hours=24)
-        )
+        started_at = timezone.now()
+        try:
+            recent_users = UserProfile.objects.filter(
+                pk__in=posting_activity.active_user_ids(
+                    bot_analysis_watermark.get()
+                )
+            )
+            posting_activity.prune_active_users()
+        except Exception:
+            recent_users = UserProfile.objects.filter(
+                last_active__gte=started_at - timedelta(hours=24)
+            )
 
         updated_profiles = 0
         for user in recent_users:
@@ -60,6 +77,7 @@ def process_bot_detection_analysis():
                     }
                 )
 
+        bot_analysis_watermark.advance(started_at)
         return f"Analyzed {updated_profiles} user profiles for bot detection"
 
     except Exception as e:
@@ -103,6 +121,31 @@ def cleanup_bot_detection_data():
         return f"Error cleaning up bot detection data: {str(e)}"
 
 
+@shared_task
+def process_content_ingest(batch_size=100, max_batches=50):
+    """
+    Run queued new posts and comments through the post-ingest pipeline:
+    analysis, moderation rules, bot signals, then mentions and hashtags
+    (see content.ingest). Reports the time spent in each stage.
+    """
+    from content.ingest import ingest_pipeline
+
+    try:
+        processed, timings = ingest_pipeline.drain(batch_size, max_batches)
+        stage_times = ', '.join(
+            f'{stage} {seconds:.3f}s' for stage, seconds in timings.items()
+        )
+        return f"Ingested {processed} posts and comments ({stage_times})"
+
+    except Exception as e:
+        ErrorLog.objects.create(
+            level='error',
+            message=f'Error processing content ingest queue: {str(e)}',
+            extra_data={'task': 'process_content_ingest'}
+        )
+        return f"Error processing content ingest queue: {str(e)}"
+
+
 @shared_task
 def process_moderation_queue():
     """Process pending items in moderation queue."""
@@ -233,73 +276,55 @@ def update_moderation_analytics():
 # =============================================================================
 
 @shared_task
-def update_content_counters():
-    """Update reaction, comment, share counts for posts."""
-    try:
-        posts = Post.objects.filter(
-            updated_at__gte=timezone.now() - timedelta(hours=1)
-        )  # Only update recently active posts
+def update_content_counters(batch_size=1000, max_batches=500):
+    """
+    Reconcile reaction, comment, share and repost counts for posts.
 
-        updated_count = 0
-        for post in posts:
+    Only posts marked dirty by the counter signals are recounted, one chunk
+    of ``batch_size`` posts per query. If Redis is unavailable, falls back
+    to posts updated in the last hour.
+    """
+    from content.counters import dirty_posts, recount_post_counters
+
+    updated_count = 0
+    processed = 0
+    try:
+        for _ in range(max_batches):
             try:
-                # Count positive reactions (likes)
-                likes_count = PostReaction.objects.filter(
-                    post=post,
-                    is_deleted=False,
-                    reaction_type__in=PostReaction.POSITIVE_REACTIONS
-                ).count()
-
-                # Count negative reactions (dislikes)
-                dislikes_count = PostReaction.objects.filter(
-                    post=post,
-                    is_deleted=False,
-                    reaction_type__in=PostReaction.NEGATIVE_REACTIONS
-                ).count()
-
-                comments_count = Comment.objects.filter(
-                    post=post, is_deleted=False
-                ).count()
-                # Independent counters
-                direct_shares_count = DirectShare.objects.filter(
-                    post=post
-                ).count()
-                reposts_count = Post.objects.filter(
-                    parent_post=post,
-                    post_type='repost'
-                ).count()
-
-                if (post.likes_count != likes_count or
-                        post.dislikes_count != dislikes_count or
-                        post.comments_count != comments_count or
-                        post.shares_count != direct_shares_count or
-                        getattr(post, 'repost_count', 0) != reposts_count):
-
-                    post.likes_count = likes_count
-                    post.dislikes_count = dislikes_count
-                    post.comments_count = comments_count
-                    post.shares_count = direct_shares_count
-                    if hasattr(post, 'repost_count'):
-                        post.repost_count = reposts_count
-                    post.save(update_fields=[
-                        'likes_count', 'dislikes_count', 'comments_count', 'shares_count', 'repost_count'
-                    ])
-                    updated_count += 1
+                post_ids = dirty_posts.pop_batch(batch_size)
+            except Exception:
+                recent_ids = list(Post.objects.filter(
+                    updated_at__gte=timezone.now() - timedelta(hours=1)
+                ).values_list('id', flat=True))
+                for start in range(0, len(recent_ids), batch_size):
+                    updated_count += recount_post_counters(
+                        recent_ids[start:start + batch_size]
+                    )
+                processed += len(recent_ids)
+                break
 
+            if not post_ids:
+                break
+            try:
+                updated_count += recount_post_counters(post_ids)
+                processed += len(post_ids)
             except Exception as e:
+                # Put the chunk back so the next run retries it
+                dirty_posts.mark(*post_ids)
                 ErrorLog.objects.create(
                     level='error',
                     message=(
-                        f'Error updating counters for post {post.id}: '
+                        f'Error updating counters for {len(post_ids)} posts: '
                         f'{str(e)}'
                     ),
                     extra_data={
-                        'post_id': str(post.id),
+                        'post_ids': post_ids[:100],
                         'task': 'update_content_counters'
                     }
                 )
+                break
 
-        return f"Updated counters for {updated_count} posts"
+        return f"Updated counters for {updated_count} of {processed} posts"
 
     except Exception as e:
         ErrorLog.objects.create(
@@ -310,42 +335,53 @@ def update_content_counters():
         return f"Error updating content counters: {str(e)}"
 
 
+@shared_task
+def flush_reaction_counters():
+    """
+    Apply write-behind like/dislike/share deltas buffered in Redis to Post
+    and Comment (see content.real_time_counters).
+
+    Returns:
+        int: Number of rows updated
+    """
+    from django.core.cache import cache
+    from content.real_time_counters import counter_buffer
+
+    # Overlapping runs would race on the flushing hash
+    if not cache.add('lock:flush_reaction_counters', 1, 60):
+        return 0
+    try:
+        updated = 0
+        for label in counter_buffer.MODELS:
+            try:
+                updated += counter_buffer.flush(label)
+            except Exception as e:
+                ErrorLog.objects.create(
+                    level='error',
+                    message=f'Error flushing {label} counters: {str(e)}',
+                    extra_data={'task': 'flush_reaction_counters'}
+                )
+        return updated
+    finally:
+        cache.delete('lock:flush_reaction_counters')
+
+
 @shared_task
 def update_trending_hashtags():
-    """Update trending hashtags based on recent activity."""
+    """
+    Fold recent hashtag mentions into time-decayed trending scores and
+    update the Hashtag rows whose trending status or score changed
+    (see content.trending).
+    """
     try:
-        # Calculate trending hashtags for the last 24 hours
-        end_time = timezone.now()
-        start_time = end_time - timedelta(hours=24)
-
-        # Get hashtags with activity in the last 24 hours
-        from content.models import PostHashtag
-        trending_hashtags = PostHashtag.objects.filter(
-            created_at__gte=start_time,
-            created_at__lt=end_time
-        ).annotate(
-            recent_mentions=Count('id')
-        ).filter(recent_mentions__gt=0)
-
-        # Update hashtag trending score for each hashtag
-        for hashtag in trending_hashtags:
-            # Simple engagement calculation
-            engagement_score = hashtag.recent_mentions
-
-            # Update hashtag trending score (if field exists)
-            if hasattr(hashtag, 'trending_score'):
-                hashtag.trending_score = engagement_score
-                hashtag.save(update_fields=['trending_score'])
-
-        # Mark top hashtags as trending
-        Hashtag.objects.update(is_trending=False)
-        top_trending = trending_hashtags.order_by('-recent_mentions')[:20]
-        top_trending_ids = [h.id for h in top_trending]
-        Hashtag.objects.filter(
-            id__in=top_trending_ids
-        ).update(is_trending=True)
-
-        return f"Updated {trending_hashtags.count()} trending hashtags"
+        from content.trending import trend_tracker
+
+        folded = trend_tracker.fold()
+        updated = trend_tracker.sync_hashtags()
+        return (
+            f"Folded {folded} mention buckets, "
+            f"updated {updated} trending hashtags"
+        )
 
     except Exception as e:
         ErrorLog.objects.create(
@@ -517,33 +553,21 @@ def generate_content_recommendations():
 
 @shared_task
 def update_content_similarity_scores():
-    """Update similarity scores between posts for better recommendations"""
+    """
+    Update similarity scores between posts for better recommendations.
+
+    Only posts without an up-to-date MinHash signature are indexed and
+    matched against the LSH index (see content.similarity_index).
+    """
     try:
-        from content.utils import calculate_content_similarity
+        from content.similarity_index import similarity_index
 
-        # Get recent posts (last 7 days) to update similarity scores
-        recent_posts = Post.objects.filter(
-            created_at__gte=timezone.now() - timedelta(days=7),
-            is_deleted=False,
-            is_hidden=False
+        result = similarity_index.update()
+        return (
+            f"Indexed {result['indexed_posts']} posts, "
+            f"{result['similar_pairs']} similar post pairs"
         )
 
-        updated_pairs = 0
-        for post in recent_posts:
-            try:
-                # Calculate similarity with other posts
-                similar_posts = calculate_content_similarity(post)
-                updated_pairs += len(similar_posts)
-
-            except Exception as e:
-                ErrorLog.objects.create(
-                    level='warning',
-                    message=f'Error calculating similarity for post {post.id}: {str(e)}',
-                    extra_data={'post_id': post.id}
-                )
-
-        return f"Updated similarity scores for {updated_pairs} post pairs"
-
     except Exception as e:
         ErrorLog.objects.create(
             level='error',
@@ -650,32 +674,20 @@ def update_user_content_preferences():
 
 @shared_task
 def generate_collaborative_filtering_recommendations():
-    """Generate recommendations using collaborative filtering"""
+    """
+    Generate recommendations using collaborative filtering for every user
+    active in the last 30 days, in one batch over the sparse reaction
+    matrix (see content.collaborative).
+    """
     try:
-        from content.utils import generate_collaborative_recommendations, get_user_interaction_frequency
+        from content.collaborative import CollaborativeFilteringEngine
         # Users active in last 30 days
-        recent_users = UserProfile.objects.filter(
+        recent_user_ids = list(UserProfile.objects.filter(
             last_active__gte=timezone.now() - timedelta(days=30)
+        ).values_list('id', flat=True))
+        recommendations_generated = CollaborativeFilteringEngine().run(
+            recent_user_ids
         )
-        eligible_users = []
-        for user in recent_users:
-            freq = get_user_interaction_frequency(user, days=30)
-            if freq.get('total', 0) >= 10:  # At least 10 interactions
-                eligible_users.append(user)
-        recommendations_generated = 0
-        for user in eligible_users:
-            try:
-                collab_recs = generate_collaborative_recommendations(user)
-                recommendations_generated += len(collab_recs)
-            except Exception as e:
-                ErrorLog.objects.create(
-                    level='warning',
-                    message=(
-                        f'Error generating collaborative recs for user '
-                        f'{user.id}: {str(e)}'
-                    ),
-                    extra_data={'user_id': str(user.id)}
-                )
         return (
             f"Generated {recommendations_generated} collaborative "
             f"filtering recommendations"
@@ -1,7 +1,6 @@
 # Content app tests
 
 # Import all test classes for discovery
-from .test_api import *
-from .test_models import *
-from .test_tasks import *
-from .test_comprehensive import *
+from .test_unified_feed import *
+from .test_viewer_state import *
+from .test_comment_thread import *
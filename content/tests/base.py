@@ -0,0 +1,28 @@
+"""Base test classes for content app tests with JWT authentication."""
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from accounts.models import UserProfile
+from core.jwt_test_mixin import JWTAuthTestMixin
+
+
+class ContentAPITestCase(JWTAuthTestMixin, APITestCase):
+    """Base test case for content API tests with JWT authentication."""
+
+    def make_profile(self, username):
+        """Create a verified user and return ``(user, profile)``."""
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='TestPass123!'
+        )
+        # Ensure profile exists (a post_save signal may auto-create it)
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        UserProfile.objects.filter(user=user).update(
+            is_verified=True,
+            last_verified_at=timezone.now()
+        )
+        profile.refresh_from_db()
+        return user, profile
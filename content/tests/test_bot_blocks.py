@@ -0,0 +1,91 @@
+"""Tests for the cached set of users blocked as bots."""
+
+import time
+from unittest import mock
+
+import redis
+from django.core.exceptions import ValidationError
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from content.bot_blocks import BlockedBotCache
+from content.models import BotDetectionProfile, Post
+from content.tests.base import ContentAPITestCase
+from content.utils import is_user_blocked_as_bot
+from middleware import EventDetectionMiddleware
+
+PREFIX = 'test:bot:blocked'
+
+
+class BlockedBotCacheTestCase(ContentAPITestCase):
+    def setUp(self):
+        self.cache = BlockedBotCache(PREFIX)
+        try:
+            self.cache.redis_client.ping()
+        except redis.RedisError:
+            self.skipTest('Redis is not available')
+        _, self.profile = self.make_profile('blockedbot')
+
+    def tearDown(self):
+        keys = list(self.cache.redis_client.scan_iter(f'{PREFIX}:*'))
+        if keys:
+            self.cache.redis_client.delete(*keys)
+
+    def test_block_reaches_other_workers_within_a_second(self):
+        first, second = self.cache, BlockedBotCache(PREFIX)
+        self.assertFalse(second.is_blocked(self.profile.id))
+
+        first.set_blocked(self.profile.id, True)
+        self.assertTrue(first.is_blocked(self.profile.id))
+
+        deadline = time.monotonic() + 1
+        with self.assertNumQueries(0):
+            while not second.is_blocked(self.profile.id):
+                self.assertLess(time.monotonic(), deadline)
+                time.sleep(0.05)
+
+        first.set_blocked(self.profile.id, False)
+        time.sleep(second.LOCAL_TTL)
+        self.assertFalse(second.is_blocked(self.profile.id))
+
+    def test_block_committed_during_a_rebuild_is_kept(self):
+        def stale_read():
+            # The block commits after the rebuild has read the database
+            self.cache.set_blocked(self.profile.id, True)
+            return []
+
+        with mock.patch.object(
+            self.cache, '_blocked_profile_ids', side_effect=stale_read
+        ):
+            self.cache.rebuild()
+
+        self.assertTrue(self.cache.is_blocked(self.profile.id))
+
+    def test_blocked_users_cannot_post(self):
+        with mock.patch('content.bot_blocks.blocked_bots', self.cache):
+            self.assertFalse(is_user_blocked_as_bot(self.profile))
+            with self.captureOnCommitCallbacks(execute=True):
+                BotDetectionProfile.objects.create(
+                    user=self.profile, auto_blocked=True
+                )
+
+            with self.assertNumQueries(0):
+                self.assertTrue(is_user_blocked_as_bot(self.profile))
+            with self.assertRaises(ValidationError):
+                Post.objects.create(author=self.profile, content='Buy now')
+
+    def test_blocked_users_are_rejected_by_the_middleware(self):
+        get_response = mock.Mock(return_value=HttpResponse())
+        middleware = EventDetectionMiddleware(get_response)
+        request = RequestFactory().get('/api/content/posts/')
+        request.user = self.profile.user
+
+        with mock.patch('content.bot_blocks.blocked_bots', self.cache):
+            with self.captureOnCommitCallbacks(execute=True):
+                BotDetectionProfile.objects.create(
+                    user=self.profile, auto_blocked=True
+                )
+            response = middleware(request)
+
+        self.assertEqual(response.status_code, 403)
+        get_response.assert_not_called()
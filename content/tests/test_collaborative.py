@@ -0,0 +1,73 @@
+"""Tests for the batch collaborative filtering engine."""
+
+from django.contrib.contenttypes.models import ContentType
+
+from content.collaborative import CollaborativeFilteringEngine
+from content.models import ContentRecommendation, Post, PostReaction
+from content.tests.base import ContentAPITestCase
+
+
+class CollaborativeFilteringEngineTestCase(ContentAPITestCase):
+    def setUp(self):
+        self.author = self.make_profile('cfauthor')[1]
+        self.viewer = self.make_profile('cfviewer')[1]
+        self.peers = [self.make_profile(f'cfpeer{i}')[1] for i in range(2)]
+        self.posts = [
+            Post.objects.create(author=self.author, content=f'Post {i}')
+            for i in range(5)
+        ]
+
+        for post in self.posts[:3]:
+            for profile in [self.viewer] + self.peers:
+                self._react(profile, post, 'like')
+        # Both peers also liked post 3; only one liked post 4
+        for profile in self.peers:
+            self._react(profile, self.posts[3], 'love')
+        self._react(self.peers[0], self.posts[4], 'like')
+
+    def _react(self, profile, post, reaction_type):
+        PostReaction.objects.create(
+            post=post, user=profile, reaction_type=reaction_type
+        )
+
+    def test_neighbours_and_candidates(self):
+        engine = CollaborativeFilteringEngine().load()
+
+        results = dict(engine.recommend([self.viewer.id]))
+
+        recommended = [post_id for post_id, *_ in results[self.viewer.id]]
+        self.assertEqual(recommended, [self.posts[3].id])
+
+    def test_disliked_posts_are_excluded(self):
+        self._react(self.viewer, self.posts[3], 'angry')
+        engine = CollaborativeFilteringEngine().load()
+
+        self.assertEqual(dict(engine.recommend([self.viewer.id])), {
+            self.viewer.id: []
+        })
+
+    def test_run_replaces_stored_recommendations(self):
+        engine = CollaborativeFilteringEngine()
+        self.assertEqual(engine.run([self.viewer.id]), 1)
+        self.assertEqual(engine.run([self.viewer.id]), 1)
+
+        stored = ContentRecommendation.objects.get(
+            user=self.viewer, recommendation_type='collaborative'
+        )
+        self.assertEqual(stored.object_id, self.posts[3].id)
+        self.assertEqual(stored.rank, 1)
+        self.assertEqual(stored.metadata['similar_users'], 2)
+
+    def test_posts_recommended_by_another_algorithm_are_not_counted(self):
+        ContentRecommendation.objects.create(
+            user=self.viewer,
+            content_type=ContentType.objects.get_for_model(Post),
+            object_id=self.posts[3].id,
+            score=0.5,
+            recommendation_type='trending',
+        )
+
+        self.assertEqual(CollaborativeFilteringEngine().run([self.viewer.id]), 0)
+        self.assertFalse(ContentRecommendation.objects.filter(
+            user=self.viewer, recommendation_type='collaborative'
+        ).exists())
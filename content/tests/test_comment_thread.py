@@ -0,0 +1,101 @@
+"""Tests for comment previews in listings and the lazy comment thread."""
+
+from datetime import timedelta
+
+from django.test import override_settings
+from django.utils import timezone
+from rest_framework import status
+
+from content.models import Comment, Post
+from content.tests.base import ContentAPITestCase
+
+
+@override_settings(SOCIAL_NETWORK_SETTINGS={
+    'COMMENT_PREVIEW_COUNT': 2,
+    'COMMENT_PREVIEW_MAX': 5,
+    'COMMENT_THREAD_PAGE_SIZE': 3,
+    'COMMENT_THREAD_MAX_PAGE_SIZE': 10,
+})
+class CommentThreadTestCase(ContentAPITestCase):
+    """Listings embed a bounded preview; threads load depth by depth."""
+
+    def setUp(self):
+        self.user1, self.profile1 = self.make_profile('threaduser1')
+        self.post = Post.objects.create(author=self.profile1, content='Hello')
+
+        base = timezone.now() - timedelta(hours=1)
+        self.top_level = []
+        for i in range(5):
+            comment = Comment.objects.create(
+                post=self.post, author=self.profile1, content=f'top {i}'
+            )
+            Comment.objects.filter(pk=comment.pk).update(
+                created_at=base + timedelta(minutes=i)
+            )
+            self.top_level.append(comment)
+
+        self.replies = []
+        for i in range(4):
+            reply = Comment.objects.create(
+                post=self.post, author=self.profile1,
+                parent=self.top_level[0], content=f'reply {i}'
+            )
+            Comment.objects.filter(pk=reply.pk).update(
+                created_at=base + timedelta(minutes=10 + i)
+            )
+            self.replies.append(reply)
+
+        self.url = f'/api/content/posts/{self.post.id}/comments/'
+
+    def _walk(self, params):
+        ids = []
+        response = self.client.get(self.url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(c['id'] for c in response.data['results'])
+            if not response.data['next_cursor']:
+                return ids, response
+            response = self.client.get(
+                self.url, {**params, 'cursor': response.data['next_cursor']}
+            )
+
+    def test_listing_embeds_preview_only(self):
+        response = self.client.get('/api/content/posts/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        post_data = response.data['results'][0]
+
+        self.assertEqual(
+            [c['id'] for c in post_data['comments']],
+            [str(self.top_level[4].id), str(self.top_level[3].id)]
+        )
+        self.assertNotIn('replies', post_data['comments'][0])
+
+        response = self.client.get(
+            '/api/content/posts/', {'comments_preview': 0}
+        )
+        self.assertEqual(response.data['results'][0]['comments'], [])
+
+    def test_top_level_thread_pages(self):
+        ids, _ = self._walk({})
+        self.assertEqual(
+            ids, [str(c.id) for c in reversed(self.top_level)]
+        )
+
+    def test_replies_load_on_demand(self):
+        response = self.client.get(self.url, {'page_size': 10})
+        first = next(
+            c for c in response.data['results']
+            if c['id'] == str(self.top_level[0].id)
+        )
+        self.assertTrue(first['has_replies'])
+        self.assertEqual(first['replies_count'], 4)
+
+        ids, last = self._walk({'parent': str(self.top_level[0].id)})
+        self.assertEqual(ids, [str(r.id) for r in self.replies])
+        self.assertEqual(last.data['parent'], str(self.top_level[0].id))
+
+    def test_unknown_parent_returns_404(self):
+        response = self.client.get(
+            self.url, {'parent': '00000000-0000-0000-0000-000000000000'}
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
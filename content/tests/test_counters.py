@@ -0,0 +1,80 @@
+"""Tests for the set-based post counter reconciliation."""
+
+from unittest import mock
+
+from content.counters import recount_post_counters
+from content.models import Comment, DirectShare, Post, PostReaction
+from content.tasks import update_content_counters
+from content.tests.base import ContentAPITestCase
+
+
+class RecountPostCountersTestCase(ContentAPITestCase):
+    def setUp(self):
+        self.user1, self.profile1 = self.make_profile('counteruser1')
+        self.user2, self.profile2 = self.make_profile('counteruser2')
+        self.post = Post.objects.create(author=self.profile1, content='Counted')
+        self.other = Post.objects.create(author=self.profile1, content='Quiet')
+
+        PostReaction.objects.create(
+            post=self.post, user=self.profile1, reaction_type='like'
+        )
+        PostReaction.objects.create(
+            post=self.post, user=self.profile2, reaction_type='angry'
+        )
+        Comment.objects.create(
+            post=self.post, author=self.profile2, content='First'
+        )
+        Comment.objects.create(
+            post=self.post, author=self.profile2, content='Gone',
+            is_deleted=True
+        )
+        DirectShare.objects.create(sender=self.profile2, post=self.post)
+        Post.objects.create(
+            author=self.profile2, post_type='repost', parent_post=self.post
+        )
+
+    def test_drifted_counters_are_corrected(self):
+        Post.objects.filter(pk__in=[self.post.pk, self.other.pk]).update(
+            likes_count=10, dislikes_count=10, comments_count=10,
+            shares_count=10, repost_count=10
+        )
+
+        corrected = recount_post_counters([self.post.pk, self.other.pk])
+
+        self.assertEqual(corrected, 2)
+        self.post.refresh_from_db()
+        self.assertEqual(
+            (self.post.likes_count, self.post.dislikes_count,
+             self.post.comments_count, self.post.shares_count,
+             self.post.repost_count),
+            (1, 1, 1, 1, 1)
+        )
+        self.other.refresh_from_db()
+        self.assertEqual(self.other.comments_count, 0)
+
+    def test_consistent_posts_are_not_rewritten(self):
+        recount_post_counters([self.post.pk, self.other.pk])
+        self.assertEqual(
+            recount_post_counters([self.post.pk, self.other.pk]), 0
+        )
+
+    def test_task_drains_dirty_set(self):
+        Post.objects.filter(pk=self.post.pk).update(comments_count=0)
+        batches = [[str(self.post.pk)], []]
+        with mock.patch(
+            'content.counters.dirty_posts.pop_batch',
+            side_effect=lambda size: batches.pop(0)
+        ):
+            update_content_counters()
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 1)
+
+    def test_reaction_marks_post_after_commit(self):
+        with mock.patch('content.counters.dirty_posts.mark') as mark:
+            with self.captureOnCommitCallbacks(execute=True):
+                PostReaction.objects.create(
+                    post=self.other, user=self.profile2, reaction_type='love'
+                )
+
+        mark.assert_any_call(self.other.pk)
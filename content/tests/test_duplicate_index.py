@@ -0,0 +1,96 @@
+"""Tests for the near-duplicate post/comment index."""
+
+from datetime import timedelta
+from unittest import mock
+
+import redis
+from django.utils import timezone
+
+from content.duplicate_index import NearDuplicateIndex, text_signature
+from content.models import BotDetectionEvent, Post
+from content.tests.base import ContentAPITestCase
+from content.utils import check_duplicate_content
+
+TEXT = (
+    'Limited offer: claim your free city parking pass today at '
+    'parking-pass dot example before it expires'
+)
+
+
+class NearDuplicateIndexTestCase(ContentAPITestCase):
+    def setUp(self):
+        self.index = NearDuplicateIndex('test:dupes')
+        try:
+            self.index.redis_client.ping()
+        except redis.RedisError:
+            self.skipTest('Redis is not available')
+        self.addCleanup(self.delete_keys)
+        self.now = timezone.now()
+
+    def delete_keys(self):
+        keys = list(self.index.redis_client.scan_iter('test:dupes:*'))
+        if keys:
+            self.index.redis_client.delete(*keys)
+
+    def add(self, object_id, user_id, text, minutes_ago):
+        self.index.add(
+            'post', object_id, user_id, text_signature(text),
+            self.now - timedelta(minutes=minutes_ago)
+        )
+
+    def test_finds_near_duplicates_per_user_and_globally(self):
+        self.add('p1', 'alice', TEXT, 30)
+        self.add('p2', 'alice', 'Photos from the farmers market', 20)
+        self.add('p3', 'bob', TEXT.upper() + '!!', 10)
+        signature = text_signature(TEXT.replace('today', 'now'))
+
+        own = self.index.find(
+            signature, timedelta(hours=1), user_id='alice', at=self.now
+        )
+        self.assertEqual([match['object_id'] for match in own], ['p1'])
+        self.assertGreater(own[0]['similarity'], 0.7)
+
+        everyone = self.index.find(signature, timedelta(hours=1), at=self.now)
+        self.assertEqual(
+            {match['user_id'] for match in everyone}, {'alice', 'bob'}
+        )
+        self.assertEqual(self.index.find(
+            signature, timedelta(minutes=15), at=self.now,
+            exclude=self.index.member('post', 'p3', 'bob')
+        ), [])
+
+    def post_from_accounts(self, text, accounts):
+        posts = []
+        for account in range(accounts):
+            _, profile = self.make_profile(f'wave{len(text)}x{account}')
+            post = Post.objects.create(author=profile, content=text)
+            self.index.add(
+                'post', post.id, profile.id, post.duplicate_signature,
+                post.created_at
+            )
+            posts.append(post)
+        return posts
+
+    def test_spam_wave_needs_a_long_text(self):
+        with mock.patch('content.duplicate_index.duplicate_index', self.index):
+            short = self.post_from_accounts('Congrats on the new job!', 5)[-1]
+            self.assertFalse(check_duplicate_content(short.author, short))
+
+            wave = self.post_from_accounts(TEXT, 4)[-1]
+            self.assertTrue(check_duplicate_content(wave.author, wave))
+
+        self.assertFalse(BotDetectionEvent.objects.filter(
+            user=short.author
+        ).exists())
+        self.assertTrue(BotDetectionEvent.objects.filter(
+            user=wave.author, event_type='copy_paste'
+        ).exists())
+
+
+class DuplicateSignatureTestCase(ContentAPITestCase):
+    def test_posts_are_fingerprinted_on_save(self):
+        _, profile = self.make_profile('fingerprinted')
+        post = Post.objects.create(author=profile, content=TEXT)
+
+        post.refresh_from_db()
+        self.assertEqual(bytes(post.duplicate_signature), text_signature(TEXT))
@@ -0,0 +1,62 @@
+"""Tests for the asynchronous post-ingest pipeline."""
+
+from unittest import mock
+
+from content.ingest import ContentIngestPipeline, ingest_pipeline
+from content.models import (
+    AutoModerationAction, ContentModerationRule, ModerationQueue, Post,
+    PostHashtag
+)
+from content.moderation_rules import compiled_rules
+from content.tests.base import ContentAPITestCase
+
+
+class ContentIngestPipelineTestCase(ContentAPITestCase):
+    def setUp(self):
+        _, self.profile = self.make_profile('ingestuser')
+        self.pipeline = ContentIngestPipeline()
+        ContentModerationRule.objects.create(
+            name='No scams',
+            rule_type='keyword',
+            description='Blocks scam keywords',
+            configuration={'keywords': ['scam']},
+            action='flag',
+            severity_level=3,
+        )
+        # Rule saves only invalidate compiled rules once committed
+        compiled_rules.invalidate()
+
+    def test_post_creation_only_queues_after_commit(self):
+        with mock.patch.object(ingest_pipeline, 'enqueue') as enqueue:
+            with self.captureOnCommitCallbacks(execute=True):
+                post = Post.objects.create(
+                    author=self.profile, content='Hello #ingest'
+                )
+                enqueue.assert_not_called()
+
+        enqueue.assert_called_once_with('post', post.id)
+        self.assertFalse(AutoModerationAction.objects.exists())
+
+    def test_process_runs_stages_once(self):
+        post = Post.objects.create(
+            author=self.profile, content='Obvious scam inside #ingest'
+        )
+        timings = {}
+
+        self.assertEqual(self.pipeline.process('post', [post.id], timings), 1)
+        self.assertEqual(
+            set(timings), {'analysis', 'rules', 'bot_signals',
+                           'mentions_hashtags', 'similarity'}
+        )
+        self.assertTrue(PostHashtag.objects.filter(
+            post=post, hashtag__name='ingest'
+        ).exists())
+
+        # A retried item must not fire its rules twice
+        self.pipeline.process('post', [post.id])
+        self.assertEqual(AutoModerationAction.objects.filter(
+            object_id=post.id
+        ).count(), 1)
+        self.assertEqual(ModerationQueue.objects.filter(
+            object_id=post.id
+        ).count(), 1)
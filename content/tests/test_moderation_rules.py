@@ -0,0 +1,55 @@
+"""Tests for the compiled moderation rule sets."""
+
+from content.models import AutoModerationAction, ContentModerationRule, Post
+from content.moderation_rules import CompiledRuleCache, CompiledRuleSet
+from content.tests.base import ContentAPITestCase
+from content.utils import check_moderation_rules
+
+
+class CompiledRuleSetTestCase(ContentAPITestCase):
+    def setUp(self):
+        _, self.profile = self.make_profile('rulesuser')
+
+    def make_rule(self, name, keywords, **options):
+        return ContentModerationRule.objects.create(
+            name=name,
+            rule_type='keyword',
+            description=name,
+            configuration={'keywords': keywords, **options},
+            action='flag',
+        )
+
+    def test_keyword_options(self):
+        overlapping = self.make_rule('Scams', ['scammer', 'scam'])
+        whole_words = self.make_rule('Insults', ['ass'], whole_words=True)
+        accents = self.make_rule('Cafes', ['cafe'], fold_accents=True)
+        rule_set = CompiledRuleSet([overlapping, whole_words, accents])
+
+        triggered = rule_set.evaluate(Post(
+            author=self.profile, content='A SCAMMER in class at the Café'
+        ))
+        self.assertEqual(
+            [(rule, reason) for rule, _, reason in triggered],
+            [(overlapping, 'Contains banned keyword: scammer'),
+             (accents, 'Contains banned keyword: cafe')]
+        )
+        self.assertEqual(
+            [rule for rule, _, _ in rule_set.evaluate(Post(content='Kick ass'))],
+            [whole_words]
+        )
+
+    def test_rule_changes_invalidate_compiled_sets(self):
+        rules = CompiledRuleCache()
+        self.assertEqual(rules.get('post').rules, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            rule = self.make_rule('Spam', ['buy now'])
+        self.assertEqual(rules.get('post').rules, [rule])
+
+        post = Post.objects.create(author=self.profile, content='Buy now!')
+        actions = check_moderation_rules(post)
+        self.assertEqual([action.triggered_by_rule for action in actions], [rule])
+        self.assertEqual(
+            check_moderation_rules(post, exclude_rule_ids={rule.pk}), []
+        )
+        self.assertEqual(AutoModerationAction.objects.count(), 1)
@@ -0,0 +1,98 @@
+"""Tests for the Redis posting-activity counters used by bot detection."""
+
+import statistics
+import uuid
+from datetime import timedelta
+from unittest import mock
+
+import redis
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.utils import timezone
+
+from content.models import BotDetectionEvent, Post
+from content.posting_activity import PostingActivityTracker
+from content.tests.base import ContentAPITestCase
+from middleware import EventDetectionMiddleware
+
+
+class PostingActivityTrackerTestCase(ContentAPITestCase):
+    def setUp(self):
+        self.tracker = PostingActivityTracker()
+        self.tracker.ACTIVE_KEY = 'test:bot:activity:active'
+        try:
+            self.tracker.redis_client.ping()
+        except redis.RedisError:
+            self.skipTest('Redis is not available')
+        self.user_id = uuid.uuid4()
+        self.addCleanup(
+            self.tracker.redis_client.delete,
+            self.tracker.EVENTS_KEY.format(self.user_id),
+            self.tracker.STATS_KEY.format(self.user_id),
+            self.tracker.ACTIVE_KEY
+        )
+
+    def test_window_count_and_running_interval_statistics(self):
+        start = timezone.now() - timedelta(minutes=10)
+        offsets = [0, 4, 64, 124, 190]
+        for index, offset in enumerate(offsets):
+            self.tracker.record(
+                self.user_id, f'post:{index}', start + timedelta(seconds=offset)
+            )
+
+        end = start + timedelta(seconds=offsets[-1])
+        self.assertEqual(self.tracker.recent_count(self.user_id, end), 5)
+        self.assertEqual(self.tracker.recent_count(
+            self.user_id, end + timedelta(minutes=2)
+        ), 3)
+
+        gaps = [later - earlier for earlier, later in zip(offsets, offsets[1:])]
+        stats = self.tracker.interval_stats(self.user_id)
+        self.assertEqual(stats['interval_count'], 4)
+        self.assertAlmostEqual(stats['avg_interval'], statistics.mean(gaps))
+        self.assertAlmostEqual(stats['std_deviation'], statistics.stdev(gaps))
+        self.assertEqual(stats['rapid_incidents'], 1)
+
+        self.assertEqual(
+            self.tracker.active_user_ids(start), [str(self.user_id)]
+        )
+        self.assertEqual(
+            self.tracker.active_user_ids(end + timedelta(seconds=1)), []
+        )
+
+    def test_post_requests_through_the_middleware_use_the_counters(self):
+        _, profile = self.make_profile('rapidposter')
+        self.addCleanup(
+            self.tracker.redis_client.delete,
+            self.tracker.EVENTS_KEY.format(profile.id),
+            self.tracker.STATS_KEY.format(profile.id)
+        )
+        start = timezone.now() - timedelta(minutes=2)
+        for index in range(11):
+            self.tracker.record(
+                profile.id, f'post:seed{index}',
+                start + timedelta(seconds=index)
+            )
+
+        def create_post(request):
+            Post.objects.create(author=profile, content='One more post')
+            return HttpResponse(status=201)
+
+        request = RequestFactory().post('/api/content/posts/')
+        request.user = profile.user
+        with mock.patch(
+            'content.posting_activity.posting_activity', self.tracker
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                response = EventDetectionMiddleware(create_post)(request)
+
+        self.assertEqual(response.status_code, 201)
+        # The rapid-posting check read the window count from Redis
+        self.assertTrue(BotDetectionEvent.objects.filter(
+            user=profile, event_type='rapid_posting'
+        ).exists())
+        # The committed post updated the running statistics
+        self.assertEqual(self.tracker.recent_count(profile.id), 12)
+        self.assertEqual(
+            self.tracker.interval_stats(profile.id)['interval_count'], 11
+        )
@@ -0,0 +1,54 @@
+"""Tests for the incremental MinHash/LSH post similarity index."""
+
+from content.models import ContentSimilarity, Post, PostSimilaritySignature
+from content.similarity_index import PostSimilarityIndex
+from content.tests.base import ContentAPITestCase
+
+
+class PostSimilarityIndexTestCase(ContentAPITestCase):
+    def setUp(self):
+        _, self.profile = self.make_profile('similarityuser')
+        self.index = PostSimilarityIndex()
+        text = (
+            'The city council approved the new bike lanes along the river '
+            'road after months of debate #cycling #citycouncil'
+        )
+        self.original = Post.objects.create(author=self.profile, content=text)
+        self.near_copy = Post.objects.create(
+            author=self.profile, content=text + ' today'
+        )
+        self.unrelated = Post.objects.create(
+            author=self.profile,
+            content='Recipe for a slow cooked lentil soup with smoked paprika'
+        )
+
+    def test_update_links_only_similar_posts(self):
+        result = self.index.update()
+
+        self.assertEqual(result['indexed_posts'], 3)
+        self.assertEqual(PostSimilaritySignature.objects.count(), 3)
+        linked = set(ContentSimilarity.objects.values_list(
+            'object_id_1', 'object_id_2'
+        ))
+        self.assertIn((self.original.id, self.near_copy.id), linked)
+        self.assertIn((self.near_copy.id, self.original.id), linked)
+        self.assertFalse(any(self.unrelated.id in pair for pair in linked))
+
+    def test_second_run_only_indexes_new_posts(self):
+        self.index.update()
+        Post.objects.create(
+            author=self.profile, content='A completely different new post'
+        )
+
+        self.assertEqual(self.index.update()['indexed_posts'], 1)
+
+    def test_reindexing_an_edited_post_replaces_its_pairs(self):
+        self.index.update()
+        self.near_copy.content = 'Tickets for the jazz festival are on sale'
+        self.near_copy.save()
+
+        self.assertEqual(self.index.update()['indexed_posts'], 1)
+        self.assertFalse(ContentSimilarity.objects.filter(
+            object_id_1__in=[self.original.id, self.near_copy.id],
+            object_id_2__in=[self.original.id, self.near_copy.id],
+        ).exists())
@@ -0,0 +1,118 @@
+"""Tests for the streaming trending-hashtag scores."""
+
+from unittest import mock
+
+import redis
+
+from content.models import Hashtag, Post, PostHashtag
+from content.tests.base import ContentAPITestCase
+from content.trending import HashtagTrendTracker
+
+
+class HashtagTrendTrackerTestCase(ContentAPITestCase):
+    def setUp(self):
+        self.tracker = HashtagTrendTracker()
+        self.tracker.BUCKET_KEY = 'test:hashtags:mentions:{}'
+        self.tracker.SCORE_KEY = 'test:hashtags:trending'
+        self.tracker.FOLDED_KEY = 'test:hashtags:trending:folded'
+        self.tracker.META_KEY = 'test:hashtags:trending:meta'
+        self.tracker.TRENDING_LIMIT = 1
+        try:
+            self.tracker.redis_client.ping()
+        except redis.RedisError:
+            self.skipTest('Redis is not available')
+        self.addCleanup(
+            self.tracker.redis_client.delete,
+            self.tracker.SCORE_KEY, self.tracker.FOLDED_KEY,
+            self.tracker.META_KEY, *(
+                self.tracker.BUCKET_KEY.format(bucket)
+                for bucket in range(100, 103)
+            )
+        )
+
+        self.python = Hashtag.objects.create(name='python', posts_count=5)
+        self.django = Hashtag.objects.create(name='django', posts_count=9)
+        self.stale = Hashtag.objects.create(
+            name='stale', is_trending=True, trending_score=4.0
+        )
+
+    def record_in_bucket(self, bucket, names):
+        with mock.patch.object(
+            self.tracker, 'current_bucket', return_value=bucket
+        ):
+            self.tracker.record(names)
+
+    def fold_at(self, bucket):
+        with mock.patch.object(
+            self.tracker, 'current_bucket', return_value=bucket
+        ):
+            return self.tracker.fold()
+
+    def test_fold_decays_older_mentions(self):
+        self.tracker.redis_client.set(self.tracker.FOLDED_KEY, 99)
+        self.record_in_bucket(100, ['python', 'python', 'django'])
+        self.record_in_bucket(101, ['django'])
+
+        self.assertEqual(self.fold_at(102), 2)
+
+        scores = dict(self.tracker.top(10))
+        decay = self.tracker.bucket_decay
+        self.assertAlmostEqual(scores['python'], 2 * decay)
+        self.assertAlmostEqual(scores['django'], decay + 1)
+        self.assertEqual(self.fold_at(102), 0)
+
+    def test_first_fold_does_not_count_the_open_bucket_twice(self):
+        current = self.tracker.current_bucket()
+        self.addCleanup(
+            self.tracker.redis_client.delete,
+            self.tracker.BUCKET_KEY.format(current)
+        )
+        _, profile = self.make_profile('trendingauthor')
+        post = Post.objects.create(author=profile, content='#python')
+        PostHashtag.objects.get_or_create(post=post, hashtag=self.python)
+        # The same mention, streamed into the bucket still in progress
+        self.record_in_bucket(current, ['python'])
+
+        self.assertEqual(self.fold_at(current), 0)
+        self.assertNotIn('python', dict(self.tracker.top(10)))
+
+        self.assertEqual(self.fold_at(current + 1), 1)
+        self.assertAlmostEqual(dict(self.tracker.top(10))['python'], 1.0)
+
+    def test_sync_updates_only_changed_hashtags(self):
+        self.tracker.redis_client.zadd(
+            self.tracker.SCORE_KEY, {'django': 3.0, 'python': 1.0}
+        )
+
+        self.assertEqual(self.tracker.sync_hashtags(), 3)
+        self.django.refresh_from_db()
+        self.stale.refresh_from_db()
+        self.assertTrue(self.django.is_trending)
+        self.assertEqual(self.django.trending_score, 3.0)
+        self.assertFalse(self.stale.is_trending)
+        self.assertEqual(self.stale.trending_score, 0.0)
+
+        self.assertEqual(self.tracker.sync_hashtags(), 0)
+
+        top = self.tracker.top_with_metadata(10)
+        self.assertEqual(
+            [(item['name'], item['posts_count'], item['is_trending'])
+             for item in top],
+            [('django', 9, True), ('python', 5, False)]
+        )
+
+    def test_deleted_hashtags_are_left_out(self):
+        Hashtag.objects.filter(pk=self.django.pk).update(is_deleted=True)
+        self.tracker.redis_client.zadd(
+            self.tracker.SCORE_KEY, {'django': 3.0, 'python': 1.0}
+        )
+
+        self.tracker.sync_hashtags()
+
+        self.django.refresh_from_db()
+        self.assertFalse(self.django.is_trending)
+        self.assertEqual(
+            [(item['name'], item['is_trending'])
+             for item in self.tracker.top_with_metadata(10)],
+            [('python', True)]
+        )
@@ -0,0 +1,89 @@
+"""Tests for the keyset-paginated home feed of UnifiedPostViewSet."""
+
+from datetime import timedelta
+
+from django.utils import timezone
+from rest_framework import status
+
+from accounts.models import Follow
+from content.models import Post
+from content.tests.base import ContentAPITestCase
+from content.unified_views import decode_feed_cursor, encode_feed_cursor
+
+
+class CursorFeedTestCase(ContentAPITestCase):
+    """Cursor feed returns the same items as the page-number feed."""
+
+    url = '/api/content/posts/feed/'
+
+    def setUp(self):
+        self.user1, self.profile1 = self.make_profile('feeduser1')
+        self.user2, self.profile2 = self.make_profile('feeduser2')
+        Follow.objects.create(follower=self.profile1, followed=self.profile2)
+
+        base = timezone.now() - timedelta(hours=1)
+        self.posts = []
+        for i in range(7):
+            post = Post.objects.create(
+                author=self.profile2, content=f'post {i}'
+            )
+            Post.objects.filter(pk=post.pk).update(
+                created_at=base + timedelta(minutes=i)
+            )
+            self.posts.append(post)
+
+        # A repost of post 0 replaces the original in the feed
+        self.repost = Post.objects.create(
+            author=self.profile1,
+            parent_post=self.posts[0],
+            post_type='repost',
+            content='worth reading'
+        )
+
+        self.authenticate(self.user1)
+
+    def _walk_cursor_feed(self, page_size):
+        items = []
+        response = self.client.get(
+            self.url, {'pagination': 'cursor', 'page_size': page_size}
+        )
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data['results']), page_size)
+            items.extend(response.data['results'])
+            if not response.data['next_cursor']:
+                self.assertFalse(response.data['has_next'])
+                return items
+            response = self.client.get(self.url, {
+                'cursor': response.data['next_cursor'],
+                'page_size': page_size
+            })
+
+    def test_cursor_feed_matches_page_feed(self):
+        """Walking all cursor pages yields the full page-number feed."""
+        legacy = self.client.get(self.url, {'page_size': 100})
+        self.assertEqual(legacy.status_code, status.HTTP_200_OK)
+
+        items = self._walk_cursor_feed(page_size=3)
+
+        def key(item):
+            return (item['type'], item.get('repost_id'), str(item['data']['id']))
+
+        self.assertEqual(
+            [key(i) for i in items],
+            [key(i) for i in legacy.data['results']]
+        )
+        self.assertEqual(len(items), 7)
+        reposts = [i for i in items if i['type'] == 'repost']
+        self.assertEqual(len(reposts), 1)
+        self.assertEqual(reposts[0]['data']['id'], str(self.posts[0].id))
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_cursor_round_trip(self):
+        post = self.posts[3]
+        post.refresh_from_db()
+        cursor = encode_feed_cursor(post.created_at, post.id)
+        self.assertEqual(decode_feed_cursor(cursor), (post.created_at, post.id))
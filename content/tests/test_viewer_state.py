@@ -0,0 +1,117 @@
+"""Query-count regression tests for batched viewer-state resolution."""
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+
+from accounts.models import Follow
+from content.models import (
+    DirectShare, Hashtag, Mention, Post, PostHashtag, PostReaction
+)
+from content.tests.base import ContentAPITestCase
+from polls.models import Poll, PollOption, PollVote
+
+
+# Tables read by the per-post user_has_* / poll voting fields
+VIEWER_STATE_TABLES = (
+    PostReaction._meta.db_table,
+    DirectShare._meta.db_table,
+    PollVote._meta.db_table,
+)
+
+
+class ViewerStateQueryCountTestCase(ContentAPITestCase):
+    """Viewer state costs a fixed number of queries per page."""
+
+    def setUp(self):
+        self.user1, self.profile1 = self.make_profile('vieweruser1')
+        self.user2, self.profile2 = self.make_profile('vieweruser2')
+        Follow.objects.create(follower=self.profile1, followed=self.profile2)
+        self.hashtag = Hashtag.objects.create(name='batched')
+        self.authenticate(self.user1)
+
+    def _add_posts(self, count, reposts=False):
+        for i in range(count):
+            post = Post.objects.create(
+                author=self.profile2, content=f'#batched post {i}'
+            )
+            PostHashtag.objects.get_or_create(post=post, hashtag=self.hashtag)
+            Mention.objects.create(
+                post=post, mentioned_user=self.profile1,
+                mentioning_user=self.profile2
+            )
+            poll = Poll.objects.create(post=post, question=f'Question {i}?')
+            option = PollOption.objects.create(poll=poll, text='Yes')
+            PollOption.objects.create(poll=poll, text='No')
+            if i % 2 == 0:
+                PostReaction.objects.create(
+                    post=post, user=self.profile1, reaction_type='like'
+                )
+                PollVote.objects.create(
+                    poll=poll, option=option, voter=self.user1
+                )
+            if reposts and i % 3 == 0:
+                Post.objects.create(
+                    author=self.profile2, parent_post=post,
+                    post_type='repost', content=f'repost {i}'
+                )
+
+    def _get(self, url, params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def _assert_flat(self, url, params):
+        self._add_posts(3, reposts=True)
+        # Warm per-process caches (content types, ...) before counting
+        self._get(url, params)
+        with CaptureQueriesContext(connection) as small:
+            self._get(url, params)
+        viewer_state = sum(
+            1 for query in small.captured_queries
+            if any(f'"{table}"' in query['sql'] for table in VIEWER_STATE_TABLES)
+        )
+        # One query each for reactions, shares and poll votes
+        self.assertLessEqual(viewer_state, len(VIEWER_STATE_TABLES))
+
+        # Every query of the page, reposts included, stays flat as it grows
+        self._add_posts(6, reposts=True)
+        with self.assertNumQueries(len(small.captured_queries)):
+            self._get(url, params)
+
+    def test_feed_query_count(self):
+        self._assert_flat('/api/content/posts/feed/', {'page_size': 50})
+
+    def test_cursor_feed_query_count(self):
+        self._assert_flat(
+            '/api/content/posts/feed/',
+            {'pagination': 'cursor', 'page_size': 50}
+        )
+
+    def test_list_query_count(self):
+        self._assert_flat('/api/content/posts/', {})
+
+    def test_hashtag_query_count(self):
+        self._assert_flat(
+            '/api/content/posts/by_hashtag/',
+            {'hashtag': 'batched', 'page_size': 50}
+        )
+
+    def test_viewer_state_values(self):
+        """Batched state matches what the per-post queries would return."""
+        self._add_posts(2)
+        response = self.client.get('/api/content/posts/feed/', {'page_size': 50})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for item in response.data['results']:
+            post_id = item['data']['id']
+            liked = PostReaction.objects.filter(
+                post_id=post_id, user=self.profile1, is_deleted=False
+            ).exists()
+            self.assertEqual(item['data']['user_has_liked'], liked)
+            self.assertEqual(
+                item['data']['mentions'],
+                {'vieweruser1': str(self.profile1.id)}
+            )
+            poll = item['data']['polls'][0]
+            self.assertEqual(poll['user_has_voted'], liked)
+            self.assertEqual(len(poll['user_votes']), 1 if liked else 0)
@@ -0,0 +1,112 @@
+"""Tests for write-behind reaction counters."""
+
+from unittest import mock
+
+import redis
+
+from content.counters import recount_post_counters
+from content.models import CounterFlushMarker, Post, PostReaction
+from content.real_time_counters import CounterDeltaBuffer
+from content.tests.base import ContentAPITestCase
+
+
+class WriteBehindCounterTestCase(ContentAPITestCase):
+    def setUp(self):
+        self.buffer = CounterDeltaBuffer()
+        self.buffer.enabled = True
+        self.buffer.PENDING_KEY = 'test:counters:pending:{}'
+        self.buffer.FLUSHING_KEY = 'test:counters:flushing:{}'
+        self.buffer.BATCH_ID_KEY = 'test:counters:flushing_id:{}'
+        try:
+            self.buffer.redis_client.ping()
+        except redis.RedisError:
+            self.skipTest('Redis is not available')
+        self.addCleanup(
+            self.buffer.redis_client.delete,
+            *(key.format('post') for key in (
+                self.buffer.PENDING_KEY, self.buffer.FLUSHING_KEY,
+                self.buffer.BATCH_ID_KEY,
+            ))
+        )
+
+        _, self.profile = self.make_profile('writebehinduser')
+        self.post = Post.objects.create(author=self.profile, content='Viral')
+
+    def test_reads_include_pending_and_flush_applies_once(self):
+        for _ in range(3):
+            self.buffer.add('post', self.post.pk, 'likes_count', 1)
+        self.buffer.add('post', self.post.pk, 'dislikes_count', 1)
+
+        self.assertEqual(
+            self.buffer.pending_deltas('post', [self.post.pk]),
+            {self.post.pk: {'likes_count': 3, 'dislikes_count': 1}}
+        )
+
+        self.assertEqual(self.buffer.flush('post'), 1)
+        self.post.refresh_from_db()
+        self.assertEqual(
+            (self.post.likes_count, self.post.dislikes_count), (3, 1)
+        )
+        self.assertEqual(self.buffer.pending_deltas('post', [self.post.pk]), {})
+        self.assertEqual(self.buffer.flush('post'), 0)
+
+    def test_crashed_flush_is_not_applied_twice(self):
+        self.buffer.add('post', self.post.pk, 'likes_count', 2)
+
+        # Simulate a flusher dying after its transaction committed but
+        # before it removed the flushing hash from Redis
+        original_delete = self.buffer.redis_client.delete
+        self.buffer.redis_client.delete = lambda *keys: None
+        try:
+            self.buffer.flush('post')
+        finally:
+            self.buffer.redis_client.delete = original_delete
+
+        self.assertEqual(self.buffer.flush('post'), 0)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 2)
+        self.assertEqual(CounterFlushMarker.objects.count(), 1)
+
+    def test_reads_mid_flush_do_not_count_the_batch_twice(self):
+        for index in range(2):
+            _, liker = self.make_profile(f'midflushuser{index}')
+            PostReaction.objects.create(
+                post=self.post, user=liker, reaction_type='like'
+            )
+        # Stored count not yet including the two buffered likes
+        Post.objects.filter(pk=self.post.pk).update(likes_count=0)
+        self.buffer.add('post', self.post.pk, 'likes_count', 2)
+
+        # Stop the flush between its commit and clearing Redis
+        original_delete = self.buffer.redis_client.delete
+        self.buffer.redis_client.delete = lambda *keys: None
+        try:
+            self.buffer.flush('post')
+        finally:
+            self.buffer.redis_client.delete = original_delete
+        self.buffer.add('post', self.post.pk, 'dislikes_count', 1)
+
+        self.assertEqual(
+            self.buffer.pending_deltas('post', [self.post.pk]),
+            {self.post.pk: {'dislikes_count': 1}}
+        )
+        with mock.patch('content.counters.counter_buffer', self.buffer):
+            recount_post_counters([self.post.pk])
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 2)
+
+    def test_reaction_deltas_follow_sentiment_changes(self):
+        with mock.patch('content.signals.counter_buffer', self.buffer), \
+                mock.patch('content.real_time_counters.counter_buffer', self.buffer):
+            with self.captureOnCommitCallbacks(execute=True):
+                reaction = PostReaction.objects.create(
+                    post=self.post, user=self.profile, reaction_type='like'
+                )
+            with self.captureOnCommitCallbacks(execute=True):
+                reaction.reaction_type = 'angry'
+                reaction.save()
+
+        self.assertEqual(
+            self.buffer.pending_deltas('post', [self.post.pk]),
+            {self.post.pk: {'dislikes_count': 1}}
+        )
@@ -0,0 +1,241 @@
+"""
+Streaming trending-hashtag scores in Redis.
+
+Every new ``PostHashtag`` adds one mention to a sorted set for the current
+time bucket (``ZINCRBY``). ``content.tasks.update_trending_hashtags`` folds
+completed buckets into one sorted set of exponentially decayed scores with
+``ZUNIONSTORE ... WEIGHTS decay 1``, so a score is the number of recent
+mentions with each one weighted by its age (half-life ``HALF_LIFE``). The
+API reads the top-N straight from that set. Only hashtags whose trending
+status or score changed are written back to ``Hashtag``.
+"""
+
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from typing import Dict, Iterable, List, Tuple
+
+import redis
+from django.conf import settings
+from django.db.models import Count, Q
+from django.db.models.functions import TruncHour
+from django.utils import timezone
+
+from .models import Hashtag, PostHashtag
+
+logger = logging.getLogger(__name__)
+
+
+class HashtagTrendTracker:
+    """Time-bucketed hashtag mentions folded into decayed trending scores."""
+
+    BUCKET_KEY = 'hashtags:mentions:{}'
+    SCORE_KEY = 'hashtags:trending'
+    FOLDED_KEY = 'hashtags:trending:folded'
+    META_KEY = 'hashtags:trending:meta'
+
+    BUCKET_SECONDS = 300
+    HALF_LIFE = timedelta(hours=6)
+    # Unfolded buckets are kept this long (catch-up after downtime)
+    BUCKET_RETENTION = timedelta(days=2)
+    # Scores below this are dropped from the sorted set
+    MIN_SCORE = 0.05
+
+    # Hashtags flagged is_trending, and hashtags whose score is stored
+    TRENDING_LIMIT = 20
+    TRACKED_LIMIT = 50
+
+    def __init__(self):
+        self.redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.5,
+            socket_connect_timeout=0.5,
+            decode_responses=True
+        )
+
+    @property
+    def bucket_decay(self) -> float:
+        """Weight kept by a score for each bucket it ages."""
+        return 0.5 ** (self.BUCKET_SECONDS / self.HALF_LIFE.total_seconds())
+
+    def current_bucket(self) -> int:
+        return int(time.time()) // self.BUCKET_SECONDS
+
+    def record(self, names: Iterable[str]) -> bool:
+        """Count one mention of each hashtag; False if Redis is unavailable."""
+        names = [name for name in names if name]
+        if not names:
+            return True
+        key = self.BUCKET_KEY.format(self.current_bucket())
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for name in names:
+                pipe.zincrby(key, 1, name)
+            pipe.expire(key, int(self.BUCKET_RETENTION.total_seconds()))
+            pipe.execute()
+            return True
+        except redis.RedisError as e:
+            logger.warning(f"Could not record hashtag mentions: {e}")
+            return False
+
+    def fold(self) -> int:
+        """
+        Fold every completed bucket not folded yet into the decayed scores.
+
+        Returns:
+            Number of buckets folded
+        """
+        last_complete = self.current_bucket() - 1
+        folded = self.redis_client.get(self.FOLDED_KEY)
+        if folded is None:
+            if not self.redis_client.exists(self.SCORE_KEY):
+                # Seed up to the cursor: later buckets get folded as well
+                self.rebuild_from_database(until=datetime.fromtimestamp(
+                    (last_complete + 1) * self.BUCKET_SECONDS,
+                    tz=dt_timezone.utc
+                ))
+            self.redis_client.set(self.FOLDED_KEY, last_complete)
+            return 0
+
+        max_buckets = int(
+            self.BUCKET_RETENTION.total_seconds() // self.BUCKET_SECONDS
+        )
+        first = max(int(folded) + 1, last_complete - max_buckets + 1)
+        decay = self.bucket_decay
+        for bucket in range(first, last_complete + 1):
+            pipe = self.redis_client.pipeline(transaction=True)
+            pipe.zunionstore(self.SCORE_KEY, {
+                self.SCORE_KEY: decay,
+                self.BUCKET_KEY.format(bucket): 1,
+            })
+            pipe.zremrangebyscore(self.SCORE_KEY, '-inf', f'({self.MIN_SCORE}')
+            pipe.delete(self.BUCKET_KEY.format(bucket))
+            pipe.set(self.FOLDED_KEY, bucket)
+            pipe.execute()
+        return max(last_complete - first + 1, 0)
+
+    def rebuild_from_database(self, hours=48, until=None) -> int:
+        """
+        Seed the scores from recent PostHashtag rows (one grouped query),
+        used when the sorted set does not exist yet.
+
+        Args:
+            hours: How far back mentions are counted
+            until: End of the seeded window (default: now); scores are
+                decayed as of this time
+
+        Returns:
+            Number of hashtags scored
+        """
+        now = until or timezone.now()
+        rows = PostHashtag.objects.filter(
+            created_at__gte=now - timedelta(hours=hours),
+            created_at__lt=now,
+            is_deleted=False
+        ).annotate(
+            hour=TruncHour('created_at')
+        ).values('hashtag__name', 'hour').annotate(mentions=Count('id'))
+
+        half_life = self.HALF_LIFE.total_seconds()
+        scores = {}
+        for row in rows:
+            age = (now - row['hour']).total_seconds()
+            scores[row['hashtag__name']] = (
+                scores.get(row['hashtag__name'], 0.0) +
+                row['mentions'] * 0.5 ** (age / half_life)
+            )
+        scores = {
+            name: score for name, score in scores.items()
+            if score >= self.MIN_SCORE
+        }
+        if scores:
+            self.redis_client.zadd(self.SCORE_KEY, scores)
+        return len(scores)
+
+    def top(self, limit: int) -> List[Tuple[str, float]]:
+        """``[(name, score), ...]`` for the ``limit`` highest scores."""
+        return self.redis_client.zrevrange(
+            self.SCORE_KEY, 0, limit - 1, withscores=True
+        )
+
+    def top_with_metadata(self, limit: int) -> List[Dict]:
+        """
+        Top hashtags with the metadata cached by the last sync.
+
+        Names without metadata (deleted hashtags, or ones first mentioned
+        since the last sync) are left out, like the database fallback.
+        """
+        top = self.top(max(limit, self.TRACKED_LIMIT))
+        if not top:
+            return []
+        metadata = self.redis_client.hmget(
+            self.META_KEY, [name for name, _ in top]
+        )
+        results = []
+        for (name, score), raw in zip(top, metadata):
+            if not raw:
+                continue
+            meta = json.loads(raw)
+            results.append({
+                'name': name,
+                'posts_count': meta.get('posts_count', 0),
+                'is_trending': len(results) < self.TRENDING_LIMIT,
+                'trending_score': round(score, 3),
+                'created_at': meta.get('created_at'),
+            })
+            if len(results) >= limit:
+                break
+        return results
+
+    def sync_hashtags(self) -> int:
+        """
+        Write the current top hashtags back to ``Hashtag``, touching only
+        rows whose trending flag or score changed.
+
+        Returns:
+            Number of Hashtag rows updated
+        """
+        top = self.top(self.TRACKED_LIMIT)
+        hashtags = list(Hashtag.objects.filter(
+            Q(name__in=[name for name, _ in top]) | Q(is_trending=True) |
+            Q(trending_score__gt=0)
+        ).only('id', 'name', 'posts_count', 'is_trending', 'trending_score',
+               'created_at', 'is_deleted'))
+
+        # Deleted hashtags lose their trending state and get no metadata
+        live = {hashtag.name for hashtag in hashtags if not hashtag.is_deleted}
+        top = [(name, score) for name, score in top if name in live]
+        scores = {name: round(score, 1) for name, score in top}
+        trending = {name for name, _ in top[:self.TRENDING_LIMIT]}
+
+        changed, metadata = [], {}
+        for hashtag in hashtags:
+            score = scores.get(hashtag.name, 0.0)
+            is_trending = hashtag.name in trending
+            if (hashtag.trending_score, hashtag.is_trending) != (
+                score, is_trending
+            ):
+                hashtag.trending_score = score
+                hashtag.is_trending = is_trending
+                changed.append(hashtag)
+            if hashtag.name in scores:
+                metadata[hashtag.name] = json.dumps({
+                    'posts_count': hashtag.posts_count,
+                    'created_at': hashtag.created_at.isoformat(),
+                })
+
+        Hashtag.objects.bulk_update(
+            changed, ['trending_score', 'is_trending'], batch_size=500
+        )
+
+        pipe = self.redis_client.pipeline(transaction=True)
+        pipe.delete(self.META_KEY)
+        if metadata:
+            pipe.hset(self.META_KEY, mapping=metadata)
+        pipe.execute()
+        return len(changed)
+
+
+# Global instance
+trend_tracker = HashtagTrendTracker()
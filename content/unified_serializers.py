@@ -8,11 +8,216 @@ These serializers replace the existing ones to provide:
 """
 
 from rest_framework import serializers
-from content.models import Post, PostMedia
+from django.conf import settings
+from django.db import models
+from content.models import Comment, Post, PostMedia
+from content.real_time_counters import (
+    apply_pending_counts, counter_buffer, get_pending_counts
+)
 from polls.models import Poll, PollOption
 from accounts.models import UserProfile
 
 
+class PostViewerState:
+    """
+    Requesting user's interaction state for a page of posts.
+
+    Built once per list with a handful of ``IN`` queries and shared with
+    every nested serializer through ``context['viewer_state']`` so the
+    per-post ``user_has_*`` fields and the poll voting fields do not hit
+    the database.
+    """
+
+    def __init__(self, profile=None):
+        self.profile = profile
+        self.post_ids = set()
+        self.liked_post_ids = set()
+        self.disliked_post_ids = set()
+        self.shared_post_ids = set()
+        self.reposted_post_ids = set()
+        self.voted_poll_ids = set()
+        self.votes_by_poll = {}
+        self.voted_option_ids = set()
+
+    @classmethod
+    def load(cls, request, post_ids):
+        """Fetch viewer state for ``post_ids``."""
+        if not request or not request.user.is_authenticated:
+            return cls()
+
+        profile = UserProfile.objects.filter(
+            user=request.user, is_deleted=False
+        ).first()
+        state = cls(profile)
+        state.post_ids = set(post_ids)
+
+        if not state.post_ids:
+            return state
+
+        from content.models import PostReaction, DirectShare
+        from polls.models import PollVote
+
+        if profile:
+            reactions = PostReaction.objects.filter(
+                user=profile,
+                post_id__in=state.post_ids,
+                is_deleted=False
+            ).values_list('post_id', 'reaction_type')
+            for post_id, reaction_type in reactions:
+                if reaction_type in PostReaction.POSITIVE_REACTIONS:
+                    state.liked_post_ids.add(post_id)
+                elif reaction_type in PostReaction.NEGATIVE_REACTIONS:
+                    state.disliked_post_ids.add(post_id)
+
+            state.shared_post_ids = set(DirectShare.objects.filter(
+                sender=profile,
+                post_id__in=state.post_ids,
+                is_deleted=False
+            ).values_list('post_id', flat=True))
+
+            state.reposted_post_ids = set(Post.objects.filter(
+                author=profile,
+                parent_post_id__in=state.post_ids,
+                post_type='repost',
+                is_deleted=False
+            ).values_list('parent_post_id', flat=True))
+
+        votes = PollVote.objects.filter(
+            voter=request.user,
+            poll__post_id__in=state.post_ids,
+            is_deleted=False
+        ).values_list('poll_id', 'option_id')
+        for poll_id, option_id in votes:
+            state.voted_poll_ids.add(poll_id)
+            state.voted_option_ids.add(option_id)
+            state.votes_by_poll.setdefault(poll_id, []).append(option_id)
+
+        return state
+
+    def covers_post(self, post_id):
+        """Whether this state was loaded for ``post_id``."""
+        return post_id in self.post_ids
+
+
+def get_viewer_state(context, post_id):
+    """Return the shared viewer state if it covers ``post_id``."""
+    state = context.get('viewer_state')
+    if state is not None and state.covers_post(post_id):
+        return state
+    return None
+
+
+def get_comment_preview_count(request):
+    """
+    Number of top-level comments embedded in post listings.
+
+    Defaults to ``SOCIAL_NETWORK_SETTINGS['COMMENT_PREVIEW_COUNT']`` and can
+    be lowered or raised per request with ``?comments_preview=N`` (capped at
+    ``COMMENT_PREVIEW_MAX``).
+    """
+    config = getattr(settings, 'SOCIAL_NETWORK_SETTINGS', {})
+    count = config.get('COMMENT_PREVIEW_COUNT', 3)
+    maximum = config.get('COMMENT_PREVIEW_MAX', 20)
+
+    params = getattr(request, 'query_params', None)
+    if params is not None and 'comments_preview' in params:
+        try:
+            count = int(params.get('comments_preview'))
+        except (TypeError, ValueError):
+            pass
+    return max(0, min(count, maximum))
+
+
+def load_comment_previews(post_ids, limit):
+    """
+    Fetch the newest ``limit`` top-level comments of every post in one query.
+
+    Returns a dict mapping each post id to its (possibly empty) preview list.
+    """
+    from django.db.models.functions import RowNumber
+
+    previews = {post_id: [] for post_id in post_ids}
+    if not previews or limit <= 0:
+        return previews
+
+    comments = Comment.objects.for_thread().filter(
+        post_id__in=previews.keys(),
+        parent__isnull=True,
+        is_deleted=False
+    ).annotate(
+        preview_rank=models.Window(
+            expression=RowNumber(),
+            partition_by=[models.F('post_id')],
+            order_by=[models.F('created_at').desc(), models.F('id').desc()]
+        )
+    ).filter(preview_rank__lte=limit).order_by('-created_at', '-id')
+
+    for comment in comments:
+        previews[comment.post_id].append(comment)
+    return previews
+
+
+def load_post_mentions(post_ids):
+    """
+    Fetch the mention mappings of every post in one query.
+
+    Returns a dict mapping each post id to ``{username: user_profile_id}``.
+    """
+    from content.models import Mention
+
+    mentions = {post_id: {} for post_id in post_ids}
+    if not mentions:
+        return mentions
+
+    rows = Mention.objects.filter(
+        post_id__in=mentions.keys()
+    ).values_list(
+        'post_id', 'mentioned_user__user__username', 'mentioned_user_id'
+    )
+    for post_id, username, profile_id in rows:
+        mentions[post_id][username] = str(profile_id)
+    return mentions
+
+
+class UnifiedPostListSerializer(serializers.ListSerializer):
+    """List serializer that preloads viewer state for the whole page."""
+
+    def to_representation(self, data):
+        from content.serializers import CommentViewerState
+
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        posts = list(iterable)
+        request = self.context.get('request')
+
+        post_ids = set()
+        for post in posts:
+            post_ids.add(post.id)
+            if post.parent_post_id:
+                post_ids.add(post.parent_post_id)
+
+        self.context['viewer_state'] = PostViewerState.load(request, post_ids)
+        self.context['pending_post_counts'] = (
+            post_ids, counter_buffer.pending_deltas('post', post_ids)
+        )
+        self.context['post_mentions'] = load_post_mentions(post_ids)
+
+        previews = load_comment_previews(
+            post_ids, get_comment_preview_count(request)
+        )
+        self.context['comment_previews'] = previews
+        comment_ids = [
+            comment.id for comments in previews.values() for comment in comments
+        ]
+        self.context['comment_viewer_state'] = CommentViewerState.load(
+            request, comment_ids
+        )
+        self.context['pending_comment_counts'] = (
+            set(comment_ids),
+            counter_buffer.pending_deltas('comment', comment_ids)
+        )
+        return super().to_representation(posts)
+
+
 class EnhancedPostMediaSerializer(serializers.ModelSerializer):
     """Enhanced serializer for PostMedia with additional metadata."""
 
@@ -158,6 +363,10 @@ class EnhancedPollOptionSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             return False
 
+        state = get_viewer_state(self.context, obj.poll.post_id)
+        if state is not None:
+            return obj.id in state.voted_option_ids
+
         from polls.models import PollVote
         return PollVote.objects.filter(option=obj,
             voter=request.user, is_deleted=False).exists()
@@ -216,6 +425,10 @@ class EnhancedPollSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             return False
 
+        state = get_viewer_state(self.context, obj.post_id)
+        if state is not None:
+            return obj.id in state.voted_poll_ids
+
         from polls.models import PollVote
         return PollVote.objects.filter(poll=obj,
             voter=request.user, is_deleted=False).exists()
@@ -226,6 +439,10 @@ class EnhancedPollSerializer(serializers.ModelSerializer):
         if not request or not request.user.is_authenticated:
             return []
 
+        state = get_viewer_state(self.context, obj.post_id)
+        if state is not None:
+            return list(state.votes_by_poll.get(obj.id, []))
+
         from polls.models import PollVote
         votes = PollVote.objects.filter(poll=obj, voter=request.user, is_deleted=False)
         return [vote.option.id for vote in votes]
@@ -294,7 +511,8 @@ class UnifiedPostSerializer(serializers.ModelSerializer):
     user_has_shared = serializers.SerializerMethodField()
     user_has_reposted = serializers.SerializerMethodField()
 
-    # Comments with nested structure
+    # Preview of the newest top-level comments (full threads are loaded
+    # lazily from the post comments endpoint)
     comments = serializers.SerializerMethodField()
     mentions = serializers.SerializerMethodField()
 
@@ -337,7 +555,7 @@ class UnifiedPostSerializer(serializers.ModelSerializer):
             'user_has_liked', 'user_has_disliked', 'user_has_shared',
             'user_has_reposted',
 
-            # Comments with nested structure
+            # Comment preview
             'comments', 'mentions',
 
             # Flags and metadata
@@ -355,6 +573,14 @@ class UnifiedPostSerializer(serializers.ModelSerializer):
             'user_has_reposted', 'comments', 'is_edited', 'created_at',
             'updated_at'
         ]
+        list_serializer_class = UnifiedPostListSerializer
+
+    def to_representation(self, instance):
+        """Add counter deltas buffered in write-behind mode."""
+        data = super().to_representation(instance)
+        return apply_pending_counts(data, get_pending_counts(
+            self.context, 'post', instance.id
+        ))
 
     def _get_user_profile(self):
         """Helper to get current user's profile."""
@@ -381,6 +607,9 @@ class UnifiedPostSerializer(serializers.ModelSerializer):
 
     def get_user_has_liked(self, obj):
         """Check if user has liked this post (positive reaction)."""
+        state = get_viewer_state(self.context, obj.id)
+        if state is not None:
+            return obj.id in state.liked_post_ids
         profile = self._get_user_profile()
         if not profile:
             return False
@@ -394,6 +623,9 @@ class UnifiedPostSerializer(serializers.ModelSerializer):
 
     def get_user_has_disliked(self, obj):
         """Check if user has disliked this post (negative reaction)."""
+        state = get_viewer_state(self.context, obj.id)
+        if state is not None:
+            return obj.id in state.disliked_post_ids
         profile = self._get_user_profile()
         if not profile:
             return False
@@ -407,6 +639,9 @@ class UnifiedPostSerializer(serializers.ModelSerializer):
 
     def get_user_has_shared(self, obj):
         """Check if user has shared this post."""
+        state = get_viewer_state(self.context, obj.id)
+        if state is not None:
+            return obj.id in state.shared_post_ids
         profile = self._get_user_profile()
         if not profile:
             return False
@@ -415,6 +650,9 @@ class UnifiedPostSerializer(serializers.ModelSerializer):
 
     def get_user_has_reposted(self, obj):
         """Check if user has reposted this post."""
+        state = get_viewer_state(self.context, obj.id)
+        if state is not None:
+            return obj.id in state.reposted_post_ids
         profile = self._get_user_profile()
         if not profile:
             return False
@@ -422,16 +660,27 @@ class UnifiedPostSerializer(serializers.ModelSerializer):
         return Post.objects.filter(author=profile, parent_post=obj, post_type='repost', is_deleted=False).exists()
 
     def get_comments(self, obj):
-        """Get all comments for this post with nested structure."""
-        from content.serializers import CommentNestedSerializer
-        # Get top-level comments (no parent)
-        top_level_comments = obj.comments.filter(parent=None, is_deleted=False)
-        return CommentNestedSerializer(
-            top_level_comments, many=True, context=self.context
+        """Get a preview of the newest top-level comments for this post."""
+        from content.serializers import CommentThreadSerializer
+
+        previews = self.context.get('comment_previews')
+        if previews is not None and obj.id in previews:
+            comments = previews[obj.id]
+        else:
+            limit = get_comment_preview_count(self.context.get('request'))
+            comments = Comment.objects.for_thread().filter(
+                post=obj, parent=None, is_deleted=False
+            ).order_by('-created_at', '-id')[:limit] if limit else []
+
+        return CommentThreadSerializer(
+            comments, many=True, context=self.context
         ).data
 
     def get_mentions(self, obj):
         """Get mention mappings (username -> user_profile_id) for this post."""
+        preloaded = self.context.get('post_mentions')
+        if preloaded is not None and obj.id in preloaded:
+            return dict(preloaded[obj.id])
         mentions = {}
         for mention in obj.content_mentions.select_related('mentioned_user__user'):
             mentions[mention.mentioned_user.user.username] = str(mention.mentioned_user.id)
@@ -5,17 +5,22 @@ These views demonstrate how to use the new unified attachment system
 alongside the existing API structure.
 """
 
+import base64
+import binascii
+import uuid
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.shortcuts import get_object_or_404
 from django.db import models
+from django.utils.dateparse import parse_datetime
 from django.utils.decorators import method_decorator
 from django.views.decorators.clickjacking import xframe_options_exempt
 from django.conf import settings
 
-from content.models import Post, PostMedia, Hashtag
+from content.models import Comment, Post, PostMedia, Hashtag
 from content.permissions import IsAuthenticatedOrPublicContent
 from content.utils import process_repost_comment_mentions
 from polls.models import PollOption
@@ -29,6 +34,35 @@ from content.unified_serializers import (
 )
 
 
+# Post types rendered as reposts in the home feed
+FEED_REPOST_TYPES = [
+    'repost', 'repost_with_media', 'repost_quote', 'repost_remix'
+]
+
+# Upper bound for the keyset feed page size
+FEED_MAX_PAGE_SIZE = 100
+
+
+def encode_feed_cursor(created_at, post_id):
+    """Encode a ``(created_at, id)`` keyset position as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{post_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_feed_cursor(cursor):
+    """Decode a cursor into ``(created_at, id)`` or ``None`` if invalid."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        created_at_str, post_id = raw.split('|', 1)
+        created_at = parse_datetime(created_at_str)
+        if created_at is None:
+            return None
+        return created_at, uuid.UUID(post_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
 class UnifiedPostViewSet(viewsets.ModelViewSet):
     """
     Enhanced PostViewSet with unified attachment and multiple polls support.
@@ -67,7 +101,7 @@ class UnifiedPostViewSet(viewsets.ModelViewSet):
         ).prefetch_related(
             'media',  # PostMedia attachments
             'polls__options',  # Multiple polls with options
-            'child_reposts', 'comments'
+            'child_reposts'
         ).filter(is_deleted=False)
 
         # Filter by community ID (preferred method)
@@ -499,6 +533,12 @@ class UnifiedPostViewSet(viewsets.ModelViewSet):
         Returns posts in chronological order, including:
         - Original posts by followed users
         - Reposts by followed users (with repost metadata)
+
+        Query parameters:
+        - page / page_size: Page-number pagination (default mode)
+        - cursor: Opaque ``next_cursor`` from a previous response; passing
+          it (or ``pagination=cursor`` for the first page) switches to the
+          keyset-paginated feed
         """
         from accounts.models import Follow
 
@@ -513,6 +553,12 @@ class UnifiedPostViewSet(viewsets.ModelViewSet):
         # Include the user's own posts
         followed_user_ids = list(following_users) + [user_profile.id]
 
+        # Keyset mode: merge originals and reposts in a single ordered query
+        # and serialize only the requested page.
+        params = getattr(request, 'query_params', request.GET)
+        if 'cursor' in params or params.get('pagination') == 'cursor':
+            return self._cursor_feed(request, followed_user_ids)
+
         # Get regular posts from followed users (excluding reposts)
         posts_queryset = self.get_queryset().filter(
             author__id__in=followed_user_ids,
@@ -522,17 +568,14 @@ class UnifiedPostViewSet(viewsets.ModelViewSet):
         # Get repost posts: only from followed users
         repost_posts_queryset = Post.objects.filter(
             author__id__in=followed_user_ids,  # Only from followed users
-            post_type__in=[
-                'repost', 'repost_with_media', 'repost_quote', 'repost_remix'
-            ],
+            post_type__in=FEED_REPOST_TYPES,
             is_deleted=False,
             parent_post__isnull=False  # Only reposts
         ).select_related(
             'author__user', 'parent_post__author__user'
         ).prefetch_related(
             'parent_post__media',
-            'parent_post__polls__options',
-            'parent_post__comments'
+            'parent_post__polls__options'
         ).order_by('-created_at')
 
         # Keep track of original post IDs that will be shown as reposts
@@ -546,68 +589,32 @@ class UnifiedPostViewSet(viewsets.ModelViewSet):
         # Filter out original posts that are being reposted
         posts_queryset = posts_queryset.exclude(id__in=reposted_original_ids)
 
-        # Combine and sort by creation time
-        combined_feed = []
-
-        # Add original posts
-        for post in posts_queryset:
-            serializer = UnifiedPostSerializer(
-                post, context={'request': request}
-            )
-            combined_feed.append({
-                'type': 'post',
-                'created_at': post.created_at.isoformat(),
-                'data': serializer.data
-            })
-
-        # Add reposts (now as Post objects)
-        reposts_added = 0
-        for repost_post in repost_posts_queryset:
-            # Only include if the parent post still exists and isn't deleted
-            if repost_post.parent_post and not repost_post.parent_post.is_deleted:
-                reposts_added += 1
-                # Serialize the parent post (original content)
-                parent_serializer = UnifiedPostSerializer(
-                    repost_post.parent_post, context={'request': request}
-                )
-
-                # Get reposter info
-                display_name = (repost_post.author.display_name or
-                                repost_post.author.user.username)
-
-                # Process mentions in repost comment
-                repost_mention_mappings = process_repost_comment_mentions(
-                    repost_post.content or ""
-                )
-
-                combined_feed.append({
-                    'type': 'repost',
-                    'created_at': repost_post.created_at.isoformat(),
-                    'repost_id': str(repost_post.id),
-                    'reposted_by': {
-                        'id': str(repost_post.author.id),
-                        'username': repost_post.author.user.username,
-                        'display_name': display_name,
-                    },
-                    'repost_comment': repost_post.content or "",
-                    'repost_mentions': repost_mention_mappings,
-                    'data': parent_serializer.data  # Original post data
-                })
+        # Only include reposts whose parent post still exists
+        visible_reposts = [
+            repost_post for repost_post in repost_posts_queryset
+            if repost_post.parent_post and not repost_post.parent_post.is_deleted
+        ]
+        original_posts = list(posts_queryset)
+
+        # Serialize originals and reposted parents in one pass so viewer
+        # state is loaded once for the whole feed
+        serialized = UnifiedPostSerializer(
+            original_posts + [p.parent_post for p in visible_reposts],
+            many=True,
+            context={'request': request}
+        ).data
+
+        combined_feed = [
+            self._build_feed_entry(post, data)
+            for post, data in zip(original_posts + visible_reposts, serialized)
+        ]
 
         # Sort combined feed by creation time (newest first)
         combined_feed.sort(key=lambda x: x['created_at'], reverse=True)
 
         # Apply pagination if needed
-        page = 1
-        page_size = 20
-
-        # Handle both DRF and Django request objects
-        if hasattr(request, 'query_params'):
-            page = int(request.query_params.get('page', 1))
-            page_size = int(request.query_params.get('page_size', 20))
-        elif hasattr(request, 'GET'):
-            page = int(request.GET.get('page', 1))
-            page_size = int(request.GET.get('page_size', 20))
+        page = int(params.get('page', 1))
+        page_size = int(params.get('page_size', 20))
 
         start_idx = (page - 1) * page_size
         end_idx = start_idx + page_size
@@ -623,6 +630,140 @@ class UnifiedPostViewSet(viewsets.ModelViewSet):
             'has_previous': page > 1
         })
 
+    def _cursor_feed(self, request, followed_user_ids):
+        """
+        Keyset-paginated feed merged in the database.
+
+        Originals and reposts come from one query ordered by
+        ``(created_at, id)``; only ``page_size`` rows are loaded and
+        serialized, and ``next_cursor`` points past the last row so deep
+        pages cost the same as the first one.
+        """
+        params = getattr(request, 'query_params', request.GET)
+        page_size = self._bounded_page_size(params, 20, FEED_MAX_PAGE_SIZE)
+
+        cursor = params.get('cursor')
+        position = None
+        if cursor:
+            position = decode_feed_cursor(cursor)
+            if position is None:
+                return Response(
+                    {'error': 'Invalid cursor'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        # Originals reposted by someone in the follow graph are shown once,
+        # as the repost, exactly like the page-number feed.
+        reposted_by_followed = Post.objects.filter(
+            author__id__in=followed_user_ids,
+            post_type__in=FEED_REPOST_TYPES,
+            is_deleted=False,
+            parent_post__isnull=False,
+            parent_post__is_deleted=False
+        ).values('parent_post_id')
+
+        queryset = Post.objects.filter(
+            author__id__in=followed_user_ids,
+            is_deleted=False
+        ).filter(
+            (
+                models.Q(parent_post__isnull=True) &
+                ~models.Q(id__in=reposted_by_followed)
+            ) | models.Q(
+                parent_post__isnull=False,
+                parent_post__is_deleted=False,
+                post_type__in=FEED_REPOST_TYPES
+            )
+        )
+
+        if position is not None:
+            created_at, post_id = position
+            queryset = queryset.filter(
+                models.Q(created_at__lt=created_at) |
+                models.Q(created_at=created_at, id__lt=post_id)
+            )
+
+        queryset = queryset.select_related(
+            'author__user', 'community', 'community__division',
+            'thread__rubrique_template', 'rubrique_template',
+            'parent_post__author__user', 'parent_post__community',
+            'parent_post__thread__rubrique_template',
+            'parent_post__rubrique_template'
+        ).prefetch_related(
+            'media', 'polls__options',
+            'parent_post__media', 'parent_post__polls__options'
+        ).order_by('-created_at', '-id')
+
+        rows = list(queryset[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        # Serialize the displayed content (the original for reposts) in one
+        # pass so list-level context is shared across the page.
+        subjects = [
+            post.parent_post if post.parent_post_id else post
+            for post in rows
+        ]
+        serialized = UnifiedPostSerializer(
+            subjects, many=True, context={'request': request}
+        ).data
+
+        results = [
+            self._build_feed_entry(post, data)
+            for post, data in zip(rows, serialized)
+        ]
+
+        next_cursor = None
+        if has_next and rows:
+            next_cursor = encode_feed_cursor(rows[-1].created_at, rows[-1].id)
+
+        return Response({
+            'results': results,
+            'page_size': page_size,
+            'next_cursor': next_cursor,
+            'has_next': has_next
+        })
+
+    def _bounded_page_size(self, params, default, maximum):
+        """Read ``page_size`` from query params, clamped to ``[1, maximum]``."""
+        try:
+            page_size = int(params.get('page_size', default))
+        except (TypeError, ValueError):
+            page_size = default
+        return max(1, min(page_size, maximum))
+
+    def _build_feed_entry(self, post, data):
+        """Wrap serialized post data in the feed item envelope."""
+        if not post.parent_post_id:
+            return {
+                'type': 'post',
+                'created_at': post.created_at.isoformat(),
+                'data': data
+            }
+
+        # Get reposter info
+        display_name = (post.author.display_name or
+                        post.author.user.username)
+
+        # Process mentions in repost comment
+        repost_mention_mappings = process_repost_comment_mentions(
+            post.content or ""
+        )
+
+        return {
+            'type': 'repost',
+            'created_at': post.created_at.isoformat(),
+            'repost_id': str(post.id),
+            'reposted_by': {
+                'id': str(post.author.id),
+                'username': post.author.user.username,
+                'display_name': display_name,
+            },
+            'repost_comment': post.content or "",
+            'repost_mentions': repost_mention_mappings,
+            'data': data  # Original post data
+        }
+
     @action(detail=False, methods=['get'],
             permission_classes=[IsAuthenticated])
     def user_posts(self, request):
@@ -1158,6 +1299,121 @@ class UnifiedPostViewSet(viewsets.ModelViewSet):
         request.data['reaction_type'] = 'sad'
         return self.react(request, pk)
 
+    @action(detail=True, methods=['get'], permission_classes=[AllowAny])
+    def comments(self, request, pk=None):
+        """
+        Get one depth of a post's comment tree, cursor-paginated.
+
+        Query parameters:
+        - parent: Comment ID whose direct replies to load (top-level
+          comments when omitted)
+        - cursor: Opaque ``next_cursor`` from a previous response
+        - page_size: Number of comments per page (default: 20, max: 100)
+
+        Top-level comments are returned newest first and replies oldest
+        first. Each comment carries ``replies_count``/``has_replies`` so the
+        client can request the next depth on demand.
+        """
+        from content.serializers import CommentThreadSerializer
+
+        post = get_object_or_404(Post, pk=pk, is_deleted=False)
+
+        user_profile = None
+        if request.user.is_authenticated:
+            user_profile = UserProfile.objects.filter(
+                user=request.user, is_deleted=False
+            ).first()
+        can_view = post.visibility == 'public' or (
+            user_profile is not None and
+            self._can_user_view_post(post, user_profile)
+        )
+        if not can_view:
+            return Response(
+                {'error': 'You do not have permission to view this post'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        config = getattr(settings, 'SOCIAL_NETWORK_SETTINGS', {})
+        page_size = self._bounded_page_size(
+            request.query_params,
+            config.get('COMMENT_THREAD_PAGE_SIZE', 20),
+            config.get('COMMENT_THREAD_MAX_PAGE_SIZE', 100)
+        )
+
+        cursor = request.query_params.get('cursor')
+        position = None
+        if cursor:
+            position = decode_feed_cursor(cursor)
+            if position is None:
+                return Response(
+                    {'error': 'Invalid cursor'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        queryset = Comment.objects.for_thread().filter(
+            post=post, is_deleted=False
+        )
+
+        parent_id = request.query_params.get('parent')
+        if parent_id:
+            try:
+                parent_id = uuid.UUID(parent_id)
+            except ValueError:
+                return Response(
+                    {'error': 'Invalid parent comment ID'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            if not Comment.objects.filter(
+                pk=parent_id, post=post, is_deleted=False
+            ).exists():
+                return Response(
+                    {'error': 'Parent comment not found'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+            # Replies read oldest first, like a conversation
+            queryset = queryset.filter(parent_id=parent_id)
+            newest_first = False
+        else:
+            queryset = queryset.filter(parent__isnull=True)
+            newest_first = True
+
+        if position is not None:
+            created_at, comment_id = position
+            if newest_first:
+                queryset = queryset.filter(
+                    models.Q(created_at__lt=created_at) |
+                    models.Q(created_at=created_at, id__lt=comment_id)
+                )
+            else:
+                queryset = queryset.filter(
+                    models.Q(created_at__gt=created_at) |
+                    models.Q(created_at=created_at, id__gt=comment_id)
+                )
+
+        ordering = (
+            ('-created_at', '-id') if newest_first else ('created_at', 'id')
+        )
+        rows = list(queryset.order_by(*ordering)[:page_size + 1])
+        has_next = len(rows) > page_size
+        rows = rows[:page_size]
+
+        serializer = CommentThreadSerializer(
+            rows, many=True, context={'request': request}
+        )
+
+        next_cursor = None
+        if has_next and rows:
+            next_cursor = encode_feed_cursor(rows[-1].created_at, rows[-1].id)
+
+        return Response({
+            'post_id': str(post.id),
+            'parent': str(parent_id) if parent_id else None,
+            'results': serializer.data,
+            'page_size': page_size,
+            'next_cursor': next_cursor,
+            'has_next': has_next
+        })
+
     @action(detail=False, methods=['post'], url_path='comments/(?P<comment_id>[^/.]+)/react', permission_classes=[IsAuthenticated])
     def react_comment(self, request, comment_id=None):
         """React to a comment with an emoji reaction."""
@@ -1565,25 +1821,35 @@ class UnifiedPostViewSet(viewsets.ModelViewSet):
         Query parameters:
         - limit: Number of hashtags to return (default: 20, max: 50)
         """
+        import redis
         from content.models import Hashtag
+        from content.trending import trend_tracker
 
         limit = int(request.query_params.get('limit', 20))
         limit = min(limit, 50)  # Max 50 trending hashtags
 
-        trending_hashtags = Hashtag.objects.filter(
-            is_deleted=False,
-            is_trending=True
-        ).order_by('-posts_count')[:limit]
+        # Ranked by decayed score straight from the Redis sorted set
+        try:
+            hashtag_data = trend_tracker.top_with_metadata(limit)
+        except redis.RedisError:
+            hashtag_data = None
 
-        hashtag_data = [
-            {
-                'name': hashtag.name,
-                'posts_count': hashtag.posts_count,
-                'is_trending': hashtag.is_trending,
-                'created_at': hashtag.created_at.isoformat()
-            }
-            for hashtag in trending_hashtags
-        ]
+        if not hashtag_data:
+            trending_hashtags = Hashtag.objects.filter(
+                is_deleted=False,
+                is_trending=True
+            ).order_by('-trending_score', '-posts_count')[:limit]
+
+            hashtag_data = [
+                {
+                    'name': hashtag.name,
+                    'posts_count': hashtag.posts_count,
+                    'is_trending': hashtag.is_trending,
+                    'trending_score': hashtag.trending_score,
+                    'created_at': hashtag.created_at.isoformat()
+                }
+                for hashtag in trending_hashtags
+            ]
 
         return Response({
             'results': hashtag_data,
@@ -8,6 +8,7 @@ import unicodedata
 import hashlib
 import random
 import statistics
+from collections import defaultdict
 from datetime import timedelta
 from django.utils import timezone
 from django.db.models import Count, Q, F
@@ -547,120 +548,47 @@ def create_content_analysis(content_object, analysis_types=None):
     return created_analyses
 
 
-def check_moderation_rules(content_object):
-    """Check content against all applicable moderation rules."""
-    from content.models import ContentModerationRule
+def check_moderation_rules(content_object, exclude_rule_ids=()):
+    """
+    Check content against all applicable moderation rules.
 
-    # Get applicable rules
-    rules = ContentModerationRule.objects.filter(is_active=True)
+    Uses the compiled rule set cached for the content's kind and community
+    (see content.moderation_rules); rules in ``exclude_rule_ids`` are
+    skipped.
+    """
+    from content.moderation_rules import compiled_rules
 
-    # Filter by content type
-    if hasattr(content_object, '__class__'):
-        model_name = content_object.__class__.__name__.lower()
-        if model_name == 'post':
-            rules = rules.filter(applies_to_posts=True)
-        elif model_name == 'comment':
-            rules = rules.filter(applies_to_comments=True)
+    if not getattr(content_object, 'content', ''):
+        return []
 
-    # Filter by community if applicable
-    if hasattr(content_object, 'community') and content_object.community:
-        rules = rules.filter(
-            Q(community=content_object.community) | Q(community=None)
-        )
+    rule_set = compiled_rules.for_content(content_object)
+    return _create_moderation_actions(
+        content_object, rule_set.evaluate(content_object, exclude_rule_ids)
+    )
 
-    triggered_actions = []
 
-    for rule in rules:
-        action = evaluate_moderation_rule(content_object, rule)
-        if action:
-            triggered_actions.append(action)
+def evaluate_moderation_rule(content_object, rule):
+    """Evaluate a specific moderation rule against content."""
+    from content.moderation_rules import CompiledRuleSet
 
-    return triggered_actions
+    actions = _create_moderation_actions(
+        content_object, CompiledRuleSet([rule]).evaluate(content_object)
+    )
+    return actions[0] if actions else None
 
 
-def evaluate_moderation_rule(content_object, rule):
-    """Evaluate a specific moderation rule against content."""
-    from content.models import AutoModerationAction, ContentAnalysis
+def _create_moderation_actions(content_object, triggered):
+    """Record an AutoModerationAction per ``(rule, confidence, reason)``."""
+    from content.models import AutoModerationAction
     from django.contrib.contenttypes.models import ContentType
 
-    content_text = getattr(content_object, 'content', '')
-    if not content_text:
-        return None
+    if not triggered:
+        return []
 
-    rule_triggered = False
-    confidence_score = 0.0
-    reason = ""
-
-    if rule.rule_type == 'keyword':
-        # Check for banned keywords
-        keywords = rule.configuration.get('keywords', [])
-        for keyword in keywords:
-            if keyword.lower() in content_text.lower():
-                rule_triggered = True
-                confidence_score = 1.0
-                reason = f"Contains banned keyword: {keyword}"
-                break
-
-    elif rule.rule_type == 'ml_toxicity':
-        # Check toxicity analysis
-        try:
-            analysis = ContentAnalysis.objects.get(
-                content_type=ContentType.objects.get_for_model(content_object),
-                object_id=content_object.id,
-                analysis_type='toxicity'
-            )
-            threshold = rule.configuration.get('toxicity_threshold', 0.7)
-            if (
-                analysis.toxicity_score and
-                analysis.toxicity_score >= threshold
-            ):
-                rule_triggered = True
-                confidence_score = analysis.toxicity_score
-                reason = f"High toxicity score: {analysis.toxicity_score:.2f}"
-        except ContentAnalysis.DoesNotExist:
-            pass
-
-    elif rule.rule_type == 'ml_spam':
-        # Check spam analysis
-        try:
-            analysis = ContentAnalysis.objects.get(
-                content_type=ContentType.objects.get_for_model(content_object),
-                object_id=content_object.id,
-                analysis_type='toxicity'
-            )
-            threshold = rule.configuration.get('spam_threshold', 0.8)
-            if (
-                analysis.spam_score and
-                analysis.spam_score >= threshold
-            ):
-                rule_triggered = True
-                confidence_score = analysis.spam_score
-                reason = f"High spam score: {analysis.spam_score:.2f}"
-        except ContentAnalysis.DoesNotExist:
-            pass
-
-    elif rule.rule_type == 'sentiment':
-        # Check sentiment analysis
-        try:
-            analysis = ContentAnalysis.objects.get(
-                content_type=ContentType.objects.get_for_model(content_object),
-                object_id=content_object.id,
-                analysis_type='sentiment'
-            )
-            blocked_sentiments = rule.configuration.get(
-                'blocked_sentiments', []
-            )
-            if analysis.sentiment in blocked_sentiments:
-                rule_triggered = True
-                confidence_score = analysis.sentiment_confidence or 0.8
-                reason = f"Blocked sentiment: {analysis.sentiment}"
-        except ContentAnalysis.DoesNotExist:
-            pass
-
-    if rule_triggered:
-        # Create auto moderation action
-        action = AutoModerationAction.objects.create(
-            content_type=ContentType.objects.get_for_model(content_object),
+    content_type = ContentType.objects.get_for_model(content_object)
+    return [
+        AutoModerationAction.objects.create(
+            content_type=content_type,
             object_id=content_object.id,
             target_user=getattr(content_object, 'author', None),
             action_type=rule.action,
@@ -669,15 +597,12 @@ def evaluate_moderation_rule(content_object, rule):
             confidence_score=confidence_score,
             severity_level=rule.severity_level
         )
-        return action
-
-    return None
+        for rule, confidence_score, reason in triggered
+    ]
 
 
 def process_content_for_moderation(content_object):
     """Complete moderation processing for new content."""
-    from content.models import ModerationQueue
-
     # Step 1: Create content analysis
     analyses = create_content_analysis(content_object)
 
@@ -685,6 +610,21 @@ def process_content_for_moderation(content_object):
     triggered_actions = check_moderation_rules(content_object)
 
     # Step 3: Handle high-risk content
+    queue_high_risk_actions(triggered_actions)
+
+    return {
+        'analyses': analyses,
+        'actions': triggered_actions,
+        'requires_review': (
+            len([a for a in triggered_actions if a.severity_level >= 3]) > 0
+        )
+    }
+
+
+def queue_high_risk_actions(triggered_actions):
+    """Add high-severity or high-confidence actions to the review queue."""
+    from content.models import ModerationQueue
+
     for action in triggered_actions:
         if action.severity_level >= 3 or action.confidence_score >= 0.8:
             # Add to moderation queue for human review
@@ -697,14 +637,6 @@ def process_content_for_moderation(content_object):
                 auto_moderation_action=action
             )
 
-    return {
-        'analyses': analyses,
-        'actions': triggered_actions,
-        'requires_review': (
-            len([a for a in triggered_actions if a.severity_level >= 3]) > 0
-        )
-    }
-
 
 def get_content_safety_score(content_object):
     """Get overall safety score for content based on all analyses."""
@@ -747,26 +679,41 @@ def analyze_user_posting_patterns(user):
     end_date = timezone.now()
     start_date = end_date - timedelta(days=30)
 
-    posts = Post.objects.filter(
-        author=user,
-        created_at__gte=start_date
-    ).order_by('created_at')
+    activities = sorted(
+        list(Post.objects.filter(
+            author=user, created_at__gte=start_date
+        ).values_list('created_at', flat=True)) +
+        list(Comment.objects.filter(
+            author=user, created_at__gte=start_date
+        ).values_list('created_at', flat=True))
+    )
 
-    comments = Comment.objects.filter(
-        author=user,
-        created_at__gte=start_date
-    ).order_by('created_at')
+    # Calculate intervals between activities
+    intervals = [
+        (activities[i] - activities[i - 1]).total_seconds()
+        for i in range(1, len(activities))
+    ]
+    if len(intervals) < 2:
+        return score_posting_intervals(len(intervals), None, 0.0, 0)
+
+    return score_posting_intervals(
+        interval_count=len(intervals),
+        avg_interval=statistics.mean(intervals),
+        std_deviation=statistics.stdev(intervals),
+        # Rapid posting incidents (posts within 10 seconds)
+        rapid_incidents=len([i for i in intervals if i < 10]),
+    )
 
-    # Combine and sort all activities
-    activities = []
-    for post in posts:
-        activities.append(('post', post.created_at))
-    for comment in comments:
-        activities.append(('comment', comment.created_at))
 
-    activities.sort(key=lambda x: x[1])
+def score_posting_intervals(interval_count, avg_interval, std_deviation,
+                            rapid_incidents):
+    """
+    Timing score from the gaps between a user's posts and comments.
 
-    if len(activities) < 3:
+    Used by the 30-day analysis above and by the running statistics kept in
+    Redis (content.posting_activity.PostingActivityTracker.interval_stats).
+    """
+    if interval_count < 2 or avg_interval is None:
         return {
             'timing_score': 0.0,
             'avg_interval': None,
@@ -774,17 +721,8 @@ def analyze_user_posting_patterns(user):
             'rapid_incidents': 0,
         }
 
-    # Calculate intervals between activities
-    intervals = []
-    for i in range(1, len(activities)):
-        interval = (activities[i][1] - activities[i-1][1]).total_seconds()
-        intervals.append(interval)
-
-    avg_interval = statistics.mean(intervals)
-
     # Detect suspiciously regular intervals (bot-like)
-    if len(intervals) > 5:
-        std_deviation = statistics.stdev(intervals)
+    if interval_count > 5:
         coefficient_of_variation = (
             std_deviation / avg_interval if avg_interval > 0 else 0
         )
@@ -793,12 +731,6 @@ def analyze_user_posting_patterns(user):
     else:
         regularity_score = 0.0
 
-    # Detect rapid posting incidents (posts within 10 seconds)
-    rapid_incidents = 0
-    for interval in intervals:
-        if interval < 10:  # Less than 10 seconds
-            rapid_incidents += 1
-
     # Calculate timing score
     timing_score = 0.0
 
@@ -807,8 +739,7 @@ def analyze_user_posting_patterns(user):
         timing_score += 0.4
 
     # Rapid posting is suspicious
-    rapid_ratio = rapid_incidents / len(intervals) if intervals else 0
-    timing_score += rapid_ratio * 0.5
+    timing_score += rapid_incidents / interval_count * 0.5
 
     # Very short average intervals are suspicious
     if avg_interval < 60:  # Less than 1 minute average
@@ -1044,23 +975,29 @@ def create_bot_detection_event(
 
 
 def check_rapid_posting(user, content_object):
-    """Check if user is posting too rapidly."""
-    from content.models import Post, Comment
-
-    # Check last 5 minutes of activity
-    recent_time = timezone.now() - timedelta(minutes=5)
-
-    recent_posts = Post.objects.filter(
-        author=user,
-        created_at__gte=recent_time
-    ).count()
+    """
+    Check if user is posting too rapidly.
 
-    recent_comments = Comment.objects.filter(
-        author=user,
-        created_at__gte=recent_time
-    ).count()
+    Reads the user's sliding-window count from Redis
+    (content.posting_activity); counts the last 5 minutes of posts and
+    comments in the database if Redis is unavailable.
+    """
+    from content.models import Post, Comment
+    from content.posting_activity import posting_activity
 
-    total_recent = recent_posts + recent_comments
+    # Check the 5 minutes up to the content's creation
+    created_at = getattr(content_object, 'created_at', None)
+    try:
+        total_recent = posting_activity.recent_count(user.id, created_at)
+    except Exception:
+        recent_time = (created_at or timezone.now()) - timedelta(minutes=5)
+        total_recent = Post.objects.filter(
+            author=user,
+            created_at__gte=recent_time
+        ).count() + Comment.objects.filter(
+            author=user,
+            created_at__gte=recent_time
+        ).count()
 
     # Threshold: more than 10 posts/comments in 5 minutes
     if total_recent > 10:
@@ -1085,14 +1022,39 @@ def check_rapid_posting(user, content_object):
     return False
 
 
+def check_posting_regularity(user):
+    """
+    Whether the gaps between the user's posts/comments look automated.
+
+    A single read of the running statistics kept in Redis
+    (content.posting_activity); False if Redis is unavailable.
+    """
+    from content.posting_activity import posting_activity
+
+    try:
+        stats = posting_activity.interval_stats(user.id)
+    except Exception:
+        return False
+    return score_posting_intervals(**stats)['timing_score'] >= 0.7
+
+
 def check_duplicate_content(user, content_object):
     """Check if user is posting duplicate content.
 
     Excludes legitimate reposts from duplicate detection since reposts
     are expected to be similar to their parent posts.
+
+    Looks the text up in the near-duplicate index (content.duplicate_index):
+    the user's own posts or comments of the last 24 hours, then the same
+    text from other accounts in the last hour (spam waves, for texts long
+    enough not to be common short replies). Compares with the user's
+    recent texts in the database if Redis is unavailable.
     """
     from content.models import Post, Comment
-    from difflib import SequenceMatcher
+    from content.duplicate_index import (
+        DUPLICATE_WINDOW, SPAM_WAVE_ACCOUNTS, SPAM_WAVE_MIN_SHINGLES,
+        SPAM_WAVE_WINDOW, duplicate_index, text_shingles, text_signature
+    )
 
     content_text = getattr(content_object, 'content', '')
     if not content_text or len(content_text.strip()) < 10:
@@ -1102,7 +1064,84 @@ def check_duplicate_content(user, content_object):
     if isinstance(content_object, Post) and content_object.is_repost:
         return False
 
-    # Check last 24 hours for similar content
+    is_post = isinstance(content_object, Post)
+    related = {
+        'related_post': content_object if is_post else None,
+        'related_comment': (
+            content_object if isinstance(content_object, Comment) else None
+        ),
+    }
+    kind = 'post' if is_post else 'comment'
+    signature = (
+        content_object.duplicate_signature or text_signature(content_text)
+    )
+    created_at = getattr(content_object, 'created_at', None)
+    member = duplicate_index.member(kind, content_object.id, user.id)
+
+    try:
+        own_duplicates = duplicate_index.find(
+            signature, DUPLICATE_WINDOW, user_id=user.id, at=created_at,
+            kind=kind, exclude=member
+        )
+        wave_accounts = set()
+        if not own_duplicates and (
+            len(text_shingles(content_text)) >= SPAM_WAVE_MIN_SHINGLES
+        ):
+            wave_accounts = {
+                match['user_id'] for match in duplicate_index.find(
+                    signature, SPAM_WAVE_WINDOW, at=created_at, exclude=member
+                )
+            } - {str(user.id)}
+    except Exception:
+        similarity = _recent_duplicate_similarity(
+            user, content_object, content_text
+        )
+        own_duplicates = (
+            [{'similarity': similarity}] if similarity is not None else []
+        )
+        wave_accounts = set()
+
+    if own_duplicates:
+        similarity = own_duplicates[0]['similarity']
+        create_bot_detection_event(
+            user=user,
+            event_type='duplicate_content',
+            severity=2,
+            description=(
+                f"Posted content {similarity:.1%} similar to recent post"
+            ),
+            confidence_score=similarity,
+            metadata={'similarity_score': similarity},
+            **related
+        )
+        return True
+
+    if len(wave_accounts) >= SPAM_WAVE_ACCOUNTS:
+        create_bot_detection_event(
+            user=user,
+            event_type='copy_paste',
+            severity=3,
+            description=(
+                f"Posted content also posted by {len(wave_accounts)} other "
+                f"accounts in the last hour"
+            ),
+            confidence_score=0.9,
+            metadata={'other_accounts': len(wave_accounts)},
+            **related
+        )
+        return True
+
+    return False
+
+
+def _recent_duplicate_similarity(user, content_object, content_text):
+    """
+    Similarity of the first of the user's texts of the last 24 hours that
+    is more than 90% similar to ``content_text``, or None.
+    """
+    from content.models import Post
+    from difflib import SequenceMatcher
+
     recent_time = timezone.now() - timedelta(hours=24)
 
     if isinstance(content_object, Post):
@@ -1114,7 +1153,7 @@ def check_duplicate_content(user, content_object):
             parent_post__isnull=True  # Only compare with original posts
         ).exclude(id=content_object.id).values_list('content', flat=True)
     else:
-        recent_content = Comment.objects.filter(
+        recent_content = content_object.__class__.objects.filter(
             author=user,
             created_at__gte=recent_time
         ).exclude(id=content_object.id).values_list('content', flat=True)
@@ -1129,38 +1168,32 @@ def check_duplicate_content(user, content_object):
             ).ratio()
 
             if similarity > 0.9:  # 90% similar
-                create_bot_detection_event(
-                    user=user,
-                    event_type='duplicate_content',
-                    severity=2,
-                    description=(
-                        f"Posted content {similarity:.1%} similar to recent post"
-                    ),
-                    confidence_score=similarity,
-                    related_post=(
-                        content_object if isinstance(content_object, Post)
-                        else None
-                    ),
-                    related_comment=(
-                        content_object if isinstance(content_object, Comment)
-                        else None
-                    ),
-                    metadata={'similarity_score': similarity}
-                )
-                return True
+                return similarity
 
-    return False
+    return None
 
 
 def is_user_blocked_as_bot(user):
     """Check if user is blocked as a bot."""
+    return is_user_id_blocked_as_bot(user.id)
+
+
+def is_user_id_blocked_as_bot(user_id):
+    """
+    Check if the user profile with this id is blocked as a bot.
+
+    Served from the cached blocked set (``content.bot_blocks``), without a
+    database query; the profile is only read when Redis is unavailable.
+    """
+    from content.bot_blocks import blocked_bots
     from content.models import BotDetectionProfile
 
-    try:
-        profile = BotDetectionProfile.objects.get(user=user)
-        return profile.auto_blocked
-    except BotDetectionProfile.DoesNotExist:
-        return False
+    blocked = blocked_bots.is_blocked(user_id)
+    if blocked is not None:
+        return blocked
+    return BotDetectionProfile.objects.filter(
+        user_id=user_id, auto_blocked=True
+    ).exists()
 
 
 def process_content_for_bot_detection(content_object):
@@ -1183,9 +1216,12 @@ def process_content_for_bot_detection(content_object):
     if check_duplicate_content(user, content_object):
         events.append('duplicate_content')
 
-    # Update bot detection profile every 10th post/comment
-    if random.randint(1, 10) == 1:  # 10% chance to update profile
-        update_bot_detection_profile(user)
+    # Regular or rapid gaps between posts: refresh the full profile now
+    # (at most every 10 minutes) instead of at the next scheduled analysis
+    if check_posting_regularity(user):
+        events.append('unusual_timing')
+        if cache.add(f'bot:profile_refresh:{user.id}', 1, 600):
+            update_bot_detection_profile(user)
 
     return {
         'bot_detected': len(events) > 0,
@@ -1404,11 +1440,40 @@ def get_content_based_recommendations(user, limit=10):
     return recommendations
 
 
+def get_stored_collaborative_recommendations(user, limit=10):
+    """
+    Collaborative recommendations precomputed by the batch engine
+    (content.collaborative), as ``(post, score)`` pairs in rank order.
+    """
+    from content.models import ContentRecommendation, Post
+
+    stored = list(ContentRecommendation.objects.filter(
+        user=user,
+        recommendation_type='collaborative',
+        is_deleted=False,
+        expires_at__gt=timezone.now()
+    ).order_by('rank').values_list('object_id', 'score')[:limit])
+    if not stored:
+        return []
+
+    posts = Post.objects.filter(
+        is_deleted=False, is_hidden=False
+    ).in_bulk([post_id for post_id, _ in stored])
+    return [
+        (posts[post_id], score) for post_id, score in stored
+        if post_id in posts
+    ]
+
+
 def get_collaborative_filtering_recommendations(user, limit=10):
     """Get recommendations using collaborative filtering."""
     from content.models import PostReaction, Post
     from django.db.models import Count
 
+    stored = get_stored_collaborative_recommendations(user, limit)
+    if stored:
+        return stored
+
     # Get users with similar interests (users who liked similar posts)
     user_interactions = get_user_content_interactions(user)
     user_liked_posts = user_interactions['liked_posts']
@@ -1437,7 +1502,6 @@ def get_collaborative_filtering_recommendations(user, limit=10):
     ).values_list('post_id', flat=True)
 
     # Exclude posts disliked by the user
-    user_interactions = get_user_content_interactions(user)
     recommended_posts = Post.objects.filter(
         id__in=liked_post_ids,
         is_deleted=False,
@@ -1616,37 +1680,48 @@ def get_user_interaction_frequency(user, days=7):
 
 
 def generate_collaborative_recommendations(user, limit=15):
-    """Generate recommendations using advanced collaborative filtering."""
+    """
+    Generate recommendations using advanced collaborative filtering.
+
+    Returns the rows precomputed by the nightly batch engine when present;
+    otherwise computes them for this user alone with a fixed number of
+    queries.
+    """
     from content.models import PostReaction, Post
 
+    stored = get_stored_collaborative_recommendations(user, limit)
+    if stored:
+        return stored
+
     # Get user's liked posts (positive reactions)
-    user_liked_posts = PostReaction.objects.filter(
+    user_liked_set = set(PostReaction.objects.filter(
         user=user,
-        reaction_type__in=PostReaction.POSITIVE_REACTIONS
-    ).values_list('post_id', flat=True)
+        reaction_type__in=PostReaction.POSITIVE_REACTIONS,
+        is_deleted=False
+    ).values_list('post_id', flat=True))
 
-    if len(user_liked_posts) < 3:
+    if len(user_liked_set) < 3:
         # Not enough data for collaborative filtering
         return []
 
-    # Find users with similar tastes using Jaccard similarity
-    similar_users_data = []
-
-    # Get all users who liked at least one post that current user liked
+    # Likes of every user who liked at least one post the current user
+    # liked, in one query
     potential_similar_users = PostReaction.objects.filter(
-        post_id__in=user_liked_posts,
-        reaction_type__in=PostReaction.POSITIVE_REACTIONS
-    ).exclude(user=user).values_list('user', flat=True).distinct()
-
-    user_liked_set = set(user_liked_posts)
+        post_id__in=user_liked_set,
+        reaction_type__in=PostReaction.POSITIVE_REACTIONS,
+        is_deleted=False
+    ).exclude(user=user).values('user')
+    likes_by_user = defaultdict(set)
+    for similar_user_id, post_id in PostReaction.objects.filter(
+        user_id__in=potential_similar_users,
+        reaction_type__in=PostReaction.POSITIVE_REACTIONS,
+        is_deleted=False
+    ).values_list('user_id', 'post_id'):
+        likes_by_user[similar_user_id].add(post_id)
 
-    for similar_user_id in potential_similar_users:
-        similar_user_likes = set(
-            PostReaction.objects.filter(
-                user_id=similar_user_id,
-                reaction_type__in=PostReaction.POSITIVE_REACTIONS
-            ).values_list('post_id', flat=True)
-        )
+    # Find users with similar tastes using Jaccard similarity
+    similar_users_data = []
+    for similar_user_id, similar_user_likes in likes_by_user.items():
         intersection = user_liked_set.intersection(similar_user_likes)
         union = user_liked_set.union(similar_user_likes)
         if union:
@@ -1687,27 +1762,32 @@ def generate_collaborative_recommendations(user, limit=15):
             bucket['score'] += similar_user['similarity']
             bucket['similar_users'] += 1
             bucket['total_similarity'] += similar_user['similarity']
+
+    candidate_ids = [
+        post_id for post_id, data in recommendation_candidates.items()
+        if data['similar_users'] >= 2
+    ]
+    posts = Post.objects.filter(
+        is_deleted=False,
+        is_hidden=False,
+        created_at__gte=timezone.now() - timedelta(days=90)
+    ).in_bulk(candidate_ids)
+
     final_recommendations = []
-    for post_id, data in recommendation_candidates.items():
-        if data['similar_users'] >= 2:
-            try:
-                post = Post.objects.get(
-                    id=post_id,
-                    is_deleted=False,
-                    is_hidden=False,
-                    created_at__gte=timezone.now() - timedelta(days=90)
-                )
-            except Post.DoesNotExist:
-                continue
-            dislikes = getattr(post, 'dislikes_count', 0)
-            likes = getattr(post, 'likes_count', 0)
-            penalty = min(dislikes / max(likes + 1, 1), 1.0)
-            avg_sim = data['total_similarity'] / data['similar_users']
-            crowd = min(data['similar_users'] / 5.0, 1.0)
-            final_score = (
-                avg_sim * 0.7 + crowd * 0.3 - penalty * 0.5
-            )
-            final_recommendations.append((post, final_score))
+    for post_id in candidate_ids:
+        post = posts.get(post_id)
+        if post is None:
+            continue
+        data = recommendation_candidates[post_id]
+        dislikes = getattr(post, 'dislikes_count', 0)
+        likes = getattr(post, 'likes_count', 0)
+        penalty = min(dislikes / max(likes + 1, 1), 1.0)
+        avg_sim = data['total_similarity'] / data['similar_users']
+        crowd = min(data['similar_users'] / 5.0, 1.0)
+        final_score = (
+            avg_sim * 0.7 + crowd * 0.3 - penalty * 0.5
+        )
+        final_recommendations.append((post, final_score))
     final_recommendations.sort(key=lambda x: x[1], reverse=True)
     return final_recommendations[:limit]
 
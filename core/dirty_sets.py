@@ -0,0 +1,56 @@
+"""
+Redis sets of object ids whose denormalized counters need reconciling.
+
+Signals mark ids after commit; periodic tasks drain the set in chunks and
+recompute only those rows (see ``content.counters`` and
+``accounts.counters``). ``content.ingest`` queues new posts and comments
+the same way.
+"""
+
+import logging
+from typing import List
+
+import redis
+from django.conf import settings
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+
+class DirtyIdSet:
+    """Redis set of ids awaiting a counter recount."""
+
+    def __init__(self, key: str):
+        self.key = key
+        self.redis_client = redis.Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=0.1,
+            socket_connect_timeout=0.1
+        )
+
+    def add(self, *ids) -> None:
+        """Add ids to the set; raises if Redis is unavailable."""
+        ids = [str(object_id) for object_id in ids if object_id]
+        if ids:
+            self.redis_client.sadd(self.key, *ids)
+
+    def mark(self, *ids) -> None:
+        """Add ids to the set; never raises."""
+        try:
+            self.add(*ids)
+        except Exception as e:
+            logger.debug(f"Dirty set {self.key} unavailable: {e}")
+
+    def mark_on_commit(self, *ids) -> None:
+        """Mark once the current transaction commits, so the recount sees it."""
+        transaction.on_commit(lambda: self.mark(*ids))
+
+    def pop_batch(self, size: int) -> List[str]:
+        """Atomically remove and return up to ``size`` ids."""
+        return [
+            object_id.decode() if isinstance(object_id, bytes) else object_id
+            for object_id in self.redis_client.spop(self.key, size) or []
+        ]
+
+    def __len__(self) -> int:
+        return self.redis_client.scard(self.key)
@@ -122,6 +122,32 @@ class FastLocationService:
         except Exception as exc:
             logger.error(f"Failed to cache location data for {ip_address}: {exc}")
 
+    @classmethod
+    def _cache_many_location_data(cls, locations: Dict[str, Dict[str, Any]]):
+        """
+        Cache lookup results for several IPs in one round trip. Empty results
+        are cached for an hour so unknown IPs are not looked up repeatedly.
+        """
+        found, not_found = {}, {}
+        for ip_address, location_data in locations.items():
+            cache_key = f"location:{ip_address}"
+            if not location_data:
+                not_found[cache_key] = {}
+                continue
+            found[cache_key] = {
+                key: str(value) if not isinstance(value, (str, int, float, bool)) else value
+                for key, value in location_data.items()
+                if value is not None
+            }
+
+        try:
+            if found:
+                cache.set_many(found, cls.LOCATION_CACHE_TIMEOUT)
+            if not_found:
+                cache.set_many(not_found, 3600)
+        except Exception as exc:
+            logger.error(f"Failed to cache location data for {len(locations)} IPs: {exc}")
+
     @classmethod
     def preload_session_location_cache(cls, session_id: str, location_data: Dict[str, Any]):
         """
@@ -203,12 +229,16 @@ class FastLocationService:
         """
         logger.info(f"Warming up location cache for {len(ip_addresses)} IPs")
 
-        for ip_address in ip_addresses:
-            # Check if already cached
-            cache_key = f"location:{ip_address}"
-            if not cache.get(cache_key):
-                # Trigger async population
-                cls._populate_location_cache_async(ip_address)
+        cached = cache.get_many([f"location:{ip}" for ip in ip_addresses])
+        missing = [
+            ip for ip in ip_addresses if not cached.get(f"location:{ip}")
+        ]
+        if not missing:
+            return
+
+        # Resolve all misses against the shared GeoIP reader in one pass
+        from core.utils import get_locations_from_ips
+        cls._cache_many_location_data(get_locations_from_ips(missing))
 
     @classmethod
     def clear_location_cache(cls, ip_address: Optional[str] = None):
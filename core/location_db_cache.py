@@ -1,10 +1,15 @@
+import os
 import redis
 import logging
 import pickle
+import threading
+import time
 import zlib  # For compression
 from django.conf import settings
 from django.core.cache import cache
 from typing import Dict, Any
+from .spatial_index import division_spatial_index
+from .utils import LocalLRUCache, _MISSING
 
 logger = logging.getLogger(__name__)
 
@@ -12,6 +17,23 @@ logger = logging.getLogger(__name__)
 SESSION_DURATION_HOURS = 4  # From session settings
 LOCATION_CACHE_TIMEOUT = SESSION_DURATION_HOURS * 3600  # Use session duration
 
+# In-process tier: bounded size and a short TTL so other processes' writes
+# are picked up even if an invalidation message is missed
+LOCAL_CACHE_SIZE = getattr(settings, 'LOCATION_LOCAL_CACHE_SIZE', 5000)
+LOCAL_CACHE_TIMEOUT = getattr(settings, 'LOCATION_LOCAL_CACHE_TIMEOUT', 300)
+
+# Pub/sub channel carrying invalidations: '*' or a cache key prefix
+INVALIDATION_CHANNEL = 'location_cache:invalidate'
+
+# Every key family written by LocationCacheService
+LOCATION_KEY_PREFIXES = (
+    'location:country_code:',
+    'location:country_id:',
+    'location:city:',
+    'location:city_id:',
+    'location:admin_division_id:',
+    'location:coords:',
+)
 
 class LocationCacheService:
     """
@@ -55,11 +77,92 @@ class LocationCacheService:
 
             self.redis_client = LocationCacheService._redis_client
 
+        self.local_cache = LocalLRUCache(LOCAL_CACHE_SIZE, LOCAL_CACHE_TIMEOUT)
+        self._stats = {
+            tier: {'hits': 0, 'misses': 0}
+            for tier in ('local', 'django', 'redis')
+        }
+        self._stats_lock = threading.Lock()
+        self._listener_pid = None
+        self._listener_thread = None
+
+    def _record(self, tier: str, hit: bool):
+        with self._stats_lock:
+            self._stats[tier]['hits' if hit else 'misses'] += 1
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters per tier for this process."""
+        with self._stats_lock:
+            stats = {tier: dict(counts) for tier, counts in self._stats.items()}
+        stats['local']['size'] = len(self.local_cache)
+        return stats
+
+    def _ensure_invalidation_listener(self):
+        """
+        Subscribe this process to invalidation broadcasts.
+
+        Started lazily (and again after a fork) so every worker process has
+        its own listener thread.
+        """
+        if not self.use_redis or self._listener_pid == os.getpid():
+            return
+        self._listener_pid = os.getpid()
+        try:
+            # Dedicated client: the pool's 0.5s socket timeout would break
+            # the blocking subscription read
+            listener_client = redis.Redis(
+                host=getattr(settings, 'REDIS_HOST', 'redis'),
+                port=getattr(settings, 'REDIS_PORT', 6379),
+                db=getattr(settings, 'REDIS_DB', 0),
+                password=getattr(settings, 'REDIS_PASSWORD', None),
+                socket_keepalive=True,
+                health_check_interval=30,
+            )
+            pubsub = listener_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{
+                INVALIDATION_CHANNEL: self._handle_invalidation_message
+            })
+            self._listener_thread = pubsub.run_in_thread(
+                sleep_time=1.0, daemon=True,
+                exception_handler=self._handle_listener_error
+            )
+        except Exception as e:
+            logger.warning(f"Location cache invalidation listener failed: {e}")
+            # Without broadcasts, rely on the local TTL alone
+
+    def _handle_invalidation_message(self, message):
+        data = message.get('data')
+        if isinstance(data, bytes):
+            data = data.decode()
+        if not data or data == '*':
+            self.local_cache.clear()
+        else:
+            self.local_cache.delete_prefix(data)
+        if not data or data in ('*', 'location:coords:'):
+            division_spatial_index.reset()
+
+    def _handle_listener_error(self, exc, pubsub, thread):
+        # Invalidations may have been missed while disconnected
+        logger.debug(f"Location cache invalidation listener error: {exc}")
+        self.local_cache.clear()
+        time.sleep(1.0)
+
     def _get_from_cache(self, cache_key: str) -> Any:
-        """Get data from cache (Django first for speed, Redis as backup)."""
-        # Try Django cache first (fastest access)
+        """
+        Get data from cache: in-process first, then Django, then Redis.
+        """
+        self._ensure_invalidation_listener()
+        cached_data = self.local_cache.get(cache_key)
+        if cached_data is not _MISSING:
+            self._record('local', True)
+            return cached_data
+        self._record('local', False)
+
+        # Try Django cache next
         cached_data = cache.get(cache_key)
+        self._record('django', cached_data is not None)
         if cached_data is not None:
+            self.local_cache.set(cache_key, cached_data)
             return cached_data
 
         # If not in Django cache, try Redis (distributed/persistent cache)
@@ -78,9 +181,12 @@ class LocationCacheService:
                         # Standard pickle deserialization
                         result = pickle.loads(redis_data)
 
-                    # Store in Django cache for faster next access
+                    # Store in the faster tiers for the next access
+                    self._record('redis', True)
                     cache.set(cache_key, result, LOCATION_CACHE_TIMEOUT)
+                    self.local_cache.set(cache_key, result)
                     return result
+                self._record('redis', False)
             except Exception as e:
                 logger.debug(f"Redis get failed for {cache_key}: {e}")
 
@@ -89,8 +195,8 @@ class LocationCacheService:
 
     def _set_in_cache(self, cache_key: str, value: Any,
                       timeout: int = LOCATION_CACHE_TIMEOUT):
-        """Set data in both caches - Django for speed, Redis for distribution."""
-        # Always store in Django cache first (fastest for immediate access)
+        """Set data in all tiers - local and Django for speed, Redis for distribution."""
+        self.local_cache.set(cache_key, value)
         cache.set(cache_key, value, timeout)
 
         # Also store in Redis for distributed access and persistence
@@ -124,36 +230,61 @@ class LocationCacheService:
         """Get multiple keys from cache in a single operation (Redis optimization)."""
         results = {}
 
-        if self.use_redis and cache_keys:
+        # Serve what we can from the in-process tier
+        remaining = []
+        for key in cache_keys:
+            cached_data = self.local_cache.get(key)
+            self._record('local', cached_data is not _MISSING)
+            if cached_data is _MISSING:
+                remaining.append(key)
+            else:
+                results[key] = cached_data
+        if not remaining:
+            return results
+
+        if self.use_redis:
             try:
                 # Single Redis pipeline call for multiple keys
                 pipe = self.redis_client.pipeline()
-                for key in cache_keys:
+                for key in remaining:
                     pipe.get(key)
                 redis_results = pipe.execute()
 
-                for i, key in enumerate(cache_keys):
+                for i, key in enumerate(remaining):
                     cached_data = redis_results[i]
+                    self._record('redis', cached_data is not None)
                     if cached_data is not None:
                         if cached_data == b'false':
                             results[key] = False
                         else:
                             try:
+                                if cached_data.startswith(b'ZLIB:'):
+                                    cached_data = zlib.decompress(
+                                        cached_data[5:]
+                                    )
                                 results[key] = pickle.loads(cached_data)
-                            except pickle.PickleError:
+                            except (pickle.PickleError, zlib.error):
                                 results[key] = None
+                        if results[key] is not None:
+                            self.local_cache.set(key, results[key])
                 return results
             except Exception as e:
                 logger.debug(f"Redis mget failed: {e}")
 
         # Fallback to Django cache
-        for key in cache_keys:
+        for key in remaining:
             results[key] = cache.get(key)
+            self._record('django', results[key] is not None)
+            if results[key] is not None:
+                self.local_cache.set(key, results[key])
         return results
 
     def _set_multiple_in_cache(self, items: Dict[str, Any],
                                timeout: int = LOCATION_CACHE_TIMEOUT):
         """Set multiple items in cache with single pipeline operation."""
+        for key, value in items.items():
+            self.local_cache.set(key, value)
+
         if self.use_redis and items:
             try:
                 # Single Redis pipeline for multiple sets
@@ -385,7 +516,21 @@ class LocationCacheService:
                 return None
             return cached_data
 
-        # Not in cache, find closest division
+        # Not in cache: resolve in memory from the point-in-polygon index
+        try:
+            division_id = division_spatial_index.find_division_id(
+                lat, lng, country
+            )
+        except Exception as e:
+            logger.debug(f"Spatial index lookup failed: {e}")
+            division_id = None
+        if division_id:
+            division = self.get_administrative_division_by_id(division_id)
+            if division:
+                self._set_in_cache(cache_key, division)
+                return division
+
+        # Outside every indexed polygon: find the closest division
         try:
             from django.contrib.gis.geos import Point
             from django.contrib.gis.db.models.functions import Distance
@@ -395,14 +540,14 @@ class LocationCacheService:
 
             # Build query
             queryset = AdministrativeDivision.objects.filter(
-                geometry__dwithin=(user_point, 0.1)  # ~10km
+                area_geometry__dwithin=(user_point, 0.1)  # ~10km
             )
 
             if country:
                 queryset = queryset.filter(country=country)
 
             division = queryset.annotate(
-                distance=Distance('geometry', user_point)
+                distance=Distance('area_geometry', user_point)
             ).order_by('distance').first()
 
             # Cache result (even if None)
@@ -595,21 +740,41 @@ class LocationCacheService:
                 f"Failed to preload cache for session {session_id}: {e}"
             )
 
-    def clear_location_cache(self):
-        """Clear all location-related cache entries from both caches."""
+    def clear_location_cache(self, prefix: str = None):
+        """
+        Clear location cache entries from every tier and tell other
+        processes to drop their in-process copies.
+
+        Args:
+            prefix: Only clear one key family (e.g. 'location:coords:');
+                all location keys when omitted
+        """
+        prefixes = [prefix] if prefix else list(LOCATION_KEY_PREFIXES)
+
+        if prefix:
+            self.local_cache.delete_prefix(prefix)
+        else:
+            self.local_cache.clear()
+        if prefix in (None, 'location:coords:'):
+            division_spatial_index.reset()
+
         try:
             if self.use_redis:
-                # Delete all location cache keys from Redis
-                for pattern in [
-                    'location:admin_division_id:*',
-                    'location:coords:*'
-                ]:
-                    keys = self.redis_client.keys(pattern)
+                for key_prefix in prefixes:
+                    keys = list(self.redis_client.scan_iter(
+                        match=f'{key_prefix}*', count=1000
+                    ))
+                    # The Django tier stores the same logical keys
+                    for start in range(0, len(keys), 1000):
+                        batch = keys[start:start + 1000]
+                        self.redis_client.delete(*batch)
+                        cache.delete_many([key.decode() for key in batch])
                     if keys:
-                        self.redis_client.delete(*keys)
                         logger.debug(
-                            f"Cleared {len(keys)} {pattern} cache entries"
+                            f"Cleared {len(keys)} {key_prefix} cache entries"
                         )
+
+                self.redis_client.publish(INVALIDATION_CHANNEL, prefix or '*')
             else:
                 # For Django cache, we need to clear by pattern
                 # This is a limitation - Django cache doesn't support patterns
@@ -0,0 +1,153 @@
+"""
+Benchmark for the chat room and poll counter recount jobs.
+
+Seeds synthetic rooms (with messages) and polls (with options and votes)
+inside a transaction that is rolled back at the end, then times a full
+recount and an incremental recount after a small fraction of the objects
+received new activity.
+"""
+
+import time
+import uuid
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from accounts.models import UserProfile
+from content.models import Post
+from messaging.counters import recount_rooms
+from messaging.models import ChatRoom, Message
+from polls.counters import recount_polls
+from polls.models import Poll, PollOption, PollVote
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic chat rooms and polls (rolled back afterwards) and '
+        'time the update_message_counters and update_poll_counters jobs'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rooms', type=int, default=100000,
+            help='Chat rooms to seed (default: 100000)'
+        )
+        parser.add_argument(
+            '--polls', type=int, default=100000,
+            help='Polls to seed (default: 100000)'
+        )
+        parser.add_argument(
+            '--messages-per-room', type=int, default=2,
+            help='Messages seeded per room (default: 2)'
+        )
+        parser.add_argument(
+            '--active-percent', type=float, default=1.0,
+            help='Share of rooms and polls given new activity before the '
+                 'incremental run (default: 1.0)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Objects recounted per grouped query (default: 5000)'
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self._run(options)
+            # Leave no benchmark data behind
+            transaction.set_rollback(True)
+
+        self.stdout.write(self.style.SUCCESS(
+            '✓ Counter job benchmark complete (seed data rolled back)'
+        ))
+
+    def _run(self, options):
+        run_id = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(username=f'bench-counters-{run_id}')
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        post = Post.objects.create(
+            author=profile, content='Counter benchmark', post_type='poll'
+        )
+
+        self.stdout.write(f"Seeding {options['rooms']} rooms...")
+        rooms = self._seed_rooms(profile, options)
+        self.stdout.write(f"Seeding {options['polls']} polls...")
+        polls, options_by_poll = self._seed_polls(post, user, options)
+
+        # Seeded rows are old news for the incremental run
+        past = timezone.now() - timedelta(days=1)
+        ChatRoom.objects.filter(created_by=profile).update(updated_at=past)
+        Message.objects.filter(sender=profile).update(updated_at=past)
+        Poll.objects.filter(post=post).update(updated_at=past)
+        PollVote.objects.filter(voter=user).update(created_at=past)
+
+        batch_size = options['batch_size']
+        self._time('Rooms, full recount', recount_rooms, None, batch_size)
+        self._time('Polls, full recount', recount_polls, None, batch_size)
+
+        since = timezone.now()
+        share = options['active_percent'] / 100.0
+        active_rooms = rooms[:max(1, int(len(rooms) * share))] if rooms else []
+        active_polls = polls[:max(1, int(len(polls) * share))] if polls else []
+        Message.objects.bulk_create([
+            Message(room_id=room_id, sender=profile, content='New activity')
+            for room_id in active_rooms
+        ], batch_size=5000)
+        # Vote removals save the poll; that marks it active
+        Poll.objects.filter(pk__in=active_polls).update(updated_at=since)
+        PollVote.objects.filter(
+            option_id__in=[options_by_poll[poll_id][1] for poll_id in active_polls]
+        ).delete()
+
+        self._time(
+            f'Rooms, incremental ({len(active_rooms)} active)',
+            recount_rooms, since, batch_size
+        )
+        self._time(
+            f'Polls, incremental ({len(active_polls)} active)',
+            recount_polls, since, batch_size
+        )
+
+    def _seed_rooms(self, profile, options):
+        rooms = ChatRoom.objects.bulk_create([
+            ChatRoom(name=f'Bench room {i}', room_type='group',
+                     created_by=profile)
+            for i in range(options['rooms'])
+        ], batch_size=5000)
+        Message.objects.bulk_create([
+            Message(room=room, sender=profile, content=f'Message {n}')
+            for room in rooms
+            for n in range(options['messages_per_room'])
+        ], batch_size=5000)
+        return [room.pk for room in rooms]
+
+    def _seed_polls(self, post, user, options):
+        polls = Poll.objects.bulk_create([
+            Poll(post=post, question=f'Bench poll {i}', order=i)
+            for i in range(options['polls'])
+        ], batch_size=5000)
+        poll_options = PollOption.objects.bulk_create([
+            PollOption(poll=poll, text=f'Option {n}', order=n)
+            for poll in polls
+            for n in range(2)
+        ], batch_size=5000)
+        PollVote.objects.bulk_create([
+            PollVote(poll_id=option.poll_id, option=option, voter=user)
+            for option in poll_options
+        ], batch_size=5000)
+
+        options_by_poll = {}
+        for option in poll_options:
+            options_by_poll.setdefault(option.poll_id, []).append(option.pk)
+        return [poll.pk for poll in polls], options_by_poll
+
+    def _time(self, label, job, since, batch_size):
+        start = time.perf_counter()
+        processed, corrected = job(since, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f'  {label:<40} {elapsed:8.2f}s  '
+            f'{processed} processed, {corrected} corrected'
+        )
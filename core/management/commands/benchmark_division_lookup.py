@@ -0,0 +1,101 @@
+"""Compare in-memory and PostGIS coordinate -> division resolution."""
+
+import random
+import statistics
+import time
+
+from django.contrib.gis.geos import Point
+from django.core.management.base import BaseCommand, CommandError
+
+from core.models import AdministrativeDivision, Country
+from core.spatial_index import DivisionSpatialIndex
+
+
+class Command(BaseCommand):
+    help = (
+        'Time coordinate to AdministrativeDivision lookups through the '
+        'in-memory grid index and through PostGIS, on loaded geo data'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--countries', type=str, default='CA,BJ',
+            help='Comma-separated ISO2 codes (default: CA,BJ for the '
+                 'Quebec and Benin datasets)'
+        )
+        parser.add_argument(
+            '--points', type=int, default=1000,
+            help='Random points per country'
+        )
+        parser.add_argument(
+            '--seed', type=int, default=42,
+            help='Random seed for reproducible points'
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+
+        for iso2 in options['countries'].split(','):
+            country = Country.objects.filter(iso2=iso2.strip().upper()).first()
+            if not country:
+                raise CommandError(f'Country {iso2} is not loaded')
+
+            index = DivisionSpatialIndex()
+            index.enabled = True
+            started = time.perf_counter()
+            grid = index._grid_for(country)
+            build_time = time.perf_counter() - started
+            if grid is None:
+                self.stdout.write(
+                    self.style.WARNING(f'{country.iso2}: no division polygons')
+                )
+                continue
+
+            level = index._index_level(country)
+            xmin, ymin, xmax, ymax = grid.extent
+            points = [
+                (rng.uniform(ymin, ymax), rng.uniform(xmin, xmax))
+                for _ in range(options['points'])
+            ]
+
+            index_times, db_times = [], []
+            agree = found = 0
+            for lat, lng in points:
+                t0 = time.perf_counter()
+                index_id = index.find_division_id(lat, lng, country)
+                index_times.append(time.perf_counter() - t0)
+
+                t0 = time.perf_counter()
+                db_id = AdministrativeDivision.objects.filter(
+                    country=country, admin_level=level,
+                    area_geometry__contains=Point(lng, lat, srid=4326)
+                ).values_list('id', flat=True).first()
+                db_times.append(time.perf_counter() - t0)
+
+                found += db_id is not None
+                agree += index_id == db_id
+
+            self.stdout.write(
+                f'{country.iso2} level {level}: {len(grid.entries)} divisions, '
+                f'index built in {build_time:.2f}s'
+            )
+            self.stdout.write(
+                f'  index  p50={self._ms(index_times, 50)} '
+                f'p95={self._ms(index_times, 95)}'
+            )
+            self.stdout.write(
+                f'  db     p50={self._ms(db_times, 50)} '
+                f'p95={self._ms(db_times, 95)}'
+            )
+            self.stdout.write(
+                f'  {found}/{len(points)} points inside a division, '
+                f'{agree}/{len(points)} identical results'
+            )
+
+        self.stdout.write(self.style.SUCCESS('✓ Division lookup benchmark complete'))
+
+    def _ms(self, timings, percentile):
+        if len(timings) == 1:
+            return f'{timings[0] * 1000:.3f}ms'
+        value = statistics.quantiles(timings, n=100)[percentile - 1]
+        return f'{value * 1000:.3f}ms'
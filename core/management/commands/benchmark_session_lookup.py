@@ -0,0 +1,149 @@
+"""Load test for fingerprint -> session lookups as the session count grows."""
+
+import json
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.session_manager import (
+    FINGERPRINT_INDEX_KEY, SESSION_KEY, USER_SESSIONS_KEY, session_manager
+)
+
+BENCHMARK_PREFIX = 'bench'
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic Redis sessions in growing batches and time '
+        'fingerprint lookups through the session index'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', type=str, default='1000,10000,100000',
+            help='Comma-separated cumulative session counts to measure at'
+        )
+        parser.add_argument(
+            '--lookups', type=int, default=500,
+            help='Timed lookups per size'
+        )
+        parser.add_argument(
+            '--sessions-per-device', type=int, default=2,
+            help='Sessions sharing each fingerprint'
+        )
+        parser.add_argument(
+            '--compare-scan', action='store_true',
+            help='Also time the old KEYS scan (slow on large sizes)'
+        )
+
+    def handle(self, *args, **options):
+        if not session_manager.use_redis:
+            raise CommandError('USE_REDIS_SESSIONS is disabled')
+
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        per_device = max(1, options['sessions_per_device'])
+        run_id = uuid.uuid4().hex[:8]
+        seeded = []
+
+        try:
+            for size in sizes:
+                self._seed(run_id, seeded, size, per_device)
+                fingerprints = [
+                    self._fingerprint(run_id, i // per_device)
+                    for i in range(0, len(seeded), per_device)
+                ]
+
+                timings = self._time_lookups(
+                    fingerprints, options['lookups'], self._index_lookup
+                )
+                line = (
+                    f'{len(seeded):>9} sessions  index '
+                    f'p50={self._ms(timings, 50)}  '
+                    f'p95={self._ms(timings, 95)}'
+                )
+                if options['compare_scan']:
+                    scan_timings = self._time_lookups(
+                        fingerprints, max(1, options['lookups'] // 50),
+                        self._scan_lookup
+                    )
+                    line += f'  | scan p50={self._ms(scan_timings, 50)}'
+                self.stdout.write(line)
+        finally:
+            self._cleanup(run_id, seeded, per_device)
+
+        self.stdout.write(self.style.SUCCESS('✓ Session lookup benchmark complete'))
+
+    def _fingerprint(self, run_id, device):
+        return f'{BENCHMARK_PREFIX}-{run_id}-fp-{device}'
+
+    def _seed(self, run_id, seeded, size, per_device):
+        """Add sessions until ``size`` exist, written the way logins do."""
+        redis_client = session_manager.redis_client
+        while len(seeded) < size:
+            pipe = redis_client.pipeline(transaction=False)
+            for _ in range(min(1000, size - len(seeded))):
+                index = len(seeded)
+                session_id = f'{BENCHMARK_PREFIX}-{run_id}-{index}'
+                fingerprint = self._fingerprint(run_id, index // per_device)
+                user_id = f'{BENCHMARK_PREFIX}-{run_id}-user-{index // per_device}'
+                data = {
+                    'session_id': session_id,
+                    'user_id': user_id,
+                    'device_fingerprint': fingerprint,
+                    'fast_fingerprint': fingerprint,
+                    'is_active': True,
+                    'started_at': f'2025-01-01T00:00:{index % 60:02d}',
+                }
+                pipe.setex(SESSION_KEY.format(session_id), 3600, json.dumps(data))
+                pipe.sadd(FINGERPRINT_INDEX_KEY.format(fingerprint), session_id)
+                pipe.expire(FINGERPRINT_INDEX_KEY.format(fingerprint), 3600)
+                pipe.sadd(USER_SESSIONS_KEY.format(user_id), session_id)
+                pipe.expire(USER_SESSIONS_KEY.format(user_id), 3600)
+                seeded.append(session_id)
+            pipe.execute()
+
+    def _index_lookup(self, fingerprint):
+        # Redis part of find_any_active_session_by_fingerprint, without the
+        # UserProfile fetch (benchmark users don't exist in the database)
+        return session_manager._load_indexed_sessions(
+            FINGERPRINT_INDEX_KEY.format(fingerprint)
+        )
+
+    def _scan_lookup(self, fingerprint):
+        redis_client = session_manager.redis_client
+        for key in redis_client.keys(SESSION_KEY.format('*')):
+            raw = redis_client.get(key)
+            if raw and json.loads(raw).get('fast_fingerprint') == fingerprint:
+                return raw
+        return None
+
+    def _time_lookups(self, fingerprints, count, lookup):
+        timings = []
+        for i in range(count):
+            fingerprint = fingerprints[(i * 7919) % len(fingerprints)]
+            started = time.perf_counter()
+            lookup(fingerprint)
+            timings.append(time.perf_counter() - started)
+        return timings
+
+    def _ms(self, timings, percentile):
+        if len(timings) == 1:
+            value = timings[0]
+        else:
+            value = statistics.quantiles(timings, n=100)[percentile - 1]
+        return f'{value * 1000:.2f}ms'
+
+    def _cleanup(self, run_id, seeded, per_device):
+        redis_client = session_manager.redis_client
+        keys = [SESSION_KEY.format(session_id) for session_id in seeded]
+        for device in range((len(seeded) + per_device - 1) // per_device):
+            keys.append(FINGERPRINT_INDEX_KEY.format(
+                self._fingerprint(run_id, device)
+            ))
+            keys.append(USER_SESSIONS_KEY.format(
+                f'{BENCHMARK_PREFIX}-{run_id}-user-{device}'
+            ))
+        for start in range(0, len(keys), 1000):
+            redis_client.delete(*keys[start:start + 1000])
@@ -17,6 +17,7 @@ from django.contrib.gis.geos import GEOSGeometry
 from django.contrib.gis.gdal import DataSource
 from django.db import transaction
 from core.models import Country, AdministrativeDivision
+from core.location_db_cache import location_cache_service
 
 
 class Command(BaseCommand):
@@ -120,6 +121,10 @@ class Command(BaseCommand):
                 "Must specify --shapefile, --auto-detect, or --batch"
             )
 
+        if not self.dry_run:
+            # Drop cached countries/divisions in every process
+            location_cache_service.clear_location_cache()
+
     def load_custom_field_mappings(self, mapping_file):
         """Load custom field mapping file"""
         mapping_path = Path(mapping_file)
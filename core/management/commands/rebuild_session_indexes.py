@@ -0,0 +1,27 @@
+"""Rebuild the Redis fingerprint and user session indexes."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.session_manager import session_manager
+
+
+class Command(BaseCommand):
+    help = (
+        'Index Redis sessions written before the fingerprint/user indexes '
+        'existed (uses SCAN, safe on a live server)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='SCAN COUNT hint'
+        )
+
+    def handle(self, *args, **options):
+        if not session_manager.use_redis:
+            raise CommandError('USE_REDIS_SESSIONS is disabled')
+
+        indexed = session_manager.rebuild_session_indexes(
+            batch_size=options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'✓ Indexed {indexed} sessions'))
@@ -14,6 +14,7 @@ from django.contrib.gis.gdal import DataSource
 from django.contrib.gis.geos import GEOSGeometry
 from django.db import transaction
 from core.models import Country, AdministrativeDivision
+from core.location_db_cache import location_cache_service
 from core.country_data import get_country_info
 
 
@@ -83,6 +84,9 @@ class Command(BaseCommand):
                 "--iso3 and --name for manual setup"
             )
 
+        # Drop cached countries/divisions in every process
+        location_cache_service.clear_location_cache()
+
     def setup_manual(self, options):
         """Setup country manually with provided parameters"""
         iso3 = options['iso3'].upper()
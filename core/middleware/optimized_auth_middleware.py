@@ -665,7 +665,7 @@ class OptimizedAuthenticationMiddleware(MiddlewareMixin):
         Track authentication performance analytics asynchronously.
         """
         try:
-            from analytics.tasks import track_authentication_performance
+            from analytics.services import event_buffer
 
             total_auth_time = (time.time() - start_time) * 1000  # ms
 
@@ -691,8 +691,8 @@ class OptimizedAuthenticationMiddleware(MiddlewareMixin):
                 }
             }
 
-            # Track analytics asynchronously
-            track_authentication_performance.delay(auth_data)
+            # Buffered; written in bulk by flush_analytics_events
+            event_buffer.push('auth', auth_data)
 
         except Exception as e:
             logger.warning(f"Failed to track authentication analytics: {e}")
@@ -707,8 +707,8 @@ class OptimizedAuthenticationMiddleware(MiddlewareMixin):
             return
 
         try:
-            # Use the comprehensive session tracking
-            from analytics.tasks import track_session_comprehensive
+            # Buffered; written in bulk by flush_analytics_events
+            from analytics.services import event_buffer
 
             # Get user ID if available
             user_id = getattr(request, 'jwt_user_id', None)
@@ -757,7 +757,7 @@ class OptimizedAuthenticationMiddleware(MiddlewareMixin):
             }
 
             # Track session lifecycle asynchronously
-            track_session_comprehensive.delay(session_data)
+            event_buffer.push('session', session_data)
 
         except Exception as e:
             logger.warning(f"Session analytics tracking failed: {e}")
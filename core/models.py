@@ -59,6 +59,25 @@ class CommentManager(models.Manager):
             return self.general_comments()
         return self.all()
 
+    def for_thread(self):
+        """Get comments with author, mentions and live reply counts loaded."""
+        from django.db.models.functions import Coalesce
+
+        replies = self.model.objects.filter(
+            parent=models.OuterRef('pk'),
+            is_deleted=False
+        ).order_by().values('parent').annotate(
+            total=models.Count('id')
+        ).values('total')
+
+        return self.select_related('author__user').prefetch_related(
+            'content_mentions__mentioned_user__user'
+        ).annotate(
+            thread_replies_count=Coalesce(
+                models.Subquery(replies), models.Value(0)
+            )
+        )
+
 
 class MentionManager(models.Manager):
     """Custom manager for Mention model with community filtering."""
@@ -20,6 +20,23 @@ logger = logging.getLogger(__name__)
 SESSION_DURATION_HOURS = getattr(settings, 'SESSION_DURATION_HOURS', 4)
 SESSION_DURATION_SECONDS = SESSION_DURATION_HOURS * 60 * 60
 
+# Redis key layout. Sessions are stored as JSON strings under SESSION_KEY;
+# the two sets are secondary indexes of session ids so lookups by device
+# or user never have to scan the keyspace.
+SESSION_KEY = 'session:{}'
+FINGERPRINT_INDEX_KEY = 'session_fp:{}'
+USER_SESSIONS_KEY = 'user_sessions:{}'
+
+
+def _session_fingerprints(session_data: Dict[str, Any]) -> set:
+    """Fingerprints a session can be found by (fast and enhanced)."""
+    return {
+        fp for fp in (
+            session_data.get('fast_fingerprint'),
+            session_data.get('device_fingerprint'),
+        ) if fp
+    }
+
 
 class SessionManager:
     """
@@ -169,19 +186,8 @@ class SessionManager:
         # Store in Redis immediately (5-15ms)
         if self.use_redis:
             try:
-                redis_key = f"session:{hashed_session_id}"
-                self.redis_client.setex(
-                    redis_key,
-                    SESSION_DURATION_SECONDS,
-                    json.dumps(minimal_data, default=str)
-                )
-
-                # Add to user's active sessions
-                user_sessions_key = f"user_sessions:{user_profile.id}"
-                self.redis_client.sadd(user_sessions_key, hashed_session_id)
-                self.redis_client.expire(
-                    user_sessions_key, SESSION_DURATION_SECONDS
-                )
+                # Also indexes the session by fingerprint and user
+                self.store_session(hashed_session_id, minimal_data)
             except Exception as e:
                 import logging
                 logger = logging.getLogger('core.session_manager')
@@ -418,6 +424,130 @@ class SessionManager:
                 'timezone_source': 'user' if user_timezone else 'ip_detection',
             }
 
+    def store_session(self, session_id: str, session_data: Dict[str, Any],
+                      ttl: int = SESSION_DURATION_SECONDS) -> None:
+        """
+        Write session data to Redis and keep its secondary indexes current.
+        """
+        if not self.use_redis:
+            return
+        self.redis_client.setex(
+            SESSION_KEY.format(session_id), ttl,
+            json.dumps(session_data, default=str)
+        )
+        self.index_session(session_id, session_data, ttl)
+
+    def index_session(self, session_id: str, session_data: Dict[str, Any],
+                      ttl: int = SESSION_DURATION_SECONDS) -> None:
+        """
+        Add a session to its fingerprint and user index sets.
+
+        Index sets are given at least the session's TTL so they outlive
+        every member; ids of sessions that expired on their own are pruned
+        lazily by the lookups.
+        """
+        if not self.use_redis:
+            return
+        index_keys = [
+            FINGERPRINT_INDEX_KEY.format(fp)
+            for fp in _session_fingerprints(session_data)
+        ]
+        if session_data.get('user_id'):
+            index_keys.append(USER_SESSIONS_KEY.format(session_data['user_id']))
+        if not index_keys:
+            return
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key in index_keys:
+            pipe.sadd(key, session_id)
+            pipe.ttl(key)
+        current_ttls = pipe.execute()[1::2]
+
+        pipe = self.redis_client.pipeline(transaction=False)
+        for key, current_ttl in zip(index_keys, current_ttls):
+            if current_ttl < ttl:
+                pipe.expire(key, ttl)
+        pipe.execute()
+
+    def unindex_session(self, session_id: str,
+                        session_data: Dict[str, Any]) -> None:
+        """Remove a session from its fingerprint and user index sets."""
+        if not self.use_redis:
+            return
+        pipe = self.redis_client.pipeline(transaction=False)
+        for fp in _session_fingerprints(session_data):
+            pipe.srem(FINGERPRINT_INDEX_KEY.format(fp), session_id)
+        if session_data.get('user_id'):
+            pipe.srem(
+                USER_SESSIONS_KEY.format(session_data['user_id']), session_id
+            )
+        pipe.execute()
+
+    def _load_indexed_sessions(self, index_key: str, matches=None) -> list:
+        """
+        Load every session referenced by an index set in one round trip.
+
+        Ids whose session key has expired, or whose data no longer
+        satisfies ``matches``, are removed from the index.
+        """
+        session_ids = list(self.redis_client.smembers(index_key))
+        if not session_ids:
+            return []
+
+        raw_sessions = self.redis_client.mget(
+            [SESSION_KEY.format(session_id) for session_id in session_ids]
+        )
+        sessions = []
+        stale_ids = []
+        for session_id, raw in zip(session_ids, raw_sessions):
+            if not raw:
+                stale_ids.append(session_id)
+                continue
+            try:
+                session_data = json.loads(raw)
+            except (TypeError, ValueError):
+                stale_ids.append(session_id)
+                continue
+            if matches is not None and not matches(session_data):
+                stale_ids.append(session_id)
+                continue
+            sessions.append(session_data)
+
+        if stale_ids:
+            self.redis_client.srem(index_key, *stale_ids)
+        return sessions
+
+    def rebuild_session_indexes(self, batch_size: int = 1000) -> int:
+        """
+        Rebuild the fingerprint and user indexes from stored sessions.
+
+        Only needed for sessions written before the indexes existed; uses
+        SCAN so Redis is never blocked. Returns the number of sessions
+        indexed.
+        """
+        if not self.use_redis:
+            return 0
+        indexed = 0
+        for key in self.redis_client.scan_iter(
+            match=SESSION_KEY.format('*'), count=batch_size
+        ):
+            raw = self.redis_client.get(key)
+            if not raw:
+                continue
+            try:
+                session_data = json.loads(raw)
+            except (TypeError, ValueError):
+                continue
+            if not session_data.get('is_active', False):
+                continue
+            ttl = self.redis_client.ttl(key)
+            if ttl <= 0:
+                continue
+            session_id = key.split(':', 1)[1]
+            self.index_session(session_id, session_data, ttl)
+            indexed += 1
+        return indexed
+
     def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """
         Get session data, trying Redis first, then Database.
@@ -652,15 +782,11 @@ class SessionManager:
         """
         if self.use_redis:
             try:
-                # Remove from Redis
-                redis_key = f"session:{session_id}"
-                self.redis_client.delete(redis_key)
-
-                # Remove from user's active sessions
+                # Read before deleting so the index entries can be removed
                 session_data = self.get_session(session_id)
+                self.redis_client.delete(SESSION_KEY.format(session_id))
                 if session_data:
-                    user_sessions_key = f"user_sessions:{session_data['user_id']}"
-                    self.redis_client.srem(user_sessions_key, session_id)
+                    self.unindex_session(session_id, session_data)
 
             except Exception as e:
                 print(f"Redis invalidation failed: {e}")
@@ -683,14 +809,12 @@ class SessionManager:
         """
         if self.use_redis:
             try:
-                user_sessions_key = f"user_sessions:{user_profile_id}"
-                session_ids = self.redis_client.smembers(user_sessions_key)
-                sessions = []
-                for session_id in session_ids:
-                    session_data = self.get_session(session_id)
-                    if session_data:
-                        sessions.append(session_data)
-                return sessions
+                return self._load_indexed_sessions(
+                    USER_SESSIONS_KEY.format(user_profile_id),
+                    matches=lambda data: (
+                        str(data.get('user_id')) == str(user_profile_id)
+                    )
+                )
             except Exception as e:
                 print(f"Redis user sessions failed: {e}")
 
@@ -781,44 +905,35 @@ class SessionManager:
         """
         logger = logging.getLogger('core.session_manager')
 
-        # STEP 1: Check Redis first (fast path)
+        # STEP 1: Check Redis first (fast path) via the fingerprint index
         if self.use_redis:
             try:
-                # Get all session keys from Redis
-                session_keys = self.redis_client.keys('session:*')
+                candidates = self._load_indexed_sessions(
+                    FINGERPRINT_INDEX_KEY.format(fast_fingerprint),
+                    matches=lambda data: (
+                        fast_fingerprint in _session_fingerprints(data)
+                    )
+                )
+                candidates = sorted(
+                    (data for data in candidates
+                     if data.get('is_active', False)),
+                    key=lambda data: data.get('started_at', ''),
+                    reverse=True
+                )
 
-                for key in session_keys:
+                for session_data in candidates:
+                    user_id = session_data.get('user_id')
+                    if not user_id:
+                        continue
                     try:
-                        session_data_str = self.redis_client.get(key)
-                        if session_data_str:
-                            session_data = json.loads(session_data_str)
-
-                            # Check if fingerprint matches (check both fields for compatibility)
-                            stored_fp = session_data.get('device_fingerprint', '')
-                            stored_fast_fp = session_data.get('fast_fingerprint', '')
-
-                            if (stored_fp == fast_fingerprint or
-                                stored_fast_fp == fast_fingerprint):
-
-                                # Verify session is active
-                                if session_data.get('is_active', False):
-                                    logger.info(f"Found session in Redis for fingerprint: {fast_fingerprint[:16]}...")
-
-                                    # Get user profile for the session
-                                    user_id = session_data.get('user_id')
-                                    if user_id:
-                                        try:
-                                            from accounts.models import UserProfile
-                                            user_profile = UserProfile.objects.get(id=user_id)
-                                            session_data['user_profile'] = user_profile
-                                            return session_data
-                                        except Exception as e:
-                                            logger.warning(f"Could not get user profile {user_id}: {e}")
-                                            continue
-
+                        from accounts.models import UserProfile
+                        user_profile = UserProfile.objects.get(id=user_id)
                     except Exception as e:
-                        logger.debug(f"Error parsing Redis session {key}: {e}")
+                        logger.warning(f"Could not get user profile {user_id}: {e}")
                         continue
+                    logger.info(f"Found session in Redis for fingerprint: {fast_fingerprint[:16]}...")
+                    session_data['user_profile'] = user_profile
+                    return session_data
 
             except Exception as e:
                 logger.warning(f"Redis lookup failed for fingerprint: {e}")
@@ -866,8 +981,6 @@ class SessionManager:
 
         return None
 
-        return None
-
     def find_existing_session_by_fast_fingerprint(self, user_profile,
                                                    fast_fingerprint: str) -> Optional[Dict[str, Any]]:
         """
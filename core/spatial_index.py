@@ -0,0 +1,188 @@
+"""
+In-memory point-in-polygon index for AdministrativeDivision lookups.
+
+Resolves a coordinate to the division whose ``area_geometry`` contains it
+without a database round trip. For each country, the divisions at its
+default admin level are bucketed by bounding box into a uniform lat/lng
+grid; the few candidates in a point's cell are then tested with prepared
+GEOS geometries. Prepared geometries build internal indexes on first use
+and are not thread-safe, so each thread prepares its own copies. Countries
+are loaded lazily on first use and dropped by ``reset()`` (called when the
+location cache is invalidated).
+"""
+
+import logging
+import math
+import threading
+from collections import defaultdict
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Grid cells are sized from the average division extent, within these bounds
+# (degrees)
+MIN_CELL_SIZE = 0.01
+MAX_CELL_SIZE = 1.0
+
+
+class DivisionGrid:
+    """Uniform grid of prepared division polygons for one country/level."""
+
+    def __init__(self, entries):
+        """
+        Args:
+            entries: Iterable of ``(division_id, geometry)`` with geometries
+                in EPSG:4326
+        """
+        self.entries = []
+        for division_id, geometry in entries:
+            self.entries.append((division_id, geometry, geometry.extent))
+        # Per-thread {division id: prepared geometry}
+        self._local = threading.local()
+
+        widths = [e[2][2] - e[2][0] for e in self.entries]
+        heights = [e[2][3] - e[2][1] for e in self.entries]
+        average = (
+            (sum(widths) + sum(heights)) / (2 * len(self.entries))
+            if self.entries else MAX_CELL_SIZE
+        )
+        self.cell_size = min(max(average, MIN_CELL_SIZE), MAX_CELL_SIZE)
+
+        self.cells = defaultdict(list)
+        self.extent = None
+        for entry in self.entries:
+            xmin, ymin, xmax, ymax = entry[2]
+            for ix in range(self._cell(xmin), self._cell(xmax) + 1):
+                for iy in range(self._cell(ymin), self._cell(ymax) + 1):
+                    self.cells[(ix, iy)].append(entry)
+            if self.extent is None:
+                self.extent = [xmin, ymin, xmax, ymax]
+            else:
+                self.extent = [
+                    min(self.extent[0], xmin), min(self.extent[1], ymin),
+                    max(self.extent[2], xmax), max(self.extent[3], ymax),
+                ]
+
+    def _cell(self, value: float) -> int:
+        return math.floor(value / self.cell_size)
+
+    def _prepared(self, division_id, geometry):
+        prepared = getattr(self._local, 'prepared', None)
+        if prepared is None:
+            prepared = self._local.prepared = {}
+        if division_id not in prepared:
+            prepared[division_id] = geometry.prepared
+        return prepared[division_id]
+
+    def contains_extent(self, x: float, y: float) -> bool:
+        return (
+            self.extent is not None and
+            self.extent[0] <= x <= self.extent[2] and
+            self.extent[1] <= y <= self.extent[3]
+        )
+
+    def find(self, x: float, y: float, point) -> Optional[str]:
+        """Return the id of the division covering ``point``, if any."""
+        for division_id, geometry, extent in self.cells.get(
+            (self._cell(x), self._cell(y)), ()
+        ):
+            if (extent[0] <= x <= extent[2] and
+                    extent[1] <= y <= extent[3] and
+                    self._prepared(division_id, geometry).covers(point)):
+                return division_id
+        return None
+
+
+class DivisionSpatialIndex:
+    """
+    Lazily built, process-wide collection of ``DivisionGrid`` per country.
+    """
+
+    def __init__(self):
+        self.enabled = getattr(settings, 'LOCATION_SPATIAL_INDEX', True)
+        self._grids = {}  # country id -> DivisionGrid (None: no polygons)
+        self._lock = threading.Lock()
+
+    def _index_level(self, country) -> Optional[int]:
+        """Admin level indexed for a country: its default, else the finest."""
+        from core.models import AdministrativeDivision
+
+        if country.default_admin_level is not None:
+            return country.default_admin_level
+        return AdministrativeDivision.objects.filter(
+            country=country, area_geometry__isnull=False
+        ).order_by('-admin_level').values_list(
+            'admin_level', flat=True
+        ).first()
+
+    def _build_grid(self, country) -> Optional[DivisionGrid]:
+        from core.models import AdministrativeDivision
+
+        level = self._index_level(country)
+        if level is None:
+            return None
+        divisions = AdministrativeDivision.objects.filter(
+            country=country, admin_level=level, area_geometry__isnull=False
+        ).only('id', 'area_geometry')
+
+        entries = []
+        for division in divisions.iterator(chunk_size=500):
+            geometry = division.area_geometry
+            if geometry.srid and geometry.srid != 4326:
+                geometry = geometry.transform(4326, clone=True)
+            entries.append((division.id, geometry))
+        if not entries:
+            return None
+
+        grid = DivisionGrid(entries)
+        logger.info(
+            f"Built spatial index for {country.iso2} level {level}: "
+            f"{len(entries)} divisions, {len(grid.cells)} cells "
+            f"of {grid.cell_size:.3f}°"
+        )
+        return grid
+
+    def _grid_for(self, country) -> Optional[DivisionGrid]:
+        if country.id not in self._grids:
+            with self._lock:
+                if country.id not in self._grids:
+                    self._grids[country.id] = self._build_grid(country)
+        return self._grids[country.id]
+
+    def find_division_id(self, lat, lng, country=None) -> Optional[str]:
+        """
+        Return the id of the division containing (lat, lng), or None when
+        the point falls outside every indexed polygon.
+
+        Without a country only grids already built are searched: building
+        every country's grid does not belong on the request path, and a
+        miss falls back to the database.
+        """
+        if not self.enabled:
+            return None
+        from django.contrib.gis.geos import Point
+
+        x, y = float(lng), float(lat)
+        point = Point(x, y, srid=4326)
+
+        if country is not None:
+            grid = self._grid_for(country)
+            return grid.find(x, y, point) if grid else None
+
+        for grid in list(self._grids.values()):
+            if grid and grid.contains_extent(x, y):
+                division_id = grid.find(x, y, point)
+                if division_id:
+                    return division_id
+        return None
+
+    def reset(self):
+        """Drop every grid; they are rebuilt on the next lookup."""
+        with self._lock:
+            self._grids = {}
+
+
+# Global index instance
+division_spatial_index = DivisionSpatialIndex()
@@ -130,11 +130,8 @@ def enhance_session_async(session_id: str, request_data: dict, client_device_inf
 
                 # Update Redis
                 if session_manager.use_redis:
-                    redis_key = f"session:{session_id}"
-                    session_manager.redis_client.setex(
-                        redis_key,
-                        SESSION_DURATION_SECONDS,
-                        json.dumps(session_data, default=str)
+                    session_manager.store_session(
+                        session_id, session_data, SESSION_DURATION_SECONDS
                     )
 
                 # Update Database
@@ -340,7 +337,7 @@ def batch_location_lookup(ip_addresses: list, priority: str = 'normal'):
         Batch lookup results
     """
     try:
-        from core.utils import get_location_from_ip
+        from core.utils import get_locations_from_ips
         from core.ip_location_service import fast_location_service
 
         results = {}
@@ -349,37 +346,37 @@ def batch_location_lookup(ip_addresses: list, priority: str = 'normal'):
 
         logger.info(f"Starting batch location lookup for {len(ip_addresses)} IPs (priority: {priority})")
 
+        # Skip IPs that are already cached (one round trip for all of them)
+        cached = cache.get_many([f"location:{ip}" for ip in ip_addresses])
+        missing = []
         for ip_address in ip_addresses:
-            try:
-                # Skip if already cached
-                cache_key = f"location:{ip_address}"
-                if cache.get(cache_key):
-                    results[ip_address] = {"status": "already_cached"}
-                    continue
-
-                # Perform lookup
-                location_data = get_location_from_ip(ip_address)
-
-                if location_data:
-                    # Cache the result
-                    fast_location_service._cache_location_data(ip_address, location_data)
-                    results[ip_address] = {
-                        "status": "success",
-                        "location": location_data
-                    }
-                    successful_lookups += 1
-                else:
-                    # Cache empty result
-                    cache.set(cache_key, {}, 3600)  # 1 hour
-                    results[ip_address] = {"status": "no_data"}
+            if cached.get(f"location:{ip_address}"):
+                results[ip_address] = {"status": "already_cached"}
+            else:
+                missing.append(ip_address)
 
-            except Exception as ip_exc:
-                logger.warning(f"Location lookup failed for {ip_address}: {ip_exc}")
+        try:
+            locations = get_locations_from_ips(missing)
+        except Exception as lookup_exc:
+            logger.warning(f"Location lookup failed for {len(missing)} IPs: {lookup_exc}")
+            locations = {}
+            for ip_address in missing:
                 results[ip_address] = {
                     "status": "error",
-                    "error": str(ip_exc)
+                    "error": str(lookup_exc)
                 }
-                failed_lookups += 1
+            failed_lookups += len(missing)
+
+        fast_location_service._cache_many_location_data(locations)
+        for ip_address, location_data in locations.items():
+            if location_data:
+                results[ip_address] = {
+                    "status": "success",
+                    "location": location_data
+                }
+                successful_lookups += 1
+            else:
+                results[ip_address] = {"status": "no_data"}
 
         logger.info(
             f"Batch location lookup completed: {successful_lookups} successful, "
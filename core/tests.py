@@ -1,7 +1,16 @@
-from .utils import get_client_ip, get_device_info
+from . import utils as core_utils
+from .utils import LocalLRUCache, get_client_ip, get_device_info
+from .location_db_cache import LocationCacheService
+from .spatial_index import DivisionGrid, DivisionSpatialIndex
+from .session_manager import (
+    FINGERPRINT_INDEX_KEY, SESSION_KEY, SessionManager
+)
 from django.contrib.auth.models import User
-from django.test import TestCase, RequestFactory
+from django.test import TestCase, RequestFactory, override_settings
+from django.utils import timezone
 from rest_framework.request import Request
+from unittest import mock
+import uuid
 
 
 class UtilsTestCase(TestCase):
@@ -32,4 +41,331 @@ class UtilsTestCase(TestCase):
         self.assertIn('browser', device_info)
         self.assertIn('os', device_info)
         self.assertIn('device', device_info)
-        self.assertIn('is_mobile', device_info)
\ No newline at end of file
+        self.assertIn('is_mobile', device_info)
+
+@override_settings(USE_REDIS_SESSIONS=True)
+class SessionFingerprintIndexTest(TestCase):
+    """Fingerprint and user lookups go through Redis index sets."""
+
+    def setUp(self):
+        self.manager = SessionManager()
+        if not self.manager.use_redis:
+            self.skipTest('Redis is not available')
+
+        from accounts.models import UserProfile
+        self.user = User.objects.create_user(
+            username='indexuser', password='testpass'
+        )
+        self.profile, _ = UserProfile.objects.get_or_create(user=self.user)
+        self.fingerprint = f'test-fp-{uuid.uuid4().hex}'
+        self.session_ids = []
+
+    def tearDown(self):
+        for session_id in self.session_ids:
+            self.manager.redis_client.delete(SESSION_KEY.format(session_id))
+            self.manager.unindex_session(session_id, {
+                'user_id': str(self.profile.id),
+                'fast_fingerprint': self.fingerprint,
+            })
+
+    def _store(self, started_at, fingerprint=None):
+        session_id = f'test-{uuid.uuid4().hex}'
+        self.session_ids.append(session_id)
+        self.manager.store_session(session_id, {
+            'session_id': session_id,
+            'user_id': str(self.profile.id),
+            'fast_fingerprint': fingerprint or self.fingerprint,
+            'device_fingerprint': fingerprint or self.fingerprint,
+            'is_active': True,
+            'started_at': started_at,
+        }, 60)
+        return session_id
+
+    def test_lookup_uses_index_not_keyspace_scan(self):
+        self._store('2025-01-01T00:00:00')
+        newest = self._store('2025-01-02T00:00:00')
+
+        with mock.patch.object(
+            self.manager.redis_client, 'keys',
+            side_effect=AssertionError('KEYS must not be used')
+        ):
+            found = self.manager.find_any_active_session_by_fingerprint(
+                self.fingerprint
+            )
+
+        self.assertEqual(found['session_id'], newest)
+        self.assertEqual(found['user_profile'], self.profile)
+
+    def test_expired_sessions_are_pruned_from_index(self):
+        session_id = self._store('2025-01-01T00:00:00')
+        self.manager.redis_client.delete(SESSION_KEY.format(session_id))
+
+        self.assertEqual(
+            self.manager.get_user_active_sessions(self.profile.id), []
+        )
+        self.assertIsNone(
+            self.manager.find_any_active_session_by_fingerprint(
+                self.fingerprint
+            )
+        )
+        self.assertFalse(self.manager.redis_client.sismember(
+            FINGERPRINT_INDEX_KEY.format(self.fingerprint), session_id
+        ))
+
+    def test_invalidate_removes_index_entries(self):
+        session_id = self._store(timezone.now().isoformat())
+        self.assertEqual(
+            len(self.manager.get_user_active_sessions(self.profile.id)), 1
+        )
+
+        self.manager.invalidate_session(session_id)
+
+        self.assertFalse(self.manager.redis_client.sismember(
+            FINGERPRINT_INDEX_KEY.format(self.fingerprint), session_id
+        ))
+        self.assertEqual(
+            self.manager.get_user_active_sessions(self.profile.id), []
+        )
+
+
+class LocalLRUCacheTest(TestCase):
+    def test_evicts_least_recently_used(self):
+        local = LocalLRUCache(max_entries=2, timeout=60)
+        local.set('a', 1)
+        local.set('b', 2)
+        local.get('a')
+        local.set('c', 3)
+
+        self.assertEqual(local.get('a'), 1)
+        self.assertEqual(local.get('c'), 3)
+        self.assertNotEqual(local.get('b'), 2)
+
+    def test_entries_expire(self):
+        local = LocalLRUCache(max_entries=10, timeout=60)
+        local.set('a', 1)
+        with mock.patch('core.utils.time.monotonic',
+                        return_value=10 ** 9):
+            self.assertNotEqual(local.get('a'), 1)
+
+
+class SharedGeoIPReaderTest(TestCase):
+    def setUp(self):
+        core_utils._geoip_reader = None
+        core_utils._geoip_file_state = None
+        core_utils._geoip_results.clear()
+        self.addCleanup(setattr, core_utils, '_geoip_reader', None)
+
+        stat = mock.Mock(st_ino=1, st_size=100, st_mtime_ns=1)
+        patcher = mock.patch('core.utils.os.stat', return_value=stat)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        response = mock.Mock()
+        response.country.name = 'Canada'
+        response.country.iso_code = 'CA'
+        response.city.name = 'Montreal'
+        response.subdivisions.most_specific.name = 'Quebec'
+        response.location.latitude = 45.5
+        response.location.longitude = -73.6
+        response.location.time_zone = 'America/Toronto'
+        response.location.accuracy_radius = 20
+        self.reader = mock.Mock()
+        self.reader.city.return_value = response
+        patcher = mock.patch('core.utils.Reader', return_value=self.reader)
+        self.reader_class = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_reader_opened_once_and_results_cached(self):
+        first = core_utils.get_locations_from_ips(['1.2.3.4', '5.6.7.8', '1.2.3.4'])
+        second = core_utils.get_location_from_ip('1.2.3.4')
+
+        self.assertEqual(set(first), {'1.2.3.4', '5.6.7.8'})
+        self.assertEqual(second['latitude'], 45.5)
+        self.reader_class.assert_called_once()
+        self.assertEqual(self.reader.city.call_count, 2)
+
+    def test_replaced_database_is_reopened(self):
+        core_utils.get_location_from_ip('1.2.3.4')
+        core_utils._geoip_checked_at = 0.0
+        with mock.patch('core.utils.os.stat', return_value=mock.Mock(
+                st_ino=2, st_size=100, st_mtime_ns=2)):
+            core_utils.get_location_from_ip('1.2.3.4')
+
+        self.assertEqual(self.reader_class.call_count, 2)
+        self.assertEqual(self.reader.city.call_count, 2)
+
+
+@override_settings(
+    USE_REDIS_CACHE=False,
+    CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'
+    }}
+)
+class LocationCacheLocalTierTest(TestCase):
+    def setUp(self):
+        self.service = LocationCacheService()
+
+    def test_repeat_lookup_served_in_process(self):
+        self.service._set_in_cache('location:country_id:1', 'Canada')
+        with mock.patch('core.location_db_cache.cache') as django_cache:
+            self.assertEqual(
+                self.service._get_from_cache('location:country_id:1'),
+                'Canada'
+            )
+            django_cache.get.assert_not_called()
+
+        stats = self.service.get_cache_stats()
+        self.assertEqual(stats['local']['hits'], 1)
+        self.assertEqual(stats['django']['hits'], 0)
+
+    def test_negative_results_cached_locally(self):
+        self.service._set_in_cache('location:country_code:ZZ', False)
+        self.assertIs(
+            self.service._get_from_cache('location:country_code:ZZ'), False
+        )
+        self.assertEqual(self.service.get_cache_stats()['local']['hits'], 1)
+
+    def test_invalidation_message_drops_prefix(self):
+        self.service._set_in_cache('location:coords:1:2:global', 'division')
+        self.service._set_in_cache('location:country_id:1', 'Canada')
+
+        self.service._handle_invalidation_message(
+            {'data': b'location:coords:'}
+        )
+
+        self.assertEqual(len(self.service.local_cache), 1)
+        self.service._handle_invalidation_message({'data': b'*'})
+        self.assertEqual(len(self.service.local_cache), 0)
+
+
+class DivisionGridTest(TestCase):
+    def setUp(self):
+        from django.contrib.gis.geos import MultiPolygon, Polygon
+
+        def square(xmin, ymin, size):
+            return MultiPolygon(Polygon.from_bbox(
+                (xmin, ymin, xmin + size, ymin + size)
+            ), srid=4326)
+
+        self.grid = DivisionGrid([
+            ('west', square(-72.0, 45.0, 0.5)),
+            ('east', square(-71.5, 45.0, 0.5)),
+        ])
+
+    def _find(self, lng, lat):
+        from django.contrib.gis.geos import Point
+        return self.grid.find(lng, lat, Point(lng, lat, srid=4326))
+
+    def test_resolves_containing_division(self):
+        self.assertEqual(self._find(-71.8, 45.2), 'west')
+        self.assertEqual(self._find(-71.2, 45.4), 'east')
+
+    def test_point_outside_all_polygons(self):
+        self.assertIsNone(self._find(-70.0, 45.2))
+        self.assertFalse(self.grid.contains_extent(-70.0, 45.2))
+
+    def test_each_thread_prepares_its_own_geometries(self):
+        import threading
+
+        self.assertEqual(self._find(-71.8, 45.2), 'west')
+        results = {}
+
+        def lookup():
+            results['found'] = self._find(-71.8, 45.2)
+            results['prepared'] = self.grid._local.prepared['west']
+
+        thread = threading.Thread(target=lookup)
+        thread.start()
+        thread.join()
+
+        self.assertEqual(results['found'], 'west')
+        self.assertIsNot(
+            results['prepared'], self.grid._local.prepared['west']
+        )
+
+    def test_lookup_without_country_builds_no_grids(self):
+        index = DivisionSpatialIndex()
+        index.enabled = True
+        index._grids = {'known': self.grid}
+        with mock.patch.object(index, '_build_grid') as build:
+            self.assertEqual(
+                index.find_division_id(45.2, -71.8), 'west'
+            )
+            self.assertIsNone(index.find_division_id(10.0, 10.0))
+        build.assert_not_called()
+
+
+@override_settings(API_RATE_LIMIT_ENABLED=True)
+class APIRateLimitMiddlewareTest(TestCase):
+    def setUp(self):
+        from django.contrib.auth.models import AnonymousUser
+        from django.http import HttpResponse
+        from middleware import APIRateLimitMiddleware
+
+        self.middleware = APIRateLimitMiddleware(lambda request: HttpResponse())
+        self.factory = RequestFactory()
+        self.anonymous = AnonymousUser()
+        # Unique client per run so counters left in Redis don't interfere
+        self.ip = f'10.{uuid.uuid4().int % 250}.{uuid.uuid4().int % 250}.7'
+
+    def _request(self, path='/api/content/posts/', method='post'):
+        request = getattr(self.factory, method)(path, REMOTE_ADDR=self.ip)
+        request.user = self.anonymous
+        return request
+
+    def _require_redis(self):
+        try:
+            self.middleware.redis_client.ping()
+        except Exception:
+            self.skipTest('Redis is not available')
+
+    def test_event_budgets(self):
+        self.assertEqual(
+            self.middleware.get_event(self._request()), 'post_create'
+        )
+        self.assertEqual(
+            self.middleware.get_event(
+                self._request('/api/auth/login-with-verification-check/')
+            ),
+            'login_attempt'
+        )
+        self.assertEqual(
+            self.middleware.get_event(self._request(method='get')), 'default'
+        )
+
+    def test_limit_enforced_with_headers(self):
+        self._require_redis()
+        limit = self.middleware.rate_limits['post_create']
+
+        for i in range(limit):
+            response = self.middleware(self._request())
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['X-RateLimit-Limit'], str(limit))
+        self.assertEqual(response['X-RateLimit-Remaining'], '0')
+
+        response = self.middleware(self._request())
+        self.assertEqual(response.status_code, 429)
+        self.assertGreater(int(response['Retry-After']), 0)
+
+    def test_blocked_client_rejected_without_redis(self):
+        self._require_redis()
+        for i in range(self.middleware.rate_limits['post_create'] + 1):
+            self.middleware(self._request())
+
+        with mock.patch.object(
+            self.middleware.redis_client, 'pipeline',
+            side_effect=AssertionError('Redis must not be used')
+        ):
+            response = self.middleware(self._request())
+        self.assertEqual(response.status_code, 429)
+
+    def test_redis_failure_fails_open(self):
+        import redis
+        with mock.patch.object(
+            self.middleware, 'redis_client'
+        ) as client:
+            client.pipeline.return_value.execute.side_effect = (
+                redis.ConnectionError('down')
+            )
+            response = self.middleware(self._request())
+        self.assertEqual(response.status_code, 200)
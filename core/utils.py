@@ -3,12 +3,83 @@ Core utilities used across multiple apps.
 """
 
 import hashlib
+import threading
+import time
+from collections import OrderedDict
 from user_agents import parse
-from typing import Any, Dict
+from typing import Any, Dict, Iterable
 from geoip2.database import Reader
+from maxminddb import MODE_MMAP
 import os
 from django.conf import settings
 
+_MISSING = object()
+
+
+class LocalLRUCache:
+    """
+    Thread-safe, size-bounded LRU cache with per-entry expiry.
+
+    Values are shared between threads as-is (no pickling), so cached model
+    instances must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int, timeout: int):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Any:
+        """Return the cached value, or ``_MISSING``."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.timeout, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete_prefix(self, prefix: str) -> int:
+        with self._lock:
+            keys = [key for key in self._data if key.startswith(prefix)]
+            for key in keys:
+                del self._data[key]
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+# Process-wide GeoIP reader, reopened when the database file changes
+GEOIP_RELOAD_CHECK_SECONDS = 60
+_geoip_lock = threading.Lock()
+_geoip_reader = None
+_geoip_file_state = None
+_geoip_checked_at = 0.0
+
+# Recent IP -> location results (negative results included); cleared
+# whenever the database is reloaded
+_geoip_results = LocalLRUCache(
+    getattr(settings, 'GEOIP_CACHE_SIZE', 4096), 3600
+)
+
 
 def get_client_ip(request):
     """
@@ -240,6 +311,73 @@ def get_device_info(request) -> Dict[str, Any]:
         }
 
 
+def _get_geoip_db_path() -> str:
+    db_path = getattr(settings, 'GEOIP2_DB_PATH', None) or os.environ.get('GEOIP2_DB_PATH')
+    if not db_path:
+        # Default to a common location in the project
+        db_path = os.path.join(settings.BASE_DIR, 'GeoLite2-City.mmdb')
+    return db_path
+
+
+def _get_geoip_reader():
+    """
+    Return the shared memory-mapped GeoIP reader, or None if the database
+    is missing.
+
+    The file is re-checked at most every GEOIP_RELOAD_CHECK_SECONDS; when it
+    was replaced, a new reader is opened and cached results are dropped.
+    The old reader is not closed explicitly so in-flight lookups on other
+    threads can finish; its mapping is released once unreferenced.
+    """
+    global _geoip_reader, _geoip_file_state, _geoip_checked_at
+
+    now = time.monotonic()
+    if _geoip_reader is not None and now - _geoip_checked_at < GEOIP_RELOAD_CHECK_SECONDS:
+        return _geoip_reader
+
+    with _geoip_lock:
+        if _geoip_reader is not None and now - _geoip_checked_at < GEOIP_RELOAD_CHECK_SECONDS:
+            return _geoip_reader
+        _geoip_checked_at = now
+
+        db_path = _get_geoip_db_path()
+        try:
+            stat = os.stat(db_path)
+        except OSError:
+            _geoip_reader = None
+            _geoip_file_state = None
+            return None
+
+        file_state = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        if _geoip_reader is None or file_state != _geoip_file_state:
+            try:
+                _geoip_reader = Reader(db_path, mode=MODE_MMAP)
+                _geoip_file_state = file_state
+            except Exception:
+                _geoip_reader = None
+                _geoip_file_state = None
+            _geoip_results.clear()
+        return _geoip_reader
+
+
+def _lookup_location(reader, ip: str) -> dict:
+    try:
+        response = reader.city(ip)
+    except Exception:
+        return {}
+    location = {
+        'country': response.country.name,
+        'country_iso_code': response.country.iso_code,
+        'city': response.city.name,
+        'region': response.subdivisions.most_specific.name,
+        'latitude': response.location.latitude,
+        'longitude': response.location.longitude,
+        'timezone': response.location.time_zone,
+        'accuracy_radius': response.location.accuracy_radius
+    }
+    return {k: v for k, v in location.items() if v}
+
+
 def get_location_from_ip(ip: str) -> dict:
     """
     Infer location from IP address using MaxMind GeoLite2 City database.
@@ -251,30 +389,34 @@ def get_location_from_ip(ip: str) -> dict:
     # If we don't have a valid IP, return empty
     if not ip:
         return {}
+    return get_locations_from_ips([ip]).get(ip, {})
 
-    db_path = getattr(settings, 'GEOIP2_DB_PATH', None) or os.environ.get('GEOIP2_DB_PATH')
-    if not db_path:
-        # Default to a common location in the project
-        db_path = os.path.join(settings.BASE_DIR, 'GeoLite2-City.mmdb')
-    if not os.path.exists(db_path):
-        return {}
-    try:
-        reader = Reader(db_path)
-        response = reader.city(ip)
-        location = {
-            'country': response.country.name,
-            'country_iso_code': response.country.iso_code,
-            'city': response.city.name,
-            'region': response.subdivisions.most_specific.name,
-            'latitude': response.location.latitude,
-            'longitude': response.location.longitude,
-            'timezone': response.location.time_zone,
-            'accuracy_radius': response.location.accuracy_radius
-        }
-        reader.close()
-        return {k: v for k, v in location.items() if v}
-    except Exception:
-        return {}
+
+def get_locations_from_ips(ips: Iterable[str]) -> Dict[str, dict]:
+    """
+    Batch version of get_location_from_ip: resolve many IPs in one pass
+    over the shared reader. Returns ``{ip: location}`` (empty dict when
+    unknown) for every distinct non-empty IP.
+    """
+    results = {}
+    missing = []
+    for ip in dict.fromkeys(ips):
+        if not ip:
+            continue
+        cached = _geoip_results.get(ip)
+        if isinstance(cached, dict):
+            results[ip] = dict(cached)
+        else:
+            missing.append(ip)
+
+    if missing:
+        reader = _get_geoip_reader()
+        for ip in missing:
+            location = _lookup_location(reader, ip) if reader else {}
+            if reader:
+                _geoip_results.set(ip, location)
+            results[ip] = dict(location)
+    return results
 
 
 def _get_public_ip():
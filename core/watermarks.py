@@ -0,0 +1,45 @@
+"""
+Activity watermarks for periodic counter recounts.
+
+A task records when its last successful run started; the next run only
+recounts objects with activity since then (see ``messaging.counters`` and
+``polls.counters``). A missing watermark (first run, cache flushed) means
+a full recount.
+
+Rows are stamped when written but become visible when their transaction
+commits, so a row stamped just before a run started may commit after that
+run scanned. The next run therefore looks back ``OVERLAP`` further than
+the recorded start.
+"""
+
+from datetime import timedelta
+
+from django.core.cache import cache
+
+
+class ActivityWatermark:
+    """Start time of the last successful run of a periodic job."""
+
+    # Longest expected gap between stamping a row and committing it
+    OVERLAP = timedelta(minutes=5)
+
+    def __init__(self, key: str):
+        self.key = key
+
+    def get(self):
+        """
+        Datetime to scan for activity from (the last successful run's start
+        minus ``OVERLAP``), or None.
+        """
+        started_at = cache.get(self.key)
+        if started_at is None:
+            return None
+        return started_at - self.OVERLAP
+
+    def advance(self, started_at) -> None:
+        """Record a successful run that started at ``started_at``."""
+        cache.set(self.key, started_at, None)
+
+    def reset(self) -> None:
+        """Force a full recount on the next run."""
+        cache.delete(self.key)
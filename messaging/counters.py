@@ -0,0 +1,104 @@
+"""
+Set-based recount of the denormalized ChatRoom counters.
+
+``messages_count`` and ``last_message_at`` are recomputed for a chunk of
+rooms with one grouped aggregate over their messages, and only the rooms
+whose stored values drifted are written, with ``bulk_update``. The periodic
+task only visits rooms with activity since its last run.
+"""
+
+from typing import Iterable, List
+
+from django.db.models import Count, Max
+
+from core.watermarks import ActivityWatermark
+
+from .models import ChatRoom, Message
+
+ROOM_COUNTER_FIELDS = ('messages_count', 'last_message_at')
+
+
+def active_room_ids(since) -> List:
+    """Rooms with a message sent or edited, or a room update, since ``since``."""
+    room_ids = set(Message.objects.filter(
+        updated_at__gte=since
+    ).order_by().values_list('room_id', flat=True).distinct())
+    room_ids.update(ChatRoom.objects.filter(
+        updated_at__gte=since
+    ).order_by().values_list('pk', flat=True))
+    return sorted(room_ids)
+
+
+def recount_room_counters(room_ids: Iterable) -> int:
+    """
+    Recompute the counters of ``room_ids`` and persist those that changed.
+
+    Returns:
+        Number of rooms whose counters were corrected
+    """
+    room_ids = list(room_ids)
+    actual = {
+        row['room_id']: (row['total'], row['last'])
+        for row in Message.objects.filter(
+            room_id__in=room_ids, is_deleted=False
+        ).order_by().values('room_id').annotate(
+            total=Count('pk'), last=Max('created_at')
+        )
+    }
+
+    changed = []
+    for row in ChatRoom.objects.filter(pk__in=room_ids).order_by().values(
+        'pk', *ROOM_COUNTER_FIELDS
+    ):
+        total, last = actual.get(row['pk'], (0, None))
+        if (row['messages_count'], row['last_message_at']) != (total, last):
+            changed.append(ChatRoom(
+                pk=row['pk'], messages_count=total, last_message_at=last
+            ))
+
+    if changed:
+        ChatRoom.objects.bulk_update(
+            changed, ROOM_COUNTER_FIELDS, batch_size=1000
+        )
+    return len(changed)
+
+
+def recount_rooms(since=None, batch_size: int = 5000) -> tuple:
+    """
+    Recount the rooms active since ``since`` (every room when None), chunk
+    by chunk.
+
+    Returns:
+        ``(processed, corrected)``
+    """
+    if since is not None:
+        room_ids = active_room_ids(since)
+        chunks = (
+            room_ids[start:start + batch_size]
+            for start in range(0, len(room_ids), batch_size)
+        )
+    else:
+        chunks = _all_room_chunks(batch_size)
+
+    processed = corrected = 0
+    for chunk in chunks:
+        corrected += recount_room_counters(chunk)
+        processed += len(chunk)
+    return processed, corrected
+
+
+def _all_room_chunks(batch_size):
+    last_pk = None
+    while True:
+        rooms = ChatRoom.objects.order_by('pk')
+        if last_pk is not None:
+            rooms = rooms.filter(pk__gt=last_pk)
+        chunk = list(rooms.values_list('pk', flat=True)[:batch_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]
+
+
+# Start of the last successful update_message_counters run
+room_counters_watermark = ActivityWatermark('messaging:counters:watermark')
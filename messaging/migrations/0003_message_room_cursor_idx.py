@@ -0,0 +1,17 @@
+# Generated by Django 4.2.25 on 2026-10-16 16:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0002_message_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['room', '-created_at', '-id'], name='message_room_cursor_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.25 on 2026-10-16 17:00
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def collapse_message_reads(apps, schema_editor):
+    """
+    Replace per-message MessageRead rows with one watermark per room and
+    participant, at the newest message they had read.
+    """
+    MessageRead = apps.get_model('messaging', 'MessageRead')
+    RoomReadWatermark = apps.get_model('messaging', 'RoomReadWatermark')
+
+    latest_reads = MessageRead.objects.values(
+        'message__room_id', 'user_id'
+    ).annotate(
+        last_read_at=Max('message__created_at')
+    ).order_by()
+
+    # The watermark time is what counts; last_read_message stays empty
+    batch = []
+    for row in latest_reads.iterator(chunk_size=5000):
+        batch.append(RoomReadWatermark(
+            room_id=row['message__room_id'],
+            user_id=row['user_id'],
+            last_read_at=row['last_read_at'],
+        ))
+        if len(batch) >= 5000:
+            RoomReadWatermark.objects.bulk_create(batch, ignore_conflicts=True)
+            batch = []
+    if batch:
+        RoomReadWatermark.objects.bulk_create(batch, ignore_conflicts=True)
+
+    MessageRead.objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        ('messaging', '0003_message_room_cursor_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RoomReadWatermark',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('last_read_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('last_read_message', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='messaging.message')),
+                ('room', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='read_watermarks', to='messaging.chatroom')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='room_read_watermarks', to='accounts.userprofile')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['room', 'last_read_at'], name='message_watermark_room_idx')],
+                'unique_together': {('room', 'user')},
+            },
+        ),
+        migrations.RunPython(
+            collapse_message_reads, migrations.RunPython.noop
+        ),
+    ]
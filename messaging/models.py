@@ -3,7 +3,11 @@
 import uuid
 from datetime import timedelta
 from django.db import models
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from accounts.models import UserProfile
 
 
@@ -41,6 +45,7 @@ class ChatRoom(models.Model):
 
     # Message count for performance
     messages_count = models.PositiveIntegerField(default=0)
+    last_message_at = models.DateTimeField(null=True, blank=True)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -298,6 +303,9 @@ class Message(models.Model):
     # Restoration tracking fields
     is_pinned = models.BooleanField(default=False)  # Pin important messages
 
+    # Full-text search document (content), maintained by search.signals
+    search_vector = SearchVectorField(null=True, editable=False)
+
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -322,9 +330,19 @@ class Message(models.Model):
     class Meta:
         indexes = [
             models.Index(fields=['room', '-created_at']),
+            # Rooms with activity since the last counter recount
+            models.Index(
+                fields=['updated_at'], name='message_updated_at_idx'
+            ),
+            # Keyset pagination of a room's history by (created_at, id)
+            models.Index(
+                fields=['room', '-created_at', '-id'],
+                name='message_room_cursor_idx'
+            ),
             models.Index(fields=['sender', '-created_at']),
             models.Index(fields=['reply_to', '-created_at']),
             models.Index(fields=['is_pinned', '-created_at']),
+            GinIndex(fields=['search_vector'], name='message_search_gin'),
         ]
     def restore_instance(self, cascade=True):
         """Restore this soft-deleted instance and optionally cascade to related objects."""
@@ -604,6 +622,132 @@ class MessageRead(models.Model):
         return f"{self.user.username} read {self.message.id}"
 
 
+class RoomReadWatermark(models.Model):
+    """
+    How far a participant has read a chat room.
+
+    Every message of the room sent at or before ``last_read_at`` counts as
+    read by ``user``, so read state costs one row per participant instead
+    of one ``MessageRead`` row per message and participant. Watermarks only
+    move forward.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    room = models.ForeignKey(
+        ChatRoom,
+        on_delete=models.CASCADE,
+        related_name='read_watermarks'
+    )
+    user = models.ForeignKey(
+        UserProfile,
+        on_delete=models.CASCADE,
+        related_name='room_read_watermarks'
+    )
+    last_read_message = models.ForeignKey(
+        Message,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    last_read_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('room', 'user')
+        indexes = [
+            models.Index(
+                fields=['room', 'last_read_at'],
+                name='message_watermark_room_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} read {self.room_id} up to {self.last_read_at}"
+
+    @classmethod
+    def advance(cls, room, user, message):
+        """
+        Mark ``room`` read by ``user`` up to ``message``.
+
+        Returns:
+            bool: False if the watermark was already at or past it
+        """
+        watermark, created = cls.objects.get_or_create(
+            room=room,
+            user=user,
+            defaults={
+                'last_read_message': message,
+                'last_read_at': message.created_at,
+            }
+        )
+        if created:
+            return True
+        return cls.objects.filter(
+            pk=watermark.pk, last_read_at__lt=message.created_at
+        ).update(
+            last_read_message=message,
+            last_read_at=message.created_at,
+            updated_at=timezone.now()
+        ) > 0
+
+    @classmethod
+    def unread_messages(cls, user, room=None):
+        """
+        Messages not read by ``user``: newer than their watermark in the
+        room (all messages when there is none), excluding their own.
+        """
+        read = cls.objects.filter(
+            room=models.OuterRef('room'),
+            user=user,
+            last_read_at__gte=models.OuterRef('created_at')
+        )
+        messages = Message.objects.filter(
+            room__participants=user, is_deleted=False
+        ) if room is None else room.messages.filter(is_deleted=False)
+        return messages.exclude(sender=user).exclude(models.Exists(read))
+
+    @classmethod
+    def annotate_read_state(cls, messages, user):
+        """
+        Annotate ``messages`` with ``is_read_by_me`` (for ``user``) and
+        ``read_count`` (participants other than the sender who read it).
+        """
+        read_by_me = cls.objects.filter(
+            room=models.OuterRef('room'),
+            user=user,
+            last_read_at__gte=models.OuterRef('created_at')
+        )
+        readers = cls.objects.filter(
+            room=models.OuterRef('room'),
+            last_read_at__gte=models.OuterRef('created_at')
+        ).exclude(
+            user=models.OuterRef('sender')
+        ).order_by().values('room').annotate(
+            total=models.Count('id')
+        ).values('total')
+        return messages.annotate(
+            is_read_by_me=models.ExpressionWrapper(
+                models.Q(sender=user) | models.Q(models.Exists(read_by_me)),
+                output_field=models.BooleanField()
+            ),
+            read_count=Coalesce(models.Subquery(readers), 0)
+        )
+
+    @classmethod
+    def unread_count(cls, room, user):
+        """
+        Unread messages of ``user`` in ``room``, counted as one range over
+        the room's ``(room, created_at)`` index.
+        """
+        last_read_at = cls.objects.filter(
+            room=room, user=user
+        ).values_list('last_read_at', flat=True).first()
+        messages = room.messages.filter(is_deleted=False).exclude(sender=user)
+        if last_read_at is not None:
+            messages = messages.filter(created_at__gt=last_read_at)
+        return messages.count()
+
+
 class MessageReaction(models.Model):
     """Message reactions (emojis) - flexible system."""
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
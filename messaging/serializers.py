@@ -1,8 +1,9 @@
 """Serializers for the messaging app."""
 
+from django.db import models
 from rest_framework import serializers
 from accounts.models import UserProfile
-from .models import ChatRoom, Message, MessageRead
+from .models import ChatRoom, Message, RoomReadWatermark
 
 
 # MessageAttachment model not yet implemented
@@ -18,14 +19,52 @@ from .models import ChatRoom, Message, MessageRead
 #         read_only_fields = ['id', 'file_size', 'uploaded_at']
 
 
-class MessageReadSerializer(serializers.ModelSerializer):
-    """Serializer for message read status."""
+class RoomReadWatermarkSerializer(serializers.ModelSerializer):
+    """How far the current user has read a chat room."""
+    unread_count = serializers.SerializerMethodField()
+
+    class Meta:
+        model = RoomReadWatermark
+        fields = [
+            'id', 'room', 'last_read_message', 'last_read_at',
+            'unread_count', 'updated_at'
+        ]
+        read_only_fields = fields
+
+    def get_unread_count(self, obj):
+        """Messages in the room past the watermark."""
+        # Annotated by MessageReadViewSet for watermark lists
+        if hasattr(obj, 'unread_messages_count'):
+            return obj.unread_messages_count
+        return RoomReadWatermark.unread_count(obj.room, obj.user)
+
+
+class ReadReceiptSerializer(serializers.ModelSerializer):
+    """A participant whose read watermark covers a message."""
     user_username = serializers.CharField(source='user.user.username', read_only=True)
+    read_at = serializers.DateTimeField(source='updated_at', read_only=True)
 
     class Meta:
-        model = MessageRead
-        fields = ['id', 'user', 'user_username', 'read_at']
-        read_only_fields = ['id', 'read_at']
+        model = RoomReadWatermark
+        fields = ['user', 'user_username', 'read_at']
+
+
+class MessageListSerializer(serializers.ListSerializer):
+    """List serializer that loads the read watermarks of a page's rooms once."""
+
+    def to_representation(self, data):
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        messages = list(iterable)
+        watermarks = self.context.setdefault('room_watermarks', {})
+        room_ids = {message.room_id for message in messages} - set(watermarks)
+        if room_ids:
+            for room_id in room_ids:
+                watermarks[room_id] = []
+            for watermark in RoomReadWatermark.objects.filter(
+                room_id__in=room_ids
+            ).select_related('user__user'):
+                watermarks[watermark.room_id].append(watermark)
+        return super().to_representation(messages)
 
 
 class MessageSerializer(serializers.ModelSerializer):
@@ -33,31 +72,66 @@ class MessageSerializer(serializers.ModelSerializer):
     sender_username = serializers.CharField(source='sender.user.username', read_only=True)
     sender_avatar = serializers.ImageField(source='sender.profile_picture', read_only=True)
     # attachments = MessageAttachmentSerializer(many=True, read_only=True)  # Not yet implemented
-    read_by = MessageReadSerializer(many=True, read_only=True)
+    read_by = serializers.SerializerMethodField()
     is_read_by_current_user = serializers.SerializerMethodField()
+    sent_at = serializers.DateTimeField(source='created_at', read_only=True)
 
     class Meta:
         model = Message
         fields = [
             'id', 'room', 'sender', 'sender_username', 'sender_avatar',
-            'content', 'message_type', 'attachments', 'read_by',
-            'is_read_by_current_user', 'is_edited', 'edited_at',
+            'content', 'message_type', 'read_by',
+            'is_read_by_current_user', 'is_edited',
             'reply_to', 'sent_at'
         ]
-        read_only_fields = ['id', 'sender', 'sent_at', 'is_edited', 'edited_at']
+        read_only_fields = ['id', 'sender', 'sent_at', 'is_edited']
+        list_serializer_class = MessageListSerializer
+
+    def get_read_by(self, obj):
+        """Participants (other than the sender) who have read the message."""
+        # MessageListSerializer loads the rooms' watermarks once per page
+        watermarks = self.context.get('room_watermarks', {}).get(obj.room_id)
+        if watermarks is None:
+            watermarks = obj.room.read_watermarks.select_related('user__user')
+        readers = [
+            watermark for watermark in watermarks
+            if watermark.last_read_at >= obj.created_at and
+            watermark.user_id != obj.sender_id
+        ]
+        return ReadReceiptSerializer(readers, many=True).data
 
     def get_is_read_by_current_user(self, obj):
         """Check if current user has read this message."""
+        # Annotated by RoomReadWatermark.annotate_read_state
+        if hasattr(obj, 'is_read_by_me'):
+            return obj.is_read_by_me
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             try:
-                profile = request.user.userprofile
-                return obj.read_by.filter(user=profile).exists()
+                profile = request.user.profile
+                return obj.sender_id == profile.id or obj.room.read_watermarks.filter(
+                    user=profile, last_read_at__gte=obj.created_at
+                ).exists()
             except UserProfile.DoesNotExist:
                 return False
         return False
 
 
+class CompactMessageSerializer(MessageSerializer):
+    """Message without the ``read_by`` list; only how many have read it."""
+    read_count = serializers.IntegerField(read_only=True)
+
+    class Meta(MessageSerializer.Meta):
+        fields = [
+            'id', 'room', 'sender', 'sender_username', 'sender_avatar',
+            'content', 'message_type', 'read_count',
+            'is_read_by_current_user', 'is_edited',
+            'reply_to', 'sent_at'
+        ]
+        # No read_by list, so no watermarks to preload
+        list_serializer_class = serializers.ListSerializer
+
+
 class MessageCreateUpdateSerializer(serializers.ModelSerializer):
     """Serializer for creating and updating messages."""
 
@@ -97,13 +171,13 @@ class ChatRoomSerializer(serializers.ModelSerializer):
 
     def get_last_message(self, obj):
         """Get the last message in the room."""
-        last_message = obj.messages.order_by('-sent_at').first()
+        last_message = obj.messages.order_by('-created_at').first()
         if last_message:
             return {
                 'id': last_message.id,
                 'content': last_message.content,
                 'sender_username': last_message.sender.user.username,
-                'sent_at': last_message.sent_at,
+                'sent_at': last_message.created_at,
                 'message_type': last_message.message_type
             }
         return None
@@ -113,11 +187,11 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             try:
-                profile = request.user.userprofile
-                # Count messages not read by current user
-                return obj.messages.exclude(
-                    read_by__user=profile
-                ).count()
+                profile = request.user.profile
+                # Annotated by ChatRoomViewSet for room lists
+                if hasattr(obj, 'unread_messages_count'):
+                    return obj.unread_messages_count
+                return RoomReadWatermark.unread_count(obj, profile)
             except UserProfile.DoesNotExist:
                 return 0
         return 0
@@ -127,7 +201,7 @@ class ChatRoomSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request and request.user.is_authenticated:
             try:
-                profile = request.user.userprofile
+                profile = request.user.profile
                 return obj.participants.filter(id=profile.id).exists()
             except UserProfile.DoesNotExist:
                 return False
@@ -152,7 +226,7 @@ class ChatRoomCreateUpdateSerializer(serializers.ModelSerializer):
         if request and hasattr(request, 'user'):
             # Ensure current user is included in participants
             try:
-                current_profile = request.user.userprofile
+                current_profile = request.user.profile
                 if current_profile not in value:
                     value.append(current_profile)
             except UserProfile.DoesNotExist:
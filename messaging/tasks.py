@@ -197,7 +197,7 @@ def send_message_notification_emails():
     """
     try:
         from django.contrib.auth.models import User
-        from messaging.models import MessageRead, Message
+        from messaging.models import RoomReadWatermark
         from notifications.utils import NotificationService
 
         # Get users who are active and have notification settings
@@ -221,24 +221,17 @@ def send_message_notification_emails():
                 if user_settings.notification_frequency == 'never':
                     continue
 
-                # Get unread message count
-                unread_count = Message.objects.filter(
-                    room__participants=user_profile
-                ).exclude(
-                    id__in=MessageRead.objects.filter(
-                        user=user
-                    ).values_list('message_id', flat=True)
-                ).count()
+                # Get unread message count (past each room's watermark)
+                unread_messages = RoomReadWatermark.unread_messages(
+                    user_profile
+                )
+                unread_count = unread_messages.count()
 
                 if unread_count > 0:
                     # Get the most recent unread message
-                    recent_message = Message.objects.filter(
-                        room__participants=user_profile
-                    ).exclude(
-                        id__in=MessageRead.objects.filter(
-                            user=user
-                        ).values_list('message_id', flat=True)
-                    ).order_by('-created_at').first()
+                    recent_message = unread_messages.order_by(
+                        '-created_at'
+                    ).first()
 
                     if recent_message:
                         sender_profile = getattr(
@@ -304,17 +297,13 @@ def cleanup_old_messages():
     """
     Clean up old message data based on retention policies.
 
-    This removes old messages, read receipts, and other messaging data
-    according to configured retention policies.
+    This removes old reactions and archives old messages according to
+    configured retention policies. Read state is one watermark per room
+    and participant (RoomReadWatermark), so there are no per-message read
+    receipts to expire.
     """
     try:
-        from messaging.models import Message, MessageRead, MessageReaction
-
-        # Delete old message read receipts (keep 30 days)
-        old_read_date = timezone.now() - timedelta(days=30)
-        old_reads = MessageRead.objects.filter(read_at__lt=old_read_date)
-        reads_count = old_reads.count()
-        old_reads.delete()
+        from messaging.models import Message, MessageReaction
 
         # Delete old message reactions (keep 90 days)
         old_reaction_date = timezone.now() - timedelta(days=90)
@@ -335,45 +324,35 @@ def cleanup_old_messages():
         from core.signals import handle_bulk_soft_deletion
         handle_bulk_soft_deletion(old_messages, is_deleted=True)
 
-        return (f"Cleaned up {reads_count} read receipts, "
-                f"{reactions_count} reactions, archived {archived_count} messages")
+        return (f"Cleaned up {reactions_count} reactions, "
+                f"archived {archived_count} messages")
 
     except Exception as e:
         return f"Error cleaning up old messages: {str(e)}"
 
 
 @shared_task
-def update_message_counters():
+def update_message_counters(batch_size=5000):
     """
     Update denormalized counters for chat rooms and messages.
 
-    This updates message counts, participant counts, and other
-    cached statistics for better performance.
+    Only rooms with activity since the last successful run are recounted
+    (every room on the first run), with grouped aggregates and
+    bulk_update (see messaging.counters).
     """
     try:
-        from messaging.models import ChatRoom
-
-        # Update chat room counters
-        rooms = ChatRoom.objects.all()
-        for room in rooms:
-            # Update message count
-            room.message_count = room.messages.filter(is_deleted=False).count()
-
-            # Update participant count
-            room.participant_count = room.participants.count()
-
-            # Update last message info
-            last_message = room.messages.filter(is_deleted=False).order_by('-created_at').first()
-            if last_message:
-                room.last_message_at = last_message.created_at
-                room.last_message_content = last_message.content[:100]
+        from messaging.counters import recount_rooms, room_counters_watermark
 
-            room.save(update_fields=[
-                'message_count', 'participant_count',
-                'last_message_at', 'last_message_content'
-            ])
+        started_at = timezone.now()
+        processed, corrected = recount_rooms(
+            room_counters_watermark.get(), batch_size=batch_size
+        )
+        room_counters_watermark.advance(started_at)
 
-        return f"Updated counters for {rooms.count()} chat rooms"
+        return (
+            f"Updated counters for {processed} chat rooms "
+            f"({corrected} corrected)"
+        )
 
     except Exception as e:
         return f"Error updating message counters: {str(e)}"
@@ -604,7 +583,7 @@ def send_hourly_message_batch():
     """
     try:
         from django.contrib.auth.models import User
-        from messaging.models import Message, MessageRead
+        from messaging.models import RoomReadWatermark
         from notifications.utils import NotificationService
 
         # Get users who want hourly email batches
@@ -624,17 +603,11 @@ def send_hourly_message_batch():
                     continue
 
                 # Get unread messages from the last hour
-                hourly_messages = Message.objects.filter(
-                    room__participants=user_profile,
-                    created_at__gte=hour_ago,
-                    is_deleted=False
-                ).exclude(
-                    sender=user_profile  # Exclude user's own messages
-                ).exclude(
-                    id__in=MessageRead.objects.filter(
-                        user=user
-                    ).values_list('message_id', flat=True)
-                ).order_by('-created_at')
+                hourly_messages = RoomReadWatermark.unread_messages(
+                    user_profile
+                ).filter(
+                    created_at__gte=hour_ago
+                ).select_related('room', 'sender').order_by('-created_at')
 
                 if hourly_messages.exists():
                     # Group messages by room and sender
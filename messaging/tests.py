@@ -13,19 +13,27 @@ This module provides extensive test coverage for:
 
 from datetime import timedelta
 from unittest.mock import patch
+from django.db import connection
 from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth.models import User
 from django.utils import timezone
 from django.core.files.uploadedfile import SimpleUploadedFile
-from rest_framework.test import APITestCase
+from rest_framework.test import (
+    APIRequestFactory, APITestCase, force_authenticate
+)
 from rest_framework import status
 from accounts.models import UserProfile
 from django.utils import timezone
 from core.jwt_test_mixin import JWTAuthTestMixin
 from messaging.models import (
-    ChatRoom, Message, MessageRead, MessageReaction, UserPresence
+    ChatRoom, Message, MessageRead, MessageReaction, RoomReadWatermark,
+    UserPresence
 )
 from messaging import tasks
+from messaging.views import (
+    ChatRoomViewSet, MessageReadViewSet, MessageViewSet
+)
 
 
 # =============================================================================
@@ -442,6 +450,26 @@ class MessagingTaskTests(TransactionTestCase):
             result = mock_task()
             self.assertIn('Updated counters', result)
 
+    def test_update_message_counters_recounts_active_rooms(self):
+        """Rooms are recounted with grouped aggregates."""
+        from messaging.counters import room_counters_watermark
+
+        message = Message.objects.create(
+            room=self.chat_room,
+            sender=self.user_profile,
+            content='Counted message',
+            message_type='text'
+        )
+        room_counters_watermark.reset()
+
+        result = tasks.update_message_counters()
+
+        self.chat_room.refresh_from_db()
+        # Includes the message created in setUp
+        self.assertEqual(self.chat_room.messages_count, 2)
+        self.assertEqual(self.chat_room.last_message_at, message.created_at)
+        self.assertIn('1 corrected', result)
+
     def test_process_message_mentions_task(self):
         """Test processing message mentions task."""
         with patch('messaging.tasks.process_message_mentions') as mock_task:
@@ -764,6 +792,146 @@ class MessagingAPITests(MessagingAPITestCase):
         ])
 
 
+class ChatRoomMessageHistoryTests(MessagingAPITestCase):
+    """Test cursor pagination of ChatRoomViewSet.messages."""
+
+    def setUp(self):
+        super().setUp()
+        for i in range(4):
+            Message.objects.create(
+                room=self.chat_room,
+                sender=self.user2_profile,
+                content=f'Message {i}',
+                message_type='text'
+            )
+        self.view = ChatRoomViewSet.as_view({'get': 'messages'})
+
+    def get_page(self, **params):
+        request = APIRequestFactory().get('/', params)
+        force_authenticate(request, user=self.user1)
+        response = self.view(request, pk=self.chat_room.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_pages_walk_back_and_forward(self):
+        first = self.get_page(page_size=2)
+        self.assertEqual(
+            [m['content'] for m in first['results']],
+            ['Message 3', 'Message 2']
+        )
+        self.assertTrue(first['has_more'])
+
+        older = self.get_page(page_size=2, before=first['older_cursor'])
+        self.assertEqual(
+            [m['content'] for m in older['results']],
+            ['Message 1', 'Message 0']
+        )
+
+        newer = self.get_page(page_size=1, after=older['newer_cursor'])
+        self.assertEqual(
+            [m['content'] for m in newer['results']], ['Message 2']
+        )
+        self.assertTrue(newer['has_more'])
+
+    def test_compact_messages_carry_read_counts(self):
+        latest = self.chat_room.messages.order_by('-created_at').first()
+        RoomReadWatermark.advance(self.chat_room, self.user1_profile, latest)
+
+        page = self.get_page(page_size=1, compact='true')
+        entry = page['results'][0]
+        self.assertNotIn('read_by', entry)
+        self.assertEqual(entry['read_count'], 1)
+        self.assertTrue(entry['is_read_by_current_user'])
+
+    def test_invalid_cursor_is_rejected(self):
+        request = APIRequestFactory().get('/', {'before': 'not-a-cursor'})
+        force_authenticate(request, user=self.user1)
+        response = self.view(request, pk=self.chat_room.pk)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RoomReadWatermarkTests(MessagingAPITestCase):
+    """Test watermark-based read receipts and unread counts."""
+
+    def setUp(self):
+        super().setUp()
+        self.incoming = [
+            Message.objects.create(
+                room=self.chat_room,
+                sender=self.user2_profile,
+                content=f'Incoming {i}',
+                message_type='text'
+            )
+            for i in range(3)
+        ]
+
+    def test_watermark_only_moves_forward(self):
+        self.assertEqual(
+            RoomReadWatermark.unread_count(self.chat_room, self.user1_profile), 3
+        )
+
+        self.assertTrue(RoomReadWatermark.advance(
+            self.chat_room, self.user1_profile, self.incoming[1]
+        ))
+        self.assertFalse(RoomReadWatermark.advance(
+            self.chat_room, self.user1_profile, self.incoming[0]
+        ))
+        self.assertEqual(
+            RoomReadWatermark.unread_count(self.chat_room, self.user1_profile), 1
+        )
+        self.assertEqual(
+            list(RoomReadWatermark.unread_messages(self.user1_profile)),
+            [self.incoming[2]]
+        )
+
+    def test_mark_read_endpoint_reads_up_to_latest(self):
+        request = APIRequestFactory().post('/', {}, format='json')
+        force_authenticate(request, user=self.user1)
+        response = ChatRoomViewSet.as_view({'post': 'mark_read'})(
+            request, pk=self.chat_room.pk
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['unread_count'], 0)
+        self.assertEqual(
+            response.data['last_read_message'], self.incoming[-1].id
+        )
+
+    def _list(self, viewset):
+        request = APIRequestFactory().get('/')
+        force_authenticate(request, user=self.user1)
+        response = viewset.as_view({'get': 'list'})(request)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response.render()
+        return response
+
+    def test_message_list_query_count_is_flat(self):
+        RoomReadWatermark.advance(
+            self.chat_room, self.user1_profile, self.incoming[0]
+        )
+        with CaptureQueriesContext(connection) as small:
+            self._list(MessageViewSet)
+
+        for i in range(5):
+            Message.objects.create(
+                room=self.chat_room,
+                sender=self.user2_profile,
+                content=f'More {i}',
+                message_type='text'
+            )
+        with self.assertNumQueries(len(small.captured_queries)):
+            self._list(MessageViewSet)
+
+    def test_read_list_annotates_unread_counts(self):
+        RoomReadWatermark.advance(
+            self.chat_room, self.user1_profile, self.incoming[0]
+        )
+        results = self._list(MessageReadViewSet).data['results']
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['unread_count'], 2)
+
+
 # =============================================================================
 # SECURITY AND VALIDATION TESTS
 # =============================================================================
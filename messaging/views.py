@@ -1,7 +1,15 @@
 """Views for the messaging app with complete CRUD operations."""
 
+import base64
+import binascii
+import uuid
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
 from django.db import models
-from django.db.models import Count, Q, Max
+from django.db.models import Count, OuterRef, Q, Max, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.dateparse import parse_datetime
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -10,14 +18,38 @@ from rest_framework.parsers import MultiPartParser, FormParser
 from accounts.models import UserProfile
 from accounts.permissions import NotDeletedUserPermission
 from accounts.utils import get_active_profile_or_404
-from .models import ChatRoom, Message, MessageRead
+from .models import ChatRoom, Message, RoomReadWatermark
 from .serializers import (
     ChatRoomSerializer, ChatRoomCreateUpdateSerializer,
-    MessageSerializer, MessageCreateUpdateSerializer,
-    MessageReadSerializer
+    CompactMessageSerializer, MessageSerializer,
+    MessageCreateUpdateSerializer, RoomReadWatermarkSerializer
 )
 
 
+# Lower bound for rooms the user has never marked read
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+def encode_message_cursor(sent_at, message_id):
+    """Encode a ``(sent_at, id)`` keyset position as an opaque cursor."""
+    raw = f"{sent_at.isoformat()}|{message_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_message_cursor(cursor):
+    """Decode a cursor into ``(sent_at, id)`` or ``None`` if invalid."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        sent_at_str, message_id = raw.split('|', 1)
+        sent_at = parse_datetime(sent_at_str)
+        if sent_at is None:
+            return None
+        return sent_at, uuid.UUID(message_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        return None
+
+
 class ChatRoomViewSet(viewsets.ModelViewSet):
     """ViewSet for managing chat rooms."""
     serializer_class = ChatRoomSerializer
@@ -25,14 +57,33 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Get chat rooms where user is a participant."""
-        profile = self.request.user.userprofile
-        return ChatRoom.objects.filter(is_deleted=False,
+        profile = self.request.user.profile
+        queryset = ChatRoom.objects.filter(is_deleted=False,
             participants=profile).select_related('created_by').prefetch_related(
-            'participants', 'messages'
+            'participants'
         ).annotate(
-            last_message_time=Max('messages__sent_at')
+            last_message_time=Max('messages__created_at')
         ).order_by('-last_message_time', '-updated_at')
 
+        if self.action in ['list', 'retrieve']:
+            # Unread count per room: one range count past the watermark
+            last_read_at = RoomReadWatermark.objects.filter(
+                room=OuterRef('pk'), user=profile
+            ).values('last_read_at')[:1]
+            unread = Message.objects.filter(
+                room=OuterRef('pk'),
+                is_deleted=False,
+                created_at__gt=Coalesce(
+                    Subquery(last_read_at), Value(EPOCH)
+                )
+            ).exclude(sender=profile).order_by().values('room').annotate(
+                total=Count('id')
+            ).values('total')
+            queryset = queryset.annotate(
+                unread_messages_count=Coalesce(Subquery(unread), 0)
+            )
+        return queryset
+
     def get_serializer_class(self):
         """Return appropriate serializer class."""
         if self.action in ['create', 'update', 'partial_update']:
@@ -41,7 +92,7 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Create chat room with current user as creator."""
-        profile = self.request.user.userprofile
+        profile = self.request.user.profile
         chat_room = serializer.save(created_by=profile)
 
         # Add participants (including creator)
@@ -52,7 +103,7 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         """Only allow room creator to delete the room."""
-        if instance.created_by != self.request.user.userprofile:
+        if instance.created_by != self.request.user.profile:
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("Only the room creator can delete the room")
         # Hard delete for chat rooms since they don't have is_deleted field
@@ -62,7 +113,7 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
     def join(self, request, pk=None):
         """Join a chat room."""
         chat_room = self.get_object()
-        profile = request.user.userprofile
+        profile = request.user.profile
 
         if chat_room.room_type == 'direct':
             return Response(
@@ -77,7 +128,7 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
     def leave(self, request, pk=None):
         """Leave a chat room."""
         chat_room = self.get_object()
-        profile = request.user.userprofile
+        profile = request.user.profile
 
         if chat_room.room_type == 'direct':
             return Response(
@@ -96,18 +147,127 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
 
     @action(detail=True, methods=['get'])
     def messages(self, request, pk=None):
-        """Get messages for a chat room."""
+        """
+        Get a page of messages for a chat room, newest first.
+
+        Query parameters:
+        - before: Cursor; return messages older than it (``older_cursor``
+          of a previous page)
+        - after: Cursor; return messages newer than it (``newer_cursor``)
+        - page_size: Messages per page (default: 50, max: 200)
+        - compact: 'true' to return read counts instead of ``read_by`` lists
+
+        Pages are keyset-paginated by ``(sent_at, id)``, so any page costs
+        the same as the latest one.
+        """
         chat_room = self.get_object()
-        messages = chat_room.messages.select_related(
-            'sender'
-        ).prefetch_related(
-            'attachments', 'read_by'
-        ).order_by('-sent_at')
-
-        serializer = MessageSerializer(
-            messages, many=True, context={'request': request}
+        params = request.query_params
+
+        config = getattr(settings, 'SOCIAL_NETWORK_SETTINGS', {})
+        maximum = config.get('MESSAGE_MAX_PAGE_SIZE', 200)
+        try:
+            page_size = int(
+                params.get('page_size', config.get('MESSAGE_PAGE_SIZE', 50))
+            )
+        except (TypeError, ValueError):
+            page_size = config.get('MESSAGE_PAGE_SIZE', 50)
+        page_size = max(1, min(page_size, maximum))
+
+        before, after = params.get('before'), params.get('after')
+        if before and after:
+            return Response(
+                {'error': 'Use either before or after, not both'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        position = None
+        if before or after:
+            position = decode_message_cursor(before or after)
+            if position is None:
+                return Response(
+                    {'error': 'Invalid cursor'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        profile = request.user.profile
+        messages = RoomReadWatermark.annotate_read_state(
+            chat_room.messages.select_related('sender__user'), profile
         )
-        return Response(serializer.data)
+
+        if after:
+            sent_at, message_id = position
+            messages = messages.filter(
+                Q(created_at__gt=sent_at) |
+                Q(created_at=sent_at, id__gt=message_id)
+            ).order_by('created_at', 'id')
+        else:
+            if before:
+                sent_at, message_id = position
+                messages = messages.filter(
+                    Q(created_at__lt=sent_at) |
+                    Q(created_at=sent_at, id__lt=message_id)
+                )
+            messages = messages.order_by('-created_at', '-id')
+
+        context = {'request': request}
+        if params.get('compact', '').lower() == 'true':
+            serializer_class = CompactMessageSerializer
+        else:
+            serializer_class = MessageSerializer
+
+        rows = list(messages[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if after:
+            rows.reverse()
+
+        older_cursor = newer_cursor = None
+        if rows:
+            oldest, newest = rows[-1], rows[0]
+            older_cursor = encode_message_cursor(oldest.created_at, oldest.id)
+            newer_cursor = encode_message_cursor(newest.created_at, newest.id)
+
+        serializer = serializer_class(rows, many=True, context=context)
+        return Response({
+            'results': serializer.data,
+            'page_size': page_size,
+            # Whether more messages exist in the requested direction
+            'has_more': has_more,
+            'older_cursor': older_cursor,
+            'newer_cursor': newer_cursor,
+        })
+
+    @action(detail=True, methods=['post'])
+    def mark_read(self, request, pk=None):
+        """
+        Mark the room read up to a message.
+
+        Body:
+        - message_id: Last message read (default: the latest message)
+        """
+        chat_room = self.get_object()
+        profile = request.user.profile
+
+        messages = chat_room.messages.filter(is_deleted=False)
+        message_id = request.data.get('message_id')
+        if message_id:
+            message = messages.filter(id=message_id).first()
+            if message is None:
+                return Response(
+                    {'error': 'Message not found in this room'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+        else:
+            message = messages.order_by('-created_at', '-id').first()
+            if message is None:
+                return Response({'unread_count': 0, 'last_read_at': None})
+
+        RoomReadWatermark.advance(chat_room, profile, message)
+        watermark = RoomReadWatermark.objects.get(room=chat_room, user=profile)
+        return Response({
+            'last_read_message': watermark.last_read_message_id,
+            'last_read_at': watermark.last_read_at,
+            'unread_count': RoomReadWatermark.unread_count(chat_room, profile)
+        })
 
     @action(detail=False, methods=['post'])
     def create_direct_message(self, request):
@@ -124,7 +284,7 @@ class ChatRoomViewSet(viewsets.ModelViewSet):
         except Exception:
             return Response({'error': 'User not found'}, status=status.HTTP_404_NOT_FOUND)
 
-        current_profile = request.user.userprofile
+        current_profile = request.user.profile
 
         if other_profile == current_profile:
             return Response(
@@ -162,12 +322,13 @@ class MessageViewSet(viewsets.ModelViewSet):
 
     def get_queryset(self):
         """Get messages for rooms where user is a participant."""
-        profile = self.request.user.userprofile
-        return Message.objects.filter(room__participants=profile, is_deleted=False).select_related(
-            'sender', 'room', 'reply_to'
-        ).prefetch_related(
-            'attachments', 'read_by'
-        ).order_by('-sent_at')
+        profile = self.request.user.profile
+        return RoomReadWatermark.annotate_read_state(
+            Message.objects.filter(
+                room__participants=profile, is_deleted=False
+            ).select_related('sender__user', 'room', 'reply_to'),
+            profile
+        ).order_by('-created_at')
 
     def get_serializer_class(self):
         """Return appropriate serializer class."""
@@ -177,7 +338,7 @@ class MessageViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Create message with current user as sender."""
-        profile = self.request.user.userprofile
+        profile = self.request.user.profile
         room_id = self.request.data.get('room')
 
         try:
@@ -196,7 +357,7 @@ class MessageViewSet(viewsets.ModelViewSet):
 
     def perform_destroy(self, instance):
         """Soft delete message instead of hard delete."""
-        if instance.sender != self.request.user.userprofile:
+        if instance.sender != self.request.user.profile:
             from rest_framework.exceptions import PermissionDenied
             raise PermissionDenied("You can only delete your own messages")
         # Soft delete by setting is_deleted flag
@@ -207,14 +368,10 @@ class MessageViewSet(viewsets.ModelViewSet):
     def mark_as_read(self, request, pk=None):
         """Mark message as read by current user."""
         message = self.get_object()
-        profile = request.user.userprofile
+        profile = request.user.profile
 
-        read_status, created = MessageRead.objects.get_or_create(
-            message=message,
-            user=profile
-        )
-
-        if created:
+        # Reading a message reads everything before it in the room
+        if RoomReadWatermark.advance(message.room, profile, message):
             return Response({'message': 'Message marked as read'})
         else:
             return Response({'message': 'Message already read'})
@@ -224,7 +381,7 @@ class MessageViewSet(viewsets.ModelViewSet):
         """Add attachment to message."""
         message = self.get_object()
 
-        if message.sender != request.user.userprofile:
+        if message.sender != request.user.profile:
             return Response(
                 {'error': 'You can only add attachments to your own messages'},
                 status=status.HTTP_403_FORBIDDEN
@@ -243,13 +400,24 @@ class MessageViewSet(viewsets.ModelViewSet):
 #     pass
 
 
-class MessageReadViewSet(viewsets.ModelViewSet):
-    """ViewSet for managing message read status."""
-    serializer_class = MessageReadSerializer
+class MessageReadViewSet(viewsets.ReadOnlyModelViewSet):
+    """ViewSet for reading how far the user has read their chat rooms."""
+    serializer_class = RoomReadWatermarkSerializer
     permission_classes = [IsAuthenticated, NotDeletedUserPermission]
 
     def get_queryset(self):
-        """Get read status for messages in user's chat rooms."""
-        profile = self.request.user.userprofile
-        return MessageRead.objects.filter(is_deleted=False,
-            message__room__participants=profile).select_related('message', 'user').order_by('-read_at')
+        """Get the user's read watermarks in rooms they participate in."""
+        profile = self.request.user.profile
+        # Unread count per room: one range count past the watermark
+        unread = Message.objects.filter(
+            room=OuterRef('room'),
+            is_deleted=False,
+            created_at__gt=OuterRef('last_read_at')
+        ).exclude(sender=profile).order_by().values('room').annotate(
+            total=Count('id')
+        ).values('total')
+        return RoomReadWatermark.objects.filter(
+            user=profile, room__participants=profile, room__is_deleted=False
+        ).annotate(
+            unread_messages_count=Coalesce(Subquery(unread), 0)
+        ).order_by('-updated_at')
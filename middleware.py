@@ -23,16 +23,24 @@ Supported Apps:
 - core: Core system utilities
 """
 
+import logging
+import math
+import re
 import sys
+import time
+import redis
 from django.utils import timezone
 from django.http import JsonResponse
 from django.utils.deprecation import MiddlewareMixin
 from django.contrib.auth.models import AnonymousUser
-from accounts.models import UserEvent, UserSession
+from accounts.models import UserEvent, UserProfile, UserSession
 from core.utils import get_client_ip
 from core.session_manager import SessionManager, SESSION_DURATION_SECONDS
+from core.utils import LocalLRUCache
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 # SimpleJWT imports for decoding/creating tokens in middleware
 try:
     from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
@@ -445,8 +453,11 @@ class EventDetectionMiddleware:
             if self.is_account_event(event_type):
                 # Get UserProfile for UserEvent
                 user_profile = None
-                if request.user.is_authenticated and hasattr(request.user, 'userprofile'):
-                    user_profile = request.user.userprofile
+                if request.user.is_authenticated:
+                    try:
+                        user_profile = request.user.profile
+                    except UserProfile.DoesNotExist:
+                        pass
 
                 # Get or create user session
                 session = None
@@ -493,16 +504,15 @@ class EventDetectionMiddleware:
         """Check for bot-like behavior patterns in real-time."""
         try:
             # Only check for authenticated users
-            if not hasattr(request.user, 'userprofile'):
+            if not request.user.is_authenticated:
+                return
+            try:
+                user = request.user.profile
+            except UserProfile.DoesNotExist:
                 return
-
-            user = request.user.userprofile
 
             # Import here to avoid circular imports
-            from content.utils import (
-                check_rapid_posting, analyze_user_posting_patterns,
-                is_user_blocked_as_bot
-            )
+            from content.utils import check_rapid_posting, is_user_blocked_as_bot
             from content.models import BotDetectionEvent
 
             # Check if user is already blocked as bot
@@ -530,10 +540,8 @@ class EventDetectionMiddleware:
                         description='Rapid posting pattern detected'
                     )
 
-            # Check posting patterns periodically (every 10th request)
-            import random
-            if random.randint(1, 10) == 1:
-                analyze_user_posting_patterns(user)
+            # Posting patterns are analysed by the scheduled
+            # process_bot_detection_analysis task, for active users only
 
         except Exception as e:
             # Don't break the request flow for bot detection errors
@@ -865,8 +873,32 @@ class APIRateLimitMiddleware:
     """
     Middleware for API rate limiting and abuse prevention.
     Works in conjunction with event detection.
+
+    Sliding-window counters in Redis, one pipelined round trip per request.
+    Each request is counted against its event budget (requests per minute)
+    for every identity it carries: the user when authenticated, the client
+    device fingerprint when sent, and the IP for anonymous requests.
+    Identities found over their limit are remembered in-process until the
+    window allows them again, so repeated requests are rejected without
+    touching Redis. Redis errors fail open.
     """
 
+    WINDOW_SECONDS = 60
+
+    # (method, path regex, event) checked in order; other /api/ requests
+    # use the 'default' budget
+    EVENT_RULES = [
+        ('POST', re.compile(r'^/api/auth/(login|social)'), 'login_attempt'),
+        ('POST', re.compile(r'^/api/(content/)?posts/$'), 'post_create'),
+        ('POST', re.compile(r'/messages/'), 'message_send'),
+        ('POST', re.compile(r'^/api/(content/)?experiments/$'),
+         'experiment_create'),
+        ('POST', re.compile(r'/experiment-metrics/'),
+         'experiment_metric_record'),
+        ('POST', re.compile(r'/experiment-interactions/'),
+         'experiment_interaction_record'),
+    ]
+
     def __init__(self, get_response):
         self.get_response = get_response
         self.rate_limits = {
@@ -878,24 +910,151 @@ class APIRateLimitMiddleware:
             'experiment_metric_record': 200,  # Allow frequent metrics
             'experiment_interaction_record': 500,  # High interaction limit
         }
+        self.rate_limits.update(getattr(settings, 'API_RATE_LIMITS', {}))
+        self.enabled = getattr(settings, 'API_RATE_LIMIT_ENABLED', True)
+
+        # identity key -> epoch seconds until which it is rejected locally
+        self.blocked = LocalLRUCache(10000, self.WINDOW_SECONDS * 2)
+
+        self.redis_client = None
+        redis_url = getattr(settings, 'REDIS_URL', None)
+        if self.enabled and redis_url:
+            self.redis_client = redis.Redis.from_url(
+                redis_url, socket_timeout=0.2, socket_connect_timeout=0.2
+            )
 
     def __call__(self, request):
-        # Check rate limits for authenticated users
-        if hasattr(request.user, 'userprofile'):
-            if self.is_rate_limited(request):
-                return JsonResponse(
-                    {'error': 'Rate limit exceeded. Please try again later.'},
-                    status=429
+        if not self.enabled or not request.path.startswith('/api/'):
+            return self.get_response(request)
+
+        event = self.get_event(request)
+        limit = self.rate_limits.get(event, self.rate_limits['default'])
+        identities = self.get_identities(request)
+
+        # Fast path: a client already known to be over its limit
+        now = time.time()
+        for identity in identities:
+            blocked_until = self.blocked.get(f'{event}:{identity}')
+            if isinstance(blocked_until, float) and blocked_until > now:
+                return self.rate_limited_response(
+                    limit, math.ceil(blocked_until - now)
                 )
 
+        state = self.is_rate_limited(request, event, limit, identities)
+        if state and state['limited']:
+            return self.rate_limited_response(limit, state['retry_after'])
+
         response = self.get_response(request)
+        if state:
+            response['X-RateLimit-Limit'] = str(limit)
+            response['X-RateLimit-Remaining'] = str(state['remaining'])
+            response['X-RateLimit-Reset'] = str(state['reset'])
         return response
 
-    def is_rate_limited(self, request):
-        """Check if user has exceeded rate limits."""
-        # Implementation would check recent events from UserEvent model
-        # This is a simplified version
-        return False
+    def get_event(self, request):
+        """Map a request to its rate limit budget."""
+        for method, pattern, event in self.EVENT_RULES:
+            if request.method == method and pattern.search(request.path):
+                return event
+        return 'default'
+
+    def get_identities(self, request):
+        """Rate limit keys carried by the request."""
+        identities = []
+        user = getattr(request, 'user', None)
+        authenticated = user is not None and user.is_authenticated
+        if authenticated:
+            identities.append(f'user:{user.pk}')
+        fingerprint = (
+            getattr(request, '_cached_device_fingerprint', None) or
+            request.META.get('HTTP_X_DEVICE_FINGERPRINT')
+        )
+        if fingerprint:
+            identities.append(f'fp:{fingerprint[:64]}')
+        if not authenticated:
+            # Also count the IP so rotating fingerprints doesn't escape the
+            # limit (not for users, who may share a NAT)
+            identities.append(f'ip:{get_client_ip(request)}')
+        return identities
+
+    def is_rate_limited(self, request, event=None, limit=None,
+                        identities=None):
+        """
+        Count the request and check whether any identity is over its limit.
+
+        Returns ``{'limited', 'remaining', 'reset', 'retry_after'}`` for the
+        most constrained identity, or None when Redis is unavailable.
+        """
+        if self.redis_client is None:
+            return None
+        event = event or self.get_event(request)
+        if limit is None:
+            limit = self.rate_limits.get(event, self.rate_limits['default'])
+        identities = identities or self.get_identities(request)
+
+        window = self.WINDOW_SECONDS
+        now = time.time()
+        window_id = int(now // window)
+        elapsed = now - window_id * window
+
+        try:
+            pipe = self.redis_client.pipeline(transaction=False)
+            for identity in identities:
+                key = f'ratelimit:{event}:{identity}'
+                pipe.incr(f'{key}:{window_id}')
+                pipe.expire(f'{key}:{window_id}', window * 2)
+                pipe.get(f'{key}:{window_id - 1}')
+            replies = pipe.execute()
+        except redis.RedisError as e:
+            logger.warning(f"Rate limiter unavailable, allowing request: {e}")
+            return None
+
+        state = None
+        for i, identity in enumerate(identities):
+            current = int(replies[i * 3])
+            previous = int(replies[i * 3 + 2] or 0)
+            # Previous window's count, weighted by how much of it still
+            # overlaps the sliding window
+            estimated = previous * (window - elapsed) / window + current
+            identity_state = {
+                'limited': estimated > limit,
+                'remaining': max(0, math.floor(limit - estimated)),
+                'reset': math.ceil(window - elapsed),
+                'retry_after': 0,
+            }
+            if identity_state['limited']:
+                retry_after = self._retry_after(
+                    previous, current, elapsed, limit
+                )
+                identity_state['retry_after'] = retry_after
+                self.blocked.set(f'{event}:{identity}', now + retry_after)
+            if state is None or (
+                identity_state['limited'], -identity_state['remaining']
+            ) > (state['limited'], -state['remaining']):
+                state = identity_state
+        return state
+
+    def _retry_after(self, previous, current, elapsed, limit):
+        """Seconds until the sliding estimate drops back to the limit."""
+        window = self.WINDOW_SECONDS
+        if current < limit and previous:
+            wait = (window - elapsed) - (limit - current) * window / previous
+        else:
+            # The current window alone is over: wait for it to roll over
+            # and decay as the previous window
+            wait = (window - elapsed) + window * (1 - limit / current)
+        return max(1, math.ceil(wait))
+
+    def rate_limited_response(self, limit, retry_after):
+        response = JsonResponse(
+            {'error': 'Rate limit exceeded. Please try again later.'},
+            status=429
+        )
+        response['Retry-After'] = str(retry_after)
+        response['X-RateLimit-Limit'] = str(limit)
+        response['X-RateLimit-Remaining'] = '0'
+        response['X-RateLimit-Reset'] = str(retry_after)
+        return response
 
 # class SessionValidationMiddleware(MiddlewareMixin):
 #     """
@@ -0,0 +1,126 @@
+"""
+Set-based recount of the denormalized poll counters.
+
+``Poll.total_votes``/``voters_count`` and ``PollOption.votes_count`` are
+recomputed for a chunk of polls with two grouped aggregates over their
+votes, and only rows whose stored values drifted are written, with
+``bulk_update``. The periodic task only visits polls with activity since
+its last run: new votes, or a poll update (vote removal saves the poll).
+"""
+
+from typing import Iterable, List
+
+from django.db.models import Count
+
+from core.watermarks import ActivityWatermark
+
+from .models import Poll, PollOption, PollVote
+
+POLL_COUNTER_FIELDS = ('total_votes', 'voters_count')
+
+
+def active_poll_ids(since) -> List:
+    """Polls with a vote cast, or a poll update, since ``since``."""
+    poll_ids = set(PollVote.objects.filter(
+        created_at__gte=since
+    ).order_by().values_list('poll_id', flat=True).distinct())
+    poll_ids.update(Poll.objects.filter(
+        updated_at__gte=since
+    ).order_by().values_list('pk', flat=True))
+    return sorted(poll_ids)
+
+
+def recount_poll_counters(poll_ids: Iterable) -> int:
+    """
+    Recompute the counters of ``poll_ids`` and their options, persisting
+    the rows that changed.
+
+    Returns:
+        Number of polls and options whose counters were corrected
+    """
+    poll_ids = list(poll_ids)
+    votes = PollVote.objects.filter(poll_id__in=poll_ids, is_deleted=False)
+
+    poll_totals = {
+        row['poll_id']: (row['total'], row['voters'])
+        for row in votes.order_by().values('poll_id').annotate(
+            total=Count('pk'), voters=Count('voter', distinct=True)
+        )
+    }
+    option_totals = {
+        row['option_id']: row['total']
+        for row in votes.order_by().values('option_id').annotate(
+            total=Count('pk')
+        )
+    }
+
+    changed_polls = []
+    for row in Poll.objects.filter(pk__in=poll_ids).order_by().values(
+        'pk', *POLL_COUNTER_FIELDS
+    ):
+        total, voters = poll_totals.get(row['pk'], (0, 0))
+        if (row['total_votes'], row['voters_count']) != (total, voters):
+            changed_polls.append(Poll(
+                pk=row['pk'], total_votes=total, voters_count=voters
+            ))
+
+    changed_options = []
+    for row in PollOption.objects.filter(
+        poll_id__in=poll_ids
+    ).order_by().values(
+        'pk', 'votes_count'
+    ):
+        total = option_totals.get(row['pk'], 0)
+        if row['votes_count'] != total:
+            changed_options.append(PollOption(pk=row['pk'], votes_count=total))
+
+    if changed_polls:
+        Poll.objects.bulk_update(
+            changed_polls, POLL_COUNTER_FIELDS, batch_size=1000
+        )
+    if changed_options:
+        PollOption.objects.bulk_update(
+            changed_options, ['votes_count'], batch_size=1000
+        )
+    return len(changed_polls) + len(changed_options)
+
+
+def recount_polls(since=None, batch_size: int = 5000) -> tuple:
+    """
+    Recount the polls active since ``since`` (every poll when None), chunk
+    by chunk.
+
+    Returns:
+        ``(processed, corrected)``
+    """
+    if since is not None:
+        poll_ids = active_poll_ids(since)
+        chunks = (
+            poll_ids[start:start + batch_size]
+            for start in range(0, len(poll_ids), batch_size)
+        )
+    else:
+        chunks = _all_poll_chunks(batch_size)
+
+    processed = corrected = 0
+    for chunk in chunks:
+        corrected += recount_poll_counters(chunk)
+        processed += len(chunk)
+    return processed, corrected
+
+
+def _all_poll_chunks(batch_size):
+    last_pk = None
+    while True:
+        polls = Poll.objects.order_by('pk')
+        if last_pk is not None:
+            polls = polls.filter(pk__gt=last_pk)
+        chunk = list(polls.values_list('pk', flat=True)[:batch_size])
+        if not chunk:
+            return
+        yield chunk
+        last_pk = chunk[-1]
+
+
+# Start of the last successful update_poll_counters run
+poll_counters_watermark = ActivityWatermark('polls:counters:watermark')
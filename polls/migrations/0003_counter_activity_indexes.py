@@ -0,0 +1,21 @@
+# Generated by Django 4.2.25 on 2026-10-16 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0002_poll_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='poll',
+            index=models.Index(fields=['updated_at'], name='poll_updated_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pollvote',
+            index=models.Index(fields=['created_at'], name='pollvote_created_at_idx'),
+        ),
+    ]
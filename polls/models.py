@@ -3,6 +3,8 @@
 import uuid
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.utils import timezone
 from content.models import Post
 
@@ -56,6 +58,9 @@ class Poll(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Full-text search document (question), maintained by search.signals
+    search_vector = SearchVectorField(null=True, editable=False)
+
     def clean(self):
         """Validate that only verified users can create polls."""
         super().clean()
@@ -86,6 +91,9 @@ class Poll(models.Model):
             models.Index(fields=['post', 'order']),
             models.Index(fields=['expires_at']),
             models.Index(fields=['is_active', '-created_at']),
+            # Polls with activity since the last counter recount
+            models.Index(fields=['updated_at'], name='poll_updated_at_idx'),
+            GinIndex(fields=['search_vector'], name='poll_search_gin'),
         ]
         ordering = ['order', 'created_at']
     def restore_instance(self, cascade=True):
@@ -570,6 +578,7 @@ class PollVote(models.Model):
             models.Index(fields=['poll', '-created_at']),
             models.Index(fields=['voter', '-created_at']),
             models.Index(fields=['option', '-created_at']),
+            models.Index(fields=['created_at'], name='pollvote_created_at_idx'),
         ]
 
 
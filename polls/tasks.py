@@ -47,35 +47,24 @@ def handle_poll_expiration():
 
 
 @shared_task
-def update_poll_counters():
-    """Update vote counts for poll options"""
+def update_poll_counters(batch_size=5000):
+    """
+    Update vote counts for polls and poll options.
+
+    Only polls with activity since the last successful run are recounted
+    (every poll on the first run), with grouped aggregates and bulk_update
+    (see polls.counters).
+    """
     try:
-        active_polls = Poll.objects.filter(is_active=True)
+        from polls.counters import poll_counters_watermark, recount_polls
 
-        for poll in active_polls:
-            # Update total votes
-            total_votes = PollVote.objects.filter(poll=poll).count()
-
-            # Update unique voters count
-            unique_voters = PollVote.objects.filter(
-                poll=poll
-            ).values('voter').distinct().count()
-
-            # Update poll counters
-            poll.total_votes = total_votes
-            poll.voters_count = unique_voters
-            poll.save(update_fields=['total_votes', 'voters_count'])
-
-            # Update individual option counters
-            for option in poll.options.all():
-                option_votes = PollVote.objects.filter(
-                    poll=poll,
-                    option=option
-                ).count()
-                option.votes_count = option_votes
-                option.save(update_fields=['votes_count'])
+        started_at = timezone.now()
+        processed, corrected = recount_polls(
+            poll_counters_watermark.get(), batch_size=batch_size
+        )
+        poll_counters_watermark.advance(started_at)
 
-        return f"Updated counters for {active_polls.count()} polls"
+        return f"Updated counters for {processed} polls ({corrected} corrected)"
 
     except Exception as e:
         ErrorLog.objects.create(
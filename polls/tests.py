@@ -394,6 +394,7 @@ class PollTaskTest(TestCase):
             last_verified_at=timezone.now()
         )
         self.user_profile.refresh_from_db()
+        self.post = Post.objects.create(
             author=self.user_profile,
             content='Test poll post',
             post_type='poll'
@@ -448,6 +449,58 @@ class PollTaskTest(TestCase):
         self.assertEqual(option.votes_count, 1)
         self.assertIn("Updated counters for", result)
 
+    @patch('polls.tasks.ErrorLog.objects.create')
+    def test_update_poll_counters_only_visits_active_polls(self, mock_error):
+        """Polls without activity since the last run are not recounted."""
+        from polls.counters import poll_counters_watermark
+
+        quiet = Poll.objects.create(post=self.post, question='Quiet?')
+        busy = Poll.objects.create(post=self.post, question='Busy?')
+        option = PollOption.objects.create(poll=busy, text='Yes', order=1)
+        poll_counters_watermark.reset()
+        update_poll_counters()
+
+        # Drift that does not count as activity, then a new vote
+        Poll.objects.filter(pk=quiet.pk).update(
+            total_votes=42, updated_at=timezone.now() - timedelta(hours=1)
+        )
+        PollVote.objects.create(poll=busy, option=option, voter=self.user)
+
+        result = update_poll_counters()
+
+        quiet.refresh_from_db()
+        busy.refresh_from_db()
+        self.assertEqual(quiet.total_votes, 42)
+        self.assertEqual((busy.total_votes, busy.voters_count), (1, 1))
+        self.assertEqual(result, "Updated counters for 1 polls (2 corrected)")
+
+    @patch('polls.tasks.ErrorLog.objects.create')
+    def test_update_poll_counters_sees_votes_committed_late(self, mock_error):
+        """A vote stamped before the last run started is still recounted."""
+        from polls.counters import poll_counters_watermark
+
+        poll = Poll.objects.create(post=self.post, question='Late?')
+        option = PollOption.objects.create(poll=poll, text='Yes', order=1)
+        poll_counters_watermark.reset()
+        update_poll_counters()
+
+        # Stamped a minute before that run but committed after its scan
+        vote = PollVote.objects.create(
+            poll=poll, option=option, voter=self.user
+        )
+        PollVote.objects.filter(pk=vote.pk).update(
+            created_at=timezone.now() - timedelta(minutes=1)
+        )
+        Poll.objects.filter(pk=poll.pk).update(
+            total_votes=0, voters_count=0,
+            updated_at=timezone.now() - timedelta(hours=1)
+        )
+
+        update_poll_counters()
+
+        poll.refresh_from_db()
+        self.assertEqual((poll.total_votes, poll.voters_count), (1, 1))
+
     @patch('polls.tasks.SystemMetric.objects.create')
     def test_generate_poll_analytics(self, mock_metric):
         """Test poll analytics generation task."""
@@ -3,3 +3,7 @@ from django.apps import AppConfig
 class SearchConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'search'
+
+    def ready(self):
+        """Import signal handlers when Django starts."""
+        import search.signals  # noqa
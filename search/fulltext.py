@@ -0,0 +1,291 @@
+"""PostgreSQL full-text search backend for the global search system.
+
+Posts, communities, messages and polls carry a stored ``search_vector``
+column (GIN indexed) that is kept up to date by ``search.signals``.
+Usernames and community names additionally have trigram indexes so fuzzy
+and substring matches do not fall back to sequential scans.
+
+Enable with ``SEARCH_BACKEND = 'fulltext'``; ``GlobalSearchEngine`` stays
+the default and is used for AI conversations in both modes.
+"""
+
+from typing import Dict
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery, SearchRank, SearchVector, TrigramSimilarity
+)
+from django.db import connection
+from django.db.models import F, Q
+from django.db.models.functions import Greatest
+
+from .global_search import GlobalSearchEngine
+
+# Text search configuration used for both documents and queries. 'simple'
+# avoids language-specific stemming on our mixed French/English content.
+SEARCH_CONFIG = getattr(settings, 'SEARCH_FULLTEXT_CONFIG', 'simple')
+
+# Minimum trigram similarity for fuzzy username / community name matches
+TRIGRAM_THRESHOLD = 0.3
+
+
+def _post_vector():
+    return (
+        SearchVector('title', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('content', weight='B', config=SEARCH_CONFIG) +
+        SearchVector('excerpt', weight='C', config=SEARCH_CONFIG)
+    )
+
+
+def _community_vector():
+    return (
+        SearchVector('name', weight='A', config=SEARCH_CONFIG) +
+        SearchVector('description', weight='B', config=SEARCH_CONFIG)
+    )
+
+
+def _message_vector():
+    return SearchVector('content', config=SEARCH_CONFIG)
+
+
+def _poll_vector():
+    return SearchVector('question', config=SEARCH_CONFIG)
+
+
+# model label -> (vector expression builder, source fields)
+SEARCH_DOCUMENTS = {
+    'content.Post': (_post_vector, {'title', 'content', 'excerpt'}),
+    'communities.Community': (_community_vector, {'name', 'description'}),
+    'messaging.Message': (_message_vector, {'content'}),
+    'polls.Poll': (_poll_vector, {'question'}),
+}
+
+
+def fulltext_supported() -> bool:
+    """Whether the default database can store and query search vectors."""
+    return connection.vendor == 'postgresql'
+
+
+def fulltext_enabled() -> bool:
+    """
+    Whether ``SEARCH_BACKEND`` selects this backend on a supporting database.
+
+    Stored vectors are only maintained while it is; run
+    ``rebuild_search_vectors`` after enabling it on existing data.
+    """
+    return (
+        getattr(settings, 'SEARCH_BACKEND', 'basic') == 'fulltext' and
+        fulltext_supported()
+    )
+
+
+def refresh_search_vector(instance) -> None:
+    """Recompute the stored search vector of a single row."""
+    document = SEARCH_DOCUMENTS.get(instance._meta.label)
+    if document is None or not fulltext_supported():
+        return
+    build_vector, _ = document
+    type(instance)._default_manager.filter(pk=instance.pk).update(
+        search_vector=build_vector()
+    )
+
+
+def rebuild_search_vectors(model, batch_size: int = 10000,
+                           only_missing: bool = False) -> int:
+    """
+    Recompute search vectors for ``model`` in primary-key batches.
+
+    Returns the number of rows updated.
+    """
+    build_vector, _ = SEARCH_DOCUMENTS[model._meta.label]
+    queryset = model._default_manager.all()
+    if only_missing:
+        queryset = queryset.filter(search_vector__isnull=True)
+
+    updated = 0
+    last_pk = None
+    while True:
+        batch = queryset.order_by('pk')
+        if last_pk is not None:
+            batch = batch.filter(pk__gt=last_pk)
+        pks = list(batch.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return updated
+        updated += model._default_manager.filter(pk__in=pks).update(
+            search_vector=build_vector()
+        )
+        last_pk = pks[-1]
+
+
+class FullTextSearchEngine(GlobalSearchEngine):
+    """
+    Global search backed by PostgreSQL ``tsvector`` and trigram indexes.
+
+    Same interface, permission filtering and result format as
+    ``GlobalSearchEngine``; only matching and ranking differ. Results are
+    ordered by ``SearchRank`` (or trigram similarity for names) before the
+    engagement tie-breakers used by the basic engine.
+    """
+
+    def _search_query(self, query: str) -> SearchQuery:
+        return SearchQuery(query, search_type='websearch', config=SEARCH_CONFIG)
+
+    def _paginate(self, queryset, limit: int, offset: int, serialize) -> Dict:
+        page = list(queryset[offset:offset + limit])
+        if len(page) < limit and (page or offset == 0):
+            # Short page: the total is known without a second scan
+            count = offset + len(page)
+        else:
+            count = queryset.count()
+        return {
+            'results': [serialize(obj) for obj in page],
+            'count': count
+        }
+
+    def _search_posts(
+        self, query: str, filters: Dict, limit: int, offset: int
+    ) -> Dict:
+        """Search posts by their stored search vector."""
+        from content.models import Post
+
+        search_query = self._search_query(query)
+        queryset = Post.objects.filter(
+            is_deleted=False,
+            search_vector=search_query
+        )
+        queryset = self._filter_posts_by_permission(queryset)
+        queryset = self._apply_post_filters(queryset, filters)
+
+        queryset = queryset.annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).select_related(
+            'author__user', 'community'
+        ).order_by('-rank', '-trend_score', '-created_at')
+
+        return self._paginate(queryset, limit, offset, self._serialize_post)
+
+    def _search_users(
+        self, query: str, filters: Dict, limit: int, offset: int
+    ) -> Dict:
+        """Search users by username (trigram) and display names."""
+        from accounts.models import UserProfile
+
+        queryset = UserProfile.objects.filter(
+            Q(user__username__trigram_similar=query) |
+            Q(user__username__icontains=query) |
+            Q(user__first_name__icontains=query) |
+            Q(user__last_name__icontains=query),
+            is_deleted=False
+        )
+
+        if filters.get('role'):
+            queryset = queryset.filter(role=filters['role'])
+
+        queryset = queryset.annotate(
+            similarity=TrigramSimilarity('user__username', query)
+        ).select_related(
+            'user', 'administrative_division'
+        ).order_by('-similarity', '-follower_count', '-user__last_login')
+
+        return self._paginate(queryset, limit, offset, self._serialize_user)
+
+    def _search_communities(
+        self, query: str, filters: Dict, limit: int, offset: int
+    ) -> Dict:
+        """Search communities by search vector and fuzzy name match."""
+        from communities.models import Community, CommunityMembership
+
+        search_query = self._search_query(query)
+        queryset = Community.objects.filter(
+            Q(search_vector=search_query) |
+            Q(name__trigram_similar=query) |
+            Q(name__icontains=query),
+            is_deleted=False
+        )
+
+        if not (self.user and self.user.is_authenticated):
+            queryset = queryset.filter(community_type='public')
+        else:
+            user_communities = CommunityMembership.objects.filter(
+                user=self.user_profile,
+                status='active'
+            ).values_list('community_id', flat=True)
+            queryset = queryset.filter(
+                Q(community_type='public') |
+                Q(id__in=user_communities)
+            )
+
+        if filters.get('community_type'):
+            queryset = queryset.filter(
+                community_type=filters['community_type']
+            )
+
+        queryset = queryset.annotate(
+            rank=Greatest(
+                SearchRank(F('search_vector'), search_query),
+                TrigramSimilarity('name', query)
+            )
+        ).select_related('creator__user').order_by('-rank', '-posts_count')
+
+        return self._paginate(
+            queryset, limit, offset, self._serialize_community
+        )
+
+    def _search_messages(
+        self, query: str, filters: Dict, limit: int, offset: int
+    ) -> Dict:
+        """Search messages in the user's rooms by search vector."""
+        from messaging.models import ChatRoom, Message
+
+        if not (self.user and self.user.is_authenticated) or not self.user_profile:
+            return {'results': [], 'count': 0}
+
+        search_query = self._search_query(query)
+        queryset = Message.objects.filter(
+            room__in=ChatRoom.objects.filter(participants=self.user_profile),
+            search_vector=search_query,
+            is_deleted=False
+        )
+
+        if filters.get('room_type'):
+            queryset = queryset.filter(room__room_type=filters['room_type'])
+
+        queryset = queryset.annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).select_related(
+            'sender__user', 'room'
+        ).order_by('-rank', '-created_at')
+
+        return self._paginate(queryset, limit, offset, self._serialize_message)
+
+    def _search_polls(
+        self, query: str, filters: Dict, limit: int, offset: int
+    ) -> Dict:
+        """Search polls by question vector with permission filtering."""
+        from content.models import Post
+        from polls.models import Poll
+
+        search_query = self._search_query(query)
+        queryset = Poll.objects.filter(
+            search_vector=search_query,
+            is_active=True
+        )
+
+        accessible_posts = self._filter_posts_by_permission(
+            Post.objects.filter(post_type='poll')
+        )
+        queryset = queryset.filter(post__in=accessible_posts)
+
+        if filters.get('poll_status'):
+            if filters['poll_status'] == 'active':
+                queryset = queryset.filter(is_closed=False)
+            elif filters['poll_status'] == 'closed':
+                queryset = queryset.filter(is_closed=True)
+
+        queryset = queryset.annotate(
+            rank=SearchRank(F('search_vector'), search_query)
+        ).select_related(
+            'post__author__user'
+        ).order_by('-rank', '-total_votes', '-created_at')
+
+        return self._paginate(queryset, limit, offset, self._serialize_poll)
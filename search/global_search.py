@@ -5,12 +5,16 @@ while respecting user permissions and privacy settings.
 """
 
 from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor, wait
+from django.db import connection
 from django.db.models import Q, QuerySet
 from django.contrib.auth.models import User
 from django.conf import settings
 from django.core.paginator import Paginator
+import logging
 import redis
 import json
+import threading
 from datetime import timedelta
 from django.utils import timezone
 
@@ -24,6 +28,39 @@ from messaging.models import Message, ChatRoom
 from polls.models import Poll
 from ai_conversations.models import AIConversation
 
+logger = logging.getLogger(__name__)
+
+# Process-wide Redis pool and fan-out executor, created on first use
+_redis_pool = None
+_search_executor = None
+_shared_lock = threading.Lock()
+
+
+def get_redis_client() -> Optional[redis.Redis]:
+    """Return a Redis client backed by a process-wide connection pool."""
+    global _redis_pool
+    redis_url = getattr(settings, 'REDIS_URL', None)
+    if not redis_url:
+        return None
+    if _redis_pool is None:
+        with _shared_lock:
+            if _redis_pool is None:
+                _redis_pool = redis.ConnectionPool.from_url(redis_url)
+    return redis.Redis(connection_pool=_redis_pool)
+
+
+def _get_search_executor() -> ThreadPoolExecutor:
+    """Return the shared thread pool used for concurrent type searches."""
+    global _search_executor
+    if _search_executor is None:
+        with _shared_lock:
+            if _search_executor is None:
+                _search_executor = ThreadPoolExecutor(
+                    max_workers=getattr(settings, 'SEARCH_MAX_WORKERS', 12),
+                    thread_name_prefix='global-search'
+                )
+    return _search_executor
+
 
 class GlobalSearchEngine:
     """
@@ -41,9 +78,7 @@ class GlobalSearchEngine:
         self.user = user
         self.user_profile = (getattr(user, 'userprofile', None)
                              if user and user.is_authenticated else None)
-        redis_url = getattr(settings, 'REDIS_URL', None)
-        self.redis_client = (redis.Redis.from_url(redis_url)
-                             if redis_url else None)
+        self.redis_client = get_redis_client()
 
     def search(
         self,
@@ -51,7 +86,9 @@ class GlobalSearchEngine:
         content_types: List[str] = None,
         filters: Dict[str, Any] = None,
         limit: int = 20,
-        offset: int = 0
+        offset: int = 0,
+        concurrent: Optional[bool] = None,
+        time_budget_ms: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Perform comprehensive search across all content types.
@@ -62,9 +99,15 @@ class GlobalSearchEngine:
             filters: Additional filters (visibility, date_range, etc.)
             limit: Maximum results per content type
             offset: Pagination offset
+            concurrent: Run the per-type searches in parallel (defaults to
+                ``settings.SEARCH_CONCURRENT``)
+            time_budget_ms: Per-type time budget in concurrent mode
+                (defaults to ``settings.SEARCH_TYPE_TIME_BUDGET_MS``)
 
         Returns:
-            Dict with search results, counts, and metadata
+            Dict with search results, counts, and metadata. In concurrent
+            mode ``partial`` is True and ``timed_out_types`` lists the types
+            that exceeded their budget and were returned empty.
         """
         if not query or not query.strip():
             return self._empty_results()
@@ -75,6 +118,8 @@ class GlobalSearchEngine:
             'messages', 'polls', 'ai_conversations'
         ]
         filters = filters or {}
+        if concurrent is None:
+            concurrent = getattr(settings, 'SEARCH_CONCURRENT', False)
 
         # Check cache first
         cache_key = self._get_cache_key(
@@ -84,22 +129,41 @@ class GlobalSearchEngine:
         if cached_results:
             return cached_results
 
+        timed_out = []
+        if concurrent and len(content_types) > 1:
+            if time_budget_ms is None:
+                time_budget_ms = getattr(
+                    settings, 'SEARCH_TYPE_TIME_BUDGET_MS', 1500
+                )
+            type_results, timed_out = self._search_types_concurrently(
+                query, content_types, filters, limit, offset, time_budget_ms
+            )
+        else:
+            type_results = {}
+            for content_type in content_types:
+                search_method = getattr(self, f'_search_{content_type}', None)
+                if search_method:
+                    try:
+                        type_results[content_type] = search_method(
+                            query, filters, limit, offset
+                        )
+                    except Exception:
+                        # Log error and continue with other content types
+                        type_results[content_type] = None
+
         results = {}
         total_count = 0
-
-        # Search each content type
         for content_type in content_types:
-            search_method = getattr(self, f'_search_{content_type}', None)
-            if search_method:
-                try:
-                    type_results = search_method(query, filters, limit, offset)
-                    results[content_type] = type_results['results']
-                    results[f'{content_type}_count'] = type_results['count']
-                    total_count += type_results['count']
-                except Exception:
-                    # Log error and continue with other content types
-                    results[content_type] = []
-                    results[f'{content_type}_count'] = 0
+            if content_type not in type_results:
+                continue
+            type_result = type_results[content_type]
+            if type_result is None:
+                results[content_type] = []
+                results[f'{content_type}_count'] = 0
+                continue
+            results[content_type] = type_result['results']
+            results[f'{content_type}_count'] = type_result['count']
+            total_count += type_result['count']
 
         search_results = {
             'query': query,
@@ -109,17 +173,82 @@ class GlobalSearchEngine:
             'filters': filters,
             'limit': limit,
             'offset': offset,
+            'partial': bool(timed_out),
+            'timed_out_types': timed_out,
             'timestamp': timezone.now().isoformat()
         }
 
-        # Cache results
-        self._cache_results(cache_key, search_results)
+        # Cache complete results only; a retry may fill in slow types
+        if not timed_out:
+            self._cache_results(cache_key, search_results)
 
         # Track search analytics
         self._track_search(query, content_types, total_count)
 
         return search_results
 
+    def _search_types_concurrently(
+        self, query: str, content_types: List[str], filters: Dict,
+        limit: int, offset: int, time_budget_ms: int
+    ):
+        """
+        Run the per-type searches in parallel with a shared deadline.
+
+        Returns ``(type_results, timed_out_types)``; failed or timed-out
+        types map to ``None``.
+        """
+        executor = _get_search_executor()
+        futures = {}
+        for content_type in content_types:
+            if hasattr(self, f'_search_{content_type}'):
+                futures[content_type] = executor.submit(
+                    self._run_search_type, content_type, query, filters,
+                    limit, offset, time_budget_ms
+                )
+
+        done, _ = wait(futures.values(), timeout=time_budget_ms / 1000)
+
+        type_results = {}
+        timed_out = []
+        for content_type, future in futures.items():
+            if future not in done:
+                future.cancel()
+                timed_out.append(content_type)
+                type_results[content_type] = None
+                continue
+            try:
+                type_results[content_type] = future.result()
+            except Exception:
+                logger.warning(
+                    'Search for %s failed', content_type, exc_info=True
+                )
+                type_results[content_type] = None
+
+        if timed_out:
+            logger.info(
+                'Search exceeded %sms budget for: %s',
+                time_budget_ms, ', '.join(timed_out)
+            )
+        return type_results, timed_out
+
+    def _run_search_type(
+        self, content_type: str, query: str, filters: Dict,
+        limit: int, offset: int, time_budget_ms: int
+    ) -> Dict:
+        """Worker-thread entry point for a single content type search."""
+        try:
+            if connection.vendor == 'postgresql':
+                # Let PostgreSQL abandon queries the caller no longer waits for
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        'SET statement_timeout = %s', [int(time_budget_ms)]
+                    )
+            search_method = getattr(self, f'_search_{content_type}')
+            return search_method(query, filters, limit, offset)
+        finally:
+            # Worker threads own their DB connection; don't leak it
+            connection.close()
+
     def _search_posts(
         self, query: str, filters: Dict, limit: int, offset: int
     ) -> Dict:
@@ -135,6 +264,23 @@ class GlobalSearchEngine:
         queryset = self._filter_posts_by_permission(queryset)
 
         # Apply additional filters
+        queryset = self._apply_post_filters(queryset, filters)
+
+        # Order by relevance (engagement + recency)
+        queryset = queryset.order_by('-trend_score', '-created_at')
+
+        # Paginate
+        paginator = Paginator(queryset, limit)
+        page_num = (offset // limit) + 1
+        page = paginator.get_page(page_num)
+
+        return {
+            'results': [self._serialize_post(post) for post in page],
+            'count': paginator.count
+        }
+
+    def _apply_post_filters(self, queryset: QuerySet, filters: Dict) -> QuerySet:
+        """Apply post_type, community and date range filters."""
         if filters.get('post_type'):
             queryset = queryset.filter(post_type=filters['post_type'])
 
@@ -155,18 +301,7 @@ class GlobalSearchEngine:
                     created_at__gte=now - timedelta(days=30)
                 )
 
-        # Order by relevance (engagement + recency)
-        queryset = queryset.order_by('-trend_score', '-created_at')
-
-        # Paginate
-        paginator = Paginator(queryset, limit)
-        page_num = (offset // limit) + 1
-        page = paginator.get_page(page_num)
-
-        return {
-            'results': [self._serialize_post(post) for post in page],
-            'count': paginator.count
-        }
+        return queryset
 
     def _search_users(
         self, query: str, filters: Dict, limit: int, offset: int
@@ -596,18 +731,34 @@ class GlobalSearchEngine:
             'filters': {},
             'limit': 0,
             'offset': 0,
+            'partial': False,
+            'timed_out_types': [],
             'timestamp': timezone.now().isoformat()
         }
 
 
+def get_search_engine(user: User) -> GlobalSearchEngine:
+    """
+    Build the search engine selected by ``settings.SEARCH_BACKEND``.
+
+    ``'fulltext'`` uses the PostgreSQL tsvector/trigram backend; anything
+    else (the default, ``'basic'``) uses ``GlobalSearchEngine``.
+    """
+    if getattr(settings, 'SEARCH_BACKEND', 'basic') == 'fulltext':
+        from .fulltext import FullTextSearchEngine, fulltext_enabled
+        if fulltext_enabled():
+            return FullTextSearchEngine(user)
+    return GlobalSearchEngine(user)
+
+
 # Convenience functions
 def global_search(user: User, query: str, **kwargs) -> Dict[str, Any]:
     """Convenience function for global search."""
-    engine = GlobalSearchEngine(user)
+    engine = get_search_engine(user)
     return engine.search(query, **kwargs)
 
 
 def search_by_type(user: User, query: str, content_type: str, **kwargs) -> Dict[str, Any]:
     """Search specific content type."""
-    engine = GlobalSearchEngine(user)
+    engine = get_search_engine(user)
     return engine.search(query, content_types=[content_type], **kwargs)
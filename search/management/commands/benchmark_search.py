@@ -0,0 +1,134 @@
+"""Benchmark the basic and full-text search backends on a seeded corpus."""
+
+import random
+import statistics
+import time
+
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import UserProfile
+from content.models import Post
+from search.fulltext import (
+    SEARCH_DOCUMENTS, FullTextSearchEngine, fulltext_supported
+)
+from search.global_search import GlobalSearchEngine
+
+BENCHMARK_USERNAME = 'search_benchmark'
+
+VOCABULARY = (
+    'montreal quebec cotonou porto-novo parakou ville quartier mairie '
+    'conseil budget route travaux parc école hopital marché festival '
+    'musique sport hockey football vélo neige pluie chaleur transport '
+    'autobus métro pont rivière lac forêt culture théâtre cinéma '
+    'restaurant café boulangerie emploi logement loyer taxe sécurité '
+    'police pompiers bibliothèque jardin recyclage énergie électricité '
+    'internet réunion élection maire député citoyen association'
+).split()
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a synthetic post corpus and compare query latency of the '
+        'basic (icontains) and full-text search backends'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--posts', type=int, default=1_000_000,
+            help='Number of posts to seed (default: 1,000,000)'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Posts inserted per bulk_create batch'
+        )
+        parser.add_argument(
+            '--queries', type=str,
+            default='hockey,budget travaux,festival musique,bibliothèque',
+            help='Comma-separated queries to time'
+        )
+        parser.add_argument(
+            '--runs', type=int, default=5,
+            help='Timed runs per query and backend'
+        )
+        parser.add_argument(
+            '--skip-seed', action='store_true',
+            help='Reuse a corpus seeded by a previous run'
+        )
+        parser.add_argument(
+            '--cleanup', action='store_true',
+            help='Delete the seeded corpus when done'
+        )
+
+    def handle(self, *args, **options):
+        if not fulltext_supported():
+            raise CommandError('Full-text search requires PostgreSQL')
+
+        user, _ = User.objects.get_or_create(
+            username=BENCHMARK_USERNAME,
+            defaults={'email': f'{BENCHMARK_USERNAME}@example.com'}
+        )
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+
+        if not options['skip_seed']:
+            self._seed(profile, options['posts'], options['batch_size'])
+
+        total = Post.objects.filter(author=profile).count()
+        self.stdout.write(f'Corpus: {total} benchmark posts')
+
+        engines = {
+            'basic': GlobalSearchEngine(AnonymousUser()),
+            'fulltext': FullTextSearchEngine(AnonymousUser()),
+        }
+        queries = [q.strip() for q in options['queries'].split(',') if q.strip()]
+
+        for query in queries:
+            for name, engine in engines.items():
+                timings = []
+                count = 0
+                for _ in range(options['runs']):
+                    start = time.perf_counter()
+                    result = engine._search_posts(query, {}, 20, 0)
+                    timings.append((time.perf_counter() - start) * 1000)
+                    count = result['count']
+                timings.sort()
+                p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+                self.stdout.write(
+                    f'{query!r:32} {name:9} matches={count:<8} '
+                    f'median={statistics.median(timings):8.1f}ms '
+                    f'p95={p95:8.1f}ms'
+                )
+
+        if options['cleanup']:
+            deleted, _ = Post.objects.filter(author=profile).delete()
+            self.stdout.write(f'Removed {deleted} seeded rows')
+
+    def _seed(self, profile, count, batch_size):
+        """Bulk insert synthetic public posts and index them."""
+        build_vector, _ = SEARCH_DOCUMENTS['content.Post']
+        rng = random.Random(42)
+        created = 0
+        start = time.perf_counter()
+        while created < count:
+            size = min(batch_size, count - created)
+            posts = [
+                Post(
+                    author=profile,
+                    content=' '.join(rng.choices(VOCABULARY, k=rng.randint(8, 40))),
+                    visibility='public',
+                    trend_score=rng.random()
+                )
+                for _ in range(size)
+            ]
+            Post.objects.bulk_create(posts)
+            Post.objects.filter(
+                pk__in=[post.pk for post in posts]
+            ).update(search_vector=build_vector())
+            created += size
+            if created % (batch_size * 20) == 0 or created == count:
+                self.stdout.write(f'  seeded {created}/{count}')
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✓ Seeded {created} posts in {time.perf_counter() - start:.1f}s'
+            )
+        )
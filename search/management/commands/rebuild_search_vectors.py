@@ -0,0 +1,47 @@
+"""Management command to backfill or rebuild full-text search vectors."""
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+
+from search.fulltext import (
+    SEARCH_DOCUMENTS, fulltext_supported, rebuild_search_vectors
+)
+
+
+class Command(BaseCommand):
+    help = 'Rebuild stored search vectors used by the full-text search backend'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            choices=sorted(SEARCH_DOCUMENTS),
+            help='Model label to rebuild (repeatable, default: all)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Rows updated per statement'
+        )
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Only fill rows whose search vector is still NULL'
+        )
+
+    def handle(self, *args, **options):
+        if not fulltext_supported():
+            raise CommandError('Full-text search requires PostgreSQL')
+
+        for label in options['model'] or sorted(SEARCH_DOCUMENTS):
+            model = apps.get_model(label)
+            self.stdout.write(f'Rebuilding {label}...')
+            updated = rebuild_search_vectors(
+                model,
+                batch_size=options['batch_size'],
+                only_missing=options['missing_only']
+            )
+            self.stdout.write(
+                self.style.SUCCESS(f'✓ {label}: {updated} rows updated')
+            )
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.25 on 2026-10-16 09:00
+
+from django.conf import settings
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('search', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        # auth_user is not ours to add Meta indexes to
+        migrations.RunSQL(
+            sql=(
+                'CREATE INDEX IF NOT EXISTS auth_user_username_trgm '
+                'ON auth_user USING gin (username gin_trgm_ops);'
+            ),
+            reverse_sql='DROP INDEX IF EXISTS auth_user_username_trgm;',
+        ),
+    ]
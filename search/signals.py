@@ -0,0 +1,29 @@
+"""Signal handlers keeping stored full-text search vectors up to date."""
+
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from communities.models import Community
+from content.models import Post
+from messaging.models import Message
+from polls.models import Poll
+
+from .fulltext import (
+    SEARCH_DOCUMENTS, fulltext_enabled, refresh_search_vector
+)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=Community)
+@receiver(post_save, sender=Message)
+@receiver(post_save, sender=Poll)
+def update_search_vector(sender, instance, created, update_fields=None, **kwargs):
+    """Recompute the search vector when an indexed text field changes."""
+    if not fulltext_enabled():
+        # The basic backend never reads stored vectors
+        return
+    _, source_fields = SEARCH_DOCUMENTS[sender._meta.label]
+    if update_fields is not None and not source_fields.intersection(update_fields):
+        # Counter/flag-only saves don't touch the document
+        return
+    refresh_search_vector(instance)
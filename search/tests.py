@@ -12,7 +12,13 @@ from polls.models import Poll
 from ai_conversations.models import AIConversation
 from core.jwt_test_mixin import JWTAuthTestMixin
 from .models import UserSearchQuery
-from .global_search import GlobalSearchEngine
+from .global_search import GlobalSearchEngine, get_search_engine
+from .fulltext import FullTextSearchEngine, fulltext_supported
+from django.test import override_settings
+from unittest import skipUnless
+from unittest import mock
+import threading
+import time
 from rest_framework.test import APIClient
 from rest_framework import status
 
@@ -620,3 +626,153 @@ class SearchIntegrationTest(TestCase):
 
         # Should return results
         self.assertGreater(results['total_count'], 0)
+
+
+class SearchBackendSelectionTest(TestCase):
+    """Test switching between the basic and full-text backends."""
+
+    @override_settings(SEARCH_BACKEND='basic')
+    def test_basic_backend_by_default(self):
+        engine = get_search_engine(None)
+        self.assertNotIsInstance(engine, FullTextSearchEngine)
+
+    @override_settings(SEARCH_BACKEND='fulltext')
+    def test_fulltext_backend_when_supported(self):
+        engine = get_search_engine(None)
+        self.assertEqual(
+            isinstance(engine, FullTextSearchEngine), fulltext_supported()
+        )
+
+
+    @override_settings(SEARCH_BACKEND='basic')
+    def test_basic_backend_skips_search_vector_updates(self):
+        user = User.objects.create_user(
+            username='basicsearch', password='testpass'
+        )
+        profile, _ = UserProfile.objects.get_or_create(user=user)
+        with mock.patch('search.signals.refresh_search_vector') as refresh:
+            Post.objects.create(content='Plain post', author=profile)
+        refresh.assert_not_called()
+
+
+@skipUnless(fulltext_supported(), 'Full-text search requires PostgreSQL')
+@override_settings(SEARCH_BACKEND='fulltext')
+class FullTextSearchEngineTest(TestCase):
+    """Test the PostgreSQL full-text search backend."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='searchuser',
+            email='fulltext@example.com',
+            password='testpass'
+        )
+        self.profile, _ = UserProfile.objects.get_or_create(user=self.user)
+        UserProfile.objects.filter(user=self.user).update(
+            is_verified=True,
+            last_verified_at=timezone.now()
+        )
+        self.profile.refresh_from_db()
+
+        self.hockey_post = Post.objects.create(
+            content='Hockey game tonight at the arena',
+            author=self.profile,
+            visibility='public'
+        )
+        self.other_post = Post.objects.create(
+            content='Budget meeting at city hall',
+            author=self.profile,
+            visibility='public'
+        )
+        self.engine = FullTextSearchEngine(None)
+
+    def test_search_vector_maintained_on_save(self):
+        self.hockey_post.refresh_from_db()
+        self.assertIsNotNone(self.hockey_post.search_vector)
+
+        self.other_post.content = 'Hockey budget approved'
+        self.other_post.save()
+        results = self.engine._search_posts('hockey', {}, 10, 0)
+        self.assertEqual(results['count'], 2)
+
+    def test_posts_ranked_by_relevance(self):
+        results = self.engine._search_posts('hockey arena', {}, 10, 0)
+        ids = [r['id'] for r in results['results']]
+        self.assertEqual(ids, [str(self.hockey_post.id)])
+
+    def test_fuzzy_username_match(self):
+        results = self.engine._search_users('serchuser', {}, 10, 0)
+        usernames = [r['username'] for r in results['results']]
+        self.assertIn('searchuser', usernames)
+
+
+class ConcurrentSearchTest(TestCase):
+    """Test the concurrent per-type fan-out of GlobalSearchEngine.search."""
+
+    def setUp(self):
+        self.engine = GlobalSearchEngine(None)
+        self.release = threading.Event()
+
+    def tearDown(self):
+        self.release.set()
+
+    def _fake(self, count, delay_event=None):
+        def search_type(query, filters, limit, offset):
+            if delay_event is not None:
+                delay_event.wait(5)
+            return {'results': [{'id': str(i)} for i in range(count)],
+                    'count': count}
+        return search_type
+
+    def _patch_types(self, **fakes):
+        patches = [
+            mock.patch.object(self.engine, f'_search_{name}', fake)
+            for name, fake in fakes.items()
+        ]
+        for patcher in patches:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_concurrent_matches_sequential(self):
+        self._patch_types(posts=self._fake(2), users=self._fake(1))
+        types = ['posts', 'users']
+
+        sequential = self.engine.search('hockey', types, concurrent=False)
+        concurrent = self.engine.search('hockey', types, concurrent=True)
+
+        self.assertEqual(sequential['results'], concurrent['results'])
+        self.assertEqual(concurrent['total_count'], 3)
+        self.assertFalse(concurrent['partial'])
+        self.assertEqual(concurrent['timed_out_types'], [])
+
+    def test_slow_type_returns_partial_results(self):
+        self._patch_types(
+            posts=self._fake(2),
+            polls=self._fake(4, delay_event=self.release)
+        )
+
+        started = time.monotonic()
+        results = self.engine.search(
+            'hockey', ['posts', 'polls'], concurrent=True, time_budget_ms=100
+        )
+        elapsed = time.monotonic() - started
+
+        self.assertLess(elapsed, 2)
+        self.assertTrue(results['partial'])
+        self.assertEqual(results['timed_out_types'], ['polls'])
+        self.assertEqual(results['results']['posts_count'], 2)
+        self.assertEqual(results['results']['polls'], [])
+        self.assertEqual(results['results']['polls_count'], 0)
+        self.assertEqual(results['total_count'], 2)
+
+    def test_failing_type_does_not_break_search(self):
+        def broken(query, filters, limit, offset):
+            raise RuntimeError('boom')
+
+        self._patch_types(posts=self._fake(1), users=broken)
+        results = self.engine.search(
+            'hockey', ['posts', 'users'], concurrent=True
+        )
+
+        self.assertFalse(results['partial'])
+        self.assertEqual(results['results']['users'], [])
+        self.assertEqual(results['results']['posts_count'], 1)
@@ -9,7 +9,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 import redis
 from .tasks import cache_recent_searches_by_user_type
-from .global_search import GlobalSearchEngine
+from .global_search import get_search_engine
 
 # DISABLED: postal library not in use anymore
 # from postal.parser import parse_address
@@ -135,7 +135,7 @@ class GlobalSearchView(APIView):
                 filters[key] = value
 
         # Perform search
-        search_engine = GlobalSearchEngine(request.user)
+        search_engine = get_search_engine(request.user)
         results = search_engine.search(
             query=query,
             content_types=content_types,
@@ -173,7 +173,7 @@ class QuickSearchView(APIView):
         content_type = request.query_params.get('type', 'posts')
         limit = min(int(request.query_params.get('limit', 5)), 10)
 
-        search_engine = GlobalSearchEngine(request.user)
+        search_engine = get_search_engine(request.user)
         results = search_engine.search(
             query=query,
             content_types=[content_type],